@@ -4,7 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.app.core.auth import RequirePermissionIfAuthEnabled, generate_api_key
+from backend.app.core.auth import (
+    RequirePermissionIfAuthEnabled,
+    flush_api_key_usage,
+    generate_api_key,
+    invalidate_api_key_cache,
+)
 from backend.app.core.database import get_db
 from backend.app.core.permissions import Permission
 from backend.app.models.api_key import APIKey
@@ -27,6 +32,7 @@ async def list_api_keys(
     _: User | None = RequirePermissionIfAuthEnabled(Permission.API_KEYS_READ),
 ):
     """List all API keys (without full key values)."""
+    await flush_api_key_usage()
     result = await db.execute(select(APIKey).order_by(APIKey.created_at.desc()))
     return list(result.scalars().all())
 
@@ -83,6 +89,7 @@ async def get_api_key(
     _: User | None = RequirePermissionIfAuthEnabled(Permission.API_KEYS_READ),
 ):
     """Get an API key by ID."""
+    await flush_api_key_usage()
     result = await db.execute(select(APIKey).where(APIKey.id == key_id))
     api_key = result.scalar_one_or_none()
 
@@ -124,6 +131,7 @@ async def update_api_key(
 
     await db.flush()
     await db.refresh(api_key)
+    invalidate_api_key_cache(api_key.id)
 
     return api_key
 
@@ -142,5 +150,6 @@ async def delete_api_key(
         raise HTTPException(status_code=404, detail="API key not found")
 
     await db.delete(api_key)
+    invalidate_api_key_cache(key_id)
 
     return {"message": "API key deleted"}
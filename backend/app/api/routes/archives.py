@@ -1,3 +1,4 @@
+import asyncio
 import io
 import json
 import logging
@@ -5,8 +6,10 @@ import zipfile
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
-from fastapi.responses import FileResponse, Response
-from sqlalchemy import func, select
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, Response
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.core.auth import (
@@ -19,9 +22,25 @@ from backend.app.core.permissions import Permission
 from backend.app.models.archive import PrintArchive
 from backend.app.models.filament import Filament
 from backend.app.models.user import User
-from backend.app.schemas.archive import ArchiveResponse, ArchiveStats, ArchiveUpdate, ReprintRequest
+from backend.app.schemas.archive import (
+    ArchiveDailyStats,
+    ArchiveResponse,
+    ArchiveStats,
+    ArchiveUpdate,
+    ReprintRequest,
+    count_printable_objects,
+)
 from backend.app.services.archive import ArchiveService
-from backend.app.utils.threemf_tools import extract_nozzle_mapping_from_3mf
+from backend.app.services.archive_duplicates import get_archives_with_duplicates
+from backend.app.services.archive_search import (
+    build_match_query,
+    rebuild_search_index as rebuild_archive_search_index,
+    search_archives as search_archive_hits,
+)
+from backend.app.services.archive_stats import get_stats_buckets, get_stats_totals, rebuild_archive_stats
+from backend.app.services.blob_store import intern_file, release_blob
+from backend.app.services.filament_requirements import filament_requirements_for_archive
+from backend.app.services.pagination import InvalidCursorError, UnknownFieldError, parse_fields
 
 logger = logging.getLogger(__name__)
 
@@ -59,13 +78,17 @@ def archive_to_response(
     archive: PrintArchive,
     duplicates: list[dict] | None = None,
     duplicate_count: int = 0,
+    fields: list[str] | None = None,
 ) -> dict:
-    """Convert archive model to response dict with computed fields."""
+    """Convert archive model to response dict with computed fields.
+
+    With fields, only those keys are returned, and the project, creator and
+    extra_data are only read when requested (sparse listings don't load them).
+    """
     data = {
         "id": archive.id,
         "printer_id": archive.printer_id,
         "project_id": archive.project_id,
-        "project_name": archive.project.name if archive.project else None,
         "filename": archive.filename,
         "file_path": archive.file_path,
         "file_size": archive.file_size,
@@ -90,7 +113,6 @@ def archive_to_response(
         "status": archive.status,
         "started_at": archive.started_at,
         "completed_at": archive.completed_at,
-        "extra_data": archive.extra_data,
         "makerworld_url": archive.makerworld_url,
         "designer": archive.designer,
         "external_url": archive.external_url,
@@ -106,84 +128,129 @@ def archive_to_response(
         "created_at": archive.created_at,
         # User tracking (Issue #206)
         "created_by_id": archive.created_by_id,
-        "created_by_username": archive.created_by.username if archive.created_by else None,
     }
+    if fields is None or "project_name" in fields:
+        data["project_name"] = archive.project.name if archive.project else None
+    if fields is None or "created_by_username" in fields:
+        data["created_by_username"] = archive.created_by.username if archive.created_by else None
+    if fields is None or "extra_data" in fields or "object_count" in fields:
+        data["extra_data"] = archive.extra_data
 
     # Add computed time accuracy fields
     accuracy_data = compute_time_accuracy(archive)
     data.update(accuracy_data)
 
-    return data
+    if fields is None:
+        return data
+    # Sparse responses bypass ArchiveResponse, so compute its derived field here
+    if "object_count" in fields:
+        data["object_count"] = count_printable_objects(data["extra_data"])
+    return {name: data.get(name) for name in fields}
 
 
 @router.get("/", response_model=list[ArchiveResponse])
 async def list_archives(
+    response: Response,
     printer_id: int | None = None,
     project_id: int | None = None,
-    limit: int = 50,
+    limit: int = Query(50, ge=0),
     offset: int = 0,
+    cursor: str | None = Query(None, description="X-Next-Cursor header of the previous page"),
+    fields: str | None = Query(None, description="Comma-separated fields to return (default: all)"),
     db: AsyncSession = Depends(get_db),
     _: User | None = RequirePermissionIfAuthEnabled(Permission.ARCHIVES_READ),
 ):
-    """List archived prints."""
+    """List archived prints, newest first.
+
+    For the next page pass the X-Next-Cursor response header as cursor (the header
+    is absent on the last page); offset is still supported for the first request.
+    X-Total-Count holds the number of archives matching the filters. With fields,
+    each archive only has the listed fields, and the project, creator, extra_data
+    and duplicate lookups are skipped unless requested.
+    """
+    try:
+        selected = parse_fields(fields, ArchiveResponse.model_fields)
+    except UnknownFieldError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown field: {e}")
+
+    def wanted(*names: str) -> bool:
+        return selected is None or any(name in selected for name in names)
+
     service = ArchiveService(db)
-    archives = await service.list_archives(
-        printer_id=printer_id,
-        project_id=project_id,
-        limit=limit,
-        offset=offset,
-    )
+    try:
+        archives, next_cursor = await service.list_archives(
+            printer_id=printer_id,
+            project_id=project_id,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+            with_relations=wanted("project_name", "created_by_username"),
+            with_extra_data=wanted("extra_data", "object_count"),
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    # Get sets of hashes and names that have duplicates (efficient single queries)
-    duplicate_hashes, duplicate_names = await service.get_duplicate_hashes_and_names()
+    headers = {"X-Total-Count": str(await service.count_archives(printer_id=printer_id, project_id=project_id))}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
 
-    # Mark archives that have duplicates (by hash or by print name)
-    result = []
-    for a in archives:
-        has_hash_dup = a.content_hash in duplicate_hashes if a.content_hash else False
-        has_name_dup = a.print_name and a.print_name.lower() in duplicate_names
-        has_duplicate = has_hash_dup or has_name_dup
-        result.append(archive_to_response(a, duplicate_count=1 if has_duplicate else 0))
-    return result
+    # Mark archives that have duplicates (by hash or by print name) from the maintained counts
+    with_duplicates = (
+        await get_archives_with_duplicates(db, [a.id for a in archives]) if wanted("duplicate_count") else set()
+    )
+    items = [
+        archive_to_response(a, duplicate_count=1 if a.id in with_duplicates else 0, fields=selected) for a in archives
+    ]
+    if selected is not None:
+        # Partial objects don't satisfy ArchiveResponse
+        return JSONResponse(jsonable_encoder(items), headers=headers)
+    response.headers.update(headers)
+    return items
 
 
 @router.get("/search", response_model=list[ArchiveResponse])
 async def search_archives(
+    response: Response,
     q: str = Query(..., min_length=2, description="Search query"),
     printer_id: int | None = None,
     project_id: int | None = None,
     status: str | None = None,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=500),
     offset: int = 0,
+    cursor: str | None = Query(None, description="X-Next-Cursor header of the previous page"),
     db: AsyncSession = Depends(get_db),
     _: User | None = RequirePermissionIfAuthEnabled(Permission.ARCHIVES_READ),
 ):
-    """Full-text search across archives.
+    """Full-text search across archives, best matches first.
 
     Searches print_name, filename, tags, notes, designer, and filament_type fields.
-    Supports partial matches with wildcards (e.g., 'vor*' matches 'voron').
+    Terms match as prefixes ('vor' matches 'voron'); use "quotes" for exact phrases,
+    field:term (e.g. tags:gift, designer:"Jane Doe") to search one field, and OR
+    between alternatives. Each result has a highlighted search_snippet.
+
+    For the next page pass the X-Next-Cursor response header as cursor (the header
+    is absent on the last page); offset is still supported for the first request.
     """
-    from sqlalchemy import text
     from sqlalchemy.orm import selectinload
 
-    # Prepare search query - add wildcard for partial matches
-    search_term = q.strip()
-    if not search_term.endswith("*"):
-        search_term = f"{search_term}*"
-
-    # Build the FTS query
-    # Using MATCH for FTS5 full-text search
-    fts_query = text("""
-        SELECT rowid FROM archive_fts
-        WHERE archive_fts MATCH :search_term
-        ORDER BY rank
-        LIMIT :limit OFFSET :offset
-    """)
+    match = build_match_query(q)
+    if match is None:
+        return []
 
     try:
-        result = await db.execute(fts_query, {"search_term": search_term, "limit": limit + 100, "offset": 0})
-        matched_ids = [row[0] for row in result.fetchall()]
-    except Exception as e:
+        hits, next_cursor = await search_archive_hits(
+            db,
+            match,
+            printer_id=printer_id,
+            project_id=project_id,
+            status=status,
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except OperationalError as e:
         logger.warning("FTS search failed, falling back to LIKE search: %s", e)
         # Fallback to LIKE search if FTS fails
         like_pattern = f"%{q}%"
@@ -213,28 +280,27 @@ async def search_archives(
         archives = result.scalars().all()
         return [archive_to_response(a) for a in archives]
 
-    if not matched_ids:
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if not hits:
         return []
 
-    # Fetch full archive records for matched IDs
-    query = select(PrintArchive).options(selectinload(PrintArchive.project)).where(PrintArchive.id.in_(matched_ids))
-
-    # Apply additional filters
-    if printer_id:
-        query = query.where(PrintArchive.printer_id == printer_id)
-    if project_id:
-        query = query.where(PrintArchive.project_id == project_id)
-    if status:
-        query = query.where(PrintArchive.status == status)
-
-    result = await db.execute(query)
+    result = await db.execute(
+        select(PrintArchive)
+        .options(selectinload(PrintArchive.project))
+        .where(PrintArchive.id.in_([hit.archive_id for hit in hits]))
+    )
     archives_dict = {a.id: a for a in result.scalars().all()}
 
-    # Preserve FTS ranking order and apply pagination
-    ordered_archives = [archives_dict[id] for id in matched_ids if id in archives_dict]
-    paginated = ordered_archives[offset : offset + limit]
-
-    return [archive_to_response(a) for a in paginated]
+    # Preserve ranking order
+    results = []
+    for hit in hits:
+        archive = archives_dict.get(hit.archive_id)
+        if archive:
+            data = archive_to_response(archive)
+            data["search_snippet"] = hit.snippet
+            results.append(data)
+    return results
 
 
 @router.post("/search/rebuild-index")
@@ -244,29 +310,12 @@ async def rebuild_search_index(
 ):
     """Rebuild the full-text search index from existing archives.
 
-    Use this if search results seem incomplete or incorrect.
+    The index is kept up to date automatically; use this if search results seem
+    incomplete or incorrect.
     """
-    from sqlalchemy import text
-
     try:
-        # Clear and rebuild the FTS index
-        await db.execute(text("DELETE FROM archive_fts"))
-
-        # Repopulate from print_archives
-        await db.execute(
-            text("""
-            INSERT INTO archive_fts(rowid, print_name, filename, tags, notes, designer, filament_type)
-            SELECT id, print_name, filename, tags, notes, designer, filament_type
-            FROM print_archives
-        """)
-        )
-
+        count = await rebuild_archive_search_index(db)
         await db.commit()
-
-        # Count entries
-        result = await db.execute(text("SELECT COUNT(*) FROM archive_fts"))
-        count = result.scalar() or 0
-
         return {"message": f"Search index rebuilt with {count} entries"}
     except Exception as e:
         logger.error("Failed to rebuild search index: %s", e)
@@ -344,12 +393,14 @@ async def export_archives(
     date_from: str | None = Query(None, description="Start date (ISO format)"),
     date_to: str | None = Query(None, description="End date (ISO format)"),
     search: str | None = None,
+    gzip: bool = Query(False, description="Gzip the CSV file"),
     db: AsyncSession = Depends(get_db),
     _: User | None = RequirePermissionIfAuthEnabled(Permission.ARCHIVES_READ),
 ):
     """Export archives to CSV or Excel format.
 
-    Returns a downloadable file with archive data.
+    Returns a downloadable file with archive data. The file is streamed while
+    archives are read, so large histories don't have to fit in memory.
     """
     from datetime import datetime
 
@@ -359,6 +410,8 @@ async def export_archives(
 
     if format not in ("csv", "xlsx"):
         raise HTTPException(400, "Format must be 'csv' or 'xlsx'")
+    if gzip and format != "csv":
+        raise HTTPException(400, "gzip is only supported for CSV (Excel files are already compressed)")
 
     # Parse fields
     field_list = None
@@ -381,7 +434,7 @@ async def export_archives(
 
     service = ExportService(db)
     try:
-        file_bytes, filename, content_type = await service.export_archives(
+        chunks, filename, content_type = await service.export_archives(
             format=format,
             fields=field_list,
             printer_id=printer_id,
@@ -390,12 +443,13 @@ async def export_archives(
             date_from=date_from_dt,
             date_to=date_to_dt,
             search=search,
+            compress=gzip,
         )
     except ImportError as e:
         raise HTTPException(500, str(e))
 
     return StreamingResponse(
-        io.BytesIO(file_bytes),
+        chunks,
         media_type=content_type,
         headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -441,95 +495,34 @@ async def get_archive_stats(
     db: AsyncSession = Depends(get_db),
     _: User | None = RequirePermissionIfAuthEnabled(Permission.STATS_READ),
 ):
-    """Get statistics across all archives."""
-    # Total counts
-    total_result = await db.execute(select(func.count(PrintArchive.id)))
-    total_prints = total_result.scalar() or 0
-
-    successful_result = await db.execute(select(func.count(PrintArchive.id)).where(PrintArchive.status == "completed"))
-    successful_prints = successful_result.scalar() or 0
-
-    failed_result = await db.execute(select(func.count(PrintArchive.id)).where(PrintArchive.status == "failed"))
-    failed_prints = failed_result.scalar() or 0
-
-    # Totals - use actual print time from timestamps (not slicer estimates)
-    # For archives with both started_at and completed_at, calculate actual duration
-    # Fall back to print_time_seconds only for archives without timestamps
-    archives_for_time = await db.execute(
-        select(PrintArchive.started_at, PrintArchive.completed_at, PrintArchive.print_time_seconds)
-    )
-    total_seconds = 0
-    for started_at, completed_at, print_time_seconds in archives_for_time.all():
-        if started_at and completed_at:
-            # Use actual elapsed time
-            actual_seconds = (completed_at - started_at).total_seconds()
-            if actual_seconds > 0:
-                total_seconds += actual_seconds
-        elif print_time_seconds:
-            # Fallback to estimate only if no timestamps
-            total_seconds += print_time_seconds
-    total_time = total_seconds / 3600  # Convert to hours
-
-    # Sum filament directly - filament_used_grams already contains the total for the print job
-    filament_result = await db.execute(select(func.coalesce(func.sum(PrintArchive.filament_used_grams), 0)))
-    total_filament = filament_result.scalar() or 0
-
-    cost_result = await db.execute(select(func.sum(PrintArchive.cost)))
-    total_cost = cost_result.scalar() or 0
-
-    # By filament type (split comma-separated values for multi-material prints)
-    filament_type_result = await db.execute(
-        select(PrintArchive.filament_type).where(PrintArchive.filament_type.isnot(None))
-    )
-    prints_by_filament: dict[str, int] = {}
-    for (filament_types,) in filament_type_result.all():
-        # Split by comma and count each type
-        for ftype in filament_types.split(","):
-            ftype = ftype.strip()
-            if ftype:
-                prints_by_filament[ftype] = prints_by_filament.get(ftype, 0) + 1
-
-    # By printer
-    printer_result = await db.execute(
-        select(PrintArchive.printer_id, func.count(PrintArchive.id)).group_by(PrintArchive.printer_id)
-    )
-    prints_by_printer = {str(k): v for k, v in printer_result.all()}
+    """Get statistics across all archives.
 
-    # Time accuracy statistics
-    # Get all completed archives with both estimated and actual times
-    accuracy_result = await db.execute(
-        select(PrintArchive)
-        .where(PrintArchive.status == "completed")
-        .where(PrintArchive.print_time_seconds.isnot(None))
-        .where(PrintArchive.started_at.isnot(None))
-        .where(PrintArchive.completed_at.isnot(None))
-    )
-    archives_with_times = list(accuracy_result.scalars().all())
-
-    average_accuracy = None
+    Reads the running totals in archive_stats, so the cost doesn't grow with
+    the archive history.
+    """
+    totals = await get_stats_totals(db)
+    total_prints = totals.prints
+    successful_prints = totals.completed
+    failed_prints = totals.failed
+    # Actual print time from timestamps, slicer estimate for archives without them
+    total_time = totals.print_seconds / 3600  # Convert to hours
+    total_filament = totals.filament_grams
+    total_cost = totals.cost
+
+    # By filament type (comma-separated values for multi-material prints count once per type)
+    prints_by_filament = {b.key: b.prints for b in await get_stats_buckets(db, "filament")}
+
+    # By printer, with time accuracy (estimated / actual time) per printer
+    prints_by_printer: dict[str, int] = {}
     accuracy_by_printer: dict[str, float] = {}
+    for bucket in await get_stats_buckets(db, "printer"):
+        prints_by_printer[bucket.key or "None"] = bucket.prints
+        if bucket.accuracy_count:
+            accuracy_by_printer[bucket.key or "unknown"] = round(bucket.accuracy_sum / bucket.accuracy_count, 1)
 
-    if archives_with_times:
-        accuracies = []
-        printer_accuracies: dict[str, list[float]] = {}
-
-        for archive in archives_with_times:
-            acc_data = compute_time_accuracy(archive)
-            if acc_data["time_accuracy"] is not None:
-                accuracies.append(acc_data["time_accuracy"])
-
-                # Group by printer
-                printer_key = str(archive.printer_id) if archive.printer_id else "unknown"
-                if printer_key not in printer_accuracies:
-                    printer_accuracies[printer_key] = []
-                printer_accuracies[printer_key].append(acc_data["time_accuracy"])
-
-        if accuracies:
-            average_accuracy = round(sum(accuracies) / len(accuracies), 1)
-
-        # Calculate per-printer averages
-        for printer_key, accs in printer_accuracies.items():
-            accuracy_by_printer[printer_key] = round(sum(accs) / len(accs), 1)
+    average_accuracy = None
+    if totals.accuracy_count:
+        average_accuracy = round(totals.accuracy_sum / totals.accuracy_count, 1)
 
     # Energy totals - check which mode to use
     from backend.app.api.routes.settings import get_setting
@@ -538,46 +531,23 @@ async def get_archive_stats(
     energy_cost_per_kwh_str = await get_setting(db, "energy_cost_per_kwh")
     energy_cost_per_kwh = float(energy_cost_per_kwh_str) if energy_cost_per_kwh_str else 0.15
 
+    energy_sampled_at = None
+    energy_stale = False
     if energy_tracking_mode == "total":
-        # Total mode: sum up 'total' counter from all smart plugs (lifetime consumption)
+        # Total mode: sum up the cached 'total' counters of all smart plugs (lifetime consumption)
         from backend.app.models.smart_plug import SmartPlug
-        from backend.app.services.homeassistant import homeassistant_service
-        from backend.app.services.mqtt_relay import mqtt_relay
-        from backend.app.services.tasmota import tasmota_service
-
-        plugs_result = await db.execute(select(SmartPlug))
-        plugs = list(plugs_result.scalars().all())
-
-        # Configure HA service once (needed for homeassistant-type plugs)
-        ha_url = await get_setting(db, "ha_url") or ""
-        ha_token = await get_setting(db, "ha_token") or ""
-        homeassistant_service.configure(ha_url, ha_token)
-
-        total_energy_kwh = 0.0
-        for plug in plugs:
-            if plug.plug_type == "tasmota":
-                energy = await tasmota_service.get_energy(plug)
-                if energy and energy.get("total") is not None:
-                    total_energy_kwh += energy["total"]
-            elif plug.plug_type == "homeassistant":
-                energy = await homeassistant_service.get_energy(plug)
-                if energy and energy.get("total") is not None:
-                    total_energy_kwh += energy["total"]
-            elif plug.plug_type == "mqtt":
-                # MQTT plugs report "today" energy, not lifetime total
-                mqtt_data = mqtt_relay.smart_plug_service.get_plug_data(plug.id)
-                if mqtt_data and mqtt_data.energy is not None:
-                    total_energy_kwh += mqtt_data.energy
-
-        total_energy_kwh = round(total_energy_kwh, 3)
+        from backend.app.services.energy_sampler import energy_sampler
+
+        plug_ids = list((await db.execute(select(SmartPlug.id))).scalars().all())
+        energy = energy_sampler.get_total_energy(plug_ids)
+        total_energy_kwh = energy.total_kwh
         total_energy_cost = round(total_energy_kwh * energy_cost_per_kwh, 2)
+        energy_sampled_at = energy.sampled_at
+        energy_stale = energy.stale
     else:
         # Print mode: sum up per-print energy from archives
-        energy_kwh_result = await db.execute(select(func.sum(PrintArchive.energy_kwh)))
-        total_energy_kwh = energy_kwh_result.scalar() or 0
-
-        energy_cost_result = await db.execute(select(func.sum(PrintArchive.energy_cost)))
-        total_energy_cost = energy_cost_result.scalar() or 0
+        total_energy_kwh = totals.energy_kwh
+        total_energy_cost = totals.energy_cost
 
     return ArchiveStats(
         total_prints=total_prints,
@@ -592,9 +562,48 @@ async def get_archive_stats(
         time_accuracy_by_printer=accuracy_by_printer if accuracy_by_printer else None,
         total_energy_kwh=round(total_energy_kwh, 3),
         total_energy_cost=round(total_energy_cost, 2),
+        energy_sampled_at=energy_sampled_at,
+        energy_stale=energy_stale,
     )
 
 
+@router.get("/stats/daily", response_model=list[ArchiveDailyStats])
+async def get_archive_daily_stats(
+    days: int = Query(30, ge=1, le=3650),
+    db: AsyncSession = Depends(get_db),
+    _: User | None = RequirePermissionIfAuthEnabled(Permission.STATS_READ),
+):
+    """Get print statistics per day for the most recent days with archives."""
+    buckets = sorted(await get_stats_buckets(db, "day"), key=lambda b: b.key, reverse=True)[:days]
+    return [
+        ArchiveDailyStats(
+            date=b.key,
+            total_prints=b.prints,
+            successful_prints=b.completed,
+            failed_prints=b.failed,
+            total_print_time_hours=round(b.print_seconds / 3600, 1),
+            total_filament_grams=round(b.filament_grams, 1),
+            total_cost=round(b.cost, 2),
+        )
+        for b in reversed(buckets)
+    ]
+
+
+@router.post("/stats/rebuild")
+async def rebuild_stats(
+    db: AsyncSession = Depends(get_db),
+    _: User | None = RequirePermissionIfAuthEnabled(Permission.ARCHIVES_UPDATE_ALL),
+):
+    """Recompute the archive statistics from all archives.
+
+    Statistics are kept up to date automatically; use this if they seem wrong.
+    """
+    await rebuild_archive_stats(db)
+    await db.commit()
+    totals = await get_stats_totals(db)
+    return {"message": f"Statistics rebuilt from {totals.prints} archives"}
+
+
 @router.get("/tags")
 async def get_all_tags(
     db: AsyncSession = Depends(get_db),
@@ -2612,8 +2621,6 @@ async def get_filament_requirements(
         archive_id: The archive ID
         plate_id: Optional plate index to filter filaments for (for multi-plate files)
     """
-    import defusedxml.ElementTree as ET
-
     service = ArchiveService(db)
     archive = await service.get_archive(archive_id)
     if not archive:
@@ -2623,97 +2630,8 @@ async def get_filament_requirements(
     if not file_path.exists():
         raise HTTPException(404, "Archive file not found")
 
-    filaments = []
-
-    try:
-        with zipfile.ZipFile(file_path, "r") as zf:
-            # Parse slice_info.config for filament requirements
-            if "Metadata/slice_info.config" in zf.namelist():
-                content = zf.read("Metadata/slice_info.config").decode()
-                root = ET.fromstring(content)
-
-                # If plate_id is specified, find filaments for that specific plate
-                if plate_id is not None:
-                    # Find the plate element with matching index
-                    for plate_elem in root.findall(".//plate"):
-                        plate_index = None
-                        for meta in plate_elem.findall("metadata"):
-                            if meta.get("key") == "index":
-                                try:
-                                    plate_index = int(meta.get("value", "0"))
-                                except ValueError:
-                                    pass  # Skip plate with non-numeric index metadata
-                                break
-
-                        if plate_index == plate_id:
-                            # Extract filaments from this plate element
-                            for filament_elem in plate_elem.findall("filament"):
-                                filament_id = filament_elem.get("id")
-                                filament_type = filament_elem.get("type", "")
-                                filament_color = filament_elem.get("color", "")
-                                used_g = filament_elem.get("used_g", "0")
-                                used_m = filament_elem.get("used_m", "0")
-
-                                tray_info_idx = filament_elem.get("tray_info_idx", "")
-
-                                try:
-                                    used_grams = float(used_g)
-                                except (ValueError, TypeError):
-                                    used_grams = 0
-
-                                if used_grams > 0 and filament_id:
-                                    filaments.append(
-                                        {
-                                            "slot_id": int(filament_id),
-                                            "type": filament_type,
-                                            "color": filament_color,
-                                            "used_grams": round(used_grams, 1),
-                                            "used_meters": float(used_m) if used_m else 0,
-                                            "tray_info_idx": tray_info_idx,
-                                        }
-                                    )
-                            break
-                else:
-                    # No plate_id specified - extract all filaments with used_g > 0
-                    # This is the legacy behavior for single-plate files
-                    for filament_elem in root.findall(".//filament"):
-                        filament_id = filament_elem.get("id")
-                        filament_type = filament_elem.get("type", "")
-                        filament_color = filament_elem.get("color", "")
-                        used_g = filament_elem.get("used_g", "0")
-                        used_m = filament_elem.get("used_m", "0")
-
-                        tray_info_idx = filament_elem.get("tray_info_idx", "")
-
-                        # Only include filaments that are actually used
-                        try:
-                            used_grams = float(used_g)
-                        except (ValueError, TypeError):
-                            used_grams = 0
-
-                        if used_grams > 0 and filament_id:
-                            filaments.append(
-                                {
-                                    "slot_id": int(filament_id),
-                                    "type": filament_type,
-                                    "color": filament_color,
-                                    "used_grams": round(used_grams, 1),
-                                    "used_meters": float(used_m) if used_m else 0,
-                                    "tray_info_idx": tray_info_idx,
-                                }
-                            )
-
-            # Sort by slot ID
-            filaments.sort(key=lambda x: x["slot_id"])
-
-            # Enrich with nozzle mapping for dual-nozzle printers
-            nozzle_mapping = extract_nozzle_mapping_from_3mf(zf)
-            if nozzle_mapping:
-                for filament in filaments:
-                    filament["nozzle_id"] = nozzle_mapping.get(filament["slot_id"])
-
-    except Exception as e:
-        logger.warning("Failed to parse filament requirements from archive %s: %s", archive_id, e)
+    # Parsed once per file content and stored
+    filaments = await filament_requirements_for_archive(db, archive, plate_id)
 
     return {
         "archive_id": archive_id,
@@ -2964,6 +2882,13 @@ async def update_project_page(
     if not success:
         raise HTTPException(500, "Failed to update project page")
 
+    # The edited file is new content: store it and move the archive to its blob
+    old_hash = archive.content_hash
+    archive.content_hash = await asyncio.to_thread(intern_file, file_path)
+    await db.commit()
+    if old_hash != archive.content_hash:
+        await asyncio.to_thread(release_blob, old_hash)
+
     # Return updated data
     data = parser.parse(archive_id)
     return data
@@ -17,6 +17,7 @@ from backend.app.core.auth import (
     get_password_hash,
     get_user_by_email,
     get_user_by_username,
+    invalidate_auth_cache,
 )
 from backend.app.core.database import get_db
 from backend.app.models.group import Group
@@ -199,6 +200,7 @@ async def setup_auth(request: SetupRequest, db: AsyncSession = Depends(get_db)):
         await set_auth_enabled(db, request.auth_enabled)
         await set_setup_completed(db, True)
         await db.commit()
+        invalidate_auth_cache()
 
         if admin_created:
             await db.refresh(admin_user)
@@ -251,6 +253,7 @@ async def disable_auth(
     try:
         await set_auth_enabled(db, False)
         await db.commit()
+        invalidate_auth_cache()
         logger.info("Authentication disabled by admin user: %s", user.username)
         return {"message": "Authentication disabled successfully", "auth_enabled": False}
     except Exception as e:
@@ -527,6 +530,7 @@ async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Dep
             new_password = generate_secure_password()
             user.password_hash = get_password_hash(new_password)
             await db.commit()
+            invalidate_auth_cache()
 
             login_url = await get_external_login_url(db)
 
@@ -603,6 +607,7 @@ async def reset_user_password(
         new_password = generate_secure_password()
         user.password_hash = get_password_hash(new_password)
         await db.commit()
+        invalidate_auth_cache()
 
         login_url = await get_external_login_url(db)
 
@@ -2,6 +2,7 @@
 
 import asyncio
 import logging
+import time
 from collections.abc import AsyncGenerator
 
 from fastapi import APIRouter, Depends, HTTPException, Request
@@ -23,6 +24,7 @@ from backend.app.services.camera import (
     read_next_chamber_frame,
     test_camera_connection,
 )
+from backend.app.services.camera_hub import CameraStreamError, camera_hub_manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/printers", tags=["camera"])
@@ -33,7 +35,7 @@ _active_streams: dict[str, asyncio.subprocess.Process] = {}
 # Track active chamber image connections for cleanup
 _active_chamber_streams: dict[str, tuple] = {}
 
-# Store last frame for each printer (for photo capture from active stream)
+# Store last frame for each printer (for photo capture from active stream), fed by the camera hub
 _last_frames: dict[int, bytes] = {}
 
 # Track last frame timestamp for each printer (for stall detection)
@@ -42,6 +44,9 @@ _last_frame_times: dict[int, float] = {}
 # Track stream start times for each printer
 _stream_start_times: dict[int, float] = {}
 
+# Stream ID of the upstream that owns each printer's frame buffer and start time
+_frame_buffer_owners: dict[int, str | None] = {}
+
 # Track active external camera streams by printer ID
 _active_external_streams: set[int] = set()
 
@@ -63,80 +68,88 @@ async def get_printer_or_404(printer_id: int, db: AsyncSession) -> Printer:
     return printer
 
 
-async def generate_chamber_mjpeg_stream(
+def _mjpeg_part(frame: bytes) -> bytes:
+    """Wrap a JPEG frame as a multipart MJPEG part."""
+    return (
+        b"--frame\r\n"
+        b"Content-Type: image/jpeg\r\n"
+        b"Content-Length: " + str(len(frame)).encode() + b"\r\n"
+        b"\r\n" + frame + b"\r\n"
+    )
+
+
+def _mjpeg_error_part(message: str) -> bytes:
+    """Build a plain-text multipart part carrying an error message."""
+    return b"--frame\r\nContent-Type: text/plain\r\n\r\nError: " + message.encode() + b"\r\n"
+
+
+def _record_frame(printer_id: int, frame: bytes) -> None:
+    """Save the latest hub frame for photo capture and stall detection."""
+    _last_frames[printer_id] = frame
+    _last_frame_times[printer_id] = time.time()
+
+
+def _claim_frame_buffer(printer_id: int, stream_id: str | None) -> None:
+    """Make a starting upstream the owner of a printer's frame buffer and start time."""
+    _frame_buffer_owners[printer_id] = stream_id
+    _stream_start_times[printer_id] = time.time()
+
+
+def _clear_frame_buffer(printer_id: int, stream_id: str | None) -> None:
+    """Clear a printer's frame buffer, unless an upstream started since has taken it over."""
+    if printer_id not in _frame_buffer_owners or _frame_buffer_owners[printer_id] != stream_id:
+        return
+    del _frame_buffer_owners[printer_id]
+    _last_frames.pop(printer_id, None)
+    _last_frame_times.pop(printer_id, None)
+    _stream_start_times.pop(printer_id, None)
+
+
+async def iter_chamber_frames(
     ip_address: str,
     access_code: str,
     model: str | None,
     fps: int = 5,
     stream_id: str | None = None,
-    disconnect_event: asyncio.Event | None = None,
     printer_id: int | None = None,
 ) -> AsyncGenerator[bytes, None]:
-    """Generate MJPEG stream from A1/P1 printer using chamber image protocol.
+    """Yield JPEG frames from an A1/P1 printer using the chamber image protocol.
 
     This connects to port 6000 and reads JPEG frames using the Bambu binary protocol.
+    Used as the upstream source of a camera hub.
     """
     logger.info("Starting chamber image stream for %s (stream_id=%s, model=%s)", ip_address, stream_id, model)
 
     connection = await generate_chamber_image_stream(ip_address, access_code, fps)
     if connection is None:
         logger.error("Failed to connect to chamber image stream for %s", ip_address)
-        yield (
-            b"--frame\r\n"
-            b"Content-Type: text/plain\r\n\r\n"
-            b"Error: Camera connection failed. Check printer is on and camera is enabled.\r\n"
-        )
-        return
+        raise CameraStreamError("Camera connection failed. Check printer is on and camera is enabled.")
 
     reader, writer = connection
 
     # Track active connection for cleanup
     if stream_id:
         _active_chamber_streams[stream_id] = (reader, writer)
+    if printer_id is not None:
+        _claim_frame_buffer(printer_id, stream_id)
 
     try:
         frame_interval = 1.0 / fps if fps > 0 else 0.2
         last_frame_time = 0.0
 
         while True:
-            # Check if client disconnected
-            if disconnect_event and disconnect_event.is_set():
-                logger.info("Client disconnected, stopping chamber stream %s", stream_id)
-                break
-
-            # Read next frame
             frame = await read_next_chamber_frame(reader, timeout=30.0)
             if frame is None:
                 logger.warning("Chamber image stream ended for %s", stream_id)
                 break
 
-            # Save frame to buffer for photo capture and track timestamp
-            if printer_id is not None:
-                import time
-
-                _last_frames[printer_id] = frame
-                _last_frame_times[printer_id] = time.time()
-
             # Rate limiting - skip frames if needed to maintain target FPS
             current_time = asyncio.get_event_loop().time()
             if current_time - last_frame_time < frame_interval:
                 continue
             last_frame_time = current_time
 
-            # Yield frame in MJPEG format
-            yield (
-                b"--frame\r\n"
-                b"Content-Type: image/jpeg\r\n"
-                b"Content-Length: " + str(len(frame)).encode() + b"\r\n"
-                b"\r\n" + frame + b"\r\n"
-            )
-
-    except asyncio.CancelledError:
-        logger.info("Chamber image stream cancelled (stream_id=%s)", stream_id)
-    except GeneratorExit:
-        logger.info("Chamber image stream generator exit (stream_id=%s)", stream_id)
-    except Exception as e:
-        logger.exception("Chamber image stream error: %s", e)
+            yield frame
     finally:
         # Remove from active streams
         if stream_id and stream_id in _active_chamber_streams:
@@ -144,9 +157,7 @@ async def generate_chamber_mjpeg_stream(
 
         # Clean up frame buffer and timestamps
         if printer_id is not None:
-            _last_frames.pop(printer_id, None)
-            _last_frame_times.pop(printer_id, None)
-            _stream_start_times.pop(printer_id, None)
+            _clear_frame_buffer(printer_id, stream_id)
 
         # Close the connection
         try:
@@ -157,24 +168,23 @@ async def generate_chamber_mjpeg_stream(
         logger.info("Chamber image stream stopped for %s (stream_id=%s)", ip_address, stream_id)
 
 
-async def generate_rtsp_mjpeg_stream(
+async def iter_rtsp_frames(
     ip_address: str,
     access_code: str,
     model: str | None,
     fps: int = 10,
     stream_id: str | None = None,
-    disconnect_event: asyncio.Event | None = None,
     printer_id: int | None = None,
 ) -> AsyncGenerator[bytes, None]:
-    """Generate MJPEG stream from printer camera using ffmpeg/RTSP.
+    """Yield JPEG frames from the printer camera using ffmpeg/RTSP.
 
     This is for X1/H2/P2 models that support RTSP streaming.
+    Used as the upstream source of a camera hub.
     """
     ffmpeg = get_ffmpeg_path()
     if not ffmpeg:
         logger.error("ffmpeg not found - camera streaming requires ffmpeg")
-        yield (b"--frame\r\nContent-Type: text/plain\r\n\r\nError: ffmpeg not installed\r\n")
-        return
+        raise CameraStreamError("ffmpeg not installed")
 
     port = get_camera_port(model)
     camera_url = f"rtsps://bblp:{access_code}@{ip_address}:{port}/streaming/live/1"
@@ -218,12 +228,18 @@ async def generate_rtsp_mjpeg_stream(
     logger.debug("ffmpeg command: %s ... (url hidden)", ffmpeg)
 
     process = None
+    if printer_id is not None:
+        _claim_frame_buffer(printer_id, stream_id)
     try:
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except FileNotFoundError:
+            logger.error("ffmpeg not found - camera streaming requires ffmpeg")
+            raise CameraStreamError("ffmpeg not installed")
 
         # Track active process for cleanup
         if stream_id:
@@ -234,12 +250,7 @@ async def generate_rtsp_mjpeg_stream(
         if process.returncode is not None:
             stderr = await process.stderr.read()
             logger.error("ffmpeg failed immediately: %s", stderr.decode())
-            yield (
-                b"--frame\r\n"
-                b"Content-Type: text/plain\r\n\r\n"
-                b"Error: Camera connection failed. Check printer is on and camera is enabled.\r\n"
-            )
-            return
+            raise CameraStreamError("Camera connection failed. Check printer is on and camera is enabled.")
 
         # Read JPEG frames from ffmpeg output
         # JPEG images start with 0xFFD8 and end with 0xFFD9
@@ -248,76 +259,41 @@ async def generate_rtsp_mjpeg_stream(
         jpeg_end = b"\xff\xd9"
 
         while True:
-            # Check if client disconnected
-            if disconnect_event and disconnect_event.is_set():
-                logger.info("Client disconnected, stopping stream %s", stream_id)
-                break
-
             try:
                 # Read chunk from ffmpeg - use longer timeout for network hiccups
-                chunk = await asyncio.wait_for(process.stdout.read(8192), timeout=30.0)
-
-                if not chunk:
-                    logger.warning("Camera stream ended (no more data)")
-                    break
-
-                buffer += chunk
-
-                # Find complete JPEG frames in buffer
-                while True:
-                    start_idx = buffer.find(jpeg_start)
-                    if start_idx == -1:
-                        # No start marker, clear buffer up to last 2 bytes
-                        buffer = buffer[-2:] if len(buffer) > 2 else buffer
-                        break
-
-                    # Trim anything before the start marker
-                    if start_idx > 0:
-                        buffer = buffer[start_idx:]
+                chunk = await asyncio.wait_for(process.stdout.read(65536), timeout=30.0)
+            except TimeoutError:
+                logger.warning("Camera stream read timeout")
+                break
 
-                    end_idx = buffer.find(jpeg_end, 2)  # Skip first 2 bytes
-                    if end_idx == -1:
-                        # No end marker yet, wait for more data
-                        break
+            if not chunk:
+                logger.warning("Camera stream ended (no more data)")
+                break
 
-                    # Extract complete frame
-                    frame = buffer[: end_idx + 2]
-                    buffer = buffer[end_idx + 2 :]
+            buffer += chunk
 
-                    # Save frame to buffer for photo capture and track timestamp
-                    if printer_id is not None:
-                        import time
+            # Find complete JPEG frames in buffer
+            while True:
+                start_idx = buffer.find(jpeg_start)
+                if start_idx == -1:
+                    # No start marker, clear buffer up to last 2 bytes
+                    buffer = buffer[-2:] if len(buffer) > 2 else buffer
+                    break
 
-                        _last_frames[printer_id] = frame
-                        _last_frame_times[printer_id] = time.time()
+                # Trim anything before the start marker
+                if start_idx > 0:
+                    buffer = buffer[start_idx:]
 
-                    # Yield frame in MJPEG format
-                    yield (
-                        b"--frame\r\n"
-                        b"Content-Type: image/jpeg\r\n"
-                        b"Content-Length: " + str(len(frame)).encode() + b"\r\n"
-                        b"\r\n" + frame + b"\r\n"
-                    )
+                end_idx = buffer.find(jpeg_end, 2)  # Skip first 2 bytes
+                if end_idx == -1:
+                    # No end marker yet, wait for more data
+                    break
 
-            except TimeoutError:
-                logger.warning("Camera stream read timeout")
-                break
-            except asyncio.CancelledError:
-                logger.info("Camera stream cancelled (stream_id=%s)", stream_id)
-                break
-            except GeneratorExit:
-                logger.info("Camera stream generator exit (stream_id=%s)", stream_id)
-                break
+                # Extract complete frame
+                frame = buffer[: end_idx + 2]
+                buffer = buffer[end_idx + 2 :]
+                yield frame
 
-    except FileNotFoundError:
-        logger.error("ffmpeg not found - camera streaming requires ffmpeg")
-        yield (b"--frame\r\nContent-Type: text/plain\r\n\r\nError: ffmpeg not installed\r\n")
-    except asyncio.CancelledError:
-        logger.info("Camera stream task cancelled (stream_id=%s)", stream_id)
-    except GeneratorExit:
-        logger.info("Camera stream generator closed (stream_id=%s)", stream_id)
-    except Exception as e:
-        logger.exception("Camera stream error: %s", e)
     finally:
         # Remove from active streams
         if stream_id and stream_id in _active_streams:
@@ -325,9 +301,7 @@ async def generate_rtsp_mjpeg_stream(
 
         # Clean up frame buffer and timestamps
         if printer_id is not None:
-            _last_frames.pop(printer_id, None)
-            _last_frame_times.pop(printer_id, None)
-            _stream_start_times.pop(printer_id, None)
+            _clear_frame_buffer(printer_id, stream_id)
 
         if process and process.returncode is None:
             logger.info("Terminating ffmpeg process for stream %s", stream_id)
@@ -351,6 +325,8 @@ async def camera_stream(
     printer_id: int,
     request: Request,
     fps: int = 10,
+    max_width: int | None = None,
+    viewer: str | None = None,
     db: AsyncSession = Depends(get_db),
 ):
     """Stream live video from printer camera as MJPEG.
@@ -365,9 +341,17 @@ async def camera_stream(
     - A1/P1: Chamber image protocol (port 6000)
     - X1/H2/P2: RTSP via ffmpeg (port 322)
 
+    Built-in camera viewers of the same printer share a single upstream
+    connection through a camera hub; each viewer only receives the frames
+    its own fps allows and skips frames it is too slow to consume. Viewers
+    passing max_width are served from a downscaled tier (half resolution, or
+    a 1 fps thumbnail for small tiles) that is encoded once per tier.
+
     Args:
         printer_id: Printer ID
         fps: Target frames per second (default: 10, max: 30)
+        max_width: Largest frame width the client displays (default: full resolution)
+        viewer: Client-chosen viewer ID, passed to /camera/stop to detach this stream
     """
     import uuid
 
@@ -375,8 +359,6 @@ async def camera_stream(
 
     # Check for external camera first
     if printer.external_camera_enabled and printer.external_camera_url:
-        import time
-
         from backend.app.services.external_camera import generate_mjpeg_stream
 
         # Limit external camera FPS to reduce browser load
@@ -422,59 +404,58 @@ async def camera_stream(
     # Validate FPS - A1/P1 models max out at ~5 FPS
     if is_chamber_image_model(printer.model):
         fps = min(max(fps, 1), 5)
-    else:
-        fps = min(max(fps, 1), 30)
-
-    # Generate unique stream ID for tracking
-    stream_id = f"{printer_id}-{uuid.uuid4().hex[:8]}"
-
-    # Create disconnect event that will be set when client disconnects
-    disconnect_event = asyncio.Event()
-
-    # Choose the appropriate stream generator based on model
-    if is_chamber_image_model(printer.model):
-        stream_generator = generate_chamber_mjpeg_stream
+        frame_source = iter_chamber_frames
         logger.info("Using chamber image protocol for %s", printer.model)
     else:
-        stream_generator = generate_rtsp_mjpeg_stream
+        fps = min(max(fps, 1), 30)
+        frame_source = iter_rtsp_frames
         logger.info("Using RTSP protocol for %s", printer.model)
 
-    # Track stream start time
-    import time
+    ip_address = printer.ip_address
+    access_code = printer.access_code
+    model = printer.model
+
+    def hub_source(source_fps: int) -> AsyncGenerator[bytes, None]:
+        # Each upstream (re)start gets its own stream ID for tracking/cleanup
+        return frame_source(
+            ip_address=ip_address,
+            access_code=access_code,
+            model=model,
+            fps=source_fps,
+            stream_id=f"{printer_id}-{uuid.uuid4().hex[:8]}",
+            printer_id=printer_id,
+        )
 
-    _stream_start_times[printer_id] = time.time()
+    hub = await camera_hub_manager.acquire(
+        printer_id,
+        hub_source,
+        fps,
+        source_key=(ip_address, access_code, model),
+        on_frame=_record_frame,
+    )
+    if max_width is not None and max_width <= 0:
+        max_width = None
+    subscriber = hub.subscribe(fps, max_width=max_width, viewer_id=viewer)
 
-    async def stream_with_disconnect_check():
-        """Wrapper generator that monitors for client disconnect."""
+    async def stream_from_hub():
+        """Relay hub frames to this client until it disconnects or the hub ends."""
         try:
-            async for chunk in stream_generator(
-                ip_address=printer.ip_address,
-                access_code=printer.access_code,
-                model=printer.model,
-                fps=fps,
-                stream_id=stream_id,
-                disconnect_event=disconnect_event,
-                printer_id=printer_id,
-            ):
+            async for frame in subscriber.frames():
                 # Check if client is still connected
                 if await request.is_disconnected():
-                    logger.info("Client disconnected detected for stream %s", stream_id)
-                    disconnect_event.set()
+                    logger.info("Client disconnected from camera hub for printer %s", printer_id)
                     break
-                yield chunk
+                yield _mjpeg_part(frame)
+            else:
+                if hub.error and subscriber.frames_received == 0:
+                    yield _mjpeg_error_part(hub.error)
         except asyncio.CancelledError:
-            logger.info("Stream %s cancelled", stream_id)
-            disconnect_event.set()
-        except GeneratorExit:
-            logger.info("Stream %s generator closed", stream_id)
-            disconnect_event.set()
+            logger.info("Camera stream for printer %s cancelled", printer_id)
         finally:
-            disconnect_event.set()
-            # Give a moment for the inner generator to clean up
-            await asyncio.sleep(0.1)
+            hub.unsubscribe(subscriber)
 
     return StreamingResponse(
-        stream_with_disconnect_check(),
+        stream_from_hub(),
         media_type="multipart/x-mixed-replace; boundary=frame",
         headers={
             "Cache-Control": "no-cache, no-store, must-revalidate",
@@ -487,13 +468,25 @@ async def camera_stream(
 @router.api_route("/{printer_id}/camera/stop", methods=["GET", "POST"])
 async def stop_camera_stream(
     printer_id: int,
+    viewer: str | None = None,
     _: User | None = RequirePermissionIfAuthEnabled(Permission.CAMERA_VIEW),
 ):
     """Stop all active camera streams for a printer.
 
     This can be called by the frontend when the camera window is closed.
     Accepts both GET and POST (POST for sendBeacon compatibility).
+
+    The viewer given by the viewer ID is detached from the printer's camera
+    hub. The shared upstream is left running while other viewers are still
+    subscribed, and the number of viewers detached is returned; it idles
+    down on its own once the last one leaves.
     """
+    detached = camera_hub_manager.detach(printer_id, viewer) if viewer else 0
+    viewers = camera_hub_manager.get_subscriber_count(printer_id)
+    if viewers > 0:
+        logger.info("Camera for printer %s still has %s viewer(s), keeping stream", printer_id, viewers)
+        return {"stopped": detached}
+
     stopped = 0
 
     # Stop ffmpeg/RTSP streams
@@ -527,6 +520,8 @@ async def stop_camera_stream(
     for stream_id in to_remove_chamber:
         _active_chamber_streams.pop(stream_id, None)
 
+    await camera_hub_manager.stop(printer_id)
+
     logger.info("Stopped %s camera stream(s) for printer %s", stopped, printer_id)
     return {"stopped": stopped}
 
@@ -634,8 +629,6 @@ async def camera_status(
     Returns whether a stream is active and when the last frame was received.
     Used by the frontend to detect stalled streams and auto-reconnect.
     """
-    import time
-
     # Check if there's an active stream for this printer
     has_active_stream = False
 
@@ -5,7 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from backend.app.core.auth import RequirePermissionIfAuthEnabled
+from backend.app.core.auth import RequirePermissionIfAuthEnabled, invalidate_auth_cache
 from backend.app.core.database import get_db
 from backend.app.core.permissions import (
     ALL_PERMISSIONS,
@@ -203,6 +203,7 @@ async def update_group(
         group.permissions = group_data.permissions
 
     await db.commit()
+    invalidate_auth_cache()
     await db.refresh(group)
 
     return GroupResponse(
@@ -240,6 +241,7 @@ async def delete_group(
 
     await db.delete(group)
     await db.commit()
+    invalidate_auth_cache()
 
 
 @router.post("/{group_id}/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -277,6 +279,7 @@ async def add_user_to_group(
 
     group.users.append(user)
     await db.commit()
+    invalidate_auth_cache()
 
 
 @router.delete("/{group_id}/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -314,3 +317,4 @@ async def remove_user_from_group(
 
     group.users.remove(user)
     await db.commit()
+    invalidate_auth_cache()
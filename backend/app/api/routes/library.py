@@ -1,8 +1,8 @@
 """API routes for File Manager (Library) functionality."""
 
+import asyncio
 import base64
 import binascii
-import hashlib
 import logging
 import os
 import re
@@ -12,10 +12,11 @@ import zipfile
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
-from fastapi.responses import FileResponse as FastAPIFileResponse
-from sqlalchemy import func, select
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse as FastAPIFileResponse, JSONResponse
+from sqlalchemy import func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from backend.app.core.auth import (
     require_ownership_permission,
@@ -55,8 +56,19 @@ from backend.app.schemas.library import (
     ZipExtractResult,
 )
 from backend.app.services.archive import ArchiveService, ThreeMFParser
+from backend.app.services.blob_store import intern_file, release_blob
+from backend.app.services.filament_requirements import (
+    filament_requirements_for_library_file,
+    store_filament_requirements,
+)
+from backend.app.services.pagination import (
+    InvalidCursorError,
+    UnknownFieldError,
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+)
 from backend.app.services.stl_thumbnail import generate_stl_thumbnail
-from backend.app.utils.threemf_tools import extract_nozzle_mapping_from_3mf
 
 logger = logging.getLogger(__name__)
 
@@ -109,15 +121,6 @@ def to_absolute_path(relative_path: str | None) -> Path | None:
     return Path(app_settings.base_dir) / relative_path
 
 
-def calculate_file_hash(file_path: Path) -> str:
-    """Calculate SHA256 hash of a file."""
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
-
-
 def extract_gcode_thumbnail(file_path: Path) -> bytes | None:
     """Extract embedded thumbnail from gcode file.
 
@@ -625,30 +628,66 @@ async def list_files(
     response: Response,
     folder_id: int | None = None,
     include_root: bool = True,
+    limit: int | None = Query(None, ge=1, description="Page size (default: all files)"),
+    cursor: str | None = Query(None, description="X-Next-Cursor header of the previous page"),
+    fields: str | None = Query(None, description="Comma-separated fields to return (default: all)"),
     db: AsyncSession = Depends(get_db),
     _: User | None = Depends(require_permission_if_auth_enabled(Permission.LIBRARY_READ)),
 ):
-    """List files, optionally filtered by folder.
+    """List files, optionally filtered by folder, in filename order.
 
     Args:
         folder_id: Filter by folder ID. If None and include_root=True, returns root files.
         include_root: If True and folder_id is None, returns files at root level.
                      If False and folder_id is None, returns all files.
+        limit: Return at most this many files; the X-Next-Cursor response header
+               (absent on the last page) is the cursor of the next page.
+        cursor: Continue after the last file of the previous page.
+        fields: Only return these fields of each file; the creator and duplicate
+                lookups are skipped unless requested.
+
+    X-Total-Count holds the number of files in the listing.
     """
-    query = select(LibraryFile).options(selectinload(LibraryFile.created_by))
+    try:
+        selected = parse_fields(fields, FileListResponse.model_fields)
+    except UnknownFieldError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown field: {e}")
+
+    def wanted(name: str) -> bool:
+        return selected is None or name in selected
 
+    filters = []
     if folder_id is not None:
-        query = query.where(LibraryFile.folder_id == folder_id)
+        filters.append(LibraryFile.folder_id == folder_id)
     elif include_root:
-        query = query.where(LibraryFile.folder_id.is_(None))
+        filters.append(LibraryFile.folder_id.is_(None))
 
-    query = query.order_by(LibraryFile.filename)
+    query = select(LibraryFile).where(*filters).order_by(LibraryFile.filename, LibraryFile.id)
+    query = query.options((selectinload if wanted("created_by_username") else noload)(LibraryFile.created_by))
+    if cursor:
+        try:
+            after_filename, after_id = decode_cursor(cursor, str, int)
+        except InvalidCursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(
+            LibraryFile.filename >= after_filename,
+            or_(LibraryFile.filename > after_filename, LibraryFile.id > after_id),
+        )
+    if limit is not None:
+        query = query.limit(limit + 1)
     result = await db.execute(query)
-    files = result.scalars().all()
+    files = list(result.scalars().all())
+
+    total = (await db.execute(select(func.count()).select_from(LibraryFile).where(*filters))).scalar_one()
+    # Prevent browser caching of file list
+    headers = {"X-Total-Count": str(total), "Cache-Control": "no-cache, no-store, must-revalidate"}
+    if limit is not None and len(files) > limit:
+        files = files[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(files[-1].filename, files[-1].id)
 
     # Get duplicate counts
     hash_counts = {}
-    if files:
+    if files and wanted("duplicate_count"):
         hashes = [f.file_hash for f in files if f.file_hash]
         if hashes:
             dup_result = await db.execute(
@@ -658,9 +697,6 @@ async def list_files(
             )
             hash_counts = {h: c - 1 for h, c in dup_result.all()}  # -1 to exclude self
 
-    # Prevent browser caching of file list
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-
     file_list = []
     for f in files:
         # Extract key metadata for display
@@ -694,6 +730,11 @@ async def list_files(
             )
         )
 
+    if selected is not None:
+        # Partial objects don't satisfy FileListResponse
+        items = [item.model_dump(include=set(selected)) for item in file_list]
+        return JSONResponse(jsonable_encoder(items), headers=headers)
+    response.headers.update(headers)
     return file_list
 
 
@@ -731,8 +772,10 @@ async def upload_file(
         with open(file_path, "wb") as f:
             f.write(content)
 
-        # Calculate hash
-        file_hash = calculate_file_hash(file_path)
+        # Calculate hash; identical content shares one copy on disk
+        file_hash = await asyncio.to_thread(intern_file, file_path)
+        if ext == ".3mf":
+            await store_filament_requirements(db, file_path, file_hash)
 
         # Check for duplicates
         dup_result = await db.execute(select(LibraryFile.id).where(LibraryFile.file_hash == file_hash).limit(1))
@@ -746,7 +789,7 @@ async def upload_file(
         if ext == ".3mf":
             try:
                 parser = ThreeMFParser(str(file_path))
-                raw_metadata = parser.parse()
+                raw_metadata = await asyncio.to_thread(parser.parse)
 
                 # Extract thumbnail before cleaning metadata
                 thumbnail_data = raw_metadata.get("_thumbnail_data")
@@ -977,8 +1020,8 @@ async def extract_zip_file(
                     with open(file_path, "wb") as f:
                         f.write(file_content)
 
-                    # Calculate hash
-                    file_hash = calculate_file_hash(file_path)
+                    # Calculate hash; identical content shares one copy on disk
+                    file_hash = await asyncio.to_thread(intern_file, file_path)
 
                     # Extract metadata and thumbnail for 3MF files
                     metadata = {}
@@ -1612,8 +1655,6 @@ async def get_library_file_filament_requirements(
         file_id: The library file ID
         plate_id: Optional plate index to get filaments for a specific plate
     """
-    import defusedxml.ElementTree as ET
-
     # Get the library file
     result = await db.execute(select(LibraryFile).where(LibraryFile.id == file_id))
     lib_file = result.scalar_one_or_none()
@@ -1631,95 +1672,8 @@ async def get_library_file_filament_requirements(
     if not lib_file.filename.lower().endswith(".3mf"):
         return {"file_id": file_id, "filename": lib_file.filename, "plate_id": plate_id, "filaments": []}
 
-    filaments = []
-
-    try:
-        with zipfile.ZipFile(file_path, "r") as zf:
-            # Parse slice_info.config for filament requirements
-            if "Metadata/slice_info.config" in zf.namelist():
-                content = zf.read("Metadata/slice_info.config").decode()
-                root = ET.fromstring(content)
-
-                if plate_id is not None:
-                    # Find filaments for specific plate
-                    for plate_elem in root.findall(".//plate"):
-                        # Check if this is the requested plate
-                        plate_index = None
-                        for meta in plate_elem.findall("metadata"):
-                            if meta.get("key") == "index":
-                                try:
-                                    plate_index = int(meta.get("value", ""))
-                                except ValueError:
-                                    pass  # Skip plate with non-numeric index value
-                                break
-
-                        if plate_index == plate_id:
-                            # Extract filaments from this plate
-                            for filament_elem in plate_elem.findall("filament"):
-                                filament_id = filament_elem.get("id")
-                                filament_type = filament_elem.get("type", "")
-                                filament_color = filament_elem.get("color", "")
-                                used_g = filament_elem.get("used_g", "0")
-                                used_m = filament_elem.get("used_m", "0")
-
-                                tray_info_idx = filament_elem.get("tray_info_idx", "")
-
-                                try:
-                                    used_grams = float(used_g)
-                                except (ValueError, TypeError):
-                                    used_grams = 0
-
-                                if used_grams > 0 and filament_id:
-                                    filaments.append(
-                                        {
-                                            "slot_id": int(filament_id),
-                                            "type": filament_type,
-                                            "color": filament_color,
-                                            "used_grams": round(used_grams, 1),
-                                            "used_meters": float(used_m) if used_m else 0,
-                                            "tray_info_idx": tray_info_idx,
-                                        }
-                                    )
-                            break
-                else:
-                    # Extract all filaments with used_g > 0 (for single-plate or overview)
-                    for filament_elem in root.findall(".//filament"):
-                        filament_id = filament_elem.get("id")
-                        filament_type = filament_elem.get("type", "")
-                        filament_color = filament_elem.get("color", "")
-                        used_g = filament_elem.get("used_g", "0")
-                        used_m = filament_elem.get("used_m", "0")
-
-                        tray_info_idx = filament_elem.get("tray_info_idx", "")
-
-                        try:
-                            used_grams = float(used_g)
-                        except (ValueError, TypeError):
-                            used_grams = 0
-
-                        if used_grams > 0 and filament_id:
-                            filaments.append(
-                                {
-                                    "slot_id": int(filament_id),
-                                    "type": filament_type,
-                                    "color": filament_color,
-                                    "used_grams": round(used_grams, 1),
-                                    "used_meters": float(used_m) if used_m else 0,
-                                    "tray_info_idx": tray_info_idx,
-                                }
-                            )
-
-            # Sort by slot ID
-            filaments.sort(key=lambda x: x["slot_id"])
-
-            # Enrich with nozzle mapping for dual-nozzle printers
-            nozzle_mapping = extract_nozzle_mapping_from_3mf(zf)
-            if nozzle_mapping:
-                for filament in filaments:
-                    filament["nozzle_id"] = nozzle_mapping.get(filament["slot_id"])
-
-    except Exception as e:
-        logger.warning("Failed to parse filament requirements from library file %s: %s", file_id, e)
+    # Parsed once per file content and stored
+    filaments = await filament_requirements_for_library_file(db, lib_file, plate_id)
 
     return {
         "file_id": file_id,
@@ -2101,6 +2055,7 @@ async def delete_file(
         abs_thumb_path = to_absolute_path(file.thumbnail_path)
         if abs_file_path and abs_file_path.exists():
             abs_file_path.unlink()
+            release_blob(file.file_hash)
         if abs_thumb_path and abs_thumb_path.exists():
             abs_thumb_path.unlink()
     except OSError as e:
@@ -2280,6 +2235,7 @@ async def bulk_delete(
                 abs_thumb_path = to_absolute_path(file.thumbnail_path)
                 if abs_file_path and abs_file_path.exists():
                     abs_file_path.unlink()
+                    release_blob(file.file_hash)
                 if abs_thumb_path and abs_thumb_path.exists():
                     abs_thumb_path.unlink()
             except OSError as e:
@@ -1,5 +1,7 @@
 """Prometheus metrics endpoint for external monitoring."""
 
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,6 +11,8 @@ from backend.app.models.archive import PrintArchive
 from backend.app.models.print_queue import PrintQueueItem
 from backend.app.models.printer import Printer
 from backend.app.models.settings import Settings
+from backend.app.models.smart_plug import SmartPlug
+from backend.app.services.energy_sampler import energy_sampler
 from backend.app.services.printer_manager import printer_manager, supports_chamber_temp
 
 router = APIRouter(tags=["metrics"])
@@ -411,6 +415,51 @@ async def get_metrics(
     lines.append("# TYPE bambuddy_printers_total gauge")
     lines.append(f"bambuddy_printers_total {len(printers)}")
 
+    # MQTT ingestion pipeline
+    ingest_stats = printer_manager.get_ingest_stats()
+    ingest_metrics = [
+        ("mqtt_queue_depth", "queue_depth", "gauge", "MQTT messages waiting to be processed"),
+        ("mqtt_parse_avg_ms", "avg_parse_ms", "gauge", "Average MQTT message parse and processing time (ms)"),
+        ("mqtt_parse_max_ms", "max_parse_ms", "gauge", "Maximum recent MQTT message parse and processing time (ms)"),
+        ("mqtt_messages_coalesced_total", "coalesced", "counter", "MQTT status reports skipped as superseded"),
+        ("mqtt_messages_dropped_total", "dropped", "counter", "MQTT messages dropped due to a full queue"),
+    ]
+    for metric, key, metric_type, help_text in ingest_metrics:
+        lines.append("")
+        lines.append(f"# HELP bambuddy_{metric} {help_text}")
+        lines.append(f"# TYPE bambuddy_{metric} {metric_type}")
+        for printer in printers:
+            stats = ingest_stats.get(printer.id)
+            if not stats:
+                continue
+            labels = format_labels(printer_id=str(printer.id), printer_name=printer.name)
+            lines.append(f"bambuddy_{metric}{labels} {stats[key]}")
+
+    # =========================================================================
+    # Smart plug energy (cached samples, no live plug requests)
+    # =========================================================================
+
+    result = await db.execute(select(SmartPlug))
+    plug_samples = [(plug, energy_sampler.get_latest(plug.id)) for plug in result.scalars().all()]
+    plug_samples = [(plug, sample) for plug, sample in plug_samples if sample]
+    now = datetime.utcnow()
+    plug_metrics = [
+        ("smart_plug_power_watts", "gauge", "Smart plug power draw in watts", lambda s: s.power),
+        ("smart_plug_energy_today_kwh", "gauge", "Smart plug energy used today in kWh", lambda s: s.today),
+        ("smart_plug_energy_total_kwh", "counter", "Smart plug lifetime energy counter in kWh", lambda s: s.total),
+        ("smart_plug_sample_age_seconds", "gauge", "Age of the smart plug energy sample", lambda s: s.age_seconds(now)),
+    ]
+    for metric, metric_type, help_text, value in plug_metrics:
+        lines.append("")
+        lines.append(f"# HELP bambuddy_{metric} {help_text}")
+        lines.append(f"# TYPE bambuddy_{metric} {metric_type}")
+        for plug, sample in plug_samples:
+            val = value(sample)
+            if val is None:
+                continue
+            labels = format_labels(plug_id=str(plug.id), plug_name=plug.name)
+            lines.append(f"bambuddy_{metric}{labels} {val:.3f}")
+
     # Add trailing newline
     lines.append("")
 
@@ -30,6 +30,7 @@ from backend.app.schemas.print_queue import (
     PrintQueueReorder,
 )
 from backend.app.services.notification_service import notification_service
+from backend.app.services.print_scheduler import scheduler as print_scheduler
 from backend.app.utils.printer_models import normalize_printer_model, normalize_printer_model_id
 from backend.app.utils.threemf_tools import extract_filament_usage_from_3mf
 
@@ -277,6 +278,14 @@ async def list_queue(
     return [_enrich_response(item) for item in items]
 
 
+@router.get("/assignment")
+async def get_last_assignment(
+    _: User | None = RequirePermissionIfAuthEnabled(Permission.QUEUE_READ),
+):
+    """Get the scheduler's last model-based job-to-printer assignment with its costs (for debugging)."""
+    return print_scheduler.last_assignment or {}
+
+
 @router.post("/", response_model=PrintQueueItemResponse)
 async def add_to_queue(
     data: PrintQueueItemCreate,
@@ -390,6 +399,7 @@ async def add_to_queue(
     db.add(item)
     await db.commit()
     await db.refresh(item)
+    print_scheduler.wake(item.printer_id)
 
     # Load relationships for response
     await db.refresh(item, ["archive", "printer", "library_file", "created_by"])
@@ -491,6 +501,8 @@ async def bulk_update_queue_items(
         updated_count += 1
 
     await db.commit()
+    if updated_count:
+        print_scheduler.wake()
 
     logger.info("Bulk updated %s queue items, skipped %s", updated_count, skipped_count)
     return PrintQueueBulkUpdateResponse(
@@ -590,6 +602,7 @@ async def update_queue_item(
         setattr(item, field, value)
 
     await db.commit()
+    print_scheduler.wake(item.printer_id)
     await db.refresh(item, ["archive", "printer", "library_file", "created_by"])
 
     logger.info("Updated queue item %s", item_id)
@@ -644,6 +657,7 @@ async def reorder_queue(
             item.position = reorder_item.position
 
     await db.commit()
+    print_scheduler.wake()
     logger.info("Reordered %s queue items", len(data.items))
     return {"message": f"Reordered {len(data.items)} items"}
 
@@ -780,6 +794,7 @@ async def start_queue_item(
     # Clear manual_start flag so scheduler picks it up
     item.manual_start = False
     await db.commit()
+    print_scheduler.wake(item.printer_id)
     await db.refresh(item, ["archive", "printer", "library_file", "created_by"])
 
     logger.info("Manually started queue item %s (cleared manual_start flag)", item_id)
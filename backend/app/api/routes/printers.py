@@ -12,14 +12,11 @@ from backend.app.core.auth import RequirePermissionIfAuthEnabled
 from backend.app.core.config import settings
 from backend.app.core.database import get_db
 from backend.app.core.permissions import Permission
+from backend.app.core.websocket import ws_manager
 from backend.app.models.printer import Printer
 from backend.app.models.slot_preset import SlotPresetMapping
 from backend.app.schemas.printer import (
-    AMSTray,
-    AMSUnit,
-    HMSErrorResponse,
     NozzleInfoResponse,
-    NozzleRackSlot,
     PrinterCreate,
     PrinterResponse,
     PrinterStatus,
@@ -33,7 +30,9 @@ from backend.app.services.bambu_ftp import (
     get_storage_info_async,
     list_files_async,
 )
-from backend.app.services.printer_manager import get_derived_status_name, printer_manager, supports_chamber_temp
+from backend.app.services.print_scheduler import scheduler as print_scheduler
+from backend.app.services.printer_manager import get_derived_status_name, printer_manager, status_cache
+from backend.app.services.telemetry import telemetry_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/printers", tags=["printers"])
@@ -175,6 +174,8 @@ async def delete_printer(
         raise HTTPException(404, "Printer not found")
 
     printer_manager.disconnect_printer(printer_id)
+    telemetry_store.remove(printer_id)
+    ws_manager.remove_printer(printer_id)
 
     if delete_archives:
         # Delete all archives for this printer
@@ -229,131 +230,13 @@ async def get_printer_status(
     if state.state in ("RUNNING", "PAUSE", "PAUSED") and state.gcode_file:
         cover_url = f"/api/v1/printers/{printer_id}/cover"
 
-    # Convert HMS errors to response format
-    hms_errors = [
-        HMSErrorResponse(code=e.code, attr=e.attr, module=e.module, severity=e.severity)
-        for e in (state.hms_errors or [])
-    ]
-
-    # Parse AMS data from raw_data
-    ams_units = []
-    vt_tray = []
-    ams_exists = False
-    raw_data = state.raw_data or {}
-
-    # Build K-profile lookup map: cali_idx -> k_value
-    # This allows looking up the calibrated K value for each AMS slot
-    kprofile_map: dict[int, float] = {}
-    for kp in state.kprofiles or []:
-        if kp.slot_id is not None and kp.k_value:
-            try:
-                kprofile_map[kp.slot_id] = float(kp.k_value)
-            except (ValueError, TypeError):
-                pass  # Skip K-profile entries with unparseable values
-
-    if "ams" in raw_data and isinstance(raw_data["ams"], list):
-        ams_exists = True
-        for ams_data in raw_data["ams"]:
-            # Skip if ams_data is not a dict (defensive check)
-            if not isinstance(ams_data, dict):
-                continue
-            trays = []
-            for tray_data in ams_data.get("tray", []):
-                # Filter out empty/invalid tag values
-                tag_uid = tray_data.get("tag_uid", "")
-                if tag_uid in ("", "0000000000000000"):
-                    tag_uid = None
-                tray_uuid = tray_data.get("tray_uuid", "")
-                if tray_uuid in ("", "00000000000000000000000000000000"):
-                    tray_uuid = None
-
-                # Get K value: first try tray's k field, then lookup from K-profiles
-                k_value = tray_data.get("k")
-                cali_idx = tray_data.get("cali_idx")
-                if k_value is None and cali_idx is not None and cali_idx in kprofile_map:
-                    k_value = kprofile_map[cali_idx]
-
-                trays.append(
-                    AMSTray(
-                        id=tray_data.get("id", 0),
-                        tray_color=tray_data.get("tray_color"),
-                        tray_type=tray_data.get("tray_type"),
-                        tray_sub_brands=tray_data.get("tray_sub_brands"),
-                        tray_id_name=tray_data.get("tray_id_name"),
-                        tray_info_idx=tray_data.get("tray_info_idx"),
-                        remain=tray_data.get("remain", 0),
-                        k=k_value,
-                        cali_idx=cali_idx,
-                        tag_uid=tag_uid,
-                        tray_uuid=tray_uuid,
-                        nozzle_temp_min=tray_data.get("nozzle_temp_min"),
-                        nozzle_temp_max=tray_data.get("nozzle_temp_max"),
-                    )
-                )
-            # Prefer humidity_raw (percentage) over humidity (index 1-5)
-            # humidity_raw is the actual percentage value from the sensor
-            humidity_raw = ams_data.get("humidity_raw")
-            humidity_idx = ams_data.get("humidity")
-            humidity_value = None
-
-            if humidity_raw is not None:
-                try:
-                    humidity_value = int(humidity_raw)
-                except (ValueError, TypeError):
-                    pass  # Skip unparseable humidity; will try index fallback
-            if humidity_value is None and humidity_idx is not None:
-                try:
-                    humidity_value = int(humidity_idx)
-                except (ValueError, TypeError):
-                    pass  # Skip unparseable humidity index; humidity remains None
-            # AMS-HT has 1 tray, regular AMS has 4 trays
-            is_ams_ht = len(trays) == 1
-
-            ams_units.append(
-                AMSUnit(
-                    id=ams_data.get("id", 0),
-                    humidity=humidity_value,
-                    temp=ams_data.get("temp"),
-                    is_ams_ht=is_ams_ht,
-                    tray=trays,
-                )
-            )
-
-    # Virtual tray (external spool holder) - comes from vt_tray in raw_data (list)
-    if "vt_tray" in raw_data:
-        for vt_data in raw_data["vt_tray"]:
-            # Filter out empty/invalid tag values for vt_tray
-            vt_tag_uid = vt_data.get("tag_uid", "")
-            if vt_tag_uid in ("", "0000000000000000"):
-                vt_tag_uid = None
-            vt_tray_uuid = vt_data.get("tray_uuid", "")
-            if vt_tray_uuid in ("", "00000000000000000000000000000000"):
-                vt_tray_uuid = None
-
-            # Get K value: first try tray's k field, then lookup from K-profiles
-            vt_k_value = vt_data.get("k")
-            vt_cali_idx = vt_data.get("cali_idx")
-            if vt_k_value is None and vt_cali_idx is not None and vt_cali_idx in kprofile_map:
-                vt_k_value = kprofile_map[vt_cali_idx]
-
-            tray_id = int(vt_data.get("id", 254))
-            vt_tray.append(
-                AMSTray(
-                    id=tray_id,
-                    tray_color=vt_data.get("tray_color"),
-                    tray_type=vt_data.get("tray_type"),
-                    tray_sub_brands=vt_data.get("tray_sub_brands"),
-                    tray_id_name=vt_data.get("tray_id_name"),
-                    tray_info_idx=vt_data.get("tray_info_idx"),
-                    remain=vt_data.get("remain", 0),
-                    k=vt_k_value,
-                    cali_idx=vt_cali_idx,
-                    tag_uid=vt_tag_uid,
-                    tray_uuid=vt_tray_uuid,
-                    nozzle_temp_min=vt_data.get("nozzle_temp_min"),
-                    nozzle_temp_max=vt_data.get("nozzle_temp_max"),
-                )
-            )
+    # AMS trays, HMS errors, nozzle rack and temperatures come from the shared
+    # status cache, so they're only re-derived when those parts of the state change
+    ams = status_cache.get_section(state, printer_id, printer.model, "ams")
+    ams_units = ams["ams"]
+    ams_exists = ams["ams_exists"]
+    vt_tray = ams["vt_tray"]
+    hms_errors = status_cache.get_section(state, printer_id, printer.model, "hms_errors")
 
     # Convert nozzle info to response format
     nozzles = [
@@ -365,21 +248,7 @@ async def get_printer_status(
     ]
 
     # H2C nozzle rack (tool-changer dock positions)
-    nozzle_rack = [
-        NozzleRackSlot(
-            id=n.get("id", 0),
-            nozzle_type=n.get("type", ""),
-            nozzle_diameter=n.get("diameter", ""),
-            wear=n.get("wear"),
-            stat=n.get("stat"),
-            max_temp=n.get("max_temp", 0),
-            serial_number=n.get("serial_number", ""),
-            filament_color=n.get("filament_color", ""),
-            filament_id=n.get("filament_id", ""),
-            filament_type=n.get("filament_type", ""),
-        )
-        for n in (state.nozzle_rack or [])
-    ]
+    nozzle_rack = status_cache.get_section(state, printer_id, printer.model, "nozzle_rack")
 
     # Convert print options to response format
     print_options = PrintOptionsResponse(
@@ -401,9 +270,9 @@ async def get_printer_status(
     )
 
     # Get AMS mapping from raw_data (which AMS is connected to which nozzle)
-    ams_mapping = raw_data.get("ams_mapping", [])
+    ams_mapping = (state.raw_data or {}).get("ams_mapping", [])
     # Get per-AMS extruder map: {ams_id: extruder_id} where 0=right, 1=left
-    ams_extruder_map = raw_data.get("ams_extruder_map", {})
+    ams_extruder_map = ams["ams_extruder_map"]
     logger.debug("API returning ams_mapping: %s, ams_extruder_map: %s", ams_mapping, ams_extruder_map)
 
     # tray_now from MQTT is already a global tray ID: (ams_id * 4) + slot_id
@@ -412,13 +281,8 @@ async def get_printer_status(
     tray_now = state.tray_now
     logger.debug("Using tray_now directly as global ID: %s", tray_now)
 
-    # Filter out chamber temp for models that don't have a real sensor
-    # P1P, P1S, A1, A1Mini report meaningless chamber_temper values
-    temperatures = state.temperatures
-    if not supports_chamber_temp(printer.model):
-        temperatures = {
-            k: v for k, v in temperatures.items() if k not in ("chamber", "chamber_target", "chamber_heating")
-        }
+    # Chamber temp is filtered out for models without a real sensor
+    temperatures = status_cache.get_section(state, printer_id, printer.model, "temperatures")
 
     return PrinterStatus(
         id=printer_id,
@@ -1885,6 +1749,7 @@ async def clear_plate(
         )
 
     printer_manager.set_plate_cleared(printer_id)
+    print_scheduler.wake(printer_id)
 
     return {"success": True, "message": "Plate cleared, next print will start shortly"}
 
@@ -1,7 +1,9 @@
+import asyncio
 import io
 import json
 import logging
 import os
+import tempfile
 import uuid
 import zipfile
 from datetime import datetime
@@ -40,12 +42,32 @@ from backend.app.schemas.project import (
     ProjectUpdate,
     TimelineEvent,
 )
+from backend.app.services.blob_store import intern_file, release_blob
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
+def _write_library_file(file_path: Path, content: bytes) -> str:
+    """Write an imported library file and store it by content, returning its hash.
+
+    The file is written next to the target and swapped in: on a re-import the
+    existing file is a link shared with its blob and other files, so it must
+    not be rewritten.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_name, file_path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    # Identical content shares one copy on disk
+    return intern_file(file_path)
+
+
 async def compute_project_stats(
     db: AsyncSession, project_id: int, target_count: int | None = None, target_parts_count: int | None = None
 ) -> ProjectStats:
@@ -864,12 +886,16 @@ async def upload_attachment(
         logger.error("Failed to save attachment: %s", e)
         raise HTTPException(status_code=500, detail="Failed to save attachment")
 
+    # Identical attachments share one copy on disk
+    content_hash = await asyncio.to_thread(intern_file, file_path)
+
     # Update project attachments JSON
     attachments = list(project.attachments or [])
     new_attachment = {
         "filename": unique_filename,
         "original_name": original_name,
         "size": len(content),
+        "content_hash": content_hash,
         "uploaded_at": datetime.now().isoformat(),
     }
     attachments.append(new_attachment)
@@ -968,6 +994,7 @@ async def delete_attachment(
     if file_path.exists():
         try:
             os.remove(file_path)
+            release_blob(attachment.get("content_hash"))
         except Exception as e:
             logger.warning("Failed to delete attachment file: %s", e)
 
@@ -1700,7 +1727,7 @@ async def import_project_file(
             # Write file to disk
             file_disk_path = library_dir / folder_name / relative_path
             file_disk_path.parent.mkdir(parents=True, exist_ok=True)
-            file_disk_path.write_bytes(file_content)
+            file_hash = await asyncio.to_thread(_write_library_file, file_disk_path, file_content)
 
             # Determine file type
             ext = Path(relative_path).suffix.lower()
@@ -1720,6 +1747,7 @@ async def import_project_file(
                 file_path=f"{folder_name}/{relative_path}",
                 file_type=file_type,
                 file_size=len(file_content),
+                file_hash=file_hash,
                 is_external=False,
             )
             db.add(lib_file)
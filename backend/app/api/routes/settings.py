@@ -1,15 +1,15 @@
-import io
+import itertools
 import logging
 import zipfile
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, Query, UploadFile
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.app.core.auth import RequirePermissionIfAuthEnabled
+from backend.app.core.auth import RequirePermissionIfAuthEnabled, invalidate_auth_cache
 from backend.app.core.config import settings as app_settings
 from backend.app.core.database import get_db
 from backend.app.core.permissions import Permission
@@ -320,71 +320,24 @@ async def get_homeassistant_settings(db: AsyncSession) -> dict:
 
 @router.get("/backup")
 async def create_backup(
-    db: AsyncSession = Depends(get_db),
+    incremental: bool = Query(False, description="Only include files changed since the last backup"),
     _: User | None = RequirePermissionIfAuthEnabled(Permission.SETTINGS_BACKUP),
 ):
-    """Create a complete backup (database + all files) as a ZIP.
+    """Create a backup (database + data files) as a streamed ZIP.
 
-    This is a simplified backup that includes the entire SQLite database
-    and all data directories. It is complete by definition and cannot miss data.
+    The ZIP is written while it is downloaded, reading the database snapshot and
+    the data files in place. With incremental=true, only files changed since the
+    last completed backup are included (the database is always complete);
+    restore it on top of that backup.
     """
-    import shutil
-    import tempfile
-
-    from sqlalchemy import text
+    import asyncio
 
-    from backend.app.core.database import engine
+    from backend.app.services.backup import iter_backup
 
+    chunks = iter_backup(incremental)
     try:
-        base_dir = app_settings.base_dir
-        db_path = Path(app_settings.database_url.replace("sqlite+aiosqlite:///", ""))
-
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # 1. Checkpoint WAL to ensure all data is in main db file
-            async with engine.begin() as conn:
-                await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
-
-            # 2. Copy database file
-            shutil.copy2(db_path, temp_path / "bambuddy.db")
-
-            # 3. Copy data directories (if they exist)
-            dirs_to_backup = [
-                ("archive", base_dir / "archive"),
-                ("virtual_printer", base_dir / "virtual_printer"),
-                ("plate_calibration", app_settings.plate_calibration_dir),
-                ("icons", base_dir / "icons"),
-                ("projects", base_dir / "projects"),
-            ]
-
-            for name, src_dir in dirs_to_backup:
-                if src_dir.exists() and any(src_dir.iterdir()):
-                    try:
-                        shutil.copytree(src_dir, temp_path / name)
-                    except shutil.Error as e:
-                        # Some files may have restricted permissions (e.g., SSL keys)
-                        # Log the error but continue with partial backup
-                        logger.warning("Some files in %s could not be copied: %s", name, e)
-                    except PermissionError as e:
-                        logger.warning("Permission denied copying %s: %s", name, e)
-
-            # 4. Create ZIP
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-                for file_path in temp_path.rglob("*"):
-                    if file_path.is_file():
-                        arcname = file_path.relative_to(temp_path)
-                        zf.write(file_path, arcname)
-
-            zip_buffer.seek(0)
-            filename = f"bambuddy-backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
-
-            return StreamingResponse(
-                zip_buffer,
-                media_type="application/zip",
-                headers={"Content-Disposition": f"attachment; filename={filename}"},
-            )
+        # Produce the first chunk (database snapshot) up front so failures still get an error response
+        first = await asyncio.to_thread(next, chunks)
     except Exception as e:
         logger.error("Backup failed: %s", e, exc_info=True)
         return JSONResponse(
@@ -392,6 +345,14 @@ async def create_backup(
             content={"success": False, "message": "Backup failed. Check server logs for details."},
         )
 
+    suffix = "-incremental" if incremental else ""
+    filename = f"bambuddy-backup-{datetime.now().strftime('%Y%m%d-%H%M%S')}{suffix}.zip"
+    return StreamingResponse(
+        itertools.chain([first], chunks),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
 
 @router.post("/restore")
 async def restore_backup(
@@ -399,10 +360,11 @@ async def restore_backup(
     db: AsyncSession = Depends(get_db),
     _: User | None = RequirePermissionIfAuthEnabled(Permission.SETTINGS_RESTORE),
 ):
-    """Restore from a complete backup ZIP.
+    """Restore from a backup ZIP.
 
-    This is a simplified restore that replaces the database and all data directories
-    from the backup ZIP. Requires a restart after restore.
+    A full backup replaces the database and all data directories. An incremental
+    backup replaces the database, updates the files it contains and deletes the
+    files removed since its base backup. Requires a restart after restore.
     """
     import shutil
     import tempfile
@@ -410,29 +372,36 @@ async def restore_backup(
     from fastapi import HTTPException
 
     from backend.app.core.database import close_all_connections
+    from backend.app.services.backup import (
+        DATABASE_NAME,
+        backup_dirs,
+        last_manifest_path,
+        read_backup_manifest,
+        reset_blob_store_migration,
+        restore_file,
+    )
     from backend.app.services.virtual_printer import virtual_printer_manager
 
-    base_dir = app_settings.base_dir
     db_path = Path(app_settings.database_url.replace("sqlite+aiosqlite:///", ""))
 
     with tempfile.TemporaryDirectory() as temp_dir:
         temp_path = Path(temp_dir)
 
-        # 1. Read and extract ZIP
-        content = await file.read()
-
         # Check if it's a valid ZIP
         if not file.filename or not file.filename.endswith(".zip"):
             raise HTTPException(400, "Invalid backup file: must be a .zip file")
 
+        # 1. Extract ZIP straight from the spooled upload (not loaded into memory)
         try:
-            with zipfile.ZipFile(io.BytesIO(content), "r") as zf:
+            with zipfile.ZipFile(file.file, "r") as zf:
+                manifest = read_backup_manifest(zf)
                 zf.extractall(temp_path)
         except zipfile.BadZipFile:
             raise HTTPException(400, "Invalid backup file: not a valid ZIP")
+        incremental = bool(manifest and manifest.get("incremental"))
 
         # 2. Validate backup (must have database)
-        backup_db = temp_path / "bambuddy.db"
+        backup_db = temp_path / DATABASE_NAME
         if not backup_db.exists():
             raise HTTPException(400, "Invalid backup: missing bambuddy.db")
 
@@ -455,26 +424,20 @@ async def restore_backup(
 
             # 5. Replace database
             logger.info("Restoring database from backup...")
+            reset_blob_store_migration(backup_db)
             shutil.copy2(backup_db, db_path)
 
             # 6. Replace data directories
             # For Docker compatibility: clear contents then copy (don't delete mount points)
-            dirs_to_restore = [
-                ("archive", base_dir / "archive"),
-                ("virtual_printer", base_dir / "virtual_printer"),
-                ("plate_calibration", app_settings.plate_calibration_dir),
-                ("icons", base_dir / "icons"),
-                ("projects", base_dir / "projects"),
-            ]
-
             skipped_dirs = []
-            for name, dest_dir in dirs_to_restore:
+            for name, dest_dir in backup_dirs():
                 src_dir = temp_path / name
                 if src_dir.exists():
                     logger.info("Restoring %s directory...", name)
                     try:
-                        # Clear destination contents (not the dir itself - may be Docker mount)
-                        if dest_dir.exists():
+                        # Clear destination contents (not the dir itself - may be Docker mount).
+                        # Incremental backups only hold changes, so they are applied on top.
+                        if dest_dir.exists() and not incremental:
                             for item in dest_dir.iterdir():
                                 try:
                                     if item.is_dir():
@@ -485,20 +448,36 @@ async def restore_backup(
                                     logger.warning("Could not delete %s: %s", item, e)
                         else:
                             dest_dir.mkdir(parents=True, exist_ok=True)
-                        # Copy contents from backup
-                        for item in src_dir.iterdir():
-                            dest_item = dest_dir / item.name
-                            if item.is_dir():
-                                shutil.copytree(item, dest_item)
-                            else:
-                                shutil.copy2(item, dest_item)
+                        # Copy contents from backup, replacing files instead of writing
+                        # into them: existing ones may be links to a shared blob
+                        shutil.copytree(src_dir, dest_dir, copy_function=restore_file, dirs_exist_ok=True)
                     except OSError as e:
                         logger.warning("Could not restore %s directory: %s", name, e)
                         skipped_dirs.append(name)
 
-            # 7. Note: Virtual printer and database will be reinitialized on restart
+            # 7. Remove files deleted since the base of an incremental backup
+            if incremental:
+                dest_dirs = dict(backup_dirs())
+                for arcname in manifest.get("deleted", []):
+                    name, _sep, rel_path = arcname.partition("/")
+                    dest_dir = dest_dirs.get(name)
+                    if dest_dir is None or not rel_path:
+                        continue
+                    target = (dest_dir / rel_path).resolve()
+                    if not target.is_relative_to(dest_dir.resolve()):
+                        continue
+                    try:
+                        target.unlink(missing_ok=True)
+                    except OSError as e:
+                        logger.warning("Could not delete %s: %s", target, e)
+
+            # The next incremental backup must not be based on the replaced data
+            last_manifest_path().unlink(missing_ok=True)
+
+            # 8. Note: Virtual printer and database will be reinitialized on restart
             # Do NOT try to restart services here - the database session is closed
 
+            invalidate_auth_cache()
             logger.info("Restore complete - restart required")
             message = "Backup restored successfully. Please restart Bambuddy for changes to take effect."
             if skipped_dirs:
@@ -36,10 +36,17 @@ _storage_usage_lock = asyncio.Lock()
 def get_directory_size(path: Path) -> int:
     """Calculate total size of a directory in bytes."""
     total = 0
+    seen: set[tuple[int, int]] = set()
     try:
         for entry in path.rglob("*"):
             if entry.is_file():
-                total += entry.stat().st_size
+                stat = entry.stat()
+                # Files deduplicated into the blob store are hard links; count them once
+                if stat.st_nlink > 1:
+                    if (stat.st_dev, stat.st_ino) in seen:
+                        continue
+                    seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
     except (PermissionError, OSError):
         pass  # Return partial total if directory traversal is interrupted
     return total
@@ -275,13 +282,20 @@ def _scan_storage_usage() -> dict:
     other_breakdown: dict[tuple[str, str], int] = {}
     database_items = _get_database_items()
 
+    seen_inodes: set[tuple[int, int]] = set()
     files = _walk_files(unique_roots)
     for file_path in files:
         try:
-            size = file_path.stat().st_size
+            stat = file_path.stat()
         except OSError:
             error_count += 1
             continue
+        # Files deduplicated into the blob store are hard links; count them once
+        if stat.st_nlink > 1:
+            if (stat.st_dev, stat.st_ino) in seen_inodes:
+                continue
+            seen_inodes.add((stat.st_dev, stat.st_ino))
+        size = stat.st_size
 
         total_bytes += size
 
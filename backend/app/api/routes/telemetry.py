@@ -0,0 +1,72 @@
+"""API routes for printer telemetry history."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from backend.app.core.auth import RequirePermissionIfAuthEnabled
+from backend.app.core.permissions import Permission
+from backend.app.models.user import User
+from backend.app.services.pagination import UnknownFieldError, parse_fields
+from backend.app.services.telemetry import (
+    DEFAULT_QUERY_POINTS,
+    MAX_QUERY_POINTS,
+    TELEMETRY_FIELDS,
+    telemetry_store,
+)
+
+router = APIRouter(prefix="/telemetry", tags=["telemetry"])
+
+
+class TelemetryResponse(BaseModel):
+    printer_id: int
+    start: datetime
+    end: datetime
+    tier: str  # Stored resolution the points were computed from: "1s", "1m" or "15m"
+    resolution: int  # Seconds per point
+    timestamps: list[int]  # Start of each point, Unix seconds
+    series: dict[str, dict[str, list[float | None]]]  # field -> {"avg", "min", "max"}, one value per point
+
+
+@router.get("/{printer_id}", response_model=TelemetryResponse)
+async def get_telemetry(
+    printer_id: int,
+    start: datetime | None = Query(None, description="Range start (default: one hour before end)"),
+    end: datetime | None = Query(None, description="Range end (default: now)"),
+    fields: str | None = Query(
+        None, description=f"Comma-separated fields (default: all of {', '.join(TELEMETRY_FIELDS)})"
+    ),
+    max_points: int = Query(DEFAULT_QUERY_POINTS, ge=1, le=MAX_QUERY_POINTS),
+    _: User | None = RequirePermissionIfAuthEnabled(Permission.PRINTERS_READ),
+):
+    """Get a printer's temperature, fan, speed and progress history.
+
+    Samples are recorded every second and rolled up into 1 minute and 15 minute
+    buckets. The range is returned in at most max_points evenly spaced points,
+    each with the average, minimum and maximum of the samples it covers, read
+    from the coarsest stored resolution that is fine enough.
+    """
+    try:
+        selected = parse_fields(fields, TELEMETRY_FIELDS)
+    except UnknownFieldError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown field: {e}")
+
+    end = end or datetime.now()
+    start = start or end - timedelta(hours=1)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    result = await asyncio.to_thread(
+        telemetry_store.query, printer_id, start.timestamp(), end.timestamp(), selected, max_points
+    )
+    return TelemetryResponse(
+        printer_id=printer_id,
+        start=start,
+        end=end,
+        tier=result.tier,
+        resolution=result.resolution,
+        timestamps=result.timestamps,
+        series=result.series,
+    )
@@ -8,6 +8,7 @@ from backend.app.core.auth import (
     RequirePermissionIfAuthEnabled,
     get_current_user_optional,
     get_password_hash,
+    invalidate_auth_cache,
     verify_password,
 )
 from backend.app.core.database import get_db
@@ -278,6 +279,7 @@ async def update_user(
         user.groups = list(groups)
 
     await db.commit()
+    invalidate_auth_cache()
     await db.refresh(user)
 
     return _user_to_response(user)
@@ -386,6 +388,7 @@ async def delete_user(
 
     await db.delete(user)
     await db.commit()
+    invalidate_auth_cache()
 
 
 @router.post("/me/change-password", response_model=dict)
@@ -427,5 +430,6 @@ async def change_own_password(
     # Update password
     user.password_hash = get_password_hash(password_data.new_password)
     await db.commit()
+    invalidate_auth_cache()
 
     return {"message": "Password changed successfully"}
@@ -11,6 +11,7 @@ from backend.app.models.api_key import APIKey
 from backend.app.models.archive import PrintArchive
 from backend.app.models.print_queue import PrintQueueItem
 from backend.app.models.printer import Printer
+from backend.app.services.print_scheduler import scheduler as print_scheduler
 from backend.app.services.printer_manager import printer_manager
 
 logger = logging.getLogger(__name__)
@@ -119,6 +120,7 @@ async def webhook_add_to_queue(
     db.add(queue_item)
     await db.flush()
     await db.refresh(queue_item)
+    print_scheduler.wake(queue_item.printer_id)
 
     return QueueAddResponse(
         id=queue_item.id,
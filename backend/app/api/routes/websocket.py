@@ -1,14 +1,29 @@
 import logging
+from collections.abc import Iterable
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from backend.app.core.websocket import ws_manager
-from backend.app.services.printer_manager import printer_manager, printer_state_to_dict
+from backend.app.services.printer_manager import printer_manager, printer_state_to_dict, printer_state_to_json
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def _send_snapshots(websocket: WebSocket, printer_ids: Iterable[int]):
+    """Queue full status snapshots for the given printers to one client."""
+    for printer_id in printer_ids:
+        state = printer_manager.get_status(printer_id)
+        if state:
+            model = printer_manager.get_model(printer_id)
+            await ws_manager.send_status_snapshot(
+                websocket,
+                printer_id,
+                printer_state_to_dict(state, printer_id, model),
+                encoded=printer_state_to_json(state, printer_id, model),
+            )
+
+
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates."""
@@ -17,17 +32,10 @@ async def websocket_endpoint(websocket: WebSocket):
     logger.info("WebSocket client connected")
 
     try:
-        # Send initial status of all printers
+        # Send initial status of all printers; later updates arrive as deltas against it
         statuses = printer_manager.get_all_statuses()
-        for printer_id, state in statuses.items():
-            await websocket.send_json(
-                {
-                    "type": "printer_status",
-                    "printer_id": printer_id,
-                    "data": printer_state_to_dict(state, printer_id, printer_manager.get_model(printer_id)),
-                }
-            )
-        logger.info("Sent initial status for %s printers", len(statuses))
+        await _send_snapshots(websocket, statuses.keys())
+        logger.info("Queued initial status for %s printers", len(statuses))
 
         # Keep connection alive and handle incoming messages
         while True:
@@ -35,21 +43,38 @@ async def websocket_endpoint(websocket: WebSocket):
 
             # Handle ping/pong for keepalive
             if data.get("type") == "ping":
-                await websocket.send_json({"type": "pong"})
+                await ws_manager.send_to(websocket, {"type": "pong"})
+
+            # Narrow (or widen) which printers/events this client receives, e.g.
+            # {"type": "subscribe", "printers": [1, 2], "events": ["printer_status"]}
+            # {"type": "subscribe", "scopes": ["archives:read"]}
+            # {"type": "unsubscribe", "printers": [2]}
+            elif data.get("type") in ("subscribe", "unsubscribe"):
+                try:
+                    new_printers = ws_manager.update_subscriptions(
+                        websocket,
+                        data["type"],
+                        printers=data.get("printers"),
+                        events=data.get("events"),
+                        scopes=data.get("scopes"),
+                    )
+                except (TypeError, ValueError):
+                    await ws_manager.send_to(websocket, {"type": "error", "message": "Invalid subscription"})
+                    continue
+
+                if data["type"] == "subscribe" and data.get("printers") == "*":
+                    new_printers = list(printer_manager.get_all_statuses().keys())
+                await _send_snapshots(websocket, new_printers)
+                await ws_manager.send_to(
+                    websocket,
+                    {"type": "subscriptions", "data": ws_manager.get_subscriptions(websocket)},
+                )
 
             # Handle status request
             elif data.get("type") == "get_status":
                 printer_id = data.get("printer_id")
                 if printer_id:
-                    state = printer_manager.get_status(printer_id)
-                    if state:
-                        await websocket.send_json(
-                            {
-                                "type": "printer_status",
-                                "printer_id": printer_id,
-                                "data": printer_state_to_dict(state, printer_id, printer_manager.get_model(printer_id)),
-                            }
-                        )
+                    await _send_snapshots(websocket, [printer_id])
 
     except WebSocketDisconnect:
         logger.info("WebSocket client disconnected normally")
@@ -1,18 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 import os
 import secrets
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Annotated
 
 import jwt
-from fastapi import Depends, Header, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jwt.exceptions import PyJWTError as JWTError
 from passlib.context import CryptContext
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -98,6 +102,24 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 # HTTP Bearer token
 security = HTTPBearer(auto_error=False)
 
+# Auth context caching: the auth_enabled setting and users (with groups) are
+# looked up on every API request, so both are kept for a short time.
+AUTH_CACHE_TTL = 30  # seconds
+
+_auth_enabled_cache: tuple[bool, float] | None = None
+# lowercased username -> (user with groups loaded, expiry)
+_user_cache: dict[str, tuple[User, float]] = {}
+
+# API key verification cache and last_used batching
+API_KEY_CACHE_TTL = 60  # seconds a verified key is trusted without re-hashing
+API_KEY_USAGE_FLUSH_INTERVAL = 60  # seconds between last_used writes
+
+# sha256 of the raw key -> (key id, stored key hash, expiry)
+_api_key_cache: dict[str, tuple[int, str, float]] = {}
+# key id -> most recent use not yet written to the database
+_api_key_usage: dict[int, datetime] = {}
+_api_key_usage_task: asyncio.Task | None = None
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash.
@@ -175,15 +197,166 @@ async def authenticate_user_by_email(db: AsyncSession, email: str, password: str
 
 async def is_auth_enabled(db: AsyncSession) -> bool:
     """Check if authentication is enabled."""
+    global _auth_enabled_cache
+    if _auth_enabled_cache is not None and _auth_enabled_cache[1] > time.monotonic():
+        return _auth_enabled_cache[0]
     try:
         result = await db.execute(select(Settings).where(Settings.key == "auth_enabled"))
         setting = result.scalar_one_or_none()
-        if setting is None:
-            return False
-        return setting.value.lower() == "true"
+        enabled = setting is not None and setting.value.lower() == "true"
     except Exception:
         # If settings table doesn't exist or query fails, assume auth is disabled
         return False
+    _auth_enabled_cache = (enabled, time.monotonic() + AUTH_CACHE_TTL)
+    return enabled
+
+
+async def get_cached_user(db: AsyncSession, username: str) -> User | None:
+    """Get a user by username like get_user_by_username, cached for AUTH_CACHE_TTL.
+
+    Used for per-request authentication. The returned user is detached and
+    shared between requests, so it must not be modified.
+    """
+    key = username.lower()
+    cached = _user_cache.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    user = await get_user_by_username(db, username)
+    if user is None:
+        _user_cache.pop(key, None)
+    else:
+        _user_cache[key] = (user, time.monotonic() + AUTH_CACHE_TTL)
+    return user
+
+
+def invalidate_auth_cache() -> None:
+    """Forget the cached auth_enabled setting and users.
+
+    Call after changing users, groups or the auth settings.
+    """
+    global _auth_enabled_cache
+    _auth_enabled_cache = None
+    _user_cache.clear()
+
+
+@dataclass
+class AuthContext:
+    """The user resolved from a request's JWT, kept on request.state.auth.
+
+    Lets the auth middleware and the route's auth dependency share one lookup.
+    """
+
+    token: str
+    user: User | None
+
+
+async def get_token_user(db: AsyncSession, token: str, request: Request | None = None) -> User | None:
+    """Get the user a JWT was issued to, or None if the token or user is invalid.
+
+    The user may be inactive; callers check is_active.
+    """
+    context = getattr(request.state, "auth", None) if request is not None else None
+    if context is not None and context.token == token:
+        return context.user
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    username = payload.get("sub")
+    user = await get_cached_user(db, username) if username else None
+    if request is not None:
+        request.state.auth = AuthContext(token=token, user=user)
+    return user
+
+
+def api_key_prefix(api_key_value: str) -> str:
+    """Get the non-secret prefix stored in APIKey.key_prefix for a raw key."""
+    return api_key_value[:8] + "..." if len(api_key_value) > 8 else api_key_value
+
+
+def _api_key_digest(api_key_value: str) -> str:
+    return hashlib.sha256(api_key_value.encode()).hexdigest()
+
+
+def invalidate_api_key_cache(key_id: int | None = None) -> None:
+    """Forget cached verifications for one API key, or all keys if key_id is None."""
+    if key_id is None:
+        _api_key_cache.clear()
+        return
+    for digest, (cached_id, _, _) in list(_api_key_cache.items()):
+        if cached_id == key_id:
+            del _api_key_cache[digest]
+
+
+async def _find_api_key(db: AsyncSession, api_key_value: str) -> APIKey | None:
+    """Find the enabled APIKey matching a raw key value (expiry is not checked).
+
+    Recently verified keys are looked up by id from the cache. Otherwise only
+    keys with a matching prefix are hashed, instead of every enabled key.
+    """
+    digest = _api_key_digest(api_key_value)
+    cached = _api_key_cache.get(digest)
+    if cached is not None:
+        key_id, key_hash, expires = cached
+        if expires > time.monotonic():
+            api_key = await db.get(APIKey, key_id)
+            if api_key is not None and api_key.enabled and api_key.key_hash == key_hash:
+                return api_key
+        _api_key_cache.pop(digest, None)
+
+    result = await db.execute(
+        select(APIKey).where(APIKey.enabled.is_(True), APIKey.key_prefix == api_key_prefix(api_key_value))
+    )
+    for api_key in result.scalars().all():
+        if verify_password(api_key_value, api_key.key_hash):
+            _api_key_cache[digest] = (api_key.id, api_key.key_hash, time.monotonic() + API_KEY_CACHE_TTL)
+            return api_key
+    return None
+
+
+def _record_api_key_use(api_key: APIKey) -> None:
+    """Queue a last_used update; written by flush_api_key_usage()."""
+    _api_key_usage[api_key.id] = datetime.now()
+
+
+async def flush_api_key_usage() -> None:
+    """Write queued last_used timestamps to the database."""
+    if not _api_key_usage:
+        return
+    pending = dict(_api_key_usage)
+    _api_key_usage.clear()
+    try:
+        async with async_session() as db:
+            for key_id, last_used in pending.items():
+                await db.execute(update(APIKey).where(APIKey.id == key_id).values(last_used=last_used))
+            await db.commit()
+    except Exception as e:
+        logger.warning("Failed to save API key usage: %s", e)
+        # Keep the timestamps for the next flush unless a newer use was recorded
+        for key_id, last_used in pending.items():
+            _api_key_usage.setdefault(key_id, last_used)
+
+
+async def _api_key_usage_loop() -> None:
+    while True:
+        await asyncio.sleep(API_KEY_USAGE_FLUSH_INTERVAL)
+        await flush_api_key_usage()
+
+
+def start_api_key_usage_flush() -> None:
+    """Start the background task that periodically writes API key last_used times."""
+    global _api_key_usage_task
+    if _api_key_usage_task is None:
+        _api_key_usage_task = asyncio.create_task(_api_key_usage_loop())
+
+
+async def stop_api_key_usage_flush() -> None:
+    """Stop the last_used flush task and write anything still queued."""
+    global _api_key_usage_task
+    if _api_key_usage_task is not None:
+        _api_key_usage_task.cancel()
+        _api_key_usage_task = None
+    await flush_api_key_usage()
 
 
 async def _validate_api_key(db: AsyncSession, api_key_value: str) -> APIKey | None:
@@ -192,47 +365,36 @@ async def _validate_api_key(db: AsyncSession, api_key_value: str) -> APIKey | No
     This is an internal helper used by auth functions to check API keys.
     """
     try:
-        result = await db.execute(select(APIKey).where(APIKey.enabled.is_(True)))
-        api_keys = result.scalars().all()
-
-        for api_key in api_keys:
-            if verify_password(api_key_value, api_key.key_hash):
-                # Check expiration
-                if api_key.expires_at and api_key.expires_at < datetime.now():
-                    return None  # Expired
-                # Update last_used timestamp
-                api_key.last_used = datetime.now()
-                await db.commit()
-                return api_key
+        api_key = await _find_api_key(db, api_key_value)
+        if api_key is None:
+            return None
+        # Check expiration
+        if api_key.expires_at and api_key.expires_at < datetime.now():
+            return None  # Expired
+        _record_api_key_use(api_key)
+        return api_key
     except Exception as e:
         logger.warning("API key validation error: %s", e)
     return None
 
 
 async def get_current_user_optional(
+    request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)] = None,
 ) -> User | None:
     """Get the current authenticated user from JWT token, or None if not authenticated."""
     if credentials is None:
         return None
 
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            return None
-    except JWTError:
-        return None
-
     async with async_session() as db:
-        user = await get_user_by_username(db, username)
+        user = await get_token_user(db, credentials.credentials, request)
         if user is None or not user.is_active:
             return None
         return user
 
 
 async def get_current_user(
+    request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)] = None,
 ) -> User:
     """Get the current authenticated user from JWT token."""
@@ -243,17 +405,9 @@ async def get_current_user(
     )
     if credentials is None:
         raise credentials_exception
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
 
     async with async_session() as db:
-        user = await get_user_by_username(db, username)
+        user = await get_token_user(db, credentials.credentials, request)
         if user is None:
             raise credentials_exception
         if not user.is_active:
@@ -270,6 +424,7 @@ async def get_current_active_user(current_user: Annotated[User, Depends(get_curr
 
 
 async def require_auth_if_enabled(
+    request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)] = None,
     x_api_key: Annotated[str | None, Header(alias="X-API-Key")] = None,
 ) -> User | None:
@@ -304,23 +459,7 @@ async def require_auth_if_enabled(
                 )
 
             # Otherwise treat as JWT
-            try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                username: str = payload.get("sub")
-                if username is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Could not validate credentials",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-            except JWTError:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-
-            user = await get_user_by_username(db, username)
+            user = await get_token_user(db, token, request)
             if user is None or not user.is_active:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -376,13 +515,12 @@ def generate_api_key() -> tuple[str, str, str]:
         tuple: (full_key, key_hash, key_prefix)
             - full_key: The complete API key (only shown once on creation)
             - key_hash: Hashed version for storage and verification
-            - key_prefix: First 8 characters for display purposes
+            - key_prefix: First 8 characters, used for display and key lookup
     """
     # Generate a secure random API key (32 bytes = 64 hex characters)
     full_key = f"bb_{secrets.token_urlsafe(32)}"
     key_hash = get_password_hash(full_key)
-    key_prefix = full_key[:8] + "..." if len(full_key) > 8 else full_key
-    return full_key, key_hash, key_prefix
+    return full_key, key_hash, api_key_prefix(full_key)
 
 
 async def get_api_key(
@@ -406,28 +544,20 @@ async def get_api_key(
             detail="API key required. Provide 'X-API-Key' header or 'Authorization: Bearer <key>'",
         )
 
-    # Get all API keys and check them
-    result = await db.execute(select(APIKey).where(APIKey.enabled.is_(True)))
-    api_keys = result.scalars().all()
-
-    for api_key in api_keys:
-        # Check if key matches (verify against hash)
-        if verify_password(api_key_value, api_key.key_hash):
-            # Check expiration
-            if api_key.expires_at and api_key.expires_at < datetime.now():
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="API key has expired",
-                )
-            # Update last_used timestamp
-            api_key.last_used = datetime.now()
-            await db.commit()
-            return api_key
-
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Invalid API key",
-    )
+    api_key = await _find_api_key(db, api_key_value)
+    if api_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key",
+        )
+    # Check expiration
+    if api_key.expires_at and api_key.expires_at < datetime.now():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="API key has expired",
+        )
+    _record_api_key_use(api_key)
+    return api_key
 
 
 def check_permission(api_key: APIKey, permission: str) -> None:
@@ -509,6 +639,7 @@ def require_permission(*permissions: str | Permission):
     perm_strings = [p.value if isinstance(p, Permission) else p for p in permissions]
 
     async def permission_checker(
+        request: Request,
         credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)] = None,
         x_api_key: Annotated[str | None, Header(alias="X-API-Key")] = None,
     ) -> User | None:
@@ -541,15 +672,7 @@ def require_permission(*permissions: str | Permission):
                 )
 
             # Otherwise treat as JWT
-            try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                username: str = payload.get("sub")
-                if username is None:
-                    raise credentials_exception
-            except JWTError:
-                raise credentials_exception
-
-            user = await get_user_by_username(db, username)
+            user = await get_token_user(db, token, request)
             if user is None or not user.is_active:
                 raise credentials_exception
 
@@ -580,6 +703,7 @@ def require_permission_if_auth_enabled(*permissions: str | Permission):
     perm_strings = [p.value if isinstance(p, Permission) else p for p in permissions]
 
     async def permission_checker(
+        request: Request,
         credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)] = None,
         x_api_key: Annotated[str | None, Header(alias="X-API-Key")] = None,
     ) -> User | None:
@@ -609,23 +733,7 @@ def require_permission_if_auth_enabled(*permissions: str | Permission):
                     )
 
                 # Otherwise treat as JWT
-                try:
-                    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                    username: str = payload.get("sub")
-                    if username is None:
-                        raise HTTPException(
-                            status_code=status.HTTP_401_UNAUTHORIZED,
-                            detail="Could not validate credentials",
-                            headers={"WWW-Authenticate": "Bearer"},
-                        )
-                except JWTError:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Could not validate credentials",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-
-                user = await get_user_by_username(db, username)
+                user = await get_token_user(db, token, request)
                 if user is None or not user.is_active:
                     raise HTTPException(
                         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -680,6 +788,7 @@ def require_ownership_permission(
     own_perm = own_permission.value if isinstance(own_permission, Permission) else own_permission
 
     async def checker(
+        request: Request,
         credentials: Annotated[HTTPAuthorizationCredentials | None, Depends(security)] = None,
         x_api_key: Annotated[str | None, Header(alias="X-API-Key")] = None,
     ) -> tuple[User | None, bool]:
@@ -714,23 +823,7 @@ def require_ownership_permission(
                     )
 
                 # Otherwise treat as JWT
-                try:
-                    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                    username: str = payload.get("sub")
-                    if username is None:
-                        raise HTTPException(
-                            status_code=status.HTTP_401_UNAUTHORIZED,
-                            detail="Could not validate credentials",
-                            headers={"WWW-Authenticate": "Bearer"},
-                        )
-                except JWTError:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Could not validate credentials",
-                        headers={"WWW-Authenticate": "Bearer"},
-                    )
-
-                user = await get_user_by_username(db, username)
+                user = await get_token_user(db, token, request)
                 if user is None or not user.is_active:
                     raise HTTPException(
                         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,7 +57,9 @@ class Settings(BaseSettings):
     # Paths
     base_dir: Path = _data_dir  # For backwards compatibility
     archive_dir: Path = _data_dir / "archive"
+    blob_dir: Path = _data_dir / "blobs"  # Content-addressed store shared by archives and library files
     plate_calibration_dir: Path = _plate_cal_dir  # Plate detection references
+    telemetry_dir: Path = _data_dir / "telemetry"  # Printer telemetry history segments
     static_dir: Path = _app_dir / "static"  # Static files are part of app, not data
     log_dir: Path = _log_dir
     database_url: str = f"sqlite+aiosqlite:///{_db_path}"
@@ -66,6 +68,11 @@ class Settings(BaseSettings):
     log_level: str = "INFO"  # Override with LOG_LEVEL env var or DEBUG=true
     log_to_file: bool = True  # Set to false to disable file logging
 
+    # MQTT ingestion: worker threads decoding printer messages, and messages
+    # buffered per printer before the oldest is dropped
+    mqtt_ingest_workers: int = 4
+    mqtt_ingest_queue_size: int = 50
+
     # API
     api_prefix: str = "/api/v1"
 
@@ -3,7 +3,7 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
-from backend.app.core.config import settings
+from backend.app.core.config import APP_VERSION, settings
 
 
 def _set_sqlite_pragmas(dbapi_conn, connection_record):
@@ -70,15 +70,21 @@ async def get_db() -> AsyncSession:
 
 
 async def init_db():
+    from backend.app.core.migrations import get_schema_state, mark_seeded, run_migrations
+
     # Import models to register them with SQLAlchemy
     from backend.app.models import (  # noqa: F401
         active_print_spoolman,
         ams_history,
         api_key,
         archive,
+        archive_duplicate,
+        archive_stats,
         color_catalog,
+        energy_reading,
         external_link,
         filament,
+        filament_requirements,
         github_backup,
         group,
         kprofile_note,
@@ -108,8 +114,13 @@ async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-        # Run migrations for new columns (SQLite doesn't auto-add columns)
+        # Run pending migrations (SQLite doesn't auto-add columns); a single version check when up to date
         await run_migrations(conn)
+        state = await get_schema_state(conn)
+
+    # Defaults only change with the schema or a new release, so don't re-seed on every start
+    if state.seeded_app_version == APP_VERSION:
+        return
 
     # Seed default notification templates
     await seed_notification_templates()
@@ -121,9 +132,18 @@ async def init_db():
     await seed_spool_catalog()
     await seed_color_catalog()
 
+    async with engine.begin() as conn:
+        await mark_seeded(conn)
+
+
+async def migrate_legacy_schema(conn):
+    """Add new columns to existing tables if they don't exist.
 
-async def run_migrations(conn):
-    """Add new columns to existing tables if they don't exist."""
+    Baseline migration (version 1 in core/migrations.py) holding every change
+    made before migrations were versioned. Each step checks or tolerates its
+    own prior application, so it is safe on databases of any older version.
+    Add new schema changes as numbered migrations instead of extending this.
+    """
     from sqlalchemy import text
 
     # Migration: Add is_favorite column to print_archives
@@ -261,64 +281,6 @@ async def run_migrations(conn):
     except OperationalError:
         pass  # Already applied
 
-    # Migration: Create FTS5 virtual table for archive full-text search
-    try:
-        await conn.execute(
-            text("""
-            CREATE VIRTUAL TABLE IF NOT EXISTS archive_fts USING fts5(
-                print_name,
-                filename,
-                tags,
-                notes,
-                designer,
-                filament_type,
-                content='print_archives',
-                content_rowid='id'
-            )
-        """)
-        )
-    except OperationalError:
-        pass  # Already applied
-
-    # Migration: Create triggers to keep FTS index in sync
-    try:
-        await conn.execute(
-            text("""
-            CREATE TRIGGER IF NOT EXISTS archive_fts_insert AFTER INSERT ON print_archives BEGIN
-                INSERT INTO archive_fts(rowid, print_name, filename, tags, notes, designer, filament_type)
-                VALUES (new.id, new.print_name, new.filename, new.tags, new.notes, new.designer, new.filament_type);
-            END
-        """)
-        )
-    except OperationalError:
-        pass  # Already applied
-
-    try:
-        await conn.execute(
-            text("""
-            CREATE TRIGGER IF NOT EXISTS archive_fts_delete AFTER DELETE ON print_archives BEGIN
-                INSERT INTO archive_fts(archive_fts, rowid, print_name, filename, tags, notes, designer, filament_type)
-                VALUES ('delete', old.id, old.print_name, old.filename, old.tags, old.notes, old.designer, old.filament_type);
-            END
-        """)
-        )
-    except OperationalError:
-        pass  # Already applied
-
-    try:
-        await conn.execute(
-            text("""
-            CREATE TRIGGER IF NOT EXISTS archive_fts_update AFTER UPDATE ON print_archives BEGIN
-                INSERT INTO archive_fts(archive_fts, rowid, print_name, filename, tags, notes, designer, filament_type)
-                VALUES ('delete', old.id, old.print_name, old.filename, old.tags, old.notes, old.designer, old.filament_type);
-                INSERT INTO archive_fts(rowid, print_name, filename, tags, notes, designer, filament_type)
-                VALUES (new.id, new.print_name, new.filename, new.tags, new.notes, new.designer, new.filament_type);
-            END
-        """)
-        )
-    except OperationalError:
-        pass  # Already applied
-
     # Migration: Add auto_off_pending columns to smart_plugs (for restart recovery)
     try:
         await conn.execute(text("ALTER TABLE smart_plugs ADD COLUMN auto_off_pending BOOLEAN DEFAULT 0"))
@@ -1216,6 +1178,12 @@ async def run_migrations(conn):
     except OperationalError:
         pass  # Already applied
 
+    # Migration: Index api_keys.key_prefix for API key lookup
+    try:
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_api_keys_key_prefix ON api_keys(key_prefix)"))
+    except OperationalError:
+        pass  # Already applied
+
 
 async def seed_notification_templates():
     """Seed default notification templates if they don't exist."""
@@ -0,0 +1,168 @@
+"""Versioned schema migrations.
+
+The schema version is stored in the single-row schema_version table. On
+startup run_migrations() reads it and, when the database is current, returns
+without touching the schema. Otherwise the pending migrations run in order and
+the version is recorded after each one.
+
+Migrations must be idempotent: databases created before versioning start at
+version 0 and replay all of them, and tables created by create_all() for a
+new install already have the columns older migrations add.
+
+To change the schema, append a Migration with the next version number. Never
+renumber or edit a released migration.
+"""
+
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from backend.app.core.config import APP_VERSION
+from backend.app.core.database import Base, migrate_legacy_schema
+from backend.app.models import archive, library, print_log, print_queue, spool_usage_history  # noqa: F401
+from backend.app.services.archive_duplicates import install_archive_duplicates, reinstall_archive_duplicates
+from backend.app.services.archive_search import install_archive_search
+from backend.app.services.archive_stats import install_archive_stats
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+
+
+def create_indexes(*names: str) -> Callable[[AsyncConnection], Awaitable[None]]:
+    """Migration creating indexes declared on the models (skipping those that exist)."""
+
+    def create(sync_conn) -> None:
+        indexes = {index.name: index for table in Base.metadata.tables.values() for index in table.indexes}
+        # Not checkfirst: reflection doesn't see expression indexes
+        existing = {row[0] for row in sync_conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for name in names:
+            if name not in existing:
+                indexes[name].create(sync_conn)
+
+    async def upgrade(conn: AsyncConnection) -> None:
+        await conn.run_sync(create)
+
+    return upgrade
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "Columns and tables added before versioned migrations", migrate_legacy_schema),
+    Migration(2, "Archive full-text search index and triggers", install_archive_search),
+    Migration(3, "Archive statistics triggers", install_archive_stats),
+    Migration(
+        4,
+        "Indexes for archive, queue, library, print log and spool usage queries",
+        create_indexes(
+            "ix_print_archives_created_at",
+            "ix_print_archives_printer_created",
+            "ix_print_archives_project_created",
+            "ix_print_archives_status_created",
+            "ix_print_archives_content_hash",
+            "ix_print_archives_name_key",
+            "ix_print_archives_makerworld_id",
+            "ix_print_queue_status_printer_position",
+            "ix_print_queue_archive_id",
+            "ix_library_files_folder_filename",
+            "ix_library_files_file_hash",
+            "ix_print_log_entries_created_at",
+            "ix_print_log_entries_printer_created",
+            "ix_spool_usage_history_spool_created",
+        ),
+    ),
+    Migration(5, "Archive duplicate counts and triggers", install_archive_duplicates),
+    Migration(6, "Skip empty hashes and print names in archive duplicate counts", reinstall_archive_duplicates),
+]
+
+
+@dataclass
+class SchemaState:
+    version: int
+    seeded_app_version: str | None
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def pending_migrations(version: int) -> list[Migration]:
+    return [migration for migration in MIGRATIONS if migration.version > version]
+
+
+async def get_schema_state(conn: AsyncConnection) -> SchemaState:
+    """Current schema version (0 for databases from before versioned migrations)."""
+    has_table = (
+        await conn.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"))
+    ).first()
+    if not has_table:
+        return SchemaState(version=0, seeded_app_version=None)
+    row = (await conn.execute(text("SELECT version, seeded_app_version FROM schema_version WHERE id = 1"))).first()
+    if row is None:
+        return SchemaState(version=0, seeded_app_version=None)
+    return SchemaState(version=row[0], seeded_app_version=row[1])
+
+
+async def _set_version(conn: AsyncConnection, version: int) -> None:
+    # Seeds may depend on the new schema, so they run again after any migration
+    await conn.execute(
+        text(
+            "INSERT INTO schema_version (id, version, seeded_app_version, updated_at) "
+            "VALUES (1, :version, NULL, CURRENT_TIMESTAMP) "
+            "ON CONFLICT(id) DO UPDATE SET version = excluded.version, seeded_app_version = NULL, "
+            "updated_at = excluded.updated_at"
+        ),
+        {"version": version},
+    )
+
+
+async def run_migrations(conn: AsyncConnection, *, dry_run: bool = False) -> list[Migration]:
+    """Apply pending migrations in order.
+
+    Returns the migrations that were applied, or with dry_run the ones that
+    would be, without changing the database.
+    """
+    state = await get_schema_state(conn)
+    if state.version > latest_version():
+        logger.warning(
+            "Database schema version %d is newer than this release supports (%d)", state.version, latest_version()
+        )
+        return []
+
+    pending = pending_migrations(state.version)
+    if dry_run or not pending:
+        return pending
+
+    await conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "id INTEGER PRIMARY KEY CHECK (id = 1), "
+            "version INTEGER NOT NULL, "
+            "seeded_app_version VARCHAR(20), "
+            "updated_at DATETIME NOT NULL)"
+        )
+    )
+    for migration in pending:
+        start = time.monotonic()
+        await migration.upgrade(conn)
+        await _set_version(conn, migration.version)
+        logger.info(
+            "Applied migration %d (%s) in %.2fs", migration.version, migration.description, time.monotonic() - start
+        )
+    return pending
+
+
+async def mark_seeded(conn: AsyncConnection) -> None:
+    """Record that default data has been seeded for this release."""
+    await conn.execute(
+        text("UPDATE schema_version SET seeded_app_version = :app_version WHERE id = 1"),
+        {"app_version": APP_VERSION},
+    )
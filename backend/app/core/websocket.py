@@ -1,57 +1,455 @@
 import asyncio
 import json
+import logging
+import time
 from typing import Any
 
 from fastapi import WebSocket
 
+from backend.app.core.permissions import Permission
+
+logger = logging.getLogger(__name__)
+
+# Printer status updates arriving within this window are coalesced; the latest state wins
+STATUS_COALESCE_WINDOW = 0.25
+
+# Queued event messages per connection before a client is considered stuck and dropped
+MAX_PENDING_MESSAGES = 1000
+
+_MISSING = object()
+
+# Subscription topics. Every client starts subscribed to the wildcard topics and
+# receives everything; subscribing to specific printers/events narrows that dimension.
+WILDCARD = "*"
+
+# Event types covered by each permission scope a client can subscribe to
+EVENT_SCOPES: dict[str, frozenset[str]] = {
+    Permission.PRINTERS_READ.value: frozenset(
+        {"printer_status", "print_start", "print_complete", "plate_not_empty", "firmware_upload_progress"}
+    ),
+    Permission.ARCHIVES_READ.value: frozenset({"archive_created", "archive_updated", "print_complete"}),
+    Permission.INVENTORY_READ.value: frozenset({"spool_auto_assigned", "spool_usage_logged", "unknown_tag"}),
+}
+
+
+def _printer_topic(printer_id: int | str) -> str:
+    return f"printer:{printer_id}"
+
+
+def _event_topic(event_type: str) -> str:
+    return f"event:{event_type}"
+
+
+def compute_status_delta(base: dict[str, Any], current: dict[str, Any]) -> dict[str, Any] | None:
+    """Compute a top-level merge patch turning ``base`` into ``current``.
+
+    Returns only the keys whose values changed, or None when a key was removed
+    (a merge patch can't express removal, so a full snapshot must be sent).
+    The frontend shallow-merges printer_status payloads into its cached status,
+    so a patch of changed top-level sections applies without client changes.
+    """
+    if base.keys() - current.keys():
+        return None
+    return {key: value for key, value in current.items() if base.get(key, _MISSING) != value}
+
+
+def _snapshot_message(printer_id: int, snapshot: dict[str, Any], encoded: bytes | None = None) -> str:
+    """Serialize a full printer_status message, reusing a pre-encoded snapshot if given."""
+    if encoded is None:
+        return json.dumps({"type": "printer_status", "printer_id": printer_id, "data": snapshot})
+    return f'{{"type": "printer_status", "printer_id": {json.dumps(printer_id)}, "data": {encoded.decode()}}}'
+
+
+class ClientConnection:
+    """A connected WebSocket client with its own outbound queue and writer task.
+
+    Event messages are queued in order. Printer status updates are not queued;
+    instead the printer is marked dirty and the writer sends whatever the latest
+    state is when it gets to it, so a slow client skips intermediate states
+    rather than accumulating a backlog.
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.messages: asyncio.Queue[str] = asyncio.Queue(maxsize=MAX_PENDING_MESSAGES)
+        self.dirty_printers: set[int] = set()
+        # Full snapshots explicitly requested (initial state, get_status), with their JSON encoding if known
+        self.pending_snapshots: dict[int, tuple[dict[str, Any], bytes | None]] = {}
+        # Last printer status successfully sent to this client: printer_id -> (version, snapshot)
+        self.sent_status: dict[int, tuple[int, dict[str, Any]]] = {}
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.closed = False
+        # Subscription filters; None means "everything" for that dimension
+        self.printer_filter: set[int] | None = None
+        self.event_filter: set[str] | None = None
+        self.scope_filter: set[str] = set()
+        self.topics: set[str] = set()
+
+    def compute_topics(self) -> set[str]:
+        """Topics this client should be indexed under given its filters."""
+        topics = set()
+        if self.printer_filter is None:
+            topics.add(_printer_topic(WILDCARD))
+        else:
+            topics.update(_printer_topic(printer_id) for printer_id in self.printer_filter)
+
+        if self.event_filter is None and not self.scope_filter:
+            topics.add(_event_topic(WILDCARD))
+        else:
+            events = set(self.event_filter or ())
+            for scope in self.scope_filter:
+                events.update(EVENT_SCOPES.get(scope, ()))
+            topics.update(_event_topic(event_type) for event_type in events)
+        return topics
+
+    def describe_subscriptions(self) -> dict[str, Any]:
+        return {
+            "printers": sorted(self.printer_filter) if self.printer_filter is not None else WILDCARD,
+            "events": sorted(self.event_filter) if self.event_filter is not None else WILDCARD,
+            "scopes": sorted(self.scope_filter),
+        }
+
 
 class ConnectionManager:
-    """Manages WebSocket connections and broadcasts."""
+    """Manages WebSocket connections and broadcasts.
+
+    Each connection has its own writer task, so a slow browser only delays its
+    own updates. Printer status updates are coalesced per printer and sent as
+    deltas against the last state each connection received, with a full
+    snapshot on (re)connect.
 
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
-        self._lock = asyncio.Lock()
+    Clients can narrow what they receive by subscribing to printer IDs, event
+    types or permission scopes. Connections are indexed by topic so each
+    message is routed only to the sockets interested in it.
+    """
+
+    def __init__(self, coalesce_window: float = STATUS_COALESCE_WINDOW):
+        self.coalesce_window = coalesce_window
+        self._clients: dict[WebSocket, ClientConnection] = {}
+        # Topic index: "printer:<id>" / "event:<type>" (or "*") -> subscribed connections
+        self._topics: dict[str, set[ClientConnection]] = {}
+        # Latest published status per printer: printer_id -> (version, snapshot)
+        self._status: dict[int, tuple[int, dict[str, Any]]] = {}
+        self._pending_status: dict[int, dict[str, Any]] = {}
+        self._flush_handles: dict[int, asyncio.TimerHandle] = {}
+        self._last_flush: dict[int, float] = {}
+        # Serialized payloads for the current version of each printer, keyed by base snapshot id
+        self._payload_cache: dict[int, dict[int, tuple[dict[str, Any] | None, str | None]]] = {}
+
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        return list(self._clients)
 
     async def connect(self, websocket: WebSocket):
         """Accept a new WebSocket connection."""
         await websocket.accept()
-        async with self._lock:
-            self.active_connections.append(websocket)
+        client = ClientConnection(websocket)
+        client.task = asyncio.create_task(self._writer(client))
+        self._clients[websocket] = client
+        self._reindex(client)
 
     async def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
-        async with self._lock:
-            if websocket in self.active_connections:
-                self.active_connections.remove(websocket)
+        client = self._clients.get(websocket)
+        if client is None:
+            return
+        self._drop(client)
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+            try:
+                await client.task
+            except asyncio.CancelledError:
+                pass
+
+    def _drop(self, client: ClientConnection) -> None:
+        client.closed = True
+        client.wakeup.set()
+        if self._clients.get(client.websocket) is client:
+            del self._clients[client.websocket]
+        self._unindex(client)
+
+    def _unindex(self, client: ClientConnection) -> None:
+        for topic in client.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self._topics[topic]
+        client.topics = set()
+
+    def _reindex(self, client: ClientConnection) -> None:
+        self._unindex(client)
+        client.topics = client.compute_topics()
+        for topic in client.topics:
+            self._topics.setdefault(topic, set()).add(client)
+
+    def _recipients(self, event_type: str | None, printer_id: int | None) -> set[ClientConnection]:
+        """Connections subscribed to an event type and (if given) printer."""
+        recipients = set(self._topics.get(_event_topic(WILDCARD), ()))
+        if event_type:
+            recipients.update(self._topics.get(_event_topic(event_type), ()))
+        if printer_id is None:
+            return recipients
+        by_printer = self._topics.get(_printer_topic(WILDCARD), set()) | self._topics.get(
+            _printer_topic(printer_id), set()
+        )
+        return recipients & by_printer
+
+    def update_subscriptions(
+        self,
+        websocket: WebSocket,
+        action: str,
+        printers: list[int] | str | None = None,
+        events: list[str] | str | None = None,
+        scopes: list[str] | None = None,
+    ) -> list[int]:
+        """Subscribe or unsubscribe a client to printers, event types or permission scopes.
+
+        Passing "*" for printers or events on subscribe restores "everything" for
+        that dimension. Unknown scopes are ignored.
+
+        Returns printer IDs added to an existing printer filter, so the caller can
+        send them a fresh snapshot (a "*" subscription should resend all printers).
+        Raises ValueError if printers or events is neither a list nor "*", or
+        scopes isn't a list; the client's subscriptions are left unchanged.
+        """
+        # A string is iterable too: "12" would subscribe to printers 1 and 2
+        for name, value in (("printers", printers), ("events", events)):
+            if value is not None and value != WILDCARD and not isinstance(value, list):
+                raise ValueError(f'{name} must be a list or "*"')
+        if scopes is not None and not isinstance(scopes, list):
+            raise ValueError("scopes must be a list")
+
+        client = self._clients.get(websocket)
+        if client is None:
+            return []
+
+        subscribe = action == "subscribe"
+        newly_visible: list[int] = []
+
+        if printers is not None:
+            if printers == WILDCARD:
+                if subscribe:
+                    client.printer_filter = None
+            else:
+                ids = {int(printer_id) for printer_id in printers}
+                if subscribe:
+                    if client.printer_filter is None:
+                        client.printer_filter = ids
+                    else:
+                        newly_visible = sorted(ids - client.printer_filter)
+                        client.printer_filter |= ids
+                elif client.printer_filter is not None:
+                    client.printer_filter -= ids
+                else:
+                    # Unsubscribing from specific printers while receiving all isn't expressible
+                    # without knowing every printer ID; treat it as a no-op
+                    logger.debug("Ignoring printer unsubscribe for client without a printer filter")
+
+        if events is not None:
+            if events == WILDCARD:
+                if subscribe:
+                    client.event_filter = None
+            else:
+                names = set(events)
+                if subscribe:
+                    client.event_filter = (client.event_filter or set()) | names
+                elif client.event_filter is not None:
+                    client.event_filter -= names
+
+        if scopes is not None:
+            valid = {scope for scope in scopes if scope in EVENT_SCOPES}
+            if subscribe:
+                client.scope_filter |= valid
+                if client.event_filter is None:
+                    client.event_filter = set()
+            else:
+                client.scope_filter -= valid
+
+        self._reindex(client)
+
+        # Stop tracking state for printers the client no longer sees, so re-subscribing
+        # starts from a full snapshot rather than a delta against stale data
+        if client.printer_filter is not None:
+            for printer_id in list(client.sent_status):
+                if printer_id not in client.printer_filter:
+                    del client.sent_status[printer_id]
+            client.dirty_printers &= client.printer_filter
+        return newly_visible
+
+    def get_subscriptions(self, websocket: WebSocket) -> dict[str, Any] | None:
+        client = self._clients.get(websocket)
+        return client.describe_subscriptions() if client else None
+
+    def _enqueue(self, client: ClientConnection, data: str) -> None:
+        try:
+            client.messages.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning("WebSocket client fell %s messages behind, dropping connection", MAX_PENDING_MESSAGES)
+            self._drop(client)
+            asyncio.create_task(self._close_quietly(client.websocket))
+            return
+        client.wakeup.set()
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close()
+        except Exception:
+            pass  # Already closed; the client reconnects and gets a fresh snapshot
+
+    async def send_to(self, websocket: WebSocket, message: dict[str, Any]):
+        """Queue a message for a single client."""
+        client = self._clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, json.dumps(message))
+
+    async def send_status_snapshot(
+        self, websocket: WebSocket, printer_id: int, status: dict, encoded: bytes | None = None
+    ):
+        """Queue a full printer status snapshot for a single client.
+
+        Later updates for this printer are sent to the client as deltas against it.
+        ``encoded`` is the snapshot's JSON encoding, if the caller already has it
+        (the printer status cache does), so it isn't serialized again per client.
+        """
+        client = self._clients.get(websocket)
+        if client is not None:
+            client.pending_snapshots[printer_id] = (status, encoded)
+            client.dirty_printers.discard(printer_id)
+            client.wakeup.set()
 
     async def broadcast(self, message: dict[str, Any]):
-        """Broadcast a message to all connected clients."""
-        if not self.active_connections:
+        """Broadcast a message to all clients subscribed to its type and printer."""
+        if not self._clients:
+            return
+
+        recipients = self._recipients(message.get("type"), message.get("printer_id"))
+        if not recipients:
             return
 
         data = json.dumps(message)
-        async with self._lock:
-            disconnected = []
-            for connection in self.active_connections:
-                try:
-                    await connection.send_text(data)
-                except Exception:
-                    disconnected.append(connection)
-
-            # Clean up disconnected clients
-            for conn in disconnected:
-                if conn in self.active_connections:
-                    self.active_connections.remove(conn)
+        for client in recipients:
+            self._enqueue(client, data)
+
+    async def _writer(self, client: ClientConnection) -> None:
+        """Send queued messages and dirty printer states to one client."""
+        websocket = client.websocket
+        try:
+            while not client.closed:
+                await client.wakeup.wait()
+                client.wakeup.clear()
+
+                while not client.messages.empty() and not client.closed:
+                    await websocket.send_text(client.messages.get_nowait())
+
+                while client.pending_snapshots and not client.closed:
+                    printer_id, (snapshot, encoded) = client.pending_snapshots.popitem()
+                    await websocket.send_text(_snapshot_message(printer_id, snapshot, encoded))
+                    client.sent_status[printer_id] = (-1, snapshot)
+
+                while client.dirty_printers and not client.closed:
+                    printer_id = client.dirty_printers.pop()
+                    published = self._status.get(printer_id)
+                    if published is None:
+                        continue
+                    data = self._status_payload(printer_id, client.sent_status.get(printer_id))
+                    if data is not None:
+                        await websocket.send_text(data)
+                    client.sent_status[printer_id] = published
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug("WebSocket send failed, dropping client: %s", e)
+        finally:
+            self._drop(client)
+
+    def _status_payload(self, printer_id: int, base: tuple[int, dict[str, Any]] | None) -> str | None:
+        """Serialize the latest status for a printer relative to a client's last state.
+
+        Payloads are cached per base snapshot, so clients that are in sync
+        share a single serialization.
+        """
+        version, snapshot = self._status[printer_id]
+        if base is not None and base[0] == version:
+            return None
+
+        base_snapshot = base[1] if base is not None else None
+        cache = self._payload_cache.setdefault(printer_id, {})
+        cached = cache.get(id(base_snapshot))
+        if cached is not None and cached[0] is base_snapshot:
+            return cached[1]
+
+        message: dict[str, Any] = {"type": "printer_status", "printer_id": printer_id}
+        delta = compute_status_delta(base_snapshot, snapshot) if base_snapshot is not None else None
+        if delta is None:
+            message["data"] = snapshot
+            data = json.dumps(message)
+        elif delta:
+            message["data"] = delta
+            message["delta"] = True
+            data = json.dumps(message)
+        else:
+            data = None
+
+        cache[id(base_snapshot)] = (base_snapshot, data)
+        return data
+
+    def _flush_status(self, printer_id: int) -> None:
+        """Publish the pending status for a printer and wake every client."""
+        self._flush_handles.pop(printer_id, None)
+        status = self._pending_status.pop(printer_id, None)
+        if status is None:
+            return
+
+        previous = self._status.get(printer_id)
+        version = previous[0] + 1 if previous else 1
+        self._status[printer_id] = (version, status)
+        self._payload_cache[printer_id] = {}
+        self._last_flush[printer_id] = time.monotonic()
+
+        for client in self._recipients("printer_status", printer_id):
+            client.dirty_printers.add(printer_id)
+            client.wakeup.set()
 
     async def send_printer_status(self, printer_id: int, status: dict):
-        """Send printer status update to all clients."""
-        await self.broadcast(
-            {
-                "type": "printer_status",
-                "printer_id": printer_id,
-                "data": status,
-            }
-        )
+        """Send printer status update to all clients.
+
+        Updates are coalesced per printer: the first update after a quiet
+        period goes out immediately, later ones within the coalescing window
+        are merged so only the latest state is sent.
+        """
+        self._pending_status[printer_id] = status
+        if printer_id in self._flush_handles:
+            return
+
+        elapsed = time.monotonic() - self._last_flush.get(printer_id, 0.0)
+        if elapsed >= self.coalesce_window:
+            self._flush_status(printer_id)
+        else:
+            loop = asyncio.get_running_loop()
+            self._flush_handles[printer_id] = loop.call_later(
+                self.coalesce_window - elapsed, self._flush_status, printer_id
+            )
+
+    def remove_printer(self, printer_id: int) -> None:
+        """Forget a deleted printer's published status and what each client was last sent.
+
+        A printer added later under the same ID then starts from a full snapshot
+        instead of a delta against the deleted printer's state.
+        """
+        handle = self._flush_handles.pop(printer_id, None)
+        if handle is not None:
+            handle.cancel()
+        self._status.pop(printer_id, None)
+        self._pending_status.pop(printer_id, None)
+        self._last_flush.pop(printer_id, None)
+        self._payload_cache.pop(printer_id, None)
+        for client in self._clients.values():
+            client.sent_status.pop(printer_id, None)
+            client.pending_snapshots.pop(printer_id, None)
+            client.dirty_printers.discard(printer_id)
 
     async def send_print_start(self, printer_id: int, data: dict):
         """Notify clients that a print has started."""
@@ -203,6 +203,7 @@ from backend.app.api.routes import (
     spoolman,
     support,
     system,
+    telemetry,
     updates,
     users,
     webhook,
@@ -210,14 +211,25 @@ from backend.app.api.routes import (
 )
 from backend.app.api.routes.maintenance import _get_printer_maintenance_internal, ensure_default_types
 from backend.app.api.routes.support import init_debug_logging
+from backend.app.core.auth import start_api_key_usage_flush, stop_api_key_usage_flush
 from backend.app.core.database import async_session, init_db
 from backend.app.core.websocket import ws_manager
 from backend.app.models.smart_plug import SmartPlug
 from backend.app.services.archive import ArchiveService
 from backend.app.services.bambu_ftp import download_file_async, get_ftp_retry_settings, with_ftp_retry
-from backend.app.services.bambu_mqtt import PrinterState
+from backend.app.services.bambu_mqtt import (
+    SECTION_HMS,
+    SECTION_PROGRESS,
+    SECTION_STATUS,
+    SECTION_TEMPERATURES,
+    PrinterState,
+)
+from backend.app.services.blob_store import deduplicate_existing_files
+from backend.app.services.camera_hub import camera_hub_manager
+from backend.app.services.energy_sampler import energy_sampler
 from backend.app.services.github_backup import github_backup_service
 from backend.app.services.homeassistant import homeassistant_service
+from backend.app.services.mqtt_ingest import mqtt_ingest
 from backend.app.services.mqtt_relay import mqtt_relay
 from backend.app.services.mqtt_smart_plug import mqtt_smart_plug_service
 from backend.app.services.notification_service import notification_service
@@ -235,6 +247,7 @@ from backend.app.services.spoolman_tracking import (
     store_print_data as _store_spoolman_print_data,
 )
 from backend.app.services.tasmota import tasmota_service
+from backend.app.services.telemetry import telemetry_store
 
 # Track active prints: {(printer_id, filename): archive_id}
 _active_prints: dict[tuple[int, str], int] = {}
@@ -313,19 +326,22 @@ def register_expected_print(printer_id: int, filename: str, archive_id: int, ams
     )
 
 
-_last_status_broadcast: dict[int, str] = {}
+_last_status_version: dict[int, int] = {}  # Last PrinterState version handled per printer
+_last_broadcast_temps: dict[int, tuple] = {}  # Rounded temperatures at the last broadcast
 _nozzle_count_updated: set[int] = set()  # Track printers where we've updated nozzle_count
 
 
+def _rounded_temps(temps: dict) -> tuple:
+    """Temperatures rounded to whole degrees, so sensor jitter doesn't trigger broadcasts."""
+    return tuple(
+        round(temps[key]) if key in temps else None
+        for key in ("nozzle", "bed", "nozzle_2", "chamber", "bed_target", "nozzle_target")
+    )
+
+
 async def on_printer_status_change(printer_id: int, state: PrinterState):
     """Handle printer status changes - broadcast via WebSocket."""
-    # Only broadcast if something meaningful changed (reduce WebSocket spam)
-    # Include rounded temperatures to detect meaningful temp changes (within 1 degree)
     temps = state.temperatures or {}
-    nozzle_temp = round(temps.get("nozzle", 0))
-    bed_temp = round(temps.get("bed", 0))
-    nozzle_2_temp = round(temps.get("nozzle_2", 0)) if "nozzle_2" in temps else ""
-    chamber_temp = round(temps.get("chamber", 0)) if "chamber" in temps else ""
 
     # Auto-detect dual-nozzle printers from MQTT temperature data
     if "nozzle_2" in temps and printer_id not in _nozzle_count_updated:
@@ -343,20 +359,6 @@ async def on_printer_status_change(printer_id: int, state: PrinterState):
                     f"Auto-detected dual-nozzle printer {printer_id}, updated nozzle_count=2"
                 )
 
-    # Include target temps for heating phase detection
-    bed_target = round(temps.get("bed_target", 0))
-    nozzle_target = round(temps.get("nozzle_target", 0))
-
-    # Include tray_now and vt_tray hash so external spool changes trigger broadcasts
-    vt_tray_key = hash(str(state.raw_data.get("vt_tray", []))) if state.raw_data else 0
-    status_key = (
-        f"{state.connected}:{state.state}:{state.progress}:{state.layer_num}:"
-        f"{nozzle_temp}:{bed_temp}:{nozzle_2_temp}:{chamber_temp}:"
-        f"{state.stg_cur}:{bed_target}:{nozzle_target}:"
-        f"{state.cooling_fan_speed}:{state.big_fan1_speed}:{state.big_fan2_speed}:"
-        f"{state.chamber_light}:{state.active_extruder}:{state.tray_now}:{vt_tray_key}"
-    )
-
     # MQTT relay - publish status (before dedup check - always publish to MQTT)
     try:
         printer_info = printer_manager.get_printer(printer_id)
@@ -365,16 +367,31 @@ async def on_printer_status_change(printer_id: int, state: PrinterState):
     except Exception:
         pass  # Don't fail status callback if MQTT fails
 
-    if _last_status_broadcast.get(printer_id) == status_key:
+    # Only broadcast if something meaningful changed (reduce WebSocket spam).
+    # Several MQTT messages may have been processed since this callback was
+    # scheduled; the state's version tells us everything that changed since the
+    # last one we handled.
+    version, changed = state.changes_since(_last_status_version.get(printer_id, 0))
+    _last_status_version[printer_id] = version
+    if not changed:
         return  # No change, skip WebSocket broadcast
 
-    _last_status_broadcast[printer_id] = status_key
+    # Let the queue react to a printer becoming connected/idle right away
+    print_scheduler.on_printer_status(printer_id, state, changed)
+
+    # Temperatures only count once they move by a whole degree
+    rounded_temps = _rounded_temps(temps)
+    if changed == {SECTION_TEMPERATURES} and _last_broadcast_temps.get(printer_id) == rounded_temps:
+        return
+    _last_broadcast_temps[printer_id] = rounded_temps
 
     # Check for progress milestone notifications (25%, 50%, 75%)
     progress = state.progress or 0
     is_printing = state.state in ("RUNNING", "PRINTING")
 
-    if is_printing and progress > 0:
+    if not changed & {SECTION_PROGRESS, SECTION_STATUS}:
+        pass  # Progress and print state unchanged
+    elif is_printing and progress > 0:
         # Determine which milestone we've reached
         current_milestone = 0
         if progress >= 75:
@@ -422,7 +439,9 @@ async def on_printer_status_change(printer_id: int, state: PrinterState):
 
     # Check for new HMS errors and send notifications
     current_hms_errors = getattr(state, "hms_errors", []) or []
-    if current_hms_errors:
+    if SECTION_HMS not in changed:
+        pass  # HMS list unchanged since the last check
+    elif current_hms_errors:
         # Build set of current error codes (using attr for uniqueness)
         current_error_codes = {f"{e.attr:08x}" for e in current_hms_errors}
         previously_notified = _notified_hms_errors.get(printer_id, set())
@@ -531,7 +550,7 @@ async def on_ams_change(printer_id: int, ams_data: list):
     except Exception:
         pass  # Don't fail AMS callback if MQTT fails
 
-    # Broadcast AMS change via WebSocket (bypasses status_key deduplication)
+    # Broadcast AMS change via WebSocket (bypasses status change deduplication)
     # This ensures frontend gets immediate updates when AMS slots are configured
     try:
         state = printer_manager.get_status(printer_id)
@@ -2165,6 +2184,7 @@ async def on_print_complete(printer_id: int, data: dict):
                 queue_item.completed_at = datetime.now()
                 await db.commit()
                 logger.info("Updated queue item %s status to %s", queue_item.id, queue_status)
+                print_scheduler.wake(printer_id)
 
                 # MQTT relay - publish queue job completed
                 try:
@@ -3219,6 +3239,9 @@ async def lifespan(app: FastAPI):
     # Start the print scheduler
     asyncio.create_task(print_scheduler.run())
 
+    # Collapse duplicate files into the blob store (first run) and remove unreferenced blobs
+    asyncio.create_task(deduplicate_existing_files())
+
     # Start the smart plug scheduler for time-based on/off
     smart_plug_manager.start_scheduler()
 
@@ -3234,9 +3257,18 @@ async def lifespan(app: FastAPI):
     # Start AMS history recording
     start_ams_history_recording()
 
+    # Start polling smart plug energy data for stats and metrics
+    energy_sampler.start()
+
+    # Start writing buffered printer telemetry to disk
+    telemetry_store.start()
+
     # Start printer runtime tracking
     start_runtime_tracking()
 
+    # Start batched API key last_used updates
+    start_api_key_usage_flush()
+
     # Initialize virtual printer manager
     from backend.app.services.virtual_printer import virtual_printer_manager
 
@@ -3295,8 +3327,13 @@ async def lifespan(app: FastAPI):
     notification_service.stop_digest_scheduler()
     github_backup_service.stop_scheduler()
     stop_ams_history_recording()
+    energy_sampler.stop()
+    telemetry_store.stop()
     stop_runtime_tracking()
+    await stop_api_key_usage_flush()
     printer_manager.disconnect_all()
+    mqtt_ingest.shutdown()
+    await camera_hub_manager.stop_all()
     await close_spoolman_client()
 
     # Stop virtual printer if running
@@ -3432,11 +3469,12 @@ async def auth_middleware(request, call_next):
         if not username:
             raise ValueError("No username in token")
 
-        # Verify user exists and is active
+        # Verify user exists and is active (shared with the route's auth dependency)
         async with async_session() as db:
-            from backend.app.core.auth import get_user_by_username
+            from backend.app.core.auth import AuthContext, get_cached_user
 
-            user = await get_user_by_username(db, username)
+            user = await get_cached_user(db, username)
+            request.state.auth = AuthContext(token=token, user=user)
             if not user or not user.is_active:
                 return JSONResponse(
                     status_code=401,
@@ -3486,6 +3524,7 @@ app.include_router(library.router, prefix=app_settings.api_prefix)
 app.include_router(api_keys.router, prefix=app_settings.api_prefix)
 app.include_router(webhook.router, prefix=app_settings.api_prefix)
 app.include_router(ams_history.router, prefix=app_settings.api_prefix)
+app.include_router(telemetry.router, prefix=app_settings.api_prefix)
 app.include_router(system.router, prefix=app_settings.api_prefix)
 app.include_router(support.router, prefix=app_settings.api_prefix)
 app.include_router(websocket.router, prefix=app_settings.api_prefix)
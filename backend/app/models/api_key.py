@@ -14,7 +14,7 @@ class APIKey(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100))  # User-friendly name
     key_hash: Mapped[str] = mapped_column(String(64))  # SHA256 hash of the key
-    key_prefix: Mapped[str] = mapped_column(String(8))  # First 8 chars for identification
+    key_prefix: Mapped[str] = mapped_column(String(8), index=True)  # First 8 chars for identification and lookup
 
     # Permissions
     can_queue: Mapped[bool] = mapped_column(Boolean, default=True)  # Add to queue
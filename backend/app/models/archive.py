@@ -1,6 +1,19 @@
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    literal_column,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.app.core.database import Base
@@ -77,6 +90,23 @@ class PrintArchive(Base):
     project: Mapped["Project | None"] = relationship(back_populates="archives")
     created_by: Mapped["User | None"] = relationship()
 
+    # Indexes for listing (newest first, optionally per printer/project/status) and duplicate detection
+    __table_args__ = (
+        Index("ix_print_archives_created_at", "created_at"),
+        Index("ix_print_archives_printer_created", "printer_id", "created_at"),
+        Index("ix_print_archives_project_created", "project_id", "created_at"),
+        Index("ix_print_archives_status_created", "status", "created_at"),
+        Index("ix_print_archives_content_hash", "content_hash"),
+        Index("ix_print_archives_name_key", text("lower(print_name)")),
+        Index("ix_print_archives_makerworld_id", text("json_extract(extra_data, '$.makerworld_model_id')")),
+    )
+
+
+# Expressions of the expression indexes above. SQLite only uses such an index when a
+# query contains the identical expression (with a literal, not bound, JSON path).
+archive_name_key = func.lower(PrintArchive.print_name)
+archive_makerworld_id = func.json_extract(PrintArchive.extra_data, literal_column("'$.makerworld_model_id'"))
+
 
 from backend.app.models.printer import Printer  # noqa: E402, F811
 from backend.app.models.project import Project  # noqa: E402, F811
@@ -0,0 +1,24 @@
+"""Running counts of archives sharing a content hash or print name."""
+
+from sqlalchemy import Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.core.database import Base
+
+
+class ArchiveDuplicateKey(Base):
+    """Number of archives with one content hash (scope "hash") or lower-cased
+    print name (scope "name").
+
+    Rows are kept up to date by triggers on print_archives (see
+    services/archive_duplicates.py); an archive has duplicates when either of
+    its keys counts more than one archive.
+    """
+
+    __tablename__ = "archive_duplicates"
+    __table_args__ = (UniqueConstraint("scope", "key"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    scope: Mapped[str] = mapped_column(String(10))  # hash, name
+    key: Mapped[str] = mapped_column(String(255))
+    archives: Mapped[int] = mapped_column(Integer, server_default="0")
@@ -0,0 +1,34 @@
+"""Running statistics totals over print archives."""
+
+from sqlalchemy import Float, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.core.database import Base
+
+
+class ArchiveStatsBucket(Base):
+    """Totals over all archives in one statistics bucket.
+
+    Buckets are global (key ""), per printer (key = printer id, "" for none),
+    per filament type and per day (key = YYYY-MM-DD of created_at). Rows are
+    kept up to date by triggers on print_archives (see services/archive_stats.py),
+    so statistics don't need to scan the archive history.
+    """
+
+    __tablename__ = "archive_stats"
+    __table_args__ = (UniqueConstraint("scope", "key"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    scope: Mapped[str] = mapped_column(String(20))  # global, printer, filament, day
+    key: Mapped[str] = mapped_column(String(100))
+    prints: Mapped[int] = mapped_column(Integer, server_default="0")
+    completed: Mapped[int] = mapped_column(Integer, server_default="0")
+    failed: Mapped[int] = mapped_column(Integer, server_default="0")
+    print_seconds: Mapped[float] = mapped_column(Float, server_default="0")
+    filament_grams: Mapped[float] = mapped_column(Float, server_default="0")
+    cost: Mapped[float] = mapped_column(Float, server_default="0")
+    energy_kwh: Mapped[float] = mapped_column(Float, server_default="0")
+    energy_cost: Mapped[float] = mapped_column(Float, server_default="0")
+    # Sum and count of per-print time accuracy (completed prints with sane estimates)
+    accuracy_sum: Mapped[float] = mapped_column(Float, server_default="0")
+    accuracy_count: Mapped[int] = mapped_column(Integer, server_default="0")
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.core.database import Base
+
+
+class SmartPlugEnergyReading(Base):
+    """Periodic energy sample from a smart plug (recorded by the energy sampler)."""
+
+    __tablename__ = "smart_plug_energy_readings"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    plug_id: Mapped[int] = mapped_column(ForeignKey("smart_plugs.id", ondelete="CASCADE"))
+    power: Mapped[float | None] = mapped_column(Float)  # Current power in watts
+    today: Mapped[float | None] = mapped_column(Float)  # Energy used today in kWh
+    total: Mapped[float | None] = mapped_column(Float)  # Total energy counter in kWh
+    recorded_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (Index("ix_energy_readings_plug_time", "plug_id", "recorded_at"),)
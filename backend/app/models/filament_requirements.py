@@ -0,0 +1,25 @@
+"""Filament requirements parsed from 3MF files."""
+
+from datetime import datetime
+
+from sqlalchemy import JSON, DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from backend.app.core.database import Base
+
+
+class FilamentRequirements(Base):
+    """Filament requirements of a 3MF file, shared by all files with the same content.
+
+    Keyed by the file's SHA256 (PrintArchive.content_hash / LibraryFile.file_hash),
+    so archives and library files of the same 3MF are only parsed once.
+    """
+
+    __tablename__ = "filament_requirements"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String(64), unique=True, index=True)
+    # {"all": [filament, ...], "plates": {"<plate index>": [filament, ...]}}
+    # filament: {"slot_id", "type", "color", "used_grams", "used_meters", "tray_info_idx"[, "nozzle_id"]}
+    requirements: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
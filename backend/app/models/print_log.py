@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, Integer, String, func
+from sqlalchemy import DateTime, Float, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.app.core.database import Base
@@ -29,3 +29,8 @@ class PrintLogEntry(Base):
     thumbnail_path: Mapped[str | None] = mapped_column(String(500))
     created_by_username: Mapped[str | None] = mapped_column(String(100))
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_print_log_entries_created_at", "created_at"),
+        Index("ix_print_log_entries_printer_created", "printer_id", "created_at"),
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.app.core.database import Base
@@ -81,6 +81,13 @@ class PrintQueueItem(Base):
     project: Mapped["Project | None"] = relationship(back_populates="queue_items")
     created_by: Mapped["User | None"] = relationship()
 
+    # The scheduler looks up pending/printing items per printer in queue order;
+    # archive_id is needed for cascading archive deletes
+    __table_args__ = (
+        Index("ix_print_queue_status_printer_position", "status", "printer_id", "position"),
+        Index("ix_print_queue_archive_id", "archive_id"),
+    )
+
 
 from backend.app.models.archive import PrintArchive  # noqa: E402
 from backend.app.models.library import LibraryFile  # noqa: E402
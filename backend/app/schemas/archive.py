@@ -29,6 +29,15 @@ class ArchiveDuplicate(BaseModel):
     match_type: str  # "exact" (hash match) or "similar" (name match)
 
 
+def count_printable_objects(extra_data: dict | None) -> int | None:
+    """Number of objects on the plate from extra_data.printable_objects."""
+    if extra_data:
+        printable_objects = extra_data.get("printable_objects")
+        if printable_objects and isinstance(printable_objects, dict):
+            return len(printable_objects)
+    return None
+
+
 class ArchiveResponse(BaseModel):
     id: int
     printer_id: int | None
@@ -93,13 +102,14 @@ class ArchiveResponse(BaseModel):
     created_by_id: int | None = None
     created_by_username: str | None = None
 
+    # Search results only: matched text with the terms wrapped in <mark> (HTML-escaped)
+    search_snippet: str | None = None
+
     @model_validator(mode="after")
     def compute_object_count(self) -> "ArchiveResponse":
         """Compute object_count from extra_data.printable_objects if not set."""
-        if self.object_count is None and self.extra_data:
-            printable_objects = self.extra_data.get("printable_objects")
-            if printable_objects and isinstance(printable_objects, dict):
-                self.object_count = len(printable_objects)
+        if self.object_count is None:
+            self.object_count = count_printable_objects(self.extra_data)
         return self
 
     class Config:
@@ -121,6 +131,19 @@ class ArchiveStats(BaseModel):
     # Energy stats
     total_energy_kwh: float = 0.0
     total_energy_cost: float = 0.0
+    # Total mode: when the cached smart plug readings were taken (oldest plug) and whether any is outdated
+    energy_sampled_at: datetime | None = None
+    energy_stale: bool = False
+
+
+class ArchiveDailyStats(BaseModel):
+    date: str  # YYYY-MM-DD the archives were created
+    total_prints: int
+    successful_prints: int
+    failed_prints: int
+    total_print_time_hours: float
+    total_filament_grams: float
+    total_cost: float
 
 
 class ProjectPageImage(BaseModel):
@@ -1,23 +1,39 @@
-import hashlib
+import asyncio
 import json
 import logging
+import os
 import re
 import shutil
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
 from defusedxml import ElementTree as ET
-from sqlalchemy import and_, or_, select
+from sqlalchemy import String, and_, func, literal, or_, select, type_coerce
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.core.config import settings
-from backend.app.models.archive import PrintArchive
+from backend.app.models.archive import PrintArchive, archive_makerworld_id, archive_name_key
 from backend.app.models.filament import Filament
 from backend.app.models.printer import Printer
+from backend.app.services.archive_stats import get_archive_count
+from backend.app.services.blob_store import hash_file, release_blob, store_file
+from backend.app.services.filament_requirements import store_filament_requirements
+from backend.app.services.pagination import decode_cursor, encode_cursor
+from backend.app.utils.threemf_tools import extract_filament_requirements_from_3mf
 
 logger = logging.getLogger(__name__)
 
+# Archive ingest (copy, hash, 3MF parse) is disk and CPU bound, so it runs in this
+# pool instead of on the event loop. Kept small so bursts of finished prints don't
+# saturate the disk.
+INGEST_WORKERS = 2
+MODEL_HEADER_CHUNK_SIZE = 64 * 1024
+
+_ingest_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="archive-ingest")
+
 
 class ThreeMFParser:
     """Parser for Bambu Lab 3MF files."""
@@ -31,31 +47,39 @@ class ThreeMFParser:
         """Extract metadata from 3MF file."""
         try:
             with zipfile.ZipFile(self.file_path, "r") as zf:
-                self._parse_slice_info(zf)  # Now sets self.plate_number from slice_info
-                self._parse_project_settings(zf)
-                self._parse_gcode_header(zf)
-                self._parse_3dmodel(zf)
-                self._extract_thumbnail(zf)  # Uses correct plate_number for thumbnail
-
-                # Enhance print_name with plate info if this is a multi-plate export
-                plate_index = self.metadata.get("_plate_index")
-                if plate_index and plate_index > 1:
-                    # Append plate number to distinguish from other plates
-                    existing_name = self.metadata.get("print_name", "")
-                    if existing_name and f"Plate {plate_index}" not in existing_name:
-                        self.metadata["print_name"] = f"{existing_name} - Plate {plate_index}"
-
-                # ALWAYS prefer slice_info values - they contain ONLY filaments actually used in print
-                # project_settings contains ALL configured filaments (AMS slots), not just used ones
-                if self.metadata.get("_slice_filament_type"):
-                    self.metadata["filament_type"] = self.metadata["_slice_filament_type"]
-                if self.metadata.get("_slice_filament_color"):
-                    self.metadata["filament_color"] = self.metadata["_slice_filament_color"]
-
-                # Clean up internal keys
-                self.metadata.pop("_slice_filament_type", None)
-                self.metadata.pop("_slice_filament_color", None)
-                self.metadata.pop("_plate_index", None)
+                return self.parse_zip(zf)
+        except Exception:
+            pass  # Return whatever metadata was extracted before the error
+        return self.metadata
+
+    def parse_zip(self, zf: zipfile.ZipFile) -> dict:
+        """Extract metadata from an already opened 3MF file."""
+        try:
+            self._parse_slice_info(zf)  # Now sets self.plate_number from slice_info
+            self._parse_project_settings(zf)
+            self._parse_gcode_header(zf)
+            self._parse_3dmodel(zf)
+            self._extract_thumbnail(zf)  # Uses correct plate_number for thumbnail
+
+            # Enhance print_name with plate info if this is a multi-plate export
+            plate_index = self.metadata.get("_plate_index")
+            if plate_index and plate_index > 1:
+                # Append plate number to distinguish from other plates
+                existing_name = self.metadata.get("print_name", "")
+                if existing_name and f"Plate {plate_index}" not in existing_name:
+                    self.metadata["print_name"] = f"{existing_name} - Plate {plate_index}"
+
+            # ALWAYS prefer slice_info values - they contain ONLY filaments actually used in print
+            # project_settings contains ALL configured filaments (AMS slots), not just used ones
+            if self.metadata.get("_slice_filament_type"):
+                self.metadata["filament_type"] = self.metadata["_slice_filament_type"]
+            if self.metadata.get("_slice_filament_color"):
+                self.metadata["filament_color"] = self.metadata["_slice_filament_color"]
+
+            # Clean up internal keys
+            self.metadata.pop("_slice_filament_type", None)
+            self.metadata.pop("_slice_filament_color", None)
+            self.metadata.pop("_plate_index", None)
         except Exception:
             pass  # Return whatever metadata was extracted before the error
         return self.metadata
@@ -338,7 +362,7 @@ class ThreeMFParser:
             if model_path not in zf.namelist():
                 return
 
-            content = zf.read(model_path).decode("utf-8", errors="ignore")
+            content = _read_model_header(zf, model_path).decode("utf-8", errors="ignore")
 
             # Parse XML metadata elements
             # MakerWorld adds metadata like: <metadata name="Designer">username</metadata>
@@ -396,13 +420,32 @@ class ThreeMFParser:
             ]
         )
 
+        names = set(zf.namelist())
         for thumb_path in thumbnail_paths:
-            if thumb_path in zf.namelist():
+            if thumb_path in names:
                 self.metadata["_thumbnail_data"] = zf.read(thumb_path)
                 self.metadata["_thumbnail_ext"] = ".png"
                 break
 
 
+def _read_model_header(zf: zipfile.ZipFile, model_path: str) -> bytes:
+    """Read a 3MF model file up to its <resources> element.
+
+    Model metadata precedes the resources, which hold the (often very large) mesh
+    data, so there is no need to decompress the rest.
+    """
+    marker = b"<resources"
+    content = bytearray()
+    with zf.open(model_path) as f:
+        while chunk := f.read(MODEL_HEADER_CHUNK_SIZE):
+            start = max(0, len(content) - len(marker))
+            content += chunk
+            end = content.find(marker, start)
+            if end != -1:
+                return bytes(content[:end])
+    return bytes(content)
+
+
 def extract_printable_objects_from_3mf(
     data: bytes, plate_number: int | None = None, include_positions: bool = False
 ) -> dict[int, str] | dict[int, dict] | tuple[dict[int, dict], list | None]:
@@ -544,7 +587,7 @@ class ProjectPageParser:
                 # Parse 3D/3dmodel.model for metadata
                 model_path = "3D/3dmodel.model"
                 if model_path in zf.namelist():
-                    content = zf.read(model_path).decode("utf-8", errors="ignore")
+                    content = _read_model_header(zf, model_path).decode("utf-8", errors="ignore")
 
                     # Extract metadata elements using regex
                     # Format: <metadata name="Key">Value</metadata> or <metadata name="Key" />
@@ -650,6 +693,10 @@ class ProjectPageParser:
     def update_metadata(self, updates: dict) -> bool:
         """Update project page metadata in the 3MF file.
 
+        The file is replaced by a new one, not rewritten, so files sharing its
+        blob keep their content; the caller stores the new content with
+        intern_file() and updates the recorded hash.
+
         Args:
             updates: Dict with fields to update (title, description, designer, etc.)
 
@@ -688,8 +735,11 @@ class ProjectPageParser:
                         replacement = rf"\g<1>{new_value}\g<2>"
                         content = re.sub(pattern, replacement, content)
 
-                # Write to a temporary file first
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".3mf") as tmp:
+                # Write a new file next to the original and swap it in: the original is a
+                # link shared with other files and its blob, so it must not be rewritten
+                with tempfile.NamedTemporaryFile(
+                    dir=self.file_path.parent, prefix=f".{self.file_path.name}.", suffix=".tmp", delete=False
+                ) as tmp:
                     tmp_path = Path(tmp.name)
 
                 # Create new zip with updated content
@@ -700,8 +750,8 @@ class ProjectPageParser:
                         else:
                             zf_write.writestr(item, zf_read.read(item))
 
-            # Replace original file with updated one
-            shutil.move(tmp_path, self.file_path)
+            # Replace original file with updated one (same directory, so an atomic rename)
+            os.replace(tmp_path, self.file_path)
             return True
 
         except Exception:
@@ -711,6 +761,59 @@ class ProjectPageParser:
             return False
 
 
+@dataclass
+class IngestResult:
+    """Everything archive_print needs from the file itself."""
+
+    dest_file: Path
+    file_size: int
+    content_hash: str
+    metadata: dict
+    thumbnail_path: str | None
+    filament_requirements: dict
+
+
+def ingest_3mf(source_file: Path, archive_dir: Path, plate_number: int | None = None) -> IngestResult:
+    """Store a 3MF, link it into its archive directory and extract everything needed to archive it.
+
+    Blocking; run it in the ingest pool (see ArchiveService.archive_print).
+    The zip is opened once for metadata, thumbnail and filament requirements.
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    dest_file = archive_dir / source_file.name
+    content_hash = store_file(source_file, dest_file)
+
+    parser = ThreeMFParser(dest_file, plate_number=plate_number)
+    requirements = {"all": [], "plates": {}}
+    try:
+        with zipfile.ZipFile(dest_file, "r") as zf:
+            metadata = parser.parse_zip(zf)
+            try:
+                requirements = extract_filament_requirements_from_3mf(zf)
+            except Exception as e:
+                logger.warning("Failed to parse filament requirements from %s: %s", dest_file, e)
+    except (zipfile.BadZipFile, OSError):
+        metadata = parser.metadata
+
+    # Save thumbnail if present
+    thumbnail_path = None
+    if "_thumbnail_data" in metadata:
+        thumb_file = archive_dir / f"thumbnail{metadata['_thumbnail_ext']}"
+        thumb_file.write_bytes(metadata["_thumbnail_data"])
+        thumbnail_path = str(thumb_file.relative_to(settings.base_dir))
+        del metadata["_thumbnail_data"]
+        del metadata["_thumbnail_ext"]
+
+    return IngestResult(
+        dest_file=dest_file,
+        file_size=dest_file.stat().st_size,
+        content_hash=content_hash,
+        metadata=metadata,
+        thumbnail_path=thumbnail_path,
+        filament_requirements=requirements,
+    )
+
+
 class ArchiveService:
     """Service for archiving print jobs."""
 
@@ -720,37 +823,7 @@ class ArchiveService:
     @staticmethod
     def compute_file_hash(file_path: Path) -> str:
         """Compute SHA256 hash of a file for duplicate detection."""
-        sha256 = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            # Read in chunks to handle large files
-            for chunk in iter(lambda: f.read(8192), b""):
-                sha256.update(chunk)
-        return sha256.hexdigest()
-
-    async def get_duplicate_hashes_and_names(self) -> tuple[set[str], set[str]]:
-        """Get all content hashes and print names that appear more than once.
-
-        Returns a tuple of (duplicate_hashes, duplicate_names).
-        """
-        from sqlalchemy import func
-
-        result = await self.db.execute(
-            select(PrintArchive.content_hash)
-            .where(PrintArchive.content_hash.isnot(None))
-            .group_by(PrintArchive.content_hash)
-            .having(func.count(PrintArchive.id) > 1)
-        )
-        duplicate_hashes = {row[0] for row in result.all()}
-
-        result = await self.db.execute(
-            select(func.lower(PrintArchive.print_name))
-            .where(PrintArchive.print_name.isnot(None))
-            .group_by(func.lower(PrintArchive.print_name))
-            .having(func.count(PrintArchive.id) > 1)
-        )
-        duplicate_names = {row[0] for row in result.all()}
-
-        return duplicate_hashes, duplicate_names
+        return hash_file(file_path)
 
     async def find_duplicates(
         self,
@@ -794,16 +867,11 @@ class ArchiveService:
 
             name_conditions = []
             if print_name:
-                # Match if print names are similar (ignoring case)
-                name_conditions.append(PrintArchive.print_name.ilike(print_name))
+                # Match if print names are equal ignoring case
+                name_conditions.append(archive_name_key == func.lower(print_name))
             if makerworld_model_id:
                 # Match by MakerWorld model ID stored in extra_data
-                # Use json_extract for SQLite compatibility (astext is PostgreSQL-only)
-                from sqlalchemy import func
-
-                name_conditions.append(
-                    func.json_extract(PrintArchive.extra_data, "$.makerworld_model_id") == str(makerworld_model_id)
-                )
+                name_conditions.append(archive_makerworld_id == str(makerworld_model_id))
 
             if name_conditions:
                 conditions.append(or_(*name_conditions))
@@ -853,14 +921,6 @@ class ArchiveService:
         # Use "unassigned" folder for archives without a printer
         printer_folder = str(printer_id) if printer_id is not None else "unassigned"
         archive_dir = settings.archive_dir / printer_folder / archive_name
-        archive_dir.mkdir(parents=True, exist_ok=True)
-
-        # Copy 3MF file
-        dest_file = archive_dir / source_file.name
-        shutil.copy2(source_file, dest_file)
-
-        # Compute content hash for duplicate detection
-        content_hash = self.compute_file_hash(dest_file)
 
         # Extract plate number from filename (e.g., "plate_5" from "/data/Metadata/plate_5.gcode")
         plate_number = None
@@ -870,18 +930,16 @@ class ArchiveService:
             if match:
                 plate_number = int(match.group(1))
 
-        # Parse 3MF metadata
-        parser = ThreeMFParser(dest_file, plate_number=plate_number)
-        metadata = parser.parse()
+        # Copy, hash and parse off the event loop; only the DB work below runs on it
+        loop = asyncio.get_running_loop()
+        ingest = await loop.run_in_executor(_ingest_executor, ingest_3mf, source_file, archive_dir, plate_number)
+        dest_file = ingest.dest_file
+        content_hash = ingest.content_hash
+        metadata = ingest.metadata
+        thumbnail_path = ingest.thumbnail_path
 
-        # Save thumbnail if present
-        thumbnail_path = None
-        if "_thumbnail_data" in metadata:
-            thumb_file = archive_dir / f"thumbnail{metadata['_thumbnail_ext']}"
-            thumb_file.write_bytes(metadata["_thumbnail_data"])
-            thumbnail_path = str(thumb_file.relative_to(settings.base_dir))
-            del metadata["_thumbnail_data"]
-            del metadata["_thumbnail_ext"]
+        # Store filament requirements so queue/reprint checks don't reparse the file
+        await store_filament_requirements(self.db, dest_file, content_hash, ingest.filament_requirements)
 
         # Merge with print data from MQTT
         if print_data:
@@ -925,7 +983,7 @@ class ArchiveService:
             printer_id=printer_id,
             filename=source_file.name,
             file_path=str(dest_file.relative_to(settings.base_dir)),
-            file_size=dest_file.stat().st_size,
+            file_size=ingest.file_size,
             content_hash=content_hash,
             thumbnail_path=thumbnail_path,
             print_name=metadata.get("print_name") or source_file.stem,
@@ -1031,15 +1089,31 @@ class ArchiveService:
         project_id: int | None = None,
         limit: int = 50,
         offset: int = 0,
-    ) -> list[PrintArchive]:
-        """List archives with optional filtering."""
-        from sqlalchemy.orm import selectinload
+        cursor: str | None = None,
+        with_relations: bool = True,
+        with_extra_data: bool = True,
+    ) -> tuple[list[PrintArchive], str | None]:
+        """List archives newest first with optional filtering.
+
+        Returns one page and the cursor of the next (None on the last page).
+        With a cursor the page starts after that (created_at, id) key, reading
+        the created_at indexes from that point, and offset is ignored. Listings
+        that don't show them can skip loading the project and creator
+        relationships and the extra_data JSON.
+        """
+        from sqlalchemy.orm import defer, noload, selectinload
 
+        # Raw stored text: func.now() and Python datetimes store different formats,
+        # so the cursor has to compare with the column value exactly as stored
+        created_key = type_coerce(PrintArchive.created_at, String).label("created_key")
+        load = selectinload if with_relations else noload
         query = (
-            select(PrintArchive)
-            .options(selectinload(PrintArchive.project), selectinload(PrintArchive.created_by))
-            .order_by(PrintArchive.created_at.desc())
+            select(PrintArchive, created_key)
+            .options(load(PrintArchive.project), load(PrintArchive.created_by))
+            .order_by(PrintArchive.created_at.desc(), PrintArchive.id.desc())
         )
+        if not with_extra_data:
+            query = query.options(defer(PrintArchive.extra_data))
 
         if printer_id:
             query = query.where(PrintArchive.printer_id == printer_id)
@@ -1047,9 +1121,40 @@ class ArchiveService:
         if project_id:
             query = query.where(PrintArchive.project_id == project_id)
 
-        query = query.limit(limit).offset(offset)
+        if cursor:
+            after_created, after_id = decode_cursor(cursor, str, int)
+            after_created = literal(after_created, String)
+            query = query.where(
+                PrintArchive.created_at <= after_created,
+                or_(PrintArchive.created_at < after_created, PrintArchive.id < after_id),
+            )
+            offset = 0
+
+        query = query.limit(limit + 1).offset(offset)
         result = await self.db.execute(query)
-        return list(result.scalars().all())
+        rows = result.all()
+
+        next_cursor = None
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if has_more and rows:
+            last_archive, last_created = rows[-1]
+            next_cursor = encode_cursor(last_created, last_archive.id)
+        return [archive for archive, _ in rows], next_cursor
+
+    async def count_archives(self, printer_id: int | None = None, project_id: int | None = None) -> int:
+        """Count the archives list_archives() pages through.
+
+        Without a project filter this reads the trigger-maintained statistics
+        instead of counting rows.
+        """
+        if not project_id:
+            return await get_archive_count(self.db, printer_id)
+
+        query = select(func.count()).select_from(PrintArchive).where(PrintArchive.project_id == project_id)
+        if printer_id:
+            query = query.where(PrintArchive.printer_id == printer_id)
+        return (await self.db.execute(query)).scalar_one()
 
     async def delete_archive(self, archive_id: int) -> bool:
         """Delete an archive and its files."""
@@ -1059,6 +1164,7 @@ class ArchiveService:
 
         # Resolve the directory to delete BEFORE committing the DB change
         dir_to_delete: Path | None = None
+        content_hash = archive.content_hash
 
         if archive.file_path and archive.file_path.strip():
             file_path = settings.base_dir / archive.file_path
@@ -1106,6 +1212,7 @@ class ArchiveService:
         # Only delete files AFTER the DB commit succeeds to avoid orphaned records
         if dir_to_delete:
             shutil.rmtree(dir_to_delete, ignore_errors=True)
+            release_blob(content_hash)
 
         return True
 
@@ -0,0 +1,114 @@
+"""Incrementally maintained duplicate counts for print archives.
+
+Triggers on print_archives count the archives per content hash and per
+lower-cased print name in the archive_duplicates table, updating the counts
+when an archive is added, deleted, re-hashed or renamed. Marking the
+duplicates on a page of archives is then a lookup of each archive's two keys
+instead of grouping the whole archive table on every request.
+"""
+
+import logging
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+def _keys(row: str) -> dict[str, str]:
+    # lower() must match the name expression of find_duplicates and its index
+    return {"hash": f"{row}.content_hash", "name": f"lower({row}.print_name)"}
+
+
+def _counted(key: str) -> str:
+    # Archives without a hash or name (NULL or empty) aren't duplicates of each other
+    return f"{key} IS NOT NULL AND {key} != ''"
+
+
+def _add(row: str) -> str:
+    return "\n".join(
+        f"INSERT INTO archive_duplicates (scope, key, archives) SELECT '{scope}', {key}, 1 WHERE {_counted(key)} "
+        f"ON CONFLICT(scope, key) DO UPDATE SET archives = archives + 1;"
+        for scope, key in _keys(row).items()
+    )
+
+
+def _remove(row: str) -> str:
+    statements = []
+    for scope, key in _keys(row).items():
+        condition = f"scope = '{scope}' AND key = {key}"
+        statements.append(f"UPDATE archive_duplicates SET archives = archives - 1 WHERE {condition};")
+        statements.append(f"DELETE FROM archive_duplicates WHERE {condition} AND archives <= 0;")
+    return "\n".join(statements)
+
+
+def _triggers() -> dict[str, str]:
+    return {
+        "archive_duplicates_insert": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_duplicates_insert AFTER INSERT ON print_archives BEGIN\n"
+            f"{_add('new')}\nEND"
+        ),
+        "archive_duplicates_delete": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_duplicates_delete AFTER DELETE ON print_archives BEGIN\n"
+            f"{_remove('old')}\nEND"
+        ),
+        "archive_duplicates_update": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_duplicates_update "
+            f"AFTER UPDATE OF content_hash, print_name ON print_archives BEGIN\n"
+            f"{_remove('old')}\n{_add('new')}\nEND"
+        ),
+    }
+
+
+async def rebuild_archive_duplicates(db: AsyncConnection | AsyncSession) -> None:
+    """Recount all duplicate keys from the archives."""
+    await db.execute(text("DELETE FROM archive_duplicates"))
+    for scope, key in _keys("a").items():
+        await db.execute(
+            text(
+                f"INSERT INTO archive_duplicates (scope, key, archives) "
+                f"SELECT '{scope}', {key}, count(*) FROM print_archives AS a WHERE {_counted(key)} GROUP BY {key}"
+            )
+        )
+
+
+async def install_archive_duplicates(conn: AsyncConnection) -> None:
+    """Create the triggers maintaining archive_duplicates and count the existing archives."""
+    for name, ddl in _triggers().items():
+        try:
+            await conn.execute(text(ddl))
+        except OperationalError as e:
+            logger.error("Failed to create trigger %s: %s", name, e)
+            return
+
+    await rebuild_archive_duplicates(conn)
+
+
+async def reinstall_archive_duplicates(conn: AsyncConnection) -> None:
+    """Replace the archive_duplicates triggers with the current ones and recount."""
+    for name in _triggers():
+        await conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    await install_archive_duplicates(conn)
+
+
+async def get_archives_with_duplicates(db: AsyncSession, archive_ids: list[int]) -> set[int]:
+    """IDs of the given archives that share their content hash or print name with another archive."""
+    if not archive_ids:
+        return set()
+
+    def has_duplicate(scope: str, key: str) -> str:
+        return (
+            f"EXISTS (SELECT 1 FROM archive_duplicates AS d "
+            f"WHERE d.scope = '{scope}' AND d.key = {key} AND d.archives > 1)"
+        )
+
+    keys = _keys("a")
+    result = await db.execute(
+        text(
+            f"SELECT a.id FROM print_archives AS a WHERE a.id IN :ids "
+            f"AND ({has_duplicate('hash', keys['hash'])} OR {has_duplicate('name', keys['name'])})"
+        ).bindparams(bindparam("ids", expanding=True)),
+        {"ids": archive_ids},
+    )
+    return {row[0] for row in result.all()}
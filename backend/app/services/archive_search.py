@@ -0,0 +1,208 @@
+"""Full-text search over print archives.
+
+archive_fts is an FTS5 index over the text columns of print_archives, kept in
+sync by triggers. Searches run as a single query joining the index with
+print_archives, so the printer/project/status filters, bm25 ranking and
+pagination all happen in SQLite. Pages are addressed with an opaque cursor
+holding the (score, id) of the last hit, so deep pages don't re-rank and skip
+all earlier results.
+
+Query syntax (terms are ANDed):
+    vor          prefix match ("voron", "vorpal")
+    "benchy v2"  exact phrase ("benchy v2"* for a phrase prefix)
+    tags:gift    restrict a term or phrase to one field
+    a OR b       either term
+"""
+
+import html
+import logging
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from backend.app.services.pagination import decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Indexed columns and their bm25 weights (a hit in the name counts more than one in the notes)
+SEARCH_COLUMNS = {
+    "print_name": 10.0,
+    "filename": 5.0,
+    "tags": 4.0,
+    "notes": 1.0,
+    "designer": 3.0,
+    "filament_type": 2.0,
+}
+
+FIELD_ALIASES = {
+    **{column: column for column in SEARCH_COLUMNS},
+    "name": "print_name",
+    "file": "filename",
+    "tag": "tags",
+    "note": "notes",
+    "filament": "filament_type",
+}
+
+SNIPPET_TOKENS = 12
+# Control characters (char(1) and char(2) in SQL) marking matched terms in raw snippets
+_MARK_OPEN = "\x01"
+_MARK_CLOSE = "\x02"
+
+_TOKEN_RE = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?(\*?)|([^\s"]+))')
+
+_COLUMNS = ", ".join(SEARCH_COLUMNS)
+_NEW = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+_OLD = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+
+
+@dataclass
+class SearchHit:
+    archive_id: int
+    score: float
+    snippet: str | None
+
+
+def _fts_ddl() -> dict[str, str]:
+    return {
+        "archive_fts": (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS archive_fts USING fts5("
+            f"{_COLUMNS}, content='print_archives', content_rowid='id')"
+        ),
+        "archive_fts_insert": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_fts_insert AFTER INSERT ON print_archives BEGIN\n"
+            f"INSERT INTO archive_fts(rowid, {_COLUMNS}) VALUES (new.id, {_NEW});\nEND"
+        ),
+        "archive_fts_delete": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_fts_delete AFTER DELETE ON print_archives BEGIN\n"
+            f"INSERT INTO archive_fts(archive_fts, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD});\nEND"
+        ),
+        # Only re-index when an indexed column changes, not on every status or metadata update
+        "archive_fts_update": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_fts_update AFTER UPDATE OF {_COLUMNS} ON print_archives BEGIN\n"
+            f"INSERT INTO archive_fts(archive_fts, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD});\n"
+            f"INSERT INTO archive_fts(rowid, {_COLUMNS}) VALUES (new.id, {_NEW});\nEND"
+        ),
+    }
+
+
+async def install_archive_search(conn: AsyncConnection) -> None:
+    """Create the search index and its triggers, indexing existing archives on first install."""
+    # Older versions re-indexed on every update; replace that trigger with the column-scoped one
+    update_trigger = (
+        await conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'archive_fts_update'"))
+    ).scalar()
+    if update_trigger and "UPDATE OF" not in update_trigger:
+        await conn.execute(text("DROP TRIGGER archive_fts_update"))
+
+    for name, ddl in _fts_ddl().items():
+        try:
+            await conn.execute(text(ddl))
+        except OperationalError as e:
+            logger.error("Failed to create %s: %s", name, e)
+            return
+
+    # Archives created before the index existed were never indexed
+    indexed = (await conn.execute(text("SELECT COUNT(*) FROM archive_fts_docsize"))).scalar()
+    archives = (await conn.execute(text("SELECT COUNT(*) FROM print_archives"))).scalar()
+    if indexed != archives:
+        await rebuild_search_index(conn)
+
+
+async def rebuild_search_index(db: AsyncConnection | AsyncSession) -> int:
+    """Rebuild the index from print_archives, returning the number of indexed archives."""
+    await db.execute(text("INSERT INTO archive_fts(archive_fts) VALUES ('rebuild')"))
+    return (await db.execute(text("SELECT COUNT(*) FROM archive_fts_docsize"))).scalar() or 0
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_match_query(q: str) -> str | None:
+    """Translate a user query into an FTS5 MATCH expression (None if it has no terms)."""
+    parts: list[str] = []
+    for field, phrase, phrase_prefix, word in _TOKEN_RE.findall(q):
+        if word and not field and word.upper() == "OR":
+            if parts and parts[-1] != "OR":
+                parts.append("OR")
+            continue
+
+        column = FIELD_ALIASES.get(field.lower()) if field else None
+        if field and column is None:
+            # Not a field name, search for the whole token
+            word = f"{field}:{word or phrase}"
+
+        if word:
+            term = _quote(word.rstrip("*")) + " *"
+            has_text = any(c.isalnum() for c in word)
+        else:
+            term = _quote(phrase) + (" *" if phrase_prefix else "")
+            has_text = any(c.isalnum() for c in phrase)
+        if not has_text:
+            continue
+
+        parts.append(f"{column} : {term}" if column else term)
+
+    while parts and parts[0] == "OR":
+        parts.pop(0)
+    while parts and parts[-1] == "OR":
+        parts.pop()
+    return " ".join(parts) or None
+
+
+def format_snippet(raw: str | None) -> str | None:
+    """HTML-escape a snippet and wrap the matched terms in <mark> tags."""
+    if not raw:
+        return None
+    return html.escape(raw).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+async def search_archives(
+    db: AsyncSession,
+    match: str,
+    *,
+    printer_id: int | None = None,
+    project_id: int | None = None,
+    status: str | None = None,
+    limit: int = 50,
+    cursor: str | None = None,
+    offset: int = 0,
+) -> tuple[list[SearchHit], str | None]:
+    """Run a search, returning one page of hits (best first) and the cursor of the next page."""
+    score = f"bm25(archive_fts, {', '.join(str(weight) for weight in SEARCH_COLUMNS.values())})"
+    conditions = ["archive_fts MATCH :match"]
+    params: dict = {"match": match, "limit": limit + 1, "offset": offset}
+    if printer_id:
+        conditions.append("a.printer_id = :printer_id")
+        params["printer_id"] = printer_id
+    if project_id:
+        conditions.append("a.project_id = :project_id")
+        params["project_id"] = project_id
+    if status:
+        conditions.append("a.status = :status")
+        params["status"] = status
+    if cursor:
+        params["after_score"], params["after_id"] = decode_cursor(cursor, float, int)
+        params["offset"] = 0
+        conditions.append(f"({score} > :after_score OR ({score} = :after_score AND a.id > :after_id))")
+
+    result = await db.execute(
+        text(
+            f"SELECT a.id, {score} AS score, "
+            f"snippet(archive_fts, -1, char(1), char(2), '…', {SNIPPET_TOKENS}) "
+            f"FROM archive_fts JOIN print_archives AS a ON a.id = archive_fts.rowid "
+            f"WHERE {' AND '.join(conditions)} "
+            f"ORDER BY score, a.id LIMIT :limit OFFSET :offset"
+        ),
+        params,
+    )
+    hits = [SearchHit(archive_id, score, format_snippet(snippet)) for archive_id, score, snippet in result.all()]
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_cursor(hits[-1].score, hits[-1].archive_id)
+    return hits, next_cursor
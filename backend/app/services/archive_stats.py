@@ -0,0 +1,204 @@
+"""Incrementally maintained archive statistics.
+
+Triggers on print_archives add each archive's contribution to its global,
+printer, filament type and day buckets in the archive_stats table, and subtract
+it again when the archive is updated or deleted. Because the triggers run in the
+same transaction as the change, the totals stay exact for every write path,
+including bulk UPDATE/DELETE statements. rebuild_archive_stats() recomputes all
+buckets from scratch.
+
+The per-archive expressions mirror the ones /archives/stats used to compute in
+Python: actual print time from the timestamps (slicer estimate as fallback) and
+time accuracy as estimated / actual, ignoring values outside 5-500%.
+"""
+
+import logging
+
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from backend.app.models.archive_stats import ArchiveStatsBucket
+
+logger = logging.getLogger(__name__)
+
+STAT_COLUMNS = [
+    "prints",
+    "completed",
+    "failed",
+    "print_seconds",
+    "filament_grams",
+    "cost",
+    "energy_kwh",
+    "energy_cost",
+    "accuracy_sum",
+    "accuracy_count",
+]
+
+# Columns whose changes affect the statistics; other updates don't fire the trigger
+TRACKED_COLUMNS = [
+    "status",
+    "printer_id",
+    "filament_type",
+    "filament_used_grams",
+    "cost",
+    "energy_kwh",
+    "energy_cost",
+    "started_at",
+    "completed_at",
+    "print_time_seconds",
+    "created_at",
+]
+
+
+def _contributions(row: str) -> dict[str, str]:
+    """SQL expressions for one archive's contribution to each statistic."""
+    has_times = f"({row}.started_at IS NOT NULL AND {row}.completed_at IS NOT NULL)"
+    actual = f"((julianday({row}.completed_at) - julianday({row}.started_at)) * 86400.0)"
+    actual_int = f"CAST(round({actual}, 3) AS INTEGER)"
+    accuracy = f"({row}.print_time_seconds * 100.0 / {actual_int})"
+    accurate = (
+        f"({row}.status = 'completed' AND {has_times} AND {row}.print_time_seconds > 0 "
+        f"AND {actual_int} > 0 AND {accuracy} BETWEEN 5 AND 500)"
+    )
+    return {
+        "prints": "1",
+        "completed": f"({row}.status = 'completed')",
+        "failed": f"({row}.status = 'failed')",
+        "print_seconds": (
+            f"(CASE WHEN {has_times} THEN max({actual}, 0) ELSE COALESCE({row}.print_time_seconds, 0) END)"
+        ),
+        "filament_grams": f"COALESCE({row}.filament_used_grams, 0)",
+        "cost": f"COALESCE({row}.cost, 0)",
+        "energy_kwh": f"COALESCE({row}.energy_kwh, 0)",
+        "energy_cost": f"COALESCE({row}.energy_cost, 0)",
+        "accuracy_sum": f"(CASE WHEN COALESCE({accurate}, 0) THEN round({accuracy}, 1) ELSE 0 END)",
+        "accuracy_count": f"COALESCE({accurate}, 0)",
+    }
+
+
+def _bucket_keys(row: str) -> dict[str, str]:
+    return {
+        "global": "''",
+        "printer": f"COALESCE(CAST({row}.printer_id AS TEXT), '')",
+        "day": f"COALESCE(date({row}.created_at), '')",
+    }
+
+
+def _filament_types(row: str) -> str:
+    """json_each() source splitting a comma-separated filament_type into its types."""
+    as_json = (
+        f"'[\"' || replace(replace(replace({row}.filament_type, '\\', '\\\\'), '\"', '\\\"'), ',', '\",\"') || '\"]'"
+    )
+    return f"json_each(CASE WHEN json_valid({as_json}) THEN {as_json} ELSE '[]' END)"
+
+
+_UPSERT = ", ".join(f"{column} = {column} + excluded.{column}" for column in STAT_COLUMNS)
+
+
+def _apply(row: str, sign: int) -> str:
+    """Trigger statements adding (sign 1) or removing (sign -1) one archive's contribution."""
+    values = _contributions(row)
+    columns = ", ".join(STAT_COLUMNS)
+    statements = []
+    for scope, key in _bucket_keys(row).items():
+        contribution = ", ".join(f"{sign} * {values[column]}" for column in STAT_COLUMNS)
+        statements.append(
+            f"INSERT INTO archive_stats (scope, key, {columns}) VALUES ('{scope}', {key}, {contribution}) "
+            f"ON CONFLICT(scope, key) DO UPDATE SET {_UPSERT};"
+        )
+    statements.append(
+        f"INSERT INTO archive_stats (scope, key, prints) "
+        f"SELECT 'filament', trim(value), {sign} FROM {_filament_types(row)} "
+        f"WHERE {row}.filament_type IS NOT NULL AND trim(value) != '' "
+        f"ON CONFLICT(scope, key) DO UPDATE SET prints = prints + excluded.prints;"
+    )
+    return "\n".join(statements)
+
+
+def _triggers() -> dict[str, str]:
+    return {
+        "archive_stats_insert": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_stats_insert AFTER INSERT ON print_archives BEGIN\n"
+            f"{_apply('new', 1)}\nEND"
+        ),
+        "archive_stats_delete": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_stats_delete AFTER DELETE ON print_archives BEGIN\n"
+            f"{_apply('old', -1)}\nEND"
+        ),
+        "archive_stats_update": (
+            f"CREATE TRIGGER IF NOT EXISTS archive_stats_update "
+            f"AFTER UPDATE OF {', '.join(TRACKED_COLUMNS)} ON print_archives BEGIN\n"
+            f"{_apply('old', -1)}\n{_apply('new', 1)}\nEND"
+        ),
+    }
+
+
+async def rebuild_archive_stats(db: AsyncConnection | AsyncSession) -> None:
+    """Recompute every statistics bucket from the archives."""
+    values = _contributions("a")
+    columns = ", ".join(STAT_COLUMNS)
+    sums = ", ".join(f"sum({values[column]})" for column in STAT_COLUMNS)
+
+    await db.execute(text("DELETE FROM archive_stats"))
+    for scope, key in _bucket_keys("a").items():
+        await db.execute(
+            text(
+                f"INSERT INTO archive_stats (scope, key, {columns}) "
+                f"SELECT '{scope}', {key}, {sums} FROM print_archives AS a GROUP BY {key}"
+            )
+        )
+    await db.execute(
+        text(
+            f"INSERT INTO archive_stats (scope, key, prints) "
+            f"SELECT 'filament', trim(value), count(*) FROM print_archives AS a, {_filament_types('a')} "
+            f"WHERE a.filament_type IS NOT NULL AND trim(value) != '' GROUP BY trim(value)"
+        )
+    )
+
+
+async def install_archive_stats(conn: AsyncConnection) -> None:
+    """Create the triggers maintaining archive_stats, filling the table on first install."""
+    for name, ddl in _triggers().items():
+        try:
+            await conn.execute(text(ddl))
+        except OperationalError as e:
+            logger.error("Failed to create trigger %s: %s", name, e)
+
+    # Archives predating the table haven't been counted yet
+    has_stats = (await conn.execute(text("SELECT 1 FROM archive_stats LIMIT 1"))).first()
+    has_archives = (await conn.execute(text("SELECT 1 FROM print_archives LIMIT 1"))).first()
+    if has_archives and not has_stats:
+        await rebuild_archive_stats(conn)
+
+
+async def get_stats_buckets(db: AsyncSession, scope: str) -> list[ArchiveStatsBucket]:
+    """Get all non-empty buckets of one scope."""
+    result = await db.execute(
+        select(ArchiveStatsBucket)
+        .where(ArchiveStatsBucket.scope == scope, ArchiveStatsBucket.prints > 0)
+        .execution_options(populate_existing=True)  # Triggers update rows behind the session's back
+    )
+    return list(result.scalars().all())
+
+
+async def get_stats_totals(db: AsyncSession) -> ArchiveStatsBucket:
+    """Get the totals over all archives (all zero if there are none)."""
+    result = await db.execute(
+        select(ArchiveStatsBucket).where(ArchiveStatsBucket.scope == "global").execution_options(populate_existing=True)
+    )
+    totals = result.scalar_one_or_none()
+    if totals is None:
+        totals = ArchiveStatsBucket(scope="global", key="", **dict.fromkeys(STAT_COLUMNS, 0))
+    return totals
+
+
+async def get_archive_count(db: AsyncSession, printer_id: int | None = None) -> int:
+    """Count all archives, or those of one printer, from the maintained buckets."""
+    key = "" if printer_id is None else str(printer_id)
+    result = await db.execute(
+        select(ArchiveStatsBucket.prints).where(
+            ArchiveStatsBucket.scope == ("global" if printer_id is None else "printer"), ArchiveStatsBucket.key == key
+        )
+    )
+    return result.scalar_one_or_none() or 0
@@ -0,0 +1,290 @@
+"""Streaming full and incremental backups.
+
+A backup is a ZIP with the database (bambuddy.db), the data directories and
+a manifest (backup-manifest.json). The ZIP is written straight to the
+response: files are read from their original location chunk by chunk, and
+the database is snapshotted with SQLite's online backup API. Nothing is
+copied to a staging directory or buffered in memory. Media that is already
+compressed (3MF, MP4, JPEG, ...) is stored as-is instead of being deflated
+again.
+
+The manifest lists the size, mtime and SHA256 of every data file. The
+manifest of the last backup that streamed completely is kept in the data
+directory. An incremental backup contains only the files that changed since
+then, plus the list of deleted files. Restoring it on top of its base backup
+(and any incremental backups in between) reproduces the current state. The
+database is always included in full.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+
+from backend.app.core.config import settings
+from backend.app.services.blob_store import MIGRATED_SETTING
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "backup-manifest.json"
+DATABASE_NAME = "bambuddy.db"
+BACKUP_CHUNK_SIZE = 1024 * 1024
+
+# Formats that are already compressed; deflating them again costs CPU for nothing
+STORED_EXTENSIONS = {
+    ".3mf",
+    ".zip",
+    ".gz",
+    ".mp4",
+    ".avi",
+    ".mkv",
+    ".mov",
+    ".webm",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".gif",
+    ".webp",
+}
+
+
+def backup_dirs() -> list[tuple[str, Path]]:
+    """Data directories included in backups, with their name inside the ZIP."""
+    base_dir = settings.base_dir
+    return [
+        ("archive", base_dir / "archive"),
+        ("virtual_printer", base_dir / "virtual_printer"),
+        ("plate_calibration", settings.plate_calibration_dir),
+        ("icons", base_dir / "icons"),
+        ("projects", base_dir / "projects"),
+    ]
+
+
+def database_path() -> Path:
+    return Path(settings.database_url.replace("sqlite+aiosqlite:///", ""))
+
+
+def last_manifest_path() -> Path:
+    return settings.base_dir / MANIFEST_NAME
+
+
+def load_last_manifest() -> dict | None:
+    """Manifest of the last completed backup (None if there is none)."""
+    try:
+        return json.loads(last_manifest_path().read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _save_last_manifest(manifest: dict) -> None:
+    path = last_manifest_path()
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, path)
+
+
+def _scan_files() -> Iterator[tuple[str, Path, os.stat_result]]:
+    """Yield (name in ZIP, path, stat) for every file in the backup directories."""
+    for name, src_dir in backup_dirs():
+        if not src_dir.exists():
+            continue
+        for root, dirs, files in os.walk(src_dir):
+            dirs.sort()
+            for filename in sorted(files):
+                path = Path(root) / filename
+                try:
+                    stat = path.stat()
+                except OSError as e:
+                    logger.warning("Skipping %s in backup: %s", path, e)
+                    continue
+                yield f"{name}/{path.relative_to(src_dir).as_posix()}", path, stat
+
+
+def _hash_file(path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(BACKUP_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _unchanged(path: Path, stat: os.stat_result, previous: dict | None) -> bool:
+    """Whether a file still matches its entry in the previous manifest."""
+    if previous is None or previous["size"] != stat.st_size:
+        return False
+    if previous["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    # Touched but possibly unchanged (e.g. copied back with a new mtime): compare content
+    try:
+        return _hash_file(path) == previous["sha256"]
+    except OSError:
+        return False
+
+
+def _compress_type(arcname: str) -> int:
+    lower = arcname.lower()
+    if any(lower.endswith(ext) for ext in STORED_EXTENSIONS):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class _StreamWriter(io.RawIOBase):
+    """Write-only, non-seekable file collecting the ZIP bytes until they are taken."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _snapshot_database(dest: Path) -> None:
+    """Copy a consistent snapshot of the live database with the online backup API."""
+    src = sqlite3.connect(database_path())
+    try:
+        dst = sqlite3.connect(dest)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
+
+def iter_backup(incremental: bool = False) -> Iterator[bytes]:
+    """Generate a backup ZIP chunk by chunk.
+
+    This is a blocking generator (file and database I/O); iterate it in a
+    worker thread, as StreamingResponse does for sync iterators. The manifest
+    is remembered for incremental backups only once the ZIP is complete.
+    """
+    previous = load_last_manifest() if incremental else None
+    if incremental and previous is None:
+        logger.info("No previous backup manifest, creating a full backup")
+    previous_files = previous["files"] if previous else {}
+
+    created_at = datetime.now()
+    manifest = {
+        "version": 1,
+        "id": created_at.strftime("%Y%m%d-%H%M%S"),
+        "created_at": created_at.isoformat(),
+        "incremental": previous is not None,
+        "base": previous["id"] if previous else None,
+        "files": {},
+        "deleted": [],
+    }
+
+    out = _StreamWriter()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        # 1. Database snapshot (always complete)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            snapshot = Path(temp_dir) / DATABASE_NAME
+            _snapshot_database(snapshot)
+            yield from _write_file(zf, out, DATABASE_NAME, snapshot, snapshot.stat())
+
+        # 2. Data files, read in place
+        for arcname, path, stat in _scan_files():
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            previous_entry = previous_files.get(arcname)
+            if previous and _unchanged(path, stat, previous_entry):
+                manifest["files"][arcname] = {**entry, "sha256": previous_entry["sha256"]}
+                continue
+            try:
+                sha256 = yield from _write_file(zf, out, arcname, path, stat)
+            except OSError as e:
+                # Some files may have restricted permissions (e.g., SSL keys)
+                logger.warning("Could not back up %s: %s", path, e)
+                continue
+            manifest["files"][arcname] = {**entry, "sha256": sha256}
+
+        manifest["deleted"] = sorted(set(previous_files) - set(manifest["files"]))
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=1))
+    yield out.take()
+
+    _save_last_manifest(manifest)
+    logger.info(
+        "Backup %s complete (%s, %s files)",
+        manifest["id"],
+        f"incremental since {manifest['base']}" if manifest["incremental"] else "full",
+        len(manifest["files"]),
+    )
+
+
+def _write_file(zf: zipfile.ZipFile, out: _StreamWriter, arcname: str, path: Path, stat: os.stat_result):
+    """Add one file to the ZIP, yielding output as it is produced. Returns the file's SHA256."""
+    date_time = max(datetime.fromtimestamp(stat.st_mtime).timetuple()[:6], (1980, 1, 1, 0, 0, 0))  # ZIP epoch
+    zinfo = zipfile.ZipInfo(arcname, date_time=date_time)
+    zinfo.compress_type = _compress_type(arcname)
+    zinfo.file_size = stat.st_size
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as src, zf.open(zinfo, "w", force_zip64=True) as dest:
+        while chunk := src.read(BACKUP_CHUNK_SIZE):
+            sha256.update(chunk)
+            dest.write(chunk)
+            yield out.take()
+    yield out.take()
+    return sha256.hexdigest()
+
+
+def read_backup_manifest(zf: zipfile.ZipFile) -> dict | None:
+    """Manifest of a backup ZIP (None for backups made before manifests existed)."""
+    try:
+        return json.loads(zf.read(MANIFEST_NAME))
+    except (KeyError, ValueError):
+        return None
+
+
+def restore_file(src: str | Path, dest: str | Path) -> str:
+    """Copy a restored file into place (copy_function for shutil.copytree).
+
+    The file is written next to the target and swapped in, so a target that is
+    a blob store link is replaced instead of rewritten: the blob and the other
+    files linked to it keep their content.
+    """
+    dest = Path(dest)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return str(dest)
+
+
+def reset_blob_store_migration(db_file: Path) -> None:
+    """Make the blob store take in the files of a restored database again on startup.
+
+    Restored files are plain copies, so duplicates are no longer shared.
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        conn.execute("DELETE FROM settings WHERE key = ?", (MIGRATED_SETTING,))
+        conn.commit()
+    except sqlite3.Error as e:
+        logger.warning("Could not reset blob store migration in restored database: %s", e)
+    finally:
+        conn.close()
@@ -8,6 +8,8 @@ but with qos=1 they respond instantly.
 """
 
 import asyncio
+import copy
+import itertools
 import json
 import logging
 import ssl
@@ -20,6 +22,8 @@ from datetime import datetime
 
 import paho.mqtt.client as mqtt
 
+from backend.app.services.mqtt_ingest import mqtt_ingest
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,6 +96,85 @@ class PrintOptions:
     filament_tangle_detect: bool = False
 
 
+# PrinterState sections used for change tracking. Consumers ask which sections
+# changed since the version they last saw instead of diffing the whole state,
+# so e.g. a temperature tick doesn't force AMS trays to be rebuilt.
+SECTION_STATUS = "status"
+SECTION_PROGRESS = "progress"
+SECTION_TEMPERATURES = "temperatures"
+SECTION_FANS = "fans"
+SECTION_AMS = "ams"
+SECTION_NOZZLES = "nozzles"
+SECTION_PRINT_OPTIONS = "print_options"
+SECTION_HMS = "hms"
+SECTION_KPROFILES = "kprofiles"
+
+STATE_SECTIONS = frozenset(
+    {
+        SECTION_STATUS,
+        SECTION_PROGRESS,
+        SECTION_TEMPERATURES,
+        SECTION_FANS,
+        SECTION_AMS,
+        SECTION_NOZZLES,
+        SECTION_PRINT_OPTIONS,
+        SECTION_HMS,
+        SECTION_KPROFILES,
+    }
+)
+
+# Section each PrinterState field belongs to; unlisted fields belong to SECTION_STATUS
+_FIELD_SECTIONS = {
+    "progress": SECTION_PROGRESS,
+    "remaining_time": SECTION_PROGRESS,
+    "layer_num": SECTION_PROGRESS,
+    "total_layers": SECTION_PROGRESS,
+    "temperatures": SECTION_TEMPERATURES,
+    "cooling_fan_speed": SECTION_FANS,
+    "big_fan1_speed": SECTION_FANS,
+    "big_fan2_speed": SECTION_FANS,
+    "heatbreak_fan_speed": SECTION_FANS,
+    "tray_now": SECTION_AMS,
+    "last_loaded_tray": SECTION_AMS,
+    "ams_status": SECTION_AMS,
+    "ams_status_main": SECTION_AMS,
+    "ams_status_sub": SECTION_AMS,
+    "ams_mapping": SECTION_AMS,
+    "ams_extruder_map": SECTION_AMS,
+    "h2d_extruder_snow": SECTION_AMS,
+    "nozzles": SECTION_NOZZLES,
+    "nozzle_rack": SECTION_NOZZLES,
+    "active_extruder": SECTION_NOZZLES,
+    "print_options": SECTION_PRINT_OPTIONS,
+    "hms_errors": SECTION_HMS,
+    "kprofiles": SECTION_KPROFILES,
+}
+
+# Fields that change without affecting what consumers show. raw_data is replaced on
+# every message; its AMS/vt_tray parts are marked explicitly by the MQTT client.
+_UNTRACKED_FIELDS = frozenset({"raw_data", "last_ams_update", "pending_tray_target", "version"})
+
+# Containers the MQTT client mutates in place, which attribute assignment can't
+# see; they are compared against a copy of their last committed value instead
+_INPLACE_FIELDS = (
+    "temperatures",
+    "nozzles",
+    "print_options",
+    "hms_errors",
+    "h2d_extruder_snow",
+    "nozzle_rack",
+    "printable_objects",
+    "skipped_objects",
+    "stg",
+)
+
+_MISSING = object()
+
+# Versions are drawn from one counter shared by all states, so a consumer's last
+# seen version stays comparable when a reconnect replaces a printer's state object
+_state_versions = itertools.count(1)
+
+
 @dataclass
 class PrinterState:
     connected: bool = False
@@ -165,6 +248,61 @@ class PrinterState:
     heatbreak_fan_speed: int | None = None  # Hotend heatbreak fan
     # Firmware version info (from info.module[name="ota"].sw_ver)
     firmware_version: str | None = None
+    # Change tracking: bumped by commit() whenever any section changed
+    version: int = field(default=0, init=False, compare=False, repr=False)
+    _dirty: set = field(default_factory=set, init=False, compare=False, repr=False)
+    _section_versions: dict = field(default_factory=dict, init=False, compare=False, repr=False)
+    _committed: dict = field(default_factory=dict, init=False, compare=False, repr=False)
+    _commit_lock: threading.Lock = field(default_factory=threading.Lock, init=False, compare=False, repr=False)
+
+    def __setattr__(self, name, value):
+        dirty = self.__dict__.get("_dirty")
+        if dirty is not None and not name.startswith("_") and name not in _UNTRACKED_FIELDS:
+            section = _FIELD_SECTIONS.get(name, SECTION_STATUS)
+            if section not in dirty:
+                old = self.__dict__.get(name, _MISSING)
+                if old is not value and old != value:
+                    dirty.add(section)
+        object.__setattr__(self, name, value)
+
+    def mark_dirty(self, *sections: str) -> None:
+        """Record that sections changed through in-place updates (e.g. raw AMS data)."""
+        self._dirty.update(sections)
+
+    def commit(self) -> int:
+        """Fold pending changes into a new state version and return the current version."""
+        with self._commit_lock:
+            for name in _INPLACE_FIELDS:
+                current = getattr(self, name)
+                if current != self._committed.get(name, _MISSING):
+                    self._dirty.add(_FIELD_SECTIONS.get(name, SECTION_STATUS))
+                    try:
+                        self._committed[name] = copy.deepcopy(current)
+                    except RuntimeError:
+                        # Mutated by the MQTT thread mid-copy; compare again next commit
+                        self._committed.pop(name, None)
+
+            pending = set(self._dirty)
+            if pending:
+                self._dirty -= pending
+                self.version = next(_state_versions)
+                for section in pending:
+                    self._section_versions[section] = self.version
+            return self.version
+
+    def section_version(self, section: str) -> int:
+        """Version at which a section last changed (0 if never committed)."""
+        return self._section_versions.get(section, 0)
+
+    def changes_since(self, version: int) -> tuple[int, set[str]]:
+        """Return the current version and the sections changed after ``version``.
+
+        Each consumer keeps the version it last handled; passing 0 returns every section.
+        """
+        current = self.commit()
+        if version <= 0:
+            return current, set(STATE_SECTIONS)
+        return current, {section for section, changed in self._section_versions.items() if changed > version}
 
 
 # Stage name mapping from BambuStudio DeviceManager.cpp
@@ -430,34 +568,35 @@ class BambuMQTTClient:
             self._disconnection_event.set()
 
     def _on_message(self, client, userdata, msg):
-        try:
-            payload = json.loads(msg.payload.decode())
-            # Track last message time - receiving a message proves we're connected
-            self._last_message_time = time.time()
-            self.state.connected = True
-
-            # Intercept request-topic messages (print commands from slicer/Bambuddy)
-            if msg.topic == self.topic_publish:
-                self._handle_request_message(payload)
-                return
+        # Runs on paho's network thread: keep it cheap and hand decoding and state
+        # processing to the ingestion pipeline so keepalives are never delayed
+        # Track last message time - receiving a message proves we're connected
+        self._last_message_time = time.time()
+        self.state.connected = True
+        mqtt_ingest.submit(self, msg.topic, msg.payload)
+
+    def _handle_message(self, topic: str, payload: dict):
+        """Handle a decoded MQTT message. Called on an ingestion worker thread."""
+        # Intercept request-topic messages (print commands from slicer/Bambuddy)
+        if topic == self.topic_publish:
+            self._handle_request_message(payload)
+            return
 
-            # TEMP: Dump full payload once to find extruder state field
-            if not hasattr(self, "_payload_dumped"):
-                self._payload_dumped = True
-                logger.debug("[%s] FULL MQTT PAYLOAD DUMP:\n%s", self.serial_number, json.dumps(payload, indent=2))
-            # Log message if logging is enabled
-            if self._logging_enabled:
-                self._message_log.append(
-                    MQTTLogEntry(
-                        timestamp=datetime.now().isoformat(),
-                        topic=msg.topic,
-                        direction="in",
-                        payload=payload,
-                    )
+        # TEMP: Dump full payload once to find extruder state field
+        if not hasattr(self, "_payload_dumped"):
+            self._payload_dumped = True
+            logger.debug("[%s] FULL MQTT PAYLOAD DUMP:\n%s", self.serial_number, json.dumps(payload, indent=2))
+        # Log message if logging is enabled
+        if self._logging_enabled:
+            self._message_log.append(
+                MQTTLogEntry(
+                    timestamp=datetime.now().isoformat(),
+                    topic=topic,
+                    direction="in",
+                    payload=payload,
                 )
-            self._process_message(payload)
-        except json.JSONDecodeError:
-            pass  # Ignore non-JSON MQTT messages (e.g. binary or malformed payloads)
+            )
+        self._process_message(payload)
 
     def _handle_request_message(self, data: dict) -> None:
         """Intercept print commands on the request topic to capture ams_mapping."""
@@ -548,6 +687,8 @@ class BambuMQTTClient:
                     # Dual-nozzle (H2D) has 2 slots: id=254 (Ext-L) and id=255 (Ext-R).
                     if len(vir_slot) == 1 and str(vir_slot[0].get("id", "")) == "255":
                         vir_slot[0]["id"] = "254"
+                    if self.state.raw_data.get("vt_tray") != vir_slot:
+                        self.state.mark_dirty(SECTION_AMS)
                     self.state.raw_data["vt_tray"] = vir_slot
 
             # Handle vt_tray (virtual tray / external spool) data
@@ -563,6 +704,8 @@ class BambuMQTTClient:
                 else:
                     if isinstance(vt_tray, dict):
                         vt_tray = [vt_tray]
+                    if existing != vt_tray:
+                        self.state.mark_dirty(SECTION_AMS)
                     self.state.raw_data["vt_tray"] = vt_tray
 
             # Parse ams_status directly from print data (NOT from print.ams)
@@ -1142,6 +1285,7 @@ class BambuMQTTClient:
                 logger.debug("[%s] Could not parse tray_exist_bits: %s", self.serial_number, e)
 
         self.state.raw_data["ams"] = merged_ams
+        self.state.mark_dirty(SECTION_AMS)
 
         # Update timestamp for RFID refresh detection (frontend can detect "new data arrived")
         self.state.last_ams_update = time.time()
@@ -2167,6 +2311,7 @@ class BambuMQTTClient:
         self._client.on_disconnect = self._on_disconnect
         self._client.on_subscribe = self._on_subscribe
         self._client.on_message = self._on_message
+        mqtt_ingest.register(self, self._handle_message, on_overflow=self._request_push_all, label=self.serial_number)
 
         # TLS setup - Bambu uses self-signed certs
         ssl_context = ssl.create_default_context()
@@ -2523,6 +2668,7 @@ class BambuMQTTClient:
             self._client.loop_stop()
             self._client = None
             self.state.connected = False
+        mqtt_ingest.unregister(self)
 
     def send_command(self, command: dict):
         """Send a command to the printer."""
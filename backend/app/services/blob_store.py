@@ -0,0 +1,265 @@
+"""Content-addressed storage for archive, library and project attachment files.
+
+Each distinct file content is stored once, as blobs/<aa>/<bb>/<sha256>. The
+paths recorded on archives, library files and attachments are hard links to
+their blob, so everything that reads those paths keeps working unchanged and
+the filesystem's link count is the reference count: a blob with a single link
+is referenced by nothing but the store and is removed by release_blob() or
+collect_garbage().
+
+Where a hard link can't be made (e.g. the blob store is on another filesystem)
+a reflink clone is tried, then a plain copy. Stored files are never rewritten
+in place (metadata edits write a new file and move it over the old path), so
+editing one linked file never changes the others.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import select
+
+from backend.app.core.config import settings
+from backend.app.core.database import async_session
+from backend.app.models.archive import PrintArchive
+from backend.app.models.library import LibraryFile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+COPY_BUFFER_SIZE = 1024 * 1024
+TEMP_MAX_AGE_SECONDS = 3600
+MIGRATED_SETTING = "blob_store_migrated"
+
+# Linux FICLONE ioctl (reflink copy on btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+# Held while a blob's link count is checked and changed, so a blob is never
+# removed between being found and being linked to
+_lock = threading.Lock()
+
+
+def blob_path(content_hash: str) -> Path:
+    """Get the store path for a SHA256 content hash."""
+    return settings.blob_dir / content_hash[:2] / content_hash[2:4] / content_hash
+
+
+def copy_and_hash(source: Path, dest: Path) -> str:
+    """Copy a file like shutil.copy2 and return its SHA256, reading the source once."""
+    sha256 = hashlib.sha256()
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        while chunk := src.read(COPY_BUFFER_SIZE):
+            sha256.update(chunk)
+            dst.write(chunk)
+    shutil.copystat(source, dest)
+    return sha256.hexdigest()
+
+
+def hash_file(file_path: Path) -> str:
+    """Compute the SHA256 of a file."""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(COPY_BUFFER_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _same_file(a: Path, b: Path) -> bool:
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return False
+
+
+def _temp_path() -> Path:
+    temp_dir = settings.blob_dir / "tmp"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    return temp_dir / uuid.uuid4().hex
+
+
+def _clone(source: Path, dest: Path) -> None:
+    """Copy a file, sharing its data blocks through a reflink where the filesystem supports it."""
+    if fcntl is not None:
+        try:
+            with open(source, "rb") as src, open(dest, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            shutil.copystat(source, dest)
+            return
+        except OSError:
+            pass  # No reflink support, fall back to copying
+    shutil.copy2(source, dest)
+
+
+def _link(blob: Path, dest: Path) -> None:
+    """Make dest a link to blob, atomically replacing whatever dest was."""
+    if _same_file(blob, dest):
+        return
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    temp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}")
+    try:
+        os.link(blob, temp)
+    except OSError:
+        _clone(blob, temp)
+    os.replace(temp, dest)
+
+
+def store_file(source: Path, dest: Path) -> str:
+    """Store the content of source and create dest as a link to it.
+
+    A source that is itself a link into the store (e.g. a library file being
+    archived) is only read to find its hash; nothing is copied. Returns the
+    SHA256 of the content.
+    """
+    if source.stat().st_nlink > 1:
+        content_hash = hash_file(source)
+        with _lock:
+            blob = blob_path(content_hash)
+            if _same_file(source, blob):
+                _link(blob, dest)
+                return content_hash
+
+    temp = _temp_path()
+    try:
+        content_hash = copy_and_hash(source, temp)
+        with _lock:
+            blob = blob_path(content_hash)
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp, blob)
+            _link(blob, dest)
+    finally:
+        temp.unlink(missing_ok=True)
+    return content_hash
+
+
+def intern_file(file_path: Path, content_hash: str | None = None) -> str:
+    """Move an existing file into the store, leaving a link in its place.
+
+    Used for files written outside store_file (uploads) and to collapse
+    duplicates in existing data. content_hash is only trusted if the file is
+    already linked to that blob; otherwise the file is hashed.
+    Returns the SHA256 of the content.
+    """
+    if content_hash and _same_file(file_path, blob_path(content_hash)):
+        return content_hash
+
+    content_hash = hash_file(file_path)
+    with _lock:
+        blob = blob_path(content_hash)
+        if blob.exists():
+            _link(blob, file_path)
+        else:
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(file_path, blob)
+            except OSError:
+                pass  # Can't link on this filesystem; keep the file as is
+    return content_hash
+
+
+def release_blob(content_hash: str | None) -> None:
+    """Remove a blob once nothing links to it anymore. Call after deleting a stored file."""
+    if not content_hash:
+        return
+    with _lock:
+        blob = blob_path(content_hash)
+        try:
+            if blob.stat().st_nlink <= 1:
+                blob.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def collect_garbage() -> int:
+    """Remove blobs nothing links to and leftover temp files.
+
+    Returns the number of files removed.
+    """
+    if not settings.blob_dir.exists():
+        return 0
+
+    removed = 0
+    temp_dir = settings.blob_dir / "tmp"
+    cutoff = time.time() - TEMP_MAX_AGE_SECONDS
+    for path in settings.blob_dir.glob("*/*/*"):
+        with _lock:
+            try:
+                if path.is_file() and path.stat().st_nlink <= 1:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+    if temp_dir.exists():
+        for path in temp_dir.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+    return removed
+
+
+def _deduplicate(entries: list[tuple[Path, str | None]]) -> tuple[int, int]:
+    files = 0
+    saved = 0
+    for file_path, content_hash in entries:
+        try:
+            if not file_path.is_file():
+                continue
+            size = file_path.stat().st_size
+            was_linked = file_path.stat().st_nlink > 1
+            intern_file(file_path, content_hash)
+            files += 1
+            if not was_linked and file_path.stat().st_nlink > 2:
+                saved += size
+        except OSError as e:
+            logger.warning("Could not move %s into the blob store: %s", file_path, e)
+    return files, saved
+
+
+async def deduplicate_existing_files() -> None:
+    """Move files stored before the blob store existed into it, then collect garbage.
+
+    Existing archives, library files and project attachments are hashed once
+    and duplicates are collapsed into links to a single blob. Runs once, and
+    again after a backup restore, whose files are plain copies; the garbage
+    collection runs on every startup.
+    """
+    from backend.app.api.routes.settings import get_setting, set_setting
+
+    try:
+        async with async_session() as db:
+            if await get_setting(db, MIGRATED_SETTING) != "true":
+                entries: list[tuple[Path, str | None]] = []
+                result = await db.execute(select(PrintArchive.file_path, PrintArchive.content_hash))
+                for file_path, content_hash in result.all():
+                    if file_path:
+                        entries.append((settings.base_dir / file_path, content_hash))
+                result = await db.execute(select(LibraryFile.file_path, LibraryFile.file_hash))
+                for file_path, file_hash in result.all():
+                    if file_path:
+                        path = Path(file_path)
+                        entries.append((path if path.is_absolute() else settings.base_dir / path, file_hash))
+                entries.extend((path, None) for path in settings.archive_dir.glob("projects/*/attachments/*"))
+
+                files, saved = await asyncio.to_thread(_deduplicate, entries)
+                logger.info("Moved %s files into the blob store, %.1f MB saved", files, saved / (1024 * 1024))
+                await set_setting(db, MIGRATED_SETTING, "true")
+                await db.commit()
+
+        removed = await asyncio.to_thread(collect_garbage)
+        if removed:
+            logger.info("Removed %s unreferenced files from the blob store", removed)
+    except Exception as e:
+        logger.error("Blob store maintenance failed: %s", e)
@@ -0,0 +1,518 @@
+"""Shared per-printer camera stream hubs.
+
+A hub owns a single upstream frame source for a printer (ffmpeg/RTSP or the
+chamber image socket) and fans the parsed JPEG frames out to any number of
+viewers. Each viewer gets a small bounded queue; when a viewer falls behind,
+the oldest queued frame is dropped so it always catches up to the newest image
+instead of lagging further and further behind.
+
+The upstream is started by the first subscriber and shut down shortly after the
+last subscriber leaves, so a wall of dashboards watching the same printer costs
+one ffmpeg process (and one RTSP session on the printer) instead of one per tab.
+
+Viewers are grouped into resolution tiers (full, half, thumbnail) based on the
+largest width they can use. Each frame is downscaled at most once per tier, no
+matter how many viewers share that tier, and thumbnail viewers are limited to
+one frame per second.
+"""
+
+import asyncio
+import io
+import logging
+import time
+from collections.abc import AsyncIterator, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+# Frames buffered per viewer before the oldest is dropped
+DEFAULT_QUEUE_SIZE = 2
+
+# Seconds to keep the upstream running after the last viewer leaves, so page
+# reloads and reconnects don't tear down and re-open the printer connection
+DEFAULT_IDLE_TIMEOUT = 5.0
+
+# A frame source is called with the target fps and yields raw JPEG frames
+FrameSource = Callable[[int], AsyncIterator[bytes]]
+
+# Resolution tiers
+TIER_FULL = "full"
+TIER_HALF = "half"
+TIER_THUMBNAIL = "thumbnail"
+
+# Thumbnail tier output width and frame rate (grid tiles, previews)
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_FPS = 1
+
+# JPEG quality used when re-encoding downscaled frames
+DOWNSCALE_QUALITY = 75
+
+# Start-of-frame markers (baseline, progressive, lossless, ...); 0xC4, 0xC8 and
+# 0xCC share the range but are other segment types
+SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def select_tier(max_width: int | None, source_width: int | None) -> str:
+    """Pick the largest tier whose output fits within a viewer's max_width."""
+    if not max_width or not source_width or max_width >= source_width:
+        return TIER_FULL
+    if max_width >= source_width // 2:
+        return TIER_HALF
+    return TIER_THUMBNAIL
+
+
+def tier_width(tier: str, source_width: int) -> int:
+    """Return the output width for a tier."""
+    if tier == TIER_HALF:
+        return source_width // 2
+    if tier == TIER_THUMBNAIL:
+        return min(THUMBNAIL_WIDTH, source_width)
+    return source_width
+
+
+def get_jpeg_width(frame: bytes) -> int | None:
+    """Read the width from a JPEG's start-of-frame header without decoding the image.
+
+    Walks the marker segments up to the first SOF, so it is cheap enough to
+    run on the event loop.
+    """
+    if frame[:2] != b"\xff\xd8":
+        return None
+    pos = 2
+    while pos + 4 <= len(frame):
+        if frame[pos] != 0xFF:
+            return None
+        marker = frame[pos + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            # Markers without a length
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image or start of scan data before any frame header
+            return None
+        length = int.from_bytes(frame[pos + 2 : pos + 4], "big")
+        if marker in SOF_MARKERS:
+            # Segment: length (2), sample precision (1), height (2), width (2)
+            width = int.from_bytes(frame[pos + 7 : pos + 9], "big") if pos + 9 <= len(frame) else 0
+            return width or None
+        pos += 2 + length
+    return None
+
+
+def downscale_jpeg(frame: bytes, width: int, quality: int = DOWNSCALE_QUALITY) -> bytes:
+    """Downscale a JPEG frame to the given width, keeping the aspect ratio.
+
+    Uses the JPEG decoder's draft mode so most of the scaling happens during
+    decoding (DCT scaling), which is far cheaper than a full decode + resize.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(frame)) as img:
+        if img.width <= width:
+            return frame
+        height = max(1, round(img.height * width / img.width))
+        img.draft("RGB", (width, height))
+        scaled = img.convert("RGB")
+        if scaled.width > width:
+            scaled = scaled.resize((width, height), Image.Resampling.BILINEAR)
+        out = io.BytesIO()
+        scaled.save(out, "JPEG", quality=quality)
+        return out.getvalue()
+
+
+class CameraStreamError(Exception):
+    """Raised by a frame source when the upstream camera cannot be read."""
+
+
+class FrameSubscriber:
+    """A single viewer attached to a camera hub.
+
+    The queue is intentionally tiny: a client whose socket can't keep up stops
+    draining it, and new frames then replace the oldest one instead of piling
+    up, so the client skips frames rather than falling behind.
+    """
+
+    def __init__(
+        self,
+        fps: int,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_width: int | None = None,
+        viewer_id: str | None = None,
+    ):
+        self.fps = fps
+        self.max_width = max_width
+        self.viewer_id = viewer_id
+        self.tier: str | None = None
+        self.frames_received = 0
+        self.frames_dropped = 0
+        self._queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=queue_size)
+        self._frame_interval = 1.0 / fps if fps > 0 else 0.0
+        self._last_accepted = 0.0
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _put_latest(self, item: bytes | None) -> None:
+        """Queue an item, discarding the oldest queued frame if the queue is full."""
+        if self._queue.full():
+            try:
+                self._queue.get_nowait()
+                self.frames_dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self._queue.put_nowait(item)
+
+    def wants_frame(self, now: float | None = None) -> bool:
+        """Check the viewer's fps limit, claiming the frame slot if it is due."""
+        if self._closed:
+            return False
+        if now is None:
+            now = time.monotonic()
+        interval = self._frame_interval
+        if self.tier == TIER_THUMBNAIL:
+            interval = max(interval, 1.0 / THUMBNAIL_FPS)
+        if interval and now - self._last_accepted < interval:
+            return False
+        self._last_accepted = now
+        return True
+
+    def push(self, frame: bytes) -> None:
+        """Queue a frame without checking the fps limit."""
+        if not self._closed:
+            self._put_latest(frame)
+
+    def offer(self, frame: bytes) -> bool:
+        """Offer a frame to this viewer, honouring its fps limit.
+
+        Returns True if the frame was queued.
+        """
+        if not self.wants_frame():
+            return False
+        self._put_latest(frame)
+        return True
+
+    def close(self) -> None:
+        """Signal end-of-stream to the viewer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._put_latest(None)
+
+    async def frames(self) -> AsyncIterator[bytes]:
+        """Yield frames until the hub closes this subscriber."""
+        while True:
+            frame = await self._queue.get()
+            if frame is None:
+                return
+            self.frames_received += 1
+            yield frame
+
+
+class CameraStreamHub:
+    """Owns one upstream camera connection for a printer and fans frames out."""
+
+    def __init__(
+        self,
+        printer_id: int,
+        source: FrameSource,
+        fps: int,
+        source_key: Hashable = None,
+        on_frame: Callable[[int, bytes], None] | None = None,
+        on_close: Callable[["CameraStreamHub"], None] | None = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ):
+        self.printer_id = printer_id
+        self.source_key = source_key
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.queue_size = queue_size
+        self.last_frame: bytes | None = None
+        self.last_frame_time: float | None = None
+        self.source_width: int | None = None
+        self.started_at: float | None = None
+        self.error: str | None = None
+        self._source = source
+        self._on_frame = on_frame
+        self._on_close = on_close
+        self._subscribers: set[FrameSubscriber] = set()
+        self._task: asyncio.Task | None = None
+        self._idle_task: asyncio.Task | None = None
+        self._closed = False
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, fps: int, max_width: int | None = None, viewer_id: str | None = None) -> FrameSubscriber:
+        """Attach a viewer, starting (or speeding up) the upstream as needed.
+
+        Args:
+            fps: Maximum frames per second to deliver to this viewer
+            max_width: Largest frame width the viewer can use (None = full resolution)
+            viewer_id: Client-chosen ID the viewer can later be detached by
+        """
+        if self._closed:
+            raise RuntimeError(f"Camera hub for printer {self.printer_id} is closed")
+
+        self._cancel_idle_shutdown()
+        subscriber = FrameSubscriber(fps, self.queue_size, max_width=max_width, viewer_id=viewer_id)
+        self._subscribers.add(subscriber)
+
+        previous = None
+        if fps > self.fps:
+            # Upstream runs at the fastest rate any viewer asked for
+            logger.info("Camera hub %s: raising upstream fps %s -> %s", self.printer_id, self.fps, fps)
+            self.fps = fps
+            if self.running:
+                previous, self._task = self._task, None
+
+        if not self.running:
+            self._start(previous)
+        elif self.last_frame is not None and self._tier_for(subscriber) == TIER_FULL:
+            # Give late full-resolution joiners something to show immediately
+            subscriber.offer(self.last_frame)
+
+        logger.debug(
+            "Camera hub %s: subscriber added (%s active, fps=%s, max_width=%s)",
+            self.printer_id,
+            len(self._subscribers),
+            fps,
+            max_width,
+        )
+        return subscriber
+
+    def unsubscribe(self, subscriber: FrameSubscriber) -> None:
+        """Detach a viewer, slowing the upstream to the fastest remaining one.
+
+        The upstream idles down once nobody is watching.
+        """
+        if subscriber not in self._subscribers:
+            subscriber.close()
+            return
+        self._subscribers.discard(subscriber)
+        subscriber.close()
+        if subscriber.frames_dropped:
+            logger.debug(
+                "Camera hub %s: subscriber left after dropping %s frames", self.printer_id, subscriber.frames_dropped
+            )
+        if self._closed:
+            return
+        if not self._subscribers:
+            if self._idle_task is None:
+                self._idle_task = asyncio.create_task(self._idle_shutdown())
+            return
+
+        fps = max(remaining.fps for remaining in self._subscribers)
+        if 0 < fps < self.fps:
+            logger.info("Camera hub %s: lowering upstream fps %s -> %s", self.printer_id, self.fps, fps)
+            self.fps = fps
+            if self.running:
+                previous, self._task = self._task, None
+                self._start(previous)
+
+    def detach(self, viewer_id: str) -> int:
+        """Detach every subscriber of a viewer, returning how many there were."""
+        subscribers = [subscriber for subscriber in self._subscribers if subscriber.viewer_id == viewer_id]
+        for subscriber in subscribers:
+            self.unsubscribe(subscriber)
+        return len(subscribers)
+
+    async def stop(self) -> None:
+        """Stop the upstream and end every subscriber's stream."""
+        if self._closed:
+            return
+        self._closed = True
+        self._cancel_idle_shutdown()
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._finish()
+
+    def _tier_for(self, subscriber: FrameSubscriber) -> str:
+        if subscriber.tier is None:
+            if self.source_width is None and subscriber.max_width:
+                # Not known until the first frame arrives
+                return TIER_FULL
+            subscriber.tier = select_tier(subscriber.max_width, self.source_width)
+        return subscriber.tier
+
+    async def _scale(self, frame: bytes, tier: str) -> bytes:
+        """Downscale a frame for a tier off the event loop, falling back to the original."""
+        try:
+            return await asyncio.to_thread(downscale_jpeg, frame, tier_width(tier, self.source_width))
+        except ImportError:
+            return frame
+        except Exception as e:
+            logger.debug("Camera hub %s: failed to downscale frame for %s tier: %s", self.printer_id, tier, e)
+            return frame
+
+    async def _publish(self, frame: bytes) -> None:
+        """Deliver a frame to all due subscribers, scaling once per tier."""
+        now = time.monotonic()
+        by_tier: dict[str, list[FrameSubscriber]] = {}
+        for subscriber in list(self._subscribers):
+            if subscriber.wants_frame(now):
+                by_tier.setdefault(self._tier_for(subscriber), []).append(subscriber)
+
+        scaled_tiers = [tier for tier in by_tier if tier != TIER_FULL]
+        scaled = await asyncio.gather(*(self._scale(frame, tier) for tier in scaled_tiers))
+        tier_frames = dict(zip(scaled_tiers, scaled, strict=True))
+        tier_frames[TIER_FULL] = frame
+
+        for tier, subscribers in by_tier.items():
+            for subscriber in subscribers:
+                subscriber.push(tier_frames[tier])
+
+    def _start(self, previous: asyncio.Task | None = None) -> None:
+        self.started_at = time.time()
+        self.error = None
+        self._task = asyncio.create_task(self._restart(previous) if previous else self._run())
+
+    async def _restart(self, previous: asyncio.Task) -> None:
+        """Run the upstream once the one it replaces has shut down.
+
+        The old source must release the printer connection and finish its
+        cleanup before the new one opens its own.
+        """
+        previous.cancel()
+        await asyncio.wait([previous])
+        await self._run()
+
+    def _cancel_idle_shutdown(self) -> None:
+        if self._idle_task is not None:
+            self._idle_task.cancel()
+            self._idle_task = None
+
+    async def _idle_shutdown(self) -> None:
+        await asyncio.sleep(self.idle_timeout)
+        self._idle_task = None
+        if not self._subscribers:
+            logger.info("Camera hub %s: no viewers for %ss, stopping upstream", self.printer_id, self.idle_timeout)
+            await self.stop()
+
+    def _finish(self) -> None:
+        self._closed = True
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+        self._subscribers.clear()
+        if self._on_close:
+            self._on_close(self)
+
+    async def _run(self) -> None:
+        logger.info("Camera hub %s: starting upstream at %s fps", self.printer_id, self.fps)
+        try:
+            async for frame in self._source(self.fps):
+                self.last_frame = frame
+                self.last_frame_time = time.time()
+                if self._on_frame:
+                    self._on_frame(self.printer_id, frame)
+                if self.source_width is None:
+                    self.source_width = get_jpeg_width(frame)
+                await self._publish(frame)
+            logger.info("Camera hub %s: upstream ended", self.printer_id)
+        except asyncio.CancelledError:
+            raise
+        except CameraStreamError as e:
+            logger.warning("Camera hub %s: %s", self.printer_id, e)
+            self.error = str(e)
+        except Exception as e:
+            logger.exception("Camera hub %s: upstream error: %s", self.printer_id, e)
+            self.error = "Camera stream error"
+
+        # Upstream ended on its own - end all viewers so their clients reconnect
+        self._task = None
+        self._finish()
+
+
+class CameraHubManager:
+    """Registry of active camera hubs, one per printer."""
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.idle_timeout = idle_timeout
+        self.queue_size = queue_size
+        self._hubs: dict[int, CameraStreamHub] = {}
+
+    def get_hub(self, printer_id: int) -> CameraStreamHub | None:
+        hub = self._hubs.get(printer_id)
+        if hub is None or hub.closed:
+            return None
+        return hub
+
+    def get_subscriber_count(self, printer_id: int) -> int:
+        hub = self.get_hub(printer_id)
+        return hub.subscriber_count if hub else 0
+
+    async def acquire(
+        self,
+        printer_id: int,
+        source: FrameSource,
+        fps: int,
+        source_key: Hashable = None,
+        on_frame: Callable[[int, bytes], None] | None = None,
+    ) -> CameraStreamHub:
+        """Return the hub for a printer, creating it if needed.
+
+        If the printer's connection details changed (different source_key), the
+        old hub is stopped and a new one is created.
+        """
+        hub = self.get_hub(printer_id)
+        if hub is not None and hub.source_key != source_key:
+            logger.info("Camera hub %s: camera settings changed, restarting", printer_id)
+            await hub.stop()
+            hub = None
+
+        if hub is None:
+            hub = CameraStreamHub(
+                printer_id,
+                source,
+                fps,
+                source_key=source_key,
+                on_frame=on_frame,
+                on_close=self._remove,
+                idle_timeout=self.idle_timeout,
+                queue_size=self.queue_size,
+            )
+            self._hubs[printer_id] = hub
+        return hub
+
+    def detach(self, printer_id: int, viewer_id: str) -> int:
+        """Detach a viewer from a printer's hub. Returns the number of subscribers detached."""
+        hub = self.get_hub(printer_id)
+        return hub.detach(viewer_id) if hub else 0
+
+    async def stop(self, printer_id: int) -> bool:
+        """Stop the hub for a printer. Returns True if a hub was running."""
+        hub = self.get_hub(printer_id)
+        if hub is None:
+            return False
+        await hub.stop()
+        return True
+
+    async def stop_all(self) -> None:
+        for hub in list(self._hubs.values()):
+            await hub.stop()
+
+    def _remove(self, hub: CameraStreamHub) -> None:
+        if self._hubs.get(hub.printer_id) is hub:
+            del self._hubs[hub.printer_id]
+
+
+camera_hub_manager = CameraHubManager()
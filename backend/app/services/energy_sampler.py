@@ -0,0 +1,234 @@
+"""Background sampler for smart plug energy readings.
+
+Polls every smart plug concurrently on a fixed interval, records the readings
+in smart_plug_energy_readings and keeps the latest sample per plug in memory.
+Statistics and /metrics read the cached samples (with their age) instead of
+querying every plug over the network on each request, so an offline plug only
+makes its own value stale rather than slowing down or timing out the request.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.models.energy_reading import SmartPlugEnergyReading
+from backend.app.models.smart_plug import SmartPlug
+from backend.app.services.homeassistant import homeassistant_service
+from backend.app.services.tasmota import tasmota_service
+
+logger = logging.getLogger(__name__)
+
+ENERGY_SAMPLE_INTERVAL = 60  # Seconds between polls
+ENERGY_SAMPLE_TIMEOUT = 10  # Per-plug timeout, an unreachable plug keeps its last sample
+ENERGY_STALE_SECONDS = 3 * ENERGY_SAMPLE_INTERVAL  # Samples older than this are reported as stale
+ENERGY_READING_RETENTION_DAYS = 30
+ENERGY_CLEANUP_EVERY = 24 * 60 * 60 // ENERGY_SAMPLE_INTERVAL  # Prune old readings about once a day
+
+
+@dataclass
+class EnergySample:
+    """Latest energy reading of one plug."""
+
+    plug_id: int
+    power: float | None  # W
+    today: float | None  # kWh
+    total: float | None  # kWh
+    sampled_at: datetime  # UTC
+
+    def age_seconds(self, now: datetime | None = None) -> float:
+        return ((now or datetime.utcnow()) - self.sampled_at).total_seconds()
+
+    def is_stale(self, now: datetime | None = None) -> bool:
+        return self.age_seconds(now) > ENERGY_STALE_SECONDS
+
+
+@dataclass
+class EnergyTotal:
+    """Sum of the cached lifetime counters over all plugs."""
+
+    total_kwh: float
+    sampled_at: datetime | None  # Oldest sample included in the sum
+    stale: bool  # Some plug has no recent sample
+
+
+class EnergySampler:
+    """Polls smart plug energy data in the background and caches the latest samples."""
+
+    def __init__(self):
+        self._latest: dict[int, EnergySample] = {}
+        self._task: asyncio.Task | None = None
+        self._cleanup_counter = 0
+
+    def start(self):
+        """Start the background sampling loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample_loop())
+            logger.info("Energy sampler started")
+
+    def stop(self):
+        """Stop the background sampling loop."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+            logger.info("Energy sampler stopped")
+
+    async def _sample_loop(self):
+        from backend.app.core.database import async_session
+
+        try:
+            async with async_session() as db:
+                await self.load_latest(db)
+        except Exception as e:
+            logger.warning("Failed to load stored energy readings: %s", e)
+
+        while True:
+            try:
+                async with async_session() as db:
+                    await self.sample_all(db)
+                    self._cleanup_counter += 1
+                    if self._cleanup_counter >= ENERGY_CLEANUP_EVERY:
+                        self._cleanup_counter = 0
+                        await self.prune_readings(db)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning("Energy sampling failed: %s", e)
+
+            await asyncio.sleep(ENERGY_SAMPLE_INTERVAL)
+
+    async def load_latest(self, db: AsyncSession):
+        """Seed the cache from the most recent stored reading of each plug."""
+        latest = (
+            select(SmartPlugEnergyReading.plug_id, func.max(SmartPlugEnergyReading.recorded_at).label("recorded_at"))
+            .group_by(SmartPlugEnergyReading.plug_id)
+            .subquery()
+        )
+        result = await db.execute(
+            select(SmartPlugEnergyReading).join(
+                latest,
+                (SmartPlugEnergyReading.plug_id == latest.c.plug_id)
+                & (SmartPlugEnergyReading.recorded_at == latest.c.recorded_at),
+            )
+        )
+        for reading in result.scalars().all():
+            cached = self._latest.get(reading.plug_id)
+            if cached is None or cached.sampled_at < reading.recorded_at:
+                self._latest[reading.plug_id] = EnergySample(
+                    plug_id=reading.plug_id,
+                    power=reading.power,
+                    today=reading.today,
+                    total=reading.total,
+                    sampled_at=reading.recorded_at,
+                )
+
+    async def _read_plug(self, plug: SmartPlug) -> EnergySample | None:
+        """Read one plug's energy data (None if unavailable)."""
+        if plug.plug_type == "mqtt":
+            from backend.app.services.mqtt_relay import mqtt_relay
+
+            data = mqtt_relay.smart_plug_service.get_plug_data(plug.id)
+            if not data or (data.power is None and data.energy is None):
+                return None
+            # MQTT plugs report "today" energy, not lifetime total; it is counted as the total
+            return EnergySample(plug.id, data.power, data.energy, data.energy, data.last_seen)
+
+        if plug.plug_type == "homeassistant":
+            energy = await homeassistant_service.get_energy(plug)
+        else:
+            energy = await tasmota_service.get_energy(plug)
+        if not energy:
+            return None
+        return EnergySample(plug.id, energy.get("power"), energy.get("today"), energy.get("total"), datetime.utcnow())
+
+    async def _sample_plug(self, plug: SmartPlug) -> EnergySample | None:
+        try:
+            return await asyncio.wait_for(self._read_plug(plug), timeout=ENERGY_SAMPLE_TIMEOUT)
+        except TimeoutError:
+            logger.debug("Energy sample for plug '%s' timed out", plug.name)
+        except Exception as e:
+            logger.debug("Energy sample for plug '%s' failed: %s", plug.name, e)
+        return None
+
+    async def sample_all(self, db: AsyncSession) -> list[EnergySample]:
+        """Poll all plugs concurrently, store the readings and update the cache."""
+        from backend.app.api.routes.settings import get_homeassistant_settings
+
+        plugs = list((await db.execute(select(SmartPlug))).scalars().all())
+
+        # Drop cached samples of deleted plugs
+        plug_ids = {plug.id for plug in plugs}
+        for plug_id in list(self._latest):
+            if plug_id not in plug_ids:
+                del self._latest[plug_id]
+
+        if any(plug.plug_type == "homeassistant" for plug in plugs):
+            ha_settings = await get_homeassistant_settings(db)
+            homeassistant_service.configure(ha_settings["ha_url"], ha_settings["ha_token"])
+
+        results = await asyncio.gather(*(self._sample_plug(plug) for plug in plugs))
+        samples = []
+        for sample in results:
+            if sample is None:
+                continue
+            cached = self._latest.get(sample.plug_id)
+            if cached and cached.sampled_at >= sample.sampled_at:
+                continue  # MQTT plug without a new message since the last poll
+            self._latest[sample.plug_id] = sample
+            samples.append(sample)
+            db.add(
+                SmartPlugEnergyReading(
+                    plug_id=sample.plug_id,
+                    power=sample.power,
+                    today=sample.today,
+                    total=sample.total,
+                    recorded_at=sample.sampled_at,
+                )
+            )
+        await db.commit()
+        return samples
+
+    async def prune_readings(self, db: AsyncSession, retention_days: int = ENERGY_READING_RETENTION_DAYS) -> int:
+        """Delete readings older than the retention period."""
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        result = await db.execute(delete(SmartPlugEnergyReading).where(SmartPlugEnergyReading.recorded_at < cutoff))
+        await db.commit()
+        if result.rowcount:
+            logger.info("Cleaned up %s old smart plug energy readings", result.rowcount)
+        return result.rowcount
+
+    def get_latest(self, plug_id: int) -> EnergySample | None:
+        """Get the cached sample of one plug."""
+        return self._latest.get(plug_id)
+
+    def get_total_energy(self, plug_ids: list[int]) -> EnergyTotal:
+        """Sum the cached lifetime energy counters of the given plugs.
+
+        The total is stale if any plug's sample is outdated, or a plug has not
+        been sampled yet and is missing from the sum.
+        """
+        now = datetime.utcnow()
+        total = 0.0
+        oldest: datetime | None = None
+        stale = False
+        for plug_id in plug_ids:
+            sample = self._latest.get(plug_id)
+            if sample is None:
+                stale = True
+                continue
+            if sample.total is None:
+                continue
+            total += sample.total
+            oldest = sample.sampled_at if oldest is None else min(oldest, sample.sampled_at)
+            stale = stale or sample.is_stale(now)
+        return EnergyTotal(total_kwh=round(total, 3), sampled_at=oldest, stale=stale)
+
+    def clear(self):
+        """Forget all cached samples."""
+        self._latest.clear()
+
+
+energy_sampler = EnergySampler()
@@ -1,13 +1,21 @@
+import asyncio
 import csv
 import io
+import tempfile
+import zlib
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Select, null, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from backend.app.models.archive import PrintArchive
+from backend.app.models.project import Project
+
+EXPORT_BATCH_SIZE = 500  # Archives fetched per round trip
+EXPORT_CHUNK_SIZE = 256 * 1024  # Bytes per streamed chunk of a finished Excel file
+EXPORT_SPOOL_MAX_SIZE = 16 * 1024 * 1024  # Excel files larger than this are spooled to disk
 
 
 class ExportService:
@@ -67,6 +75,20 @@ class ExportService:
         "created_at": "Created At",
     }
 
+    # Typical content width of fields, for Excel column sizing
+    FIELD_WIDTHS = {
+        "print_name": 30,
+        "filename": 30,
+        "project_name": 20,
+        "designer": 20,
+        "tags": 20,
+        "notes": 40,
+        "failure_reason": 20,
+        "started_at": 19,
+        "completed_at": 19,
+        "created_at": 19,
+    }
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
@@ -80,8 +102,14 @@ class ExportService:
         date_from: datetime | None = None,
         date_to: datetime | None = None,
         search: str | None = None,
-    ) -> tuple[bytes, str, str]:
-        """Export archives to CSV or Excel format.
+        compress: bool = False,
+    ) -> tuple[AsyncIterator[bytes], str, str]:
+        """Export archives to CSV or Excel format as a stream.
+
+        Archives are read in batches through a server-side cursor, so memory use
+        doesn't depend on the number of archives. CSV is produced incrementally;
+        Excel is written in openpyxl's write-only mode to a spooled temp file and
+        streamed once complete.
 
         Args:
             format: Export format ('csv' or 'xlsx')
@@ -92,13 +120,62 @@ class ExportService:
             date_from: Filter by start date
             date_to: Filter by end date
             search: Search filter
+            compress: Gzip the CSV output
 
         Returns:
-            Tuple of (file_bytes, filename, content_type)
+            Tuple of (chunk_iterator, filename, content_type)
         """
-        # Build query
+        # Determine fields to export
+        export_fields = fields if fields else self.DEFAULT_FIELDS
+
+        query = self._archive_query(export_fields, printer_id, project_id, status, date_from, date_to, search)
+        headers = [self.FIELD_LABELS.get(f, f) for f in export_fields]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+        if format == "xlsx":
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                raise ImportError("openpyxl is required for Excel export. Install with: pip install openpyxl")
+            chunks = self._stream_xlsx(query, headers, export_fields)
+            filename = f"archives_export_{timestamp}.xlsx"
+            content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        else:
+            chunks = self._stream_csv(query, headers)
+            filename = f"archives_export_{timestamp}.csv"
+            content_type = "text/csv"
+            if compress:
+                chunks = self._gzip(chunks)
+                filename += ".gz"
+                content_type = "application/gzip"
+
+        return chunks, filename, content_type
+
+    def _archive_query(
+        self,
+        fields: list[str],
+        printer_id: int | None,
+        project_id: int | None,
+        status: str | None,
+        date_from: datetime | None,
+        date_to: datetime | None,
+        search: str | None,
+    ) -> Select:
+        """Build a query selecting just the exported columns, one row per archive."""
+        columns = []
+        for field in fields:
+            if field == "project_name":
+                columns.append(Project.name)
+            elif field in PrintArchive.__table__.c:
+                columns.append(PrintArchive.__table__.c[field])
+            else:
+                columns.append(null())  # Unknown field, exported as an empty column
+
         query = (
-            select(PrintArchive).options(selectinload(PrintArchive.project)).order_by(PrintArchive.created_at.desc())
+            select(*columns)
+            .select_from(PrintArchive)
+            .outerjoin(Project, PrintArchive.project_id == Project.id)
+            .order_by(PrintArchive.created_at.desc(), PrintArchive.id.desc())
         )
 
         # Apply filters
@@ -121,36 +198,87 @@ class ExportService:
                 | (PrintArchive.notes.ilike(like_pattern))
                 | (PrintArchive.designer.ilike(like_pattern))
             )
+        return query
+
+    async def _iter_row_batches(self, query: Select) -> AsyncIterator[list[list[Any]]]:
+        """Yield the query's rows in batches, converted to export values."""
+        # The response is streamed after the request's session may have been closed,
+        # so read through a session of our own on the same engine.
+        async with AsyncSession(self.db.bind) as session:
+            result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+            async for batch in result.partitions():
+                yield [[self._export_value(value) for value in row] for row in batch]
+
+    @staticmethod
+    def _export_value(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    async def _stream_csv(self, query: Select, headers: list[str]) -> AsyncIterator[bytes]:
+        """Generate CSV content, one chunk per batch of archives."""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(headers)
+        async for rows in self._iter_row_batches(query):
+            writer.writerows(rows)
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate()
+        if output.tell():
+            yield output.getvalue().encode("utf-8")
+
+    async def _stream_xlsx(self, query: Select, headers: list[str], fields: list[str]) -> AsyncIterator[bytes]:
+        """Generate Excel content in write-only mode and stream the finished file."""
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Alignment, Font, PatternFill
+        from openpyxl.utils import get_column_letter
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Archives")
+
+        # Column widths must be set before rows are written, so they can't be fitted to the
+        # data; size them from the header and the field's typical content instead
+        for col_idx, field in enumerate(fields, 1):
+            width = max(len(headers[col_idx - 1]), self.FIELD_WIDTHS.get(field, 10))
+            ws.column_dimensions[get_column_letter(col_idx)].width = min(width + 2, 50)
 
-        # Execute query
-        result = await self.db.execute(query)
-        archives = list(result.scalars().all())
-
-        # Determine fields to export
-        export_fields = fields if fields else self.DEFAULT_FIELDS
-
-        # Convert to rows
-        rows = []
-        for archive in archives:
-            row = self._archive_to_row(archive, export_fields)
-            rows.append(row)
-
-        # Generate headers
-        headers = [self.FIELD_LABELS.get(f, f) for f in export_fields]
+        # Freeze header row
+        ws.freeze_panes = "A2"
 
-        # Generate file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Header style
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        header_alignment = Alignment(horizontal="center")
 
-        if format == "xlsx":
-            file_bytes = self._generate_xlsx(headers, rows, export_fields)
-            filename = f"archives_export_{timestamp}.xlsx"
-            content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        else:
-            file_bytes = self._generate_csv(headers, rows)
-            filename = f"archives_export_{timestamp}.csv"
-            content_type = "text/csv"
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            header_cells.append(cell)
+        ws.append(header_cells)
 
-        return file_bytes, filename, content_type
+        async for rows in self._iter_row_batches(query):
+            for row in rows:
+                ws.append(row)
+
+        with tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE) as output:
+            await asyncio.to_thread(wb.save, output)
+            output.seek(0)
+            while chunk := output.read(EXPORT_CHUNK_SIZE):
+                yield chunk
+
+    @staticmethod
+    async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Gzip a stream of chunks."""
+        compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+        async for chunk in chunks:
+            if compressed := compressor.compress(chunk):
+                yield compressed
+        yield compressor.flush()
 
     async def export_stats(
         self,
@@ -233,29 +361,6 @@ class ExportService:
 
         return file_bytes, filename, content_type
 
-    def _archive_to_row(self, archive: PrintArchive, fields: list[str]) -> list[Any]:
-        """Convert an archive to a row of values."""
-        row = []
-        for field in fields:
-            if field == "project_name":
-                value = archive.project.name if archive.project else None
-            elif field in ("started_at", "completed_at", "created_at"):
-                value = getattr(archive, field)
-                if value:
-                    value = value.isoformat()
-            else:
-                value = getattr(archive, field, None)
-            row.append(value)
-        return row
-
-    def _generate_csv(self, headers: list[str], rows: list[list]) -> bytes:
-        """Generate CSV file content."""
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(headers)
-        writer.writerows(rows)
-        return output.getvalue().encode("utf-8")
-
     def _generate_csv_simple(self, rows: list[list]) -> bytes:
         """Generate CSV file content from simple rows (no separate headers)."""
         output = io.StringIO()
@@ -263,53 +368,6 @@ class ExportService:
         writer.writerows(rows)
         return output.getvalue().encode("utf-8")
 
-    def _generate_xlsx(self, headers: list[str], rows: list[list], fields: list[str]) -> bytes:
-        """Generate Excel file content."""
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Alignment, Font, PatternFill
-            from openpyxl.utils import get_column_letter
-        except ImportError:
-            raise ImportError("openpyxl is required for Excel export. Install with: pip install openpyxl")
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Archives"
-
-        # Header style
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_alignment = Alignment(horizontal="center")
-
-        # Write headers
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-
-        # Write data
-        for row_idx, row in enumerate(rows, 2):
-            for col_idx, value in enumerate(row, 1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
-
-        # Auto-adjust column widths
-        for col_idx, _field in enumerate(fields, 1):
-            column_letter = get_column_letter(col_idx)
-            max_length = len(headers[col_idx - 1])
-            for row in rows:
-                cell_value = row[col_idx - 1]
-                if cell_value is not None:
-                    max_length = max(max_length, len(str(cell_value)))
-            ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
-
-        # Freeze header row
-        ws.freeze_panes = "A2"
-
-        output = io.BytesIO()
-        wb.save(output)
-        return output.getvalue()
-
     def _generate_xlsx_simple(self, rows: list[list]) -> bytes:
         """Generate Excel file content from simple rows."""
         try:
@@ -0,0 +1,112 @@
+"""Filament requirements of 3MF files, parsed once per file content.
+
+Requirements are extracted when a file is archived or uploaded and stored in
+the filament_requirements table by content hash. Files that predate the table
+are parsed on first use (lazy backfill).
+"""
+
+import asyncio
+import hashlib
+import logging
+import zipfile
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.archive import PrintArchive
+from backend.app.models.filament_requirements import FilamentRequirements
+from backend.app.models.library import LibraryFile
+from backend.app.utils.threemf_tools import extract_filament_requirements_from_3mf
+
+logger = logging.getLogger(__name__)
+
+EMPTY_REQUIREMENTS = {"all": [], "plates": {}}
+
+
+def _hash_file(file_path: Path) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _parse_requirements(file_path: Path) -> dict:
+    if not zipfile.is_zipfile(file_path):
+        return EMPTY_REQUIREMENTS
+    try:
+        with zipfile.ZipFile(file_path, "r") as zf:
+            return extract_filament_requirements_from_3mf(zf)
+    except Exception as e:
+        logger.warning("Failed to parse filament requirements from %s: %s", file_path, e)
+        return EMPTY_REQUIREMENTS
+
+
+async def store_filament_requirements(
+    db: AsyncSession, file_path: Path, content_hash: str, requirements: dict | None = None
+) -> dict:
+    """Parse a 3MF's filament requirements and store them under its content hash.
+
+    Called at ingest; does nothing to an existing entry for the same content.
+    Pass requirements if the caller already parsed them.
+    """
+    if requirements is None:
+        requirements = await asyncio.to_thread(_parse_requirements, file_path)
+    stmt = sqlite_insert(FilamentRequirements).values(content_hash=content_hash, requirements=requirements)
+    await db.execute(stmt.on_conflict_do_nothing(index_elements=["content_hash"]))
+    return requirements
+
+
+async def load_filament_requirements(db: AsyncSession, file_path: Path, content_hash: str) -> dict:
+    """Get the stored filament requirements for a file, parsing and storing them if missing."""
+    result = await db.execute(
+        select(FilamentRequirements.requirements).where(FilamentRequirements.content_hash == content_hash)
+    )
+    requirements = result.scalar_one_or_none()
+    if requirements is not None:
+        return requirements
+    if not file_path.exists():
+        return EMPTY_REQUIREMENTS
+    requirements = await store_filament_requirements(db, file_path, content_hash)
+    await db.commit()
+    return requirements
+
+
+def select_plate(requirements: dict, plate_id: int | None) -> list[dict]:
+    """Get the filaments for one plate, or for the whole file if plate_id is None."""
+    if plate_id is None:
+        return requirements["all"]
+    return requirements["plates"].get(str(plate_id), [])
+
+
+async def filament_requirements_for_archive(
+    db: AsyncSession, archive: PrintArchive, plate_id: int | None = None
+) -> list[dict]:
+    """Get the filaments an archived 3MF needs, optionally for a single plate."""
+    file_path = settings.base_dir / archive.file_path
+    if not archive.content_hash:
+        if not file_path.exists():
+            return []
+        archive.content_hash = await asyncio.to_thread(_hash_file, file_path)
+    requirements = await load_filament_requirements(db, file_path, archive.content_hash)
+    return select_plate(requirements, plate_id)
+
+
+async def filament_requirements_for_library_file(
+    db: AsyncSession, library_file: LibraryFile, plate_id: int | None = None
+) -> list[dict]:
+    """Get the filaments a library 3MF needs, optionally for a single plate."""
+    if not library_file.filename.lower().endswith(".3mf"):
+        return []
+    # Library files may store absolute paths
+    lib_path = Path(library_file.file_path)
+    file_path = lib_path if lib_path.is_absolute() else settings.base_dir / library_file.file_path
+    if not library_file.file_hash:
+        if not file_path.exists():
+            return []
+        library_file.file_hash = await asyncio.to_thread(_hash_file, file_path)
+    requirements = await load_filament_requirements(db, file_path, library_file.file_hash)
+    return select_plate(requirements, plate_id)
@@ -0,0 +1,269 @@
+"""Bounded ingestion pipeline for printer MQTT messages.
+
+paho-mqtt delivers messages on its network thread. Parsing a report and running
+it through the printer state machine there means a burst of large pushall
+responses stalls the network loop and the broker connection misses keepalives.
+
+Instead, the network thread only hands the raw payload to this pipeline. Each
+printer gets a small bounded queue, and a shared pool of worker threads decodes
+and processes the queued messages. A printer's messages are always processed in
+order by one worker at a time, so the state machine sees the same sequence it
+did before, just off the network thread.
+
+When a printer's queue backs up, queued status reports that are fully
+superseded by a newer report (every field they carry is present again in the
+newer one, with no state transition in between) are skipped. If a queue fills
+up regardless, the oldest message is dropped and the printer is asked for a
+fresh full status so its state catches up.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Fields whose intermediate values matter (state machine transitions, per-layer
+# callbacks, errors). A report carrying one of these is never skipped in favour
+# of a newer report with a different value.
+TRANSITION_FIELDS = frozenset({"gcode_state", "layer_num", "print_error", "mc_print_stage", "stg_cur"})
+
+# Latency samples kept per printer for the average/max
+LATENCY_SAMPLES = 100
+
+# Handler called on a worker thread with (topic, decoded payload)
+MessageHandler = Callable[[str, dict], None]
+
+
+def _covers(newer: Any, older: Any) -> bool:
+    """Check that applying ``newer`` overwrites everything ``older`` would set."""
+    if isinstance(older, dict):
+        if not isinstance(newer, dict):
+            return False
+        if "id" in older and newer.get("id") != older["id"]:
+            return False
+        return all(key in newer and _covers(newer[key], value) for key, value in older.items())
+    if isinstance(older, list):
+        return (
+            isinstance(newer, list)
+            and len(newer) == len(older)
+            and all(_covers(n, o) for n, o in zip(newer, older, strict=True))
+        )
+    return True
+
+
+def is_superseded(older: dict, newer: dict) -> bool:
+    """Check whether an older status report can be skipped because of a newer one.
+
+    Only ``push_status`` reports are considered. The older report must carry
+    nothing outside its ``print`` section, every field it sets must be set
+    again by the newer report, and any transition field must be unchanged.
+    """
+    if older.keys() != {"print"} or "print" not in newer:
+        return False
+    old_print, new_print = older["print"], newer["print"]
+    if not isinstance(old_print, dict) or not isinstance(new_print, dict):
+        return False
+    if old_print.get("command") != "push_status" or new_print.get("command") != "push_status":
+        return False
+    for key in TRANSITION_FIELDS:
+        if key in old_print and old_print[key] != new_print.get(key):
+            return False
+    return _covers(new_print, old_print)
+
+
+@dataclass
+class IngestStats:
+    """Per-printer ingestion counters."""
+
+    received: int = 0
+    processed: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    errors: int = 0
+    max_queue_depth: int = 0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def to_dict(self, queue_depth: int) -> dict:
+        latencies = list(self.latencies)
+        return {
+            "queue_depth": queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "received": self.received,
+            "processed": self.processed,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "avg_parse_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "max_parse_ms": round(max(latencies) * 1000, 3) if latencies else 0.0,
+        }
+
+
+class _PrinterQueue:
+    def __init__(self, handler: MessageHandler, on_overflow: Callable[[], None] | None, label: str):
+        self.label = label
+        self.handler = handler
+        self.on_overflow = on_overflow
+        self.pending: deque[tuple[str, bytes]] = deque()
+        self.scheduled = False
+        self.resync_needed = False
+        self.stats = IngestStats()
+
+
+class MQTTIngestPipeline:
+    """Per-printer bounded queues drained by a shared worker pool."""
+
+    def __init__(self, workers: int = 4, queue_size: int = 50):
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self._queues: dict[Hashable, _PrinterQueue] = {}
+        self._ready: deque[Hashable] = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads: list[threading.Thread] = []
+        self._running = False
+
+    def register(
+        self,
+        key: Hashable,
+        handler: MessageHandler,
+        on_overflow: Callable[[], None] | None = None,
+        label: str | None = None,
+    ) -> None:
+        """Register a printer's message handler.
+
+        Args:
+            key: Identifies the printer connection (the MQTT client object)
+            handler: Called on a worker thread with (topic, payload) for each message
+            on_overflow: Called on a worker thread after messages were dropped,
+                to request a full status resync from the printer
+            label: Name used in log messages (serial number)
+        """
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                self._queues[key] = _PrinterQueue(handler, on_overflow, label or str(key))
+            else:
+                queue.handler = handler
+                queue.on_overflow = on_overflow
+            self._ensure_workers()
+
+    def unregister(self, key: Hashable) -> None:
+        """Forget a printer, discarding anything still queued for it."""
+        with self._lock:
+            queue = self._queues.pop(key, None)
+            if queue is not None:
+                queue.pending.clear()
+
+    def submit(self, key: Hashable, topic: str, payload: bytes) -> None:
+        """Queue a raw message for a printer. Called from the paho network thread."""
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                return
+            stats = queue.stats
+            stats.received += 1
+            if len(queue.pending) >= self.queue_size:
+                queue.pending.popleft()
+                stats.dropped += 1
+                queue.resync_needed = True
+            queue.pending.append((topic, payload))
+            stats.max_queue_depth = max(stats.max_queue_depth, len(queue.pending))
+            if not queue.scheduled:
+                queue.scheduled = True
+                self._ready.append(key)
+                self._wakeup.notify()
+
+    def get_stats(self, key: Hashable | None = None) -> dict:
+        """Return ingestion metrics for one printer, or all printers keyed by printer key."""
+        with self._lock:
+            if key is not None:
+                queue = self._queues.get(key)
+                return queue.stats.to_dict(len(queue.pending)) if queue else {}
+            return {k: q.stats.to_dict(len(q.pending)) for k, q in self._queues.items()}
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Stop the worker threads."""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=timeout)
+
+    def _ensure_workers(self) -> None:
+        # Caller holds the lock
+        if self._running:
+            return
+        self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"mqtt-ingest-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                while self._running and not self._ready:
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+                key = self._ready.popleft()
+                queue = self._queues.get(key)
+                if queue is None:
+                    continue
+                batch = list(queue.pending)
+                queue.pending.clear()
+
+            self._process_batch(queue, batch)
+
+            with self._lock:
+                resync, queue.resync_needed = queue.resync_needed, False
+                if queue.pending and self._queues.get(key) is queue:
+                    self._ready.append(key)
+                    self._wakeup.notify()
+                else:
+                    queue.scheduled = False
+
+            if resync and queue.on_overflow:
+                logger.warning("[%s] MQTT ingest queue overflowed, requesting full status", queue.label)
+                try:
+                    queue.on_overflow()
+                except Exception as e:
+                    logger.debug("[%s] Status resync request failed: %s", queue.label, e)
+
+    def _process_batch(self, queue: _PrinterQueue, batch: list[tuple[str, bytes]]) -> None:
+        """Decode and handle one printer's queued messages, skipping superseded reports."""
+        decoded: list[tuple[str, dict, float]] = []
+        for topic, raw in batch:
+            started = time.perf_counter()
+            try:
+                payload = json.loads(raw)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue  # Ignore non-JSON MQTT messages (e.g. binary or malformed payloads)
+            if isinstance(payload, dict):
+                decoded.append((topic, payload, time.perf_counter() - started))
+
+        latest = decoded[-1][1] if decoded else None
+        for index, (topic, payload, decode_time) in enumerate(decoded):
+            if index < len(decoded) - 1 and topic == decoded[-1][0] and is_superseded(payload, latest):
+                queue.stats.coalesced += 1
+                continue
+            started = time.perf_counter()
+            try:
+                queue.handler(topic, payload)
+            except Exception as e:
+                queue.stats.errors += 1
+                logger.error("[%s] Error processing MQTT message: %s", queue.label, e, exc_info=True)
+            queue.stats.processed += 1
+            queue.stats.latencies.append(decode_time + time.perf_counter() - started)
+
+
+mqtt_ingest = MQTTIngestPipeline(workers=settings.mqtt_ingest_workers, queue_size=settings.mqtt_ingest_queue_size)
@@ -15,6 +15,8 @@ from typing import Any
 
 import paho.mqtt.client as mqtt
 
+from backend.app.services.bambu_mqtt import SECTION_FANS, SECTION_PROGRESS, SECTION_STATUS, SECTION_TEMPERATURES
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,6 +25,8 @@ class MQTTRelayService:
 
     # Minimum interval between status updates per printer (seconds)
     STATUS_THROTTLE_SECONDS = 1.0
+    # PrinterState sections included in the status payload
+    STATUS_SECTIONS = frozenset({SECTION_STATUS, SECTION_PROGRESS, SECTION_TEMPERATURES, SECTION_FANS})
 
     def __init__(self):
         self.client: mqtt.Client | None = None
@@ -34,6 +38,7 @@ class MQTTRelayService:
         self._broker = ""
         self._port = 1883
         self._last_printer_status: dict[int, float] = {}  # printer_id -> last publish timestamp
+        self._last_status_version: dict[int, int] = {}  # printer_id -> PrinterState version last published
         self._smart_plug_service = None  # Lazy import to avoid circular dependency
         self._settings: dict = {}  # Store settings for smart plug service
         self._disconnection_event: threading.Event | None = None
@@ -250,6 +255,12 @@ class MQTTRelayService:
         last_publish = self._last_printer_status.get(printer_id, 0)
         if now - last_publish < self.STATUS_THROTTLE_SECONDS:
             return  # Skip this update, too soon since last publish
+
+        # Skip republishing when none of the published sections changed
+        version, changed = state.changes_since(self._last_status_version.get(printer_id, 0))
+        self._last_status_version[printer_id] = version
+        if not changed & self.STATUS_SECTIONS:
+            return
         self._last_printer_status[printer_id] = now
 
         # Build status payload from PrinterState
@@ -0,0 +1,47 @@
+"""Keyset pagination cursors and sparse field selection for list endpoints.
+
+A cursor is the opaque, URL-safe encoding of the sort key of the last row of a
+page; the next page continues after that key instead of skipping OFFSET rows,
+so it costs the same however deep the client has scrolled. List endpoints
+return it in the X-Next-Cursor header (absent on the last page).
+"""
+
+import base64
+import json
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+class UnknownFieldError(ValueError):
+    """Raised when a sparse field selection names a field the response doesn't have."""
+
+
+def encode_cursor(*key: Any) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> tuple:
+    """Decode a cursor into its key, converting each part with the given type."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(key, list) or len(key) != len(types):
+            raise ValueError("wrong key length")
+        return tuple(convert(value) for convert, value in zip(types, key, strict=True))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(cursor) from e
+
+
+def parse_fields(fields: str | None, allowed: Iterable[str]) -> list[str] | None:
+    """Parse a comma-separated fields= selection (None when all fields are wanted)."""
+    if not fields:
+        return None
+    allowed = set(allowed)
+    selected = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    for name in selected:
+        if name not in allowed:
+            raise UnknownFieldError(name)
+    return selected or None
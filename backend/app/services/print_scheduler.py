@@ -1,13 +1,12 @@
 """Print scheduler service - processes the print queue."""
 
 import asyncio
+import heapq
 import json
 import logging
-import zipfile
 from datetime import datetime
 from pathlib import Path
 
-import defusedxml.ElementTree as ET
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -19,44 +18,211 @@ from backend.app.models.print_queue import PrintQueueItem
 from backend.app.models.printer import Printer
 from backend.app.models.smart_plug import SmartPlug
 from backend.app.services.bambu_ftp import delete_file_async, get_ftp_retry_settings, upload_file_async, with_ftp_retry
+from backend.app.services.bambu_mqtt import SECTION_AMS
+from backend.app.services.filament_requirements import (
+    filament_requirements_for_archive,
+    filament_requirements_for_library_file,
+)
 from backend.app.services.notification_service import notification_service
 from backend.app.services.printer_manager import printer_manager
 from backend.app.services.smart_plug_manager import smart_plug_manager
+from backend.app.utils.assignment import min_cost_assignment
 from backend.app.utils.printer_models import normalize_printer_model
-from backend.app.utils.threemf_tools import extract_nozzle_mapping_from_3mf
 
 logger = logging.getLogger(__name__)
 
+# Costs for matching model-based queue items to printers (lower is better)
+ASSIGN_COST_SIMILAR_COLOR = 1  # per filament loaded in a similar but not identical color
+ASSIGN_COST_WRONG_COLOR = 4  # per filament whose type is loaded, but not in its color
+ASSIGN_COST_MISSING_TYPE = 10  # per filament whose type isn't loaded at all
+ASSIGN_COST_PER_QUEUE_POSITION = 2  # per item ahead in the queue
+
 
 class PrintScheduler:
-    """Background scheduler that processes the print queue."""
+    """Background scheduler that processes the print queue.
+
+    Queue passes are triggered by events (see wake()) and by scheduled start
+    times coming due, debounced so a burst of events becomes a single pass.
+    A periodic full pass remains as a safety net for changes no event covers.
+    """
 
     def __init__(self):
         self._running = False
-        self._check_interval = 30  # seconds
+        self._check_interval = 300  # seconds between safety-net full passes
+        self._debounce_delay = 0.5  # seconds to collect further events before a pass
         self._power_on_wait_time = 180  # seconds to wait for printer after power on (3 min)
         self._power_on_check_interval = 10  # seconds between connection checks
+        self._wake_event: asyncio.Event | None = None
+        # Printers to re-evaluate in the next pass; _wake_all means every printer
+        self._wake_all = True
+        self._wake_printers: set[int] = set()
+        # Heap of (scheduled_time, item_id, printer_id) for pending items not yet due
+        self._timers: list[tuple[datetime, int, int | None]] = []
+        # Last seen (connected, state) per printer, to wake only on transitions
+        self._printer_states: dict[int, tuple[bool, str]] = {}
+        # Per-printer dispatch (power on / upload and start) runs in its own task so
+        # one slow printer never holds up the others. A printer with a task in
+        # flight counts as busy, which keeps one job per printer across passes.
+        self._max_concurrent_uploads = 4
+        self._upload_semaphore = asyncio.Semaphore(self._max_concurrent_uploads)
+        self._dispatch_tasks: dict[int, asyncio.Task] = {}  # printer_id -> task
+        self._dispatch_items: set[int] = set()  # queue item IDs being dispatched
+        # Printers just sent a print command, busy until they report a non-idle state
+        self._start_grace_period = 60  # seconds
+        self._recently_started: dict[int, float] = {}  # printer_id -> monotonic deadline
+        # Costs and result of the last model-based assignment, for debugging
+        self.last_assignment: dict | None = None
 
     async def run(self):
-        """Main loop - check queue every interval."""
+        """Main loop - run a queue pass whenever woken, due or the safety net expires."""
         self._running = True
+        self._wake_event = asyncio.Event()
         logger.info("Print scheduler started")
 
         while self._running:
+            printer_ids = self._take_wakeups()
             try:
-                await self.check_queue()
+                await self.check_queue(printer_ids)
             except Exception as e:
                 logger.error("Scheduler error: %s", e)
 
-            await asyncio.sleep(self._check_interval)
+            await self._wait_for_work()
 
     def stop(self):
         """Stop the scheduler."""
         self._running = False
+        if self._wake_event is not None:
+            self._wake_event.set()
         logger.info("Print scheduler stopped")
 
-    async def check_queue(self):
-        """Check for prints ready to start."""
+    def wake(self, printer_id: int | None = None):
+        """Request a queue pass for a printer, or for all printers if printer_id is None.
+
+        Call from the event loop whenever something may let a queued job start:
+        a print finished, the plate was cleared, a printer connected, or a queue
+        item was added or edited.
+        """
+        if printer_id is None:
+            self._wake_all = True
+        else:
+            self._wake_printers.add(printer_id)
+        if self._wake_event is not None:
+            self._wake_event.set()
+
+    def on_printer_status(self, printer_id: int, state, changed: set[str]):
+        """Wake for a printer whose status change may have made it ready for a job."""
+        key = (state.connected, state.state)
+        if state.state not in ("IDLE", "FINISH", "FAILED"):
+            self._recently_started.pop(printer_id, None)
+        if self._printer_states.get(printer_id) != key:
+            self._printer_states[printer_id] = key
+            self.wake(printer_id)
+        elif SECTION_AMS in changed and self._is_printer_idle(printer_id):
+            # Loading filament can satisfy a job waiting for it
+            self.wake(printer_id)
+
+    def _is_dispatching(self, printer_id: int) -> bool:
+        """Check if a printer is being powered on, uploaded to or was just started."""
+        if printer_id in self._dispatch_tasks:
+            return True
+        deadline = self._recently_started.get(printer_id)
+        if deadline is None:
+            return False
+        if deadline > asyncio.get_running_loop().time():
+            return True
+        del self._recently_started[printer_id]
+        return False
+
+    def _spawn_dispatch(self, printer_id: int, item_id: int | None, coro):
+        """Run a dispatch coroutine for a printer in the background."""
+        if item_id is not None:
+            self._dispatch_items.add(item_id)
+        task = asyncio.create_task(self._run_dispatch(printer_id, item_id, coro))
+        self._dispatch_tasks[printer_id] = task
+
+    async def _run_dispatch(self, printer_id: int, item_id: int | None, coro):
+        try:
+            await coro
+        except Exception as e:
+            logger.error("Dispatch to printer %s failed: %s", printer_id, e)
+        finally:
+            self._dispatch_tasks.pop(printer_id, None)
+            self._dispatch_items.discard(item_id)
+
+    async def wait_for_dispatches(self):
+        """Wait until all in-flight dispatch tasks have finished."""
+        while self._dispatch_tasks:
+            await asyncio.gather(*self._dispatch_tasks.values(), return_exceptions=True)
+
+    async def _power_on_printer(self, printer_id: int, plug_id: int):
+        """Power on a printer via its smart plug, then queue a pass for it."""
+        async with async_session() as db:
+            plug = await db.get(SmartPlug, plug_id)
+            if plug is None:
+                return
+            powered_on = await self._power_on_and_wait(plug, printer_id, db)
+        if powered_on:
+            self.wake(printer_id)
+        else:
+            # Retried on the next safety-net pass rather than immediately
+            logger.warning("Could not power on printer %s via smart plug", printer_id)
+
+    async def _dispatch_print(self, item_id: int):
+        """Start a queue item in its own session, limited to a few concurrent uploads."""
+        async with self._upload_semaphore, async_session() as db:
+            item = await db.get(PrintQueueItem, item_id)
+            if item is None or item.status != "pending":
+                return  # Cancelled or removed while waiting
+            await self._start_print(db, item)
+            if item.status == "printing":
+                loop = asyncio.get_running_loop()
+                self._recently_started[item.printer_id] = loop.time() + self._start_grace_period
+
+    def _take_wakeups(self) -> set[int] | None:
+        """Return and reset the printers to re-evaluate (None for all)."""
+        printer_ids = None if self._wake_all else self._wake_printers
+        self._wake_all = False
+        self._wake_printers = set()
+        return printer_ids
+
+    def _pop_due_timers(self):
+        """Wake the printers of scheduled items whose start time has been reached."""
+        now = datetime.utcnow()
+        while self._timers and self._timers[0][0] <= now:
+            _, _, printer_id = heapq.heappop(self._timers)
+            self.wake(printer_id)
+
+    async def _wait_for_work(self):
+        """Sleep until woken, a scheduled item is due or the safety-net interval passes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._check_interval
+
+        while self._running and not (self._wake_all or self._wake_printers):
+            timeout = deadline - loop.time()
+            if self._timers:
+                until_due = (self._timers[0][0] - datetime.utcnow()).total_seconds()
+                timeout = min(timeout, until_due)
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=max(timeout, 0))
+            except TimeoutError:
+                pass
+            self._wake_event.clear()
+
+            self._pop_due_timers()
+            if loop.time() >= deadline:
+                self._wake_all = True
+
+        # Let closely spaced events (e.g. print finished + queue item updated) share a pass
+        if self._running:
+            await asyncio.sleep(self._debounce_delay)
+            self._wake_event.clear()
+
+    async def check_queue(self, printer_ids: set[int] | None = None):
+        """Check for prints ready to start.
+
+        Args:
+            printer_ids: Only re-evaluate these printers. None checks every printer.
+        """
         async with async_session() as db:
             # Get all pending items, ordered by printer and position
             result = await db.execute(
@@ -66,6 +232,15 @@ class PrintScheduler:
             )
             items = list(result.scalars().all())
 
+            # Rebuild start-time timers from the current pending items
+            now = datetime.utcnow()
+            self._timers = [
+                (item.scheduled_time, item.id, item.printer_id)
+                for item in items
+                if item.scheduled_time and item.scheduled_time > now and not item.manual_start
+            ]
+            heapq.heapify(self._timers)
+
             if not items:
                 return
 
@@ -77,6 +252,20 @@ class PrintScheduler:
 
             # Track busy printers to avoid assigning multiple items to same printer
             busy_printers: set[int] = set()
+            dispatching = set(self._dispatch_tasks) | set(self._recently_started)
+            dispatching = {pid for pid in dispatching if self._is_dispatching(pid)}
+
+            # Assign model-based items to idle printers jointly rather than first-come
+            model_items = [
+                item
+                for item in items
+                if not item.printer_id
+                and item.target_model
+                and not item.manual_start
+                and not (item.scheduled_time and item.scheduled_time > now)
+                and item.id not in self._dispatch_items
+            ]
+            planned = await self._plan_model_assignments(db, model_items, dispatching, printer_ids)
 
             for item in items:
                 # Check scheduled time first (scheduled_time is stored in UTC from ISO string)
@@ -87,10 +276,19 @@ class PrintScheduler:
                 if item.manual_start:
                     continue
 
+                # Already being started by an earlier pass
+                if item.id in self._dispatch_items:
+                    continue
+
                 if item.printer_id:
                     # Specific printer assignment (existing behavior)
                     if item.printer_id in busy_printers:
                         continue
+                    if printer_ids is not None and item.printer_id not in printer_ids:
+                        continue
+                    if self._is_dispatching(item.printer_id):
+                        busy_printers.add(item.printer_id)
+                        continue
 
                     # Check if printer is idle
                     printer_idle = self._is_printer_idle(item.printer_id)
@@ -101,18 +299,13 @@ class PrintScheduler:
                         plug = await self._get_smart_plug(db, item.printer_id)
                         if plug and plug.auto_on and plug.enabled:
                             logger.info("Printer %s offline, attempting to power on via smart plug", item.printer_id)
-                            powered_on = await self._power_on_and_wait(plug, item.printer_id, db)
-                            if powered_on:
-                                printer_connected = True
-                                printer_idle = self._is_printer_idle(item.printer_id)
-                            else:
-                                logger.warning("Could not power on printer %s via smart plug", item.printer_id)
-                                busy_printers.add(item.printer_id)
-                                continue
-                        else:
-                            # No plug or auto_on disabled
-                            busy_printers.add(item.printer_id)
-                            continue
+                            # The pass after it connects starts the item
+                            self._spawn_dispatch(
+                                item.printer_id, None, self._power_on_printer(item.printer_id, plug.id)
+                            )
+                        # Offline until then, or no plug / auto_on disabled
+                        busy_printers.add(item.printer_id)
+                        continue
 
                     # Check if printer is idle (busy with another print)
                     if not printer_idle:
@@ -141,22 +334,28 @@ class PrintScheduler:
                             continue
 
                     # Start the print
-                    await self._start_print(db, item)
+                    self._spawn_dispatch(item.printer_id, item.id, self._dispatch_print(item.id))
                     busy_printers.add(item.printer_id)
 
                 elif item.target_model:
-                    # Model-based assignment - find any idle printer of matching model
-                    # Parse required filament types if present
-                    required_types = None
-                    if item.required_filament_types:
-                        try:
-                            required_types = json.loads(item.required_filament_types)
-                        except json.JSONDecodeError:
-                            pass  # Ignore malformed filament types; treat as no constraint
-
-                    printer_id, waiting_reason = await self._find_idle_printer_for_model(
-                        db, item.target_model, busy_printers, required_types, item.target_location
-                    )
+                    # Model-based assignment - use the printer planned for this item, if any
+                    printer_id = planned.get(item.id)
+                    waiting_reason = None
+                    if printer_id is None or printer_id in busy_printers:
+                        # Explain why it waits; printers planned for other items count as busy
+                        exclude_ids = busy_printers | dispatching | set(planned.values())
+                        printer_id, waiting_reason = await self._find_idle_printer_for_model(
+                            db,
+                            item.target_model,
+                            exclude_ids,
+                            self._get_required_types(item),
+                            item.target_location,
+                            printer_ids,
+                        )
+
+                    # A partial pass only saw some printers, so its reason would be incomplete
+                    if printer_id is None and printer_ids is not None:
+                        continue
 
                     # Update waiting_reason if changed and send notification when first waiting
                     if item.waiting_reason != waiting_reason:
@@ -221,11 +420,133 @@ class PrintScheduler:
                                 logger.info(
                                     f"Queue item {item.id}: Computed AMS mapping for printer {printer_id}: {computed_mapping}"
                                 )
-                                await db.commit()
 
-                        await self._start_print(db, item)
+                        await db.commit()
+                        self._spawn_dispatch(printer_id, item.id, self._dispatch_print(item.id))
                         busy_printers.add(printer_id)
 
+    def _get_required_types(self, item: PrintQueueItem) -> list[str] | None:
+        """Parse a queue item's required filament types, if present."""
+        if not item.required_filament_types:
+            return None
+        try:
+            return json.loads(item.required_filament_types)
+        except json.JSONDecodeError:
+            return None  # Ignore malformed filament types; treat as no constraint
+
+    async def _plan_model_assignments(
+        self,
+        db: AsyncSession,
+        items: list[PrintQueueItem],
+        exclude_ids: set[int],
+        only_ids: set[int] | None = None,
+    ) -> dict[int, int]:
+        """Assign model-based queue items to idle printers at the lowest total cost.
+
+        Every item is scored against every idle printer it may run on (model,
+        location and required filament types must match), and the assignment
+        that starts the most items at the lowest summed cost is chosen, so an
+        item doesn't take the only printer another item could use. The decision
+        is kept in last_assignment for debugging.
+
+        Args:
+            db: Database session
+            items: Ready model-based queue items, in queue order
+            exclude_ids: Printer IDs that are busy
+            only_ids: Optional printer IDs to restrict the search to (partial queue passes)
+
+        Returns:
+            Dict of queue item ID -> printer ID for the items that were assigned
+        """
+        if not items:
+            return {}
+
+        models = {(normalize_printer_model(item.target_model) or item.target_model).lower() for item in items}
+        query = select(Printer).where(func.lower(Printer.model).in_(models)).where(Printer.is_active == True)  # noqa: E712
+        if only_ids is not None:
+            query = query.where(Printer.id.in_(only_ids))
+        result = await db.execute(query)
+        printers = [
+            printer
+            for printer in result.scalars().all()
+            if printer.id not in exclude_ids and self._is_printer_idle(printer.id)
+        ]
+        if not printers:
+            return {}
+
+        loaded = {}
+        for printer in printers:
+            status = printer_manager.get_status(printer.id)
+            loaded[printer.id] = self._build_loaded_filaments(status) if status else []
+
+        costs: list[list[float | None]] = []
+        details = []
+        for rank, item in enumerate(items):
+            model = (normalize_printer_model(item.target_model) or item.target_model).lower()
+            required_types = self._get_required_types(item)
+            candidates = [
+                printer
+                for printer in printers
+                if (printer.model or "").lower() == model
+                and (not item.target_location or printer.location == item.target_location)
+                and not (required_types and self._get_missing_filament_types(printer.id, required_types))
+            ]
+            required = await self._get_filament_requirements(db, item) if candidates else None
+
+            row: list[float | None] = [None] * len(printers)
+            item_costs = {}
+            for printer in candidates:
+                filament_cost, swaps = self._filament_match_cost(required or [], loaded[printer.id])
+                # Earlier queue positions win when printers are scarce
+                cost = filament_cost + rank * ASSIGN_COST_PER_QUEUE_POSITION
+                row[printers.index(printer)] = cost
+                item_costs[printer.id] = {"cost": cost, "filament_cost": filament_cost, "spool_swaps": swaps}
+            costs.append(row)
+            details.append({"item_id": item.id, "target_model": item.target_model, "costs": item_costs})
+
+        assignments = {}
+        for row, col in min_cost_assignment(costs):
+            assignments[items[row].id] = printers[col].id
+        for detail in details:
+            printer_id = assignments.get(detail["item_id"])
+            detail["printer_id"] = printer_id
+            detail["cost"] = detail["costs"][printer_id]["cost"] if printer_id else None
+
+        self.last_assignment = {
+            "computed_at": datetime.utcnow().isoformat(),
+            "printer_ids": [printer.id for printer in printers],
+            "items": details,
+        }
+        logger.debug("Model-based assignment: %s", self.last_assignment)
+        return assignments
+
+    def _filament_match_cost(self, required: list[dict], loaded: list[dict]) -> tuple[float, int]:
+        """Score how well a printer's loaded filaments fit a job.
+
+        Returns:
+            Tuple of (cost, spool_swaps) where spool_swaps counts required filaments
+            with no loaded tray of the same type and a matching or similar color.
+        """
+        cost = 0.0
+        swaps = 0
+        for req in required:
+            req_type = (req.get("type") or "").upper()
+            req_color = self._normalize_color_for_compare(req.get("color"))
+            req_tray_info_idx = req.get("tray_info_idx")
+            same_type = [f for f in loaded if (f.get("type") or "").upper() == req_type]
+            if any(
+                (req_tray_info_idx and f.get("tray_info_idx") == req_tray_info_idx)
+                or self._normalize_color_for_compare(f.get("color")) == req_color
+                for f in same_type
+            ):
+                continue
+            if any(self._colors_are_similar(f.get("color"), req.get("color")) for f in same_type):
+                cost += ASSIGN_COST_SIMILAR_COLOR
+                continue
+            swaps += 1
+            cost += ASSIGN_COST_WRONG_COLOR if same_type else ASSIGN_COST_MISSING_TYPE
+        return cost, swaps
+
     async def _find_idle_printer_for_model(
         self,
         db: AsyncSession,
@@ -233,6 +554,7 @@ class PrintScheduler:
         exclude_ids: set[int],
         required_filament_types: list[str] | None = None,
         target_location: str | None = None,
+        only_ids: set[int] | None = None,
     ) -> tuple[int | None, str | None]:
         """Find an idle, connected printer matching the model with compatible filaments.
 
@@ -243,6 +565,7 @@ class PrintScheduler:
             required_filament_types: Optional list of filament types needed (e.g., ["PLA", "PETG"])
                                      If provided, only printers with all required types loaded will match.
             target_location: Optional location filter. If provided, only printers in this location are considered.
+            only_ids: Optional printer IDs to restrict the search to (partial queue passes).
 
         Returns:
             Tuple of (printer_id, waiting_reason):
@@ -261,6 +584,9 @@ class PrintScheduler:
         if target_location:
             query = query.where(Printer.location == target_location)
 
+        if only_ids is not None:
+            query = query.where(Printer.id.in_(only_ids))
+
         result = await db.execute(query)
         printers = list(result.scalars().all())
 
@@ -391,7 +717,10 @@ class PrintScheduler:
         return self._match_filaments_to_slots(filament_reqs, loaded_filaments)
 
     async def _get_filament_requirements(self, db: AsyncSession, item: PrintQueueItem) -> list[dict] | None:
-        """Extract filament requirements from the source 3MF file.
+        """Get filament requirements of the source 3MF file.
+
+        Requirements are parsed once per file content and stored, so this
+        doesn't reopen the 3MF on every queue pass.
 
         Args:
             db: Database session
@@ -400,98 +729,19 @@ class PrintScheduler:
         Returns:
             List of filament requirement dicts with slot_id, type, color, used_grams
         """
-        file_path: Path | None = None
+        filaments = None
+        plate_id = item.plate_id or None
 
         if item.archive_id:
             result = await db.execute(select(PrintArchive).where(PrintArchive.id == item.archive_id))
             archive = result.scalar_one_or_none()
             if archive:
-                file_path = settings.base_dir / archive.file_path
+                filaments = await filament_requirements_for_archive(db, archive, plate_id)
         elif item.library_file_id:
             result = await db.execute(select(LibraryFile).where(LibraryFile.id == item.library_file_id))
             library_file = result.scalar_one_or_none()
             if library_file:
-                lib_path = Path(library_file.file_path)
-                file_path = lib_path if lib_path.is_absolute() else settings.base_dir / library_file.file_path
-
-        if not file_path or not file_path.exists():
-            return None
-
-        filaments = []
-        try:
-            with zipfile.ZipFile(file_path, "r") as zf:
-                if "Metadata/slice_info.config" not in zf.namelist():
-                    return None
-
-                content = zf.read("Metadata/slice_info.config").decode()
-                root = ET.fromstring(content)
-
-                # Check if plate_id is specified - use that plate's filaments
-                plate_id = item.plate_id
-                if plate_id:
-                    for plate_elem in root.findall("./plate"):
-                        plate_index = None
-                        for meta in plate_elem.findall("metadata"):
-                            if meta.get("key") == "index":
-                                plate_index = int(meta.get("value", "0"))
-                                break
-                        if plate_index == plate_id:
-                            for filament_elem in plate_elem.findall("./filament"):
-                                filament_id = filament_elem.get("id")
-                                filament_type = filament_elem.get("type", "")
-                                filament_color = filament_elem.get("color", "")
-                                # tray_info_idx identifies the specific spool selected when slicing
-                                tray_info_idx = filament_elem.get("tray_info_idx", "")
-                                used_g = filament_elem.get("used_g", "0")
-                                try:
-                                    used_grams = float(used_g)
-                                    if used_grams > 0 and filament_id:
-                                        filaments.append(
-                                            {
-                                                "slot_id": int(filament_id),
-                                                "type": filament_type,
-                                                "color": filament_color,
-                                                "tray_info_idx": tray_info_idx,
-                                                "used_grams": round(used_grams, 1),
-                                            }
-                                        )
-                                except (ValueError, TypeError):
-                                    pass  # Skip filament entry with unparseable usage data
-                            break
-                else:
-                    # No plate_id - extract all filaments with used_g > 0
-                    for filament_elem in root.findall("./filament"):
-                        filament_id = filament_elem.get("id")
-                        filament_type = filament_elem.get("type", "")
-                        filament_color = filament_elem.get("color", "")
-                        # tray_info_idx identifies the specific spool selected when slicing
-                        tray_info_idx = filament_elem.get("tray_info_idx", "")
-                        used_g = filament_elem.get("used_g", "0")
-                        try:
-                            used_grams = float(used_g)
-                            if used_grams > 0 and filament_id:
-                                filaments.append(
-                                    {
-                                        "slot_id": int(filament_id),
-                                        "type": filament_type,
-                                        "color": filament_color,
-                                        "tray_info_idx": tray_info_idx,
-                                        "used_grams": round(used_grams, 1),
-                                    }
-                                )
-                        except (ValueError, TypeError):
-                            pass  # Skip filament entry with unparseable usage data
-
-                filaments.sort(key=lambda x: x["slot_id"])
-
-                # Enrich with nozzle mapping for dual-nozzle printers
-                nozzle_mapping = extract_nozzle_mapping_from_3mf(zf)
-                if nozzle_mapping:
-                    for filament in filaments:
-                        filament["nozzle_id"] = nozzle_mapping.get(filament["slot_id"])
-        except Exception as e:
-            logger.warning("Failed to parse filament requirements: %s", e)
-            return None
+                filaments = await filament_requirements_for_library_file(db, library_file, plate_id)
 
         return filaments if filaments else None
 
@@ -1,4 +1,5 @@
 import asyncio
+import json
 import logging
 import traceback
 from collections.abc import Callable
@@ -7,7 +8,19 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.models.printer import Printer
-from backend.app.services.bambu_mqtt import BambuMQTTClient, MQTTLogEntry, PrinterState, get_stage_name
+from backend.app.services.bambu_mqtt import (
+    SECTION_AMS,
+    SECTION_HMS,
+    SECTION_KPROFILES,
+    SECTION_NOZZLES,
+    SECTION_TEMPERATURES,
+    BambuMQTTClient,
+    MQTTLogEntry,
+    PrinterState,
+    get_stage_name,
+)
+from backend.app.services.mqtt_ingest import mqtt_ingest
+from backend.app.services.telemetry import telemetry_store
 
 logger = logging.getLogger(__name__)
 
@@ -187,6 +200,8 @@ class PrinterManager:
         printer_id = printer.id
 
         def on_state_change(state: PrinterState):
+            # Called on the MQTT ingest thread; recording only writes to the telemetry buffer
+            telemetry_store.record(printer_id, state)
             if self._on_status_change:
                 self._schedule_async(self._on_status_change(printer_id, state))
 
@@ -232,6 +247,7 @@ class PrinterManager:
         if printer_id in self._clients:
             self._clients[printer_id].disconnect(timeout=timeout)
             del self._clients[printer_id]
+        status_cache.invalidate(printer_id)
         self._models.pop(printer_id, None)  # Clean up model cache
         self._printer_info.pop(printer_id, None)  # Clean up printer info cache
 
@@ -262,6 +278,10 @@ class PrinterManager:
             result[printer_id] = client.state
         return result
 
+    def get_ingest_stats(self) -> dict[int, dict]:
+        """Get MQTT ingestion metrics (queue depth, parse latency) per printer."""
+        return {printer_id: mqtt_ingest.get_stats(client) for printer_id, client in self._clients.items()}
+
     def is_connected(self, printer_id: int) -> bool:
         """Check if a printer is connected (checks for stale connections)."""
         if printer_id in self._clients:
@@ -505,20 +525,8 @@ def get_derived_status_name(state: PrinterState, model: str | None = None) -> st
     return None
 
 
-def printer_state_to_dict(state: PrinterState, printer_id: int | None = None, model: str | None = None) -> dict:
-    """Convert PrinterState to a JSON-serializable dict.
-
-    Args:
-        state: The printer state to convert
-        printer_id: Optional printer ID for generating cover URLs
-        model: Optional printer model for filtering unsupported features
-    """
-    # Parse AMS data from raw_data
-    ams_units = []
-    vt_tray = []
-    raw_data = state.raw_data or {}
-
-    # Build K-profile lookup map: cali_idx -> k_value
+def _build_kprofile_map(state: PrinterState) -> dict[int, float]:
+    """Build K-profile lookup map: cali_idx -> k_value."""
     kprofile_map: dict[int, float] = {}
     for kp in state.kprofiles or []:
         if kp.slot_id is not None and kp.k_value:
@@ -526,41 +534,55 @@ def printer_state_to_dict(state: PrinterState, printer_id: int | None = None, mo
                 kprofile_map[kp.slot_id] = float(kp.k_value)
             except (ValueError, TypeError):
                 pass  # Skip K-profile entries with unparseable values
+    return kprofile_map
+
+
+def _build_tray(tray: dict, kprofile_map: dict[int, float], default_id: int = 0) -> dict:
+    """Convert a raw AMS/external tray to its API form."""
+    tag_uid = tray.get("tag_uid")
+    if tag_uid in ("", "0000000000000000"):
+        tag_uid = None
+    tray_uuid = tray.get("tray_uuid")
+    if tray_uuid in ("", "00000000000000000000000000000000"):
+        tray_uuid = None
+
+    # Get K value: first try tray's k field, then lookup from K-profiles
+    k_value = tray.get("k")
+    cali_idx = tray.get("cali_idx")
+    if k_value is None and cali_idx is not None and cali_idx in kprofile_map:
+        k_value = kprofile_map[cali_idx]
+
+    return {
+        "id": int(tray.get("id", default_id)),
+        "tray_color": tray.get("tray_color"),
+        "tray_type": tray.get("tray_type"),
+        "tray_sub_brands": tray.get("tray_sub_brands"),
+        "tray_id_name": tray.get("tray_id_name"),
+        "tray_info_idx": tray.get("tray_info_idx"),
+        "remain": tray.get("remain", 0),
+        "k": k_value,
+        "cali_idx": cali_idx,
+        "tag_uid": tag_uid,
+        "tray_uuid": tray_uuid,
+        "nozzle_temp_min": tray.get("nozzle_temp_min"),
+        "nozzle_temp_max": tray.get("nozzle_temp_max"),
+    }
+
 
-    if "ams" in raw_data and isinstance(raw_data["ams"], list):
+def _build_ams_section(state: PrinterState) -> dict:
+    """Derive AMS units, external spools and the AMS extruder map from raw_data."""
+    raw_data = state.raw_data or {}
+    kprofile_map = _build_kprofile_map(state)
+
+    ams_units = []
+    ams_exists = "ams" in raw_data and isinstance(raw_data["ams"], list)
+    if ams_exists:
         for ams_data in raw_data["ams"]:
-            trays = []
-            for tray in ams_data.get("tray", []):
-                tag_uid = tray.get("tag_uid")
-                if tag_uid in ("", "0000000000000000"):
-                    tag_uid = None
-                tray_uuid = tray.get("tray_uuid")
-                if tray_uuid in ("", "00000000000000000000000000000000"):
-                    tray_uuid = None
-
-                # Get K value: first try tray's k field, then lookup from K-profiles
-                k_value = tray.get("k")
-                cali_idx = tray.get("cali_idx")
-                if k_value is None and cali_idx is not None and cali_idx in kprofile_map:
-                    k_value = kprofile_map[cali_idx]
-
-                trays.append(
-                    {
-                        "id": int(tray.get("id", 0)),
-                        "tray_color": tray.get("tray_color"),
-                        "tray_type": tray.get("tray_type"),
-                        "tray_sub_brands": tray.get("tray_sub_brands"),
-                        "tray_id_name": tray.get("tray_id_name"),
-                        "tray_info_idx": tray.get("tray_info_idx"),
-                        "remain": tray.get("remain", 0),
-                        "k": k_value,
-                        "cali_idx": cali_idx,
-                        "tag_uid": tag_uid,
-                        "tray_uuid": tray_uuid,
-                        "nozzle_temp_min": tray.get("nozzle_temp_min"),
-                        "nozzle_temp_max": tray.get("nozzle_temp_max"),
-                    }
-                )
+            # Skip if ams_data is not a dict (defensive check)
+            if not isinstance(ams_data, dict):
+                continue
+            trays = [_build_tray(tray, kprofile_map) for tray in ams_data.get("tray", [])]
+
             # Prefer humidity_raw (actual percentage) over humidity (index 1-5)
             humidity_raw = ams_data.get("humidity_raw")
             humidity_idx = ams_data.get("humidity")
@@ -592,51 +614,138 @@ def printer_state_to_dict(state: PrinterState, printer_id: int | None = None, mo
             )
 
     # Parse virtual tray (external spool) — now a list
-    if "vt_tray" in raw_data:
-        for vt_data in raw_data["vt_tray"]:
-            vt_tag_uid = vt_data.get("tag_uid")
-            if vt_tag_uid in ("", "0000000000000000"):
-                vt_tag_uid = None
-            vt_tray_uuid = vt_data.get("tray_uuid")
-            if vt_tray_uuid in ("", "00000000000000000000000000000000"):
-                vt_tray_uuid = None
-
-            # Get K value for vt_tray
-            vt_k_value = vt_data.get("k")
-            vt_cali_idx = vt_data.get("cali_idx")
-            if vt_k_value is None and vt_cali_idx is not None and vt_cali_idx in kprofile_map:
-                vt_k_value = kprofile_map[vt_cali_idx]
-
-            tray_id = int(vt_data.get("id", 254))
-            vt_tray.append(
-                {
-                    "id": tray_id,
-                    "tray_color": vt_data.get("tray_color"),
-                    "tray_type": vt_data.get("tray_type"),
-                    "tray_sub_brands": vt_data.get("tray_sub_brands"),
-                    "tray_id_name": vt_data.get("tray_id_name"),
-                    "tray_info_idx": vt_data.get("tray_info_idx"),
-                    "remain": vt_data.get("remain", 0),
-                    "k": vt_k_value,
-                    "cali_idx": vt_cali_idx,
-                    "tag_uid": vt_tag_uid,
-                    "tray_uuid": vt_tray_uuid,
-                    "nozzle_temp_min": vt_data.get("nozzle_temp_min"),
-                    "nozzle_temp_max": vt_data.get("nozzle_temp_max"),
-                }
-            )
+    vt_tray = [_build_tray(vt_data, kprofile_map, default_id=254) for vt_data in raw_data.get("vt_tray") or []]
+
+    return {
+        "ams": ams_units,
+        "ams_exists": ams_exists,
+        "vt_tray": vt_tray,
+        # Get ams_extruder_map from raw_data (populated by MQTT handler from AMS info field)
+        "ams_extruder_map": raw_data.get("ams_extruder_map", {}),
+    }
+
+
+def _build_hms_section(state: PrinterState) -> list[dict]:
+    return [
+        {"code": e.code, "attr": e.attr, "module": e.module, "severity": e.severity} for e in (state.hms_errors or [])
+    ]
+
+
+def _build_nozzle_rack_section(state: PrinterState) -> list[dict]:
+    # H2C nozzle rack (tool-changer dock positions)
+    # Map raw MQTT field names (type/diameter) to schema names (nozzle_type/nozzle_diameter)
+    return [
+        {
+            "id": n.get("id", 0),
+            "nozzle_type": n.get("type", ""),
+            "nozzle_diameter": n.get("diameter", ""),
+            "wear": n.get("wear"),
+            "stat": n.get("stat"),
+            "max_temp": n.get("max_temp", 0),
+            "serial_number": n.get("serial_number", ""),
+            "filament_color": n.get("filament_color", ""),
+            "filament_id": n.get("filament_id", ""),
+            "filament_type": n.get("filament_type", ""),
+        }
+        for n in (state.nozzle_rack or [])
+    ]
 
-    # Get ams_extruder_map from raw_data (populated by MQTT handler from AMS info field)
-    ams_extruder_map = raw_data.get("ams_extruder_map", {})
 
+def _build_temperatures_section(state: PrinterState, model: str | None) -> dict:
     # Filter out chamber temp for models that don't have a real sensor
     # P1P, P1S, A1, A1Mini report meaningless chamber_temper values
-    temperatures = state.temperatures
+    temperatures = dict(state.temperatures)
     if not supports_chamber_temp(model):
-        temperatures = {
-            k: v for k, v in temperatures.items() if k not in ("chamber", "chamber_target", "chamber_heating")
-        }
+        for key in ("chamber", "chamber_target", "chamber_heating"):
+            temperatures.pop(key, None)
+    return temperatures
+
+
+# Derived status sections: name -> (state sections it depends on, builder)
+_STATUS_SECTIONS: dict[str, tuple[tuple[str, ...], Callable[[PrinterState, str | None], object]]] = {
+    "ams": ((SECTION_AMS, SECTION_KPROFILES), lambda state, _model: _build_ams_section(state)),
+    "hms_errors": ((SECTION_HMS,), lambda state, _model: _build_hms_section(state)),
+    "nozzle_rack": ((SECTION_NOZZLES,), lambda state, _model: _build_nozzle_rack_section(state)),
+    "temperatures": ((SECTION_TEMPERATURES,), _build_temperatures_section),
+}
+
+
+class _CachedStatus:
+    def __init__(self, state: PrinterState, model: str | None):
+        self.state = state
+        self.model = model
+        self.version = -1
+        self.result: dict | None = None
+        self.encoded: bytes | None = None
+        # Section name -> (versions of the state sections it was built from, value)
+        self.sections: dict[str, tuple[tuple[int, ...], object]] = {}
+
 
+class PrinterStatusCache:
+    """Memoizes printer status snapshots per printer and state version.
+
+    Each derived section (AMS trays, HMS errors, nozzle rack, temperatures) is
+    cached against the versions of the state sections it is built from, so a
+    temperature tick doesn't re-derive AMS trays. The assembled snapshot and its
+    JSON encoding are cached for the state's current version and shared by every
+    caller until the state changes.
+
+    Cached values are shared, so callers must not mutate them.
+    """
+
+    def __init__(self):
+        self._entries: dict[int, _CachedStatus] = {}
+
+    def _entry(self, printer_id: int, state: PrinterState, model: str | None) -> _CachedStatus:
+        entry = self._entries.get(printer_id)
+        if entry is None or entry.state is not state or entry.model != model:
+            entry = _CachedStatus(state, model)
+            self._entries[printer_id] = entry
+        return entry
+
+    def get_section(self, state: PrinterState, printer_id: int, model: str | None, name: str):
+        """Return a derived section, rebuilding it only if its state sections changed."""
+        entry = self._entry(printer_id, state, model)
+        state.commit()
+        return self._section(entry, name)
+
+    def _section(self, entry: _CachedStatus, name: str):
+        depends_on, builder = _STATUS_SECTIONS[name]
+        key = tuple(entry.state.section_version(section) for section in depends_on)
+        cached = entry.sections.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = builder(entry.state, entry.model)
+        entry.sections[name] = (key, value)
+        return value
+
+    def to_dict(self, state: PrinterState, printer_id: int, model: str | None) -> dict:
+        entry = self._entry(printer_id, state, model)
+        version = state.commit()
+        if entry.result is None or entry.version != version:
+            entry.result = _assemble_status(state, printer_id, model, lambda name: self._section(entry, name))
+            entry.version = version
+            entry.encoded = None
+        return entry.result
+
+    def to_json(self, state: PrinterState, printer_id: int, model: str | None) -> bytes:
+        result = self.to_dict(state, printer_id, model)
+        entry = self._entries[printer_id]
+        if entry.encoded is None:
+            entry.encoded = json.dumps(result).encode()
+        return entry.encoded
+
+    def invalidate(self, printer_id: int) -> None:
+        self._entries.pop(printer_id, None)
+
+
+def _assemble_status(
+    state: PrinterState,
+    printer_id: int | None,
+    model: str | None,
+    section: Callable[[str], object],
+) -> dict:
+    ams = section("ams")
     result = {
         "connected": state.connected,
         "state": state.state,
@@ -647,20 +756,17 @@ def printer_state_to_dict(state: PrinterState, printer_id: int | None = None, mo
         "remaining_time": state.remaining_time,
         "layer_num": state.layer_num,
         "total_layers": state.total_layers,
-        "temperatures": temperatures,
-        "hms_errors": [
-            {"code": e.code, "attr": e.attr, "module": e.module, "severity": e.severity}
-            for e in (state.hms_errors or [])
-        ],
+        "temperatures": section("temperatures"),
+        "hms_errors": section("hms_errors"),
         # AMS data for filament colors
-        "ams": ams_units if ams_units else None,
-        "vt_tray": vt_tray,
+        "ams": ams["ams"] if ams["ams"] else None,
+        "vt_tray": ams["vt_tray"],
         # AMS status for filament change tracking
         "ams_status_main": state.ams_status_main,
         "ams_status_sub": state.ams_status_sub,
         "tray_now": state.tray_now,
         # Per-AMS extruder map: {ams_id: extruder_id} where 0=right, 1=left
-        "ams_extruder_map": ams_extruder_map,
+        "ams_extruder_map": ams["ams_extruder_map"],
         # WiFi signal strength
         "wifi_signal": state.wifi_signal,
         # Calibration stage tracking
@@ -677,22 +783,7 @@ def printer_state_to_dict(state: PrinterState, printer_id: int | None = None, mo
         "chamber_light": state.chamber_light,
         # Active extruder for dual-nozzle printers (0=right, 1=left)
         "active_extruder": state.active_extruder,
-        # H2C nozzle rack (tool-changer dock positions)
-        # Map raw MQTT field names (type/diameter) to schema names (nozzle_type/nozzle_diameter)
-        "nozzle_rack": [
-            {
-                "id": n.get("id", 0),
-                "nozzle_type": n.get("type", ""),
-                "nozzle_diameter": n.get("diameter", ""),
-                "wear": n.get("wear"),
-                "stat": n.get("stat"),
-                "max_temp": n.get("max_temp", 0),
-                "serial_number": n.get("serial_number", ""),
-                "filament_color": n.get("filament_color", ""),
-                "filament_id": n.get("filament_id", ""),
-            }
-            for n in (state.nozzle_rack or [])
-        ],
+        "nozzle_rack": section("nozzle_rack"),
     }
     # Add cover URL if there's an active print and printer_id is provided
     # Include PAUSE/PAUSED states so skip objects modal can show cover
@@ -703,6 +794,30 @@ def printer_state_to_dict(state: PrinterState, printer_id: int | None = None, mo
     return result
 
 
+def printer_state_to_dict(state: PrinterState, printer_id: int | None = None, model: str | None = None) -> dict:
+    """Convert PrinterState to a JSON-serializable dict.
+
+    Snapshots for a printer_id are memoized per state version (see
+    PrinterStatusCache); the returned dict is shared and must not be mutated.
+
+    Args:
+        state: The printer state to convert
+        printer_id: Optional printer ID for generating cover URLs
+        model: Optional printer model for filtering unsupported features
+    """
+    if printer_id is None:
+        return _assemble_status(state, None, model, lambda name: _STATUS_SECTIONS[name][1](state, model))
+    return status_cache.to_dict(state, printer_id, model)
+
+
+def printer_state_to_json(state: PrinterState, printer_id: int, model: str | None = None) -> bytes:
+    """Return the JSON encoding of printer_state_to_dict, cached per state version."""
+    return status_cache.to_json(state, printer_id, model)
+
+
+status_cache = PrinterStatusCache()
+
+
 # Global printer manager instance
 printer_manager = PrinterManager()
 
@@ -0,0 +1,398 @@
+"""High-resolution printer telemetry history.
+
+Every processed MQTT report calls record() on the ingest worker thread that
+handled it. record() writes the printer's temperatures, fan speeds, speed level,
+progress and layer into a per-printer ring buffer of 1 s samples (a later report
+in the same second replaces the sample). That is a few array writes under a
+lock and never runs on the event loop.
+
+Every TELEMETRY_FLUSH_INTERVAL seconds a worker thread appends the buffered
+samples to disk, rolls each completed minute up into a 1 min bucket and each
+completed quarter hour of those into a 15 min bucket. A tier is stored as one
+file per printer and UTC day of fixed-size little-endian records: the epoch
+second and a float32 per field, and for buckets the sample count and the
+average, minimum and maximum of each field. Appending is a single write,
+reading decodes a day in one pass, and retention deletes whole files.
+
+query() reads the coarsest tier that still has the requested resolution and
+merges its records into evenly spaced buckets.
+"""
+
+import asyncio
+import logging
+import math
+import struct
+import threading
+import time
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from backend.app.core.config import settings
+from backend.app.services.bambu_mqtt import PrinterState
+
+logger = logging.getLogger(__name__)
+
+# Recorded values, in record order
+TELEMETRY_FIELDS: dict[str, Callable[[PrinterState], Any]] = {
+    "nozzle_temp": lambda state: state.temperatures.get("nozzle"),
+    "nozzle_target": lambda state: state.temperatures.get("nozzle_target"),
+    "nozzle_2_temp": lambda state: state.temperatures.get("nozzle_2"),
+    "nozzle_2_target": lambda state: state.temperatures.get("nozzle_2_target"),
+    "bed_temp": lambda state: state.temperatures.get("bed"),
+    "bed_target": lambda state: state.temperatures.get("bed_target"),
+    "chamber_temp": lambda state: state.temperatures.get("chamber"),
+    "part_fan": lambda state: state.cooling_fan_speed,
+    "aux_fan": lambda state: state.big_fan1_speed,
+    "chamber_fan": lambda state: state.big_fan2_speed,
+    "heatbreak_fan": lambda state: state.heatbreak_fan_speed,
+    "speed_level": lambda state: state.speed_level,
+    "progress": lambda state: state.progress,
+    "layer": lambda state: state.layer_num,
+}
+FIELD_COUNT = len(TELEMETRY_FIELDS)
+_FIELD_INDEX = {name: index for index, name in enumerate(TELEMETRY_FIELDS)}
+
+RING_SECONDS = 600  # 1 s samples kept in memory per printer
+TELEMETRY_FLUSH_INTERVAL = 10  # Seconds between flushes to disk
+ROLLUP_DELAY = 2  # Seconds a minute stays open for reports processed late
+TELEMETRY_PRUNE_EVERY = 60 * 60 // TELEMETRY_FLUSH_INTERVAL  # Apply retention about once an hour
+DEFAULT_QUERY_POINTS = 500
+MAX_QUERY_POINTS = 2000
+
+
+@dataclass(frozen=True)
+class Tier:
+    name: str
+    seconds: int
+    retention_days: int
+
+
+RAW_TIER = Tier("1s", 1, 2)
+MINUTE_TIER = Tier("1m", 60, 30)
+QUARTER_TIER = Tier("15m", 15 * 60, 365)
+TIERS = (RAW_TIER, MINUTE_TIER, QUARTER_TIER)
+
+_RAW_RECORD = struct.Struct(f"<I{FIELD_COUNT}f")
+# count, then the averages, minimums and maximums of all fields
+_BUCKET_RECORD = struct.Struct(f"<IH{3 * FIELD_COUNT}f")
+
+# (start, samples, averages, minimums, maximums); a raw sample is a bucket of one
+Bucket = tuple[int, int, tuple[float, ...], tuple[float, ...], tuple[float, ...]]
+
+
+def _number(value: Any) -> float:
+    return float(value) if isinstance(value, int | float) else math.nan
+
+
+def sample_values(state: PrinterState) -> tuple[float, ...]:
+    """Current value of each telemetry field (NaN where the printer doesn't report it)."""
+    return tuple(_number(extract(state)) for extract in TELEMETRY_FIELDS.values())
+
+
+def _merge(start: int, buckets: list[Bucket], indexes: range | list[int] = range(FIELD_COUNT)) -> Bucket:
+    """Combine buckets into one, weighting averages by sample count and skipping missing values."""
+    averages, minimums, maximums = [], [], []
+    for i in indexes:
+        weight = 0
+        total = 0.0
+        low = high = math.nan
+        for _, count, average, minimum, maximum in buckets:
+            if math.isnan(average[i]):
+                continue
+            weight += count
+            total += average[i] * count
+            low = minimum[i] if math.isnan(low) else min(low, minimum[i])
+            high = maximum[i] if math.isnan(high) else max(high, maximum[i])
+        averages.append(total / weight if weight else math.nan)
+        minimums.append(low)
+        maximums.append(high)
+    return start, sum(bucket[1] for bucket in buckets), tuple(averages), tuple(minimums), tuple(maximums)
+
+
+def _group(buckets: list[Bucket], seconds: int) -> dict[int, list[Bucket]]:
+    groups: dict[int, list[Bucket]] = {}
+    for bucket in buckets:
+        groups.setdefault(bucket[0] - bucket[0] % seconds, []).append(bucket)
+    return groups
+
+
+def _day(t: int) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(t))
+
+
+def choose_tier(step: int, start: int, now: int) -> Tier:
+    """Coarsest tier at least as fine as step, or a coarser one if its retention doesn't reach start."""
+    tier = next((t for t in reversed(TIERS) if t.seconds <= step), RAW_TIER)
+    for candidate in TIERS[TIERS.index(tier) :]:
+        if start >= now - candidate.retention_days * 86400:
+            return candidate
+    return TIERS[-1]
+
+
+class _Ring:
+    """Fixed-capacity ring of 1 s samples in flat arrays."""
+
+    def __init__(self, capacity: int = RING_SECONDS):
+        self.capacity = capacity
+        self.times = array("q", [0]) * capacity
+        self.values = array("f", [math.nan]) * (capacity * FIELD_COUNT)
+        self.start = 0
+        self.size = 0
+
+    def _last(self) -> int:
+        return (self.start + self.size - 1) % self.capacity
+
+    def put(self, t: int, values: tuple[float, ...]) -> None:
+        if self.size and t <= self.times[self._last()]:
+            slot = self._last()  # Same second (or a clock step back): replace
+        else:
+            slot = (self.start + self.size) % self.capacity
+            if self.size == self.capacity:
+                self.start = (self.start + 1) % self.capacity
+            else:
+                self.size += 1
+            self.times[slot] = t
+        self.values[slot * FIELD_COUNT : (slot + 1) * FIELD_COUNT] = array("f", values)
+
+    def since(self, after: int) -> list[tuple[int, tuple[float, ...]]]:
+        """Samples newer than the given second, oldest first."""
+        samples = []
+        for i in range(self.size - 1, -1, -1):
+            slot = (self.start + i) % self.capacity
+            t = self.times[slot]
+            if t <= after:
+                break
+            samples.append((t, tuple(self.values[slot * FIELD_COUNT : (slot + 1) * FIELD_COUNT])))
+        samples.reverse()
+        return samples
+
+
+@dataclass
+class _PrinterSeries:
+    ring: _Ring = field(default_factory=_Ring)
+    flushed_until: int = 0  # Last second written to the raw tier
+    rolled_until: int = 0  # Start of the first minute not rolled up yet
+    open_minutes: list[Bucket] = field(default_factory=list)  # Minute buckets of the unfinished quarter
+
+
+@dataclass
+class TelemetrySeries:
+    """Downsampled telemetry of one printer."""
+
+    tier: str
+    resolution: int  # Seconds per point
+    timestamps: list[int]  # Bucket start, Unix seconds
+    series: dict[str, dict[str, list[float | None]]]  # field -> avg/min/max per point
+
+
+class TelemetryStore:
+    """Buffers printer telemetry in memory, stores it in rolled-up tiers and serves range queries."""
+
+    def __init__(self, directory: Path | None = None):
+        self.directory = directory or settings.telemetry_dir
+        self._series: dict[int, _PrinterSeries] = {}
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    def record(self, printer_id: int, state: PrinterState, now: float | None = None) -> None:
+        """Buffer the printer's current values as the sample of this second."""
+        if not state.connected:
+            return
+        values = sample_values(state)
+        t = int(time.time() if now is None else now)
+        with self._lock:
+            series = self._series.get(printer_id)
+            if series is None:
+                series = self._series[printer_id] = _PrinterSeries()
+            series.ring.put(t, values)
+
+    def remove(self, printer_id: int) -> None:
+        """Forget a deleted printer's buffered samples."""
+        with self._lock:
+            self._series.pop(printer_id, None)
+
+    def start(self):
+        """Start the background flush loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+            logger.info("Telemetry store started")
+
+    def stop(self):
+        """Stop the flush loop and write the buffered samples."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+            try:
+                self.flush()
+            except OSError as e:
+                logger.warning("Failed to flush telemetry: %s", e)
+            logger.info("Telemetry store stopped")
+
+    async def _flush_loop(self):
+        flushes = 0
+        while True:
+            await asyncio.sleep(TELEMETRY_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(self.flush)
+                flushes += 1
+                if flushes >= TELEMETRY_PRUNE_EVERY:
+                    flushes = 0
+                    await asyncio.to_thread(self.prune)
+            except Exception as e:
+                logger.warning("Telemetry flush failed: %s", e)
+
+    def _path(self, printer_id: int, tier: Tier, day: str) -> Path:
+        return self.directory / str(printer_id) / tier.name / f"{day}.bin"
+
+    def _append(self, printer_id: int, tier: Tier, records: list[tuple[int, bytes]]) -> None:
+        by_day: dict[str, list[bytes]] = {}
+        for t, record in records:
+            by_day.setdefault(_day(t), []).append(record)
+        for day, chunks in by_day.items():
+            path = self._path(printer_id, tier, day)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("ab") as f:
+                f.write(b"".join(chunks))
+
+    def _append_buckets(self, printer_id: int, tier: Tier, buckets: list[Bucket]) -> None:
+        self._append(
+            printer_id,
+            tier,
+            [(b[0], _BUCKET_RECORD.pack(b[0], min(b[1], 0xFFFF), *b[2], *b[3], *b[4])) for b in buckets],
+        )
+
+    def flush(self, now: float | None = None) -> None:
+        """Write completed seconds to the raw tier and roll up completed minutes and quarters."""
+        now = int(time.time() if now is None else now)
+        with self._lock:
+            pending = {
+                printer_id: (series, series.ring.since(min(series.flushed_until, series.rolled_until - 1)))
+                for printer_id, series in self._series.items()
+            }
+
+        # The current second can still change
+        for printer_id, (series, samples) in pending.items():
+            samples = [sample for sample in samples if sample[0] < now]
+            if not samples:
+                continue
+
+            raw = [(t, _RAW_RECORD.pack(t, *values)) for t, values in samples if t > series.flushed_until]
+            if raw:
+                self._append(printer_id, RAW_TIER, raw)
+                series.flushed_until = raw[-1][0]
+
+            if not series.rolled_until:
+                series.rolled_until = samples[0][0] - samples[0][0] % MINUTE_TIER.seconds
+                # Minutes of this quarter rolled up before a restart still belong in its bucket
+                quarter = series.rolled_until - series.rolled_until % QUARTER_TIER.seconds
+                series.open_minutes = self._read(printer_id, MINUTE_TIER, quarter, series.rolled_until - 1)
+            closed = (now - ROLLUP_DELAY) // MINUTE_TIER.seconds * MINUTE_TIER.seconds
+            if closed <= series.rolled_until:
+                continue
+
+            buckets = [(t, 1, values, values, values) for t, values in samples if series.rolled_until <= t < closed]
+            minutes = [_merge(start, group) for start, group in sorted(_group(buckets, MINUTE_TIER.seconds).items())]
+            self._append_buckets(printer_id, MINUTE_TIER, minutes)
+            series.rolled_until = closed
+
+            series.open_minutes.extend(minutes)
+            quarters = _group(series.open_minutes, QUARTER_TIER.seconds)
+            closed_quarter = closed - closed % QUARTER_TIER.seconds
+            done = sorted(start for start in quarters if start < closed_quarter)
+            self._append_buckets(printer_id, QUARTER_TIER, [_merge(start, quarters[start]) for start in done])
+            series.open_minutes = [bucket for bucket in series.open_minutes if bucket[0] >= closed_quarter]
+
+    def prune(self, now: float | None = None) -> int:
+        """Delete segments older than their tier's retention."""
+        now = int(time.time() if now is None else now)
+        removed = 0
+        if not self.directory.is_dir():
+            return removed
+        for tier in TIERS:
+            oldest = _day(now - tier.retention_days * 86400)
+            for path in self.directory.glob(f"*/{tier.name}/*.bin"):
+                if path.stem < oldest:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        if removed:
+            logger.info("Removed %d expired telemetry segments", removed)
+        return removed
+
+    def _read(self, printer_id: int, tier: Tier, start: int, end: int) -> list[Bucket]:
+        record = _RAW_RECORD if tier is RAW_TIER else _BUCKET_RECORD
+        buckets: list[Bucket] = []
+        for day_start in range(start - start % 86400, end + 1, 86400):
+            path = self._path(printer_id, tier, _day(day_start))
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            # A record still being written is ignored
+            data = data[: len(data) - len(data) % record.size]
+            for fields in record.iter_unpack(data):
+                t = fields[0]
+                if not start <= t <= end:
+                    continue
+                if tier is RAW_TIER:
+                    values = fields[1:]
+                    buckets.append((t, 1, values, values, values))
+                else:
+                    n = FIELD_COUNT
+                    buckets.append((t, fields[1], fields[2 : 2 + n], fields[2 + n : 2 + 2 * n], fields[2 + 2 * n :]))
+        return buckets
+
+    def query(
+        self,
+        printer_id: int,
+        start: float,
+        end: float,
+        fields: list[str] | None = None,
+        max_points: int = DEFAULT_QUERY_POINTS,
+        now: float | None = None,
+    ) -> TelemetrySeries:
+        """Telemetry between start and end (Unix seconds) in at most max_points buckets."""
+        now = int(time.time() if now is None else now)
+        start, end = int(start), int(end)
+        names = fields or list(TELEMETRY_FIELDS)
+        indexes = [_FIELD_INDEX[name] for name in names]
+
+        step = max(1, math.ceil((end - start) / max(1, max_points)))
+        tier = choose_tier(step, start, now)
+        step = math.ceil(step / tier.seconds) * tier.seconds
+
+        if tier is RAW_TIER:
+            # Seconds not on disk yet come from the ring; read the ring first so a
+            # concurrent flush can't make a second appear in both or neither
+            with self._lock:
+                series = self._series.get(printer_id)
+                flushed_until = series.flushed_until if series else now
+                recent = series.ring.since(flushed_until) if series else []
+            buckets = self._read(printer_id, tier, start, min(end, flushed_until))
+            buckets += [(t, 1, values, values, values) for t, values in recent if start <= t <= end]
+        else:
+            buckets = self._read(printer_id, tier, start, end)
+
+        points = [_merge(bucket_start, group, indexes) for bucket_start, group in sorted(_group(buckets, step).items())]
+
+        def column(values: list[float]) -> list[float | None]:
+            return [None if math.isnan(value) else round(value, 2) for value in values]
+
+        return TelemetrySeries(
+            tier=tier.name,
+            resolution=step,
+            timestamps=[point[0] for point in points],
+            series={
+                name: {
+                    "avg": column([point[2][i] for point in points]),
+                    "min": column([point[3][i] for point in points]),
+                    "max": column([point[4][i] for point in points]),
+                }
+                for i, name in enumerate(names)
+            },
+        )
+
+
+telemetry_store = TelemetryStore()
@@ -0,0 +1,80 @@
+"""Minimum-cost bipartite assignment (Hungarian algorithm)."""
+
+
+def min_cost_assignment(cost: list[list[float | None]]) -> list[tuple[int, int]]:
+    """Match rows to columns so as many rows as possible are matched at the lowest total cost.
+
+    The matrix may be rectangular. A cost of None marks a pair that must not be
+    matched. Among all matchings with the most allowed pairs, the one with the
+    lowest summed cost is returned.
+
+    Returns:
+        List of (row, column) pairs, sorted by row.
+    """
+    rows = len(cost)
+    cols = len(cost[0]) if rows else 0
+    if not rows or not cols:
+        return []
+
+    # Forbidden pairs get a cost larger than any sum of allowed costs, so each one
+    # the solver is forced to use outweighs everything else, then they are dropped.
+    allowed_total = sum(abs(c) for row in cost for c in row if c is not None)
+    forbidden = allowed_total + 1.0
+
+    transposed = rows > cols
+    if transposed:
+        matrix = [[cost[r][c] for r in range(rows)] for c in range(cols)]
+        n, m = cols, rows
+    else:
+        matrix = cost
+        n, m = rows, cols
+    a = [[forbidden if c is None else float(c) for c in row] for row in matrix]
+
+    # Shortest augmenting path with potentials (1-indexed; column 0 is a sentinel)
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    match = [0] * (m + 1)  # column -> row
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = match[j0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = a[i0 - 1][j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+
+    pairs = []
+    for j in range(1, m + 1):
+        i = match[j]
+        if not i:
+            continue
+        row, col = (j - 1, i - 1) if transposed else (i - 1, j - 1)
+        if cost[row][col] is not None:
+            pairs.append((row, col))
+    return sorted(pairs)
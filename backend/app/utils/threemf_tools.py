@@ -396,3 +396,82 @@ def extract_filament_usage_from_3mf(file_path: Path, plate_id: int | None = None
         pass  # Return whatever usage data was collected before the error
 
     return filament_usage
+
+
+def _parse_required_filament(filament_elem) -> dict | None:
+    """Parse a <filament> element of slice_info.config, or None if it is unused."""
+    filament_id = filament_elem.get("id")
+    try:
+        used_grams = float(filament_elem.get("used_g", "0"))
+    except (ValueError, TypeError):
+        used_grams = 0
+    if used_grams <= 0 or not filament_id:
+        return None
+
+    used_m = filament_elem.get("used_m", "0")
+    try:
+        used_meters = float(used_m) if used_m else 0
+    except ValueError:
+        used_meters = 0
+
+    return {
+        "slot_id": int(filament_id),
+        "type": filament_elem.get("type", ""),
+        "color": filament_elem.get("color", ""),
+        "used_grams": round(used_grams, 1),
+        "used_meters": used_meters,
+        "tray_info_idx": filament_elem.get("tray_info_idx", ""),
+    }
+
+
+def extract_filament_requirements_from_3mf(zf: zipfile.ZipFile) -> dict:
+    """Extract the filaments a 3MF needs, for the whole file and for each plate.
+
+    Only filaments with usage are included. On dual-nozzle files each filament
+    also gets the nozzle_id it was sliced for.
+
+    Args:
+        zf: An open ZipFile of the 3MF archive
+
+    Returns:
+        {"all": [...], "plates": {"1": [...], ...}} with each list sorted by slot_id.
+        Filament dicts have slot_id, type, color, used_grams, used_meters and tray_info_idx.
+    """
+    all_filaments: list[dict] = []
+    plates: dict[str, list[dict]] = {}
+
+    if "Metadata/slice_info.config" in zf.namelist():
+        root = ET.fromstring(zf.read("Metadata/slice_info.config").decode())
+
+        for filament_elem in root.findall(".//filament"):
+            filament = _parse_required_filament(filament_elem)
+            if filament:
+                all_filaments.append(filament)
+
+        for plate_elem in root.findall(".//plate"):
+            plate_index = None
+            for meta in plate_elem.findall("metadata"):
+                if meta.get("key") == "index":
+                    try:
+                        plate_index = int(meta.get("value", "0"))
+                    except ValueError:
+                        pass  # Skip plate with non-numeric index metadata
+                    break
+            if plate_index is None or str(plate_index) in plates:
+                continue
+            plate_filaments = []
+            for filament_elem in plate_elem.findall("filament"):
+                filament = _parse_required_filament(filament_elem)
+                if filament:
+                    plate_filaments.append(filament)
+            plates[str(plate_index)] = plate_filaments
+
+    # Enrich with nozzle mapping for dual-nozzle printers
+    nozzle_mapping = extract_nozzle_mapping_from_3mf(zf)
+    for filaments in [all_filaments, *plates.values()]:
+        filaments.sort(key=lambda x: x["slot_id"])
+        if nozzle_mapping:
+            for filament in filaments:
+                filament["nozzle_id"] = nozzle_mapping.get(filament["slot_id"])
+
+    return {"all": all_filaments, "plates": plates}
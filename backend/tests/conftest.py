@@ -30,16 +30,28 @@ settings.log_to_file = False
 _test_plate_cal_dir = Path(tempfile.mkdtemp(prefix="bambuddy_test_plate_cal_"))
 settings.plate_calibration_dir = _test_plate_cal_dir
 
+# Use a temp data directory so archives, library files and blobs written by tests
+# don't end up in the working tree
+_test_data_dir = Path(tempfile.mkdtemp(prefix="bambuddy_test_data_"))
+settings.base_dir = _test_data_dir
+settings.archive_dir = _test_data_dir / "archive"
+settings.blob_dir = _test_data_dir / "blobs"
+settings.telemetry_dir = _test_data_dir / "telemetry"
 
-# Clean up temp directory when tests finish
-def _cleanup_test_plate_cal_dir():
-    if _test_plate_cal_dir.exists():
-        shutil.rmtree(_test_plate_cal_dir, ignore_errors=True)
 
+# Clean up temp directories when tests finish
+def _cleanup_test_dirs():
+    for path in (_test_plate_cal_dir, _test_data_dir):
+        if path.exists():
+            shutil.rmtree(path, ignore_errors=True)
 
-atexit.register(_cleanup_test_plate_cal_dir)
+
+atexit.register(_cleanup_test_dirs)
 
 from backend.app.core.database import Base  # noqa: E402
+from backend.app.services.archive_duplicates import install_archive_duplicates  # noqa: E402
+from backend.app.services.archive_search import install_archive_search  # noqa: E402
+from backend.app.services.archive_stats import install_archive_stats  # noqa: E402
 
 # Use in-memory SQLite for tests
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
@@ -63,8 +75,12 @@ async def test_engine():
         ams_history,
         api_key,
         archive,
+        archive_duplicate,
+        archive_stats,
+        energy_reading,
         external_link,
         filament,
+        filament_requirements,
         group,
         kprofile_note,
         maintenance,
@@ -80,6 +96,9 @@ async def test_engine():
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await install_archive_search(conn)
+        await install_archive_stats(conn)
+        await install_archive_duplicates(conn)
 
     yield engine
 
@@ -99,6 +118,7 @@ async def db_session(test_engine) -> AsyncGenerator[AsyncSession, None]:
 @pytest.fixture
 async def async_client(test_engine, db_session) -> AsyncGenerator[AsyncClient, None]:
     """Create an async test client."""
+    from backend.app.core.auth import invalidate_auth_cache
     from backend.app.core.database import async_session, get_db
     from backend.app.main import app
 
@@ -111,6 +131,9 @@ async def async_client(test_engine, db_session) -> AsyncGenerator[AsyncClient, N
 
     app.dependency_overrides[get_db] = override_get_db
 
+    # Auth caches are process-wide, but every test gets a fresh database
+    invalidate_auth_cache()
+
     # Mock init_printer_connections to prevent MQTT connection attempts during tests
     async def mock_init_printer_connections(db):
         pass  # No-op - don't connect to real printers
@@ -422,6 +422,32 @@ class TestForgotPasswordAPI:
         )
         assert login_resp.status_code == 401
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_forgot_password_old_password_rejected_immediately(self, async_client: AsyncClient, admin_token: str):
+        """After forgot-password, a signed-in user's cached old password no longer verifies."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        user_token = await _create_regular_user(async_client, admin_token, "cachedforgot", "originalpass123")
+        user_id = (await async_client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {user_token}"})).json()[
+            "id"
+        ]
+        await async_client.patch(f"/api/v1/users/{user_id}", headers=headers, json={"email": "cached@test.com"})
+        with patch("backend.app.api.routes.users.send_email"):
+            await _setup_smtp_and_advanced_auth(async_client, admin_token)
+        user_headers = {"Authorization": f"Bearer {user_token}"}
+        # Caches the user with the original password hash
+        assert (await async_client.get("/api/v1/auth/me", headers=user_headers)).status_code == 200
+
+        with patch("backend.app.api.routes.auth.send_email"):
+            await async_client.post("/api/v1/auth/forgot-password", json={"email": "cached@test.com"})
+
+        response = await async_client.post(
+            "/api/v1/users/me/change-password",
+            headers=user_headers,
+            json={"current_password": "originalpass123", "new_password": "chosenpass123"},
+        )
+        assert response.status_code == 400
+
 
 class TestAdminResetPasswordAPI:
     """Integration tests for admin password reset endpoint."""
@@ -532,6 +558,35 @@ class TestAdminResetPasswordAPI:
         assert response.status_code == 400
         assert "email" in response.json()["detail"].lower()
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_reset_password_old_password_rejected_immediately(self, async_client: AsyncClient, admin_token: str):
+        """After an admin reset, a signed-in user's cached old password no longer verifies."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        user_token = await _create_regular_user(async_client, admin_token, "cachedreset", "originalpass123")
+        user_id = (await async_client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {user_token}"})).json()[
+            "id"
+        ]
+        await async_client.patch(f"/api/v1/users/{user_id}", headers=headers, json={"email": "cachedreset@test.com"})
+        with patch("backend.app.api.routes.users.send_email"):
+            await _setup_smtp_and_advanced_auth(async_client, admin_token)
+        user_headers = {"Authorization": f"Bearer {user_token}"}
+        # Caches the user with the original password hash
+        assert (await async_client.get("/api/v1/auth/me", headers=user_headers)).status_code == 200
+
+        with patch("backend.app.api.routes.auth.send_email"):
+            response = await async_client.post(
+                "/api/v1/auth/reset-password", headers=headers, json={"user_id": user_id}
+            )
+        assert response.status_code == 200
+
+        response = await async_client.post(
+            "/api/v1/users/me/change-password",
+            headers=user_headers,
+            json={"current_password": "originalpass123", "new_password": "chosenpass123"},
+        )
+        assert response.status_code == 400
+
 
 class TestUserCreationAdvancedAuth:
     """Integration tests for user creation with advanced auth enabled."""
@@ -3,6 +3,8 @@
 Tests the full request/response cycle for /api/v1/archives/ endpoints.
 """
 
+from datetime import datetime
+
 import pytest
 from httpx import AsyncClient
 
@@ -61,6 +63,72 @@ class TestArchivesAPI:
         assert isinstance(data, list)
         assert len(data) == 2
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_list_archives_cursor_pages(
+        self, async_client: AsyncClient, archive_factory, printer_factory, db_session
+    ):
+        """Verify following X-Next-Cursor visits every archive once, newest first."""
+        printer = await printer_factory()
+        # Explicit timestamps are stored with microseconds, server defaults without
+        older = [await archive_factory(printer.id, created_at=datetime(2024, 1, 1, 12, 0)) for _ in range(2)]
+        newer = [await archive_factory(printer.id) for _ in range(3)]
+
+        ids, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = await async_client.get("/api/v1/archives/", params=params)
+            assert response.status_code == 200
+            assert response.headers["X-Total-Count"] == "5"
+            ids += [a["id"] for a in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert ids == [a.id for a in reversed(newer)] + [a.id for a in reversed(older)]
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_list_archives_sparse_fields(
+        self, async_client: AsyncClient, archive_factory, printer_factory, db_session
+    ):
+        """Verify fields= returns only the requested fields, including computed ones."""
+        printer = await printer_factory()
+        await archive_factory(printer.id, extra_data={"printable_objects": {"1": "a", "2": "b"}})
+
+        response = await async_client.get("/api/v1/archives/", params={"fields": "id,object_count,duplicate_count"})
+
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "1"
+        [archive] = response.json()
+        assert set(archive) == {"id", "object_count", "duplicate_count"}
+        assert archive["object_count"] == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    @pytest.mark.parametrize("params", [{"fields": "id,secret"}, {"cursor": "not-a-cursor"}])
+    async def test_list_archives_rejects_bad_params(self, async_client: AsyncClient, params):
+        """Verify unknown fields and malformed cursors are rejected."""
+        response = await async_client.get("/api/v1/archives/", params=params)
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_list_archives_marks_duplicates(
+        self, async_client: AsyncClient, archive_factory, printer_factory, db_session
+    ):
+        """Verify archives sharing a name (ignoring case) are marked as duplicates."""
+        printer = await printer_factory()
+        await archive_factory(printer.id, print_name="Benchy")
+        await archive_factory(printer.id, print_name="BENCHY")
+        await archive_factory(printer.id, print_name="Cube")
+
+        response = await async_client.get("/api/v1/archives/")
+
+        assert response.status_code == 200
+        counts = {a["print_name"]: a["duplicate_count"] for a in response.json()}
+        assert counts == {"Benchy": 1, "BENCHY": 1, "Cube": 0}
+
     @pytest.mark.asyncio
     @pytest.mark.integration
     async def test_list_archives_filter_by_printer(
@@ -196,6 +264,49 @@ class TestArchivesAPI:
 
         assert response.status_code == 404
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_search_filtered_pages(self, async_client: AsyncClient, archive_factory, printer_factory):
+        """Verify filtered search pages via the cursor header, with highlighted snippets."""
+        printer = await printer_factory()
+        other = await printer_factory(name="Other")
+        for i in range(5):
+            await archive_factory(printer.id, print_name=f"Voron part {i}")
+            await archive_factory(other.id, print_name=f"Voron part {i}")
+
+        ids = []
+        params = {"q": "vor", "printer_id": printer.id, "limit": 2}
+        for _ in range(3):
+            response = await async_client.get("/api/v1/archives/search", params=params)
+            assert response.status_code == 200
+            results = response.json()
+            assert all(r["printer_id"] == printer.id for r in results)
+            assert all("<mark>Voron</mark>" in r["search_snippet"] for r in results)
+            ids.extend(r["id"] for r in results)
+            params["cursor"] = response.headers.get("X-Next-Cursor")
+
+        assert len(set(ids)) == 5
+        assert params["cursor"] is None
+
+        response = await async_client.get("/api/v1/archives/search", params={"q": "vor", "cursor": "bad"})
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_export_streams_csv(self, async_client: AsyncClient, archive_factory, printer_factory):
+        """Verify the export endpoint streams a CSV download."""
+        printer = await printer_factory()
+        await archive_factory(printer.id, print_name="Exported Part")
+
+        response = await async_client.get("/api/v1/archives/export", params={"fields": "id,print_name"})
+
+        assert response.status_code == 200
+        assert "attachment" in response.headers["content-disposition"]
+        assert response.text.splitlines()[1].endswith(",Exported Part")
+
+        response = await async_client.get("/api/v1/archives/export", params={"format": "xlsx", "gzip": True})
+        assert response.status_code == 400
+
     # ========================================================================
     # Statistics endpoints
     # ========================================================================
@@ -226,6 +337,54 @@ class TestArchivesAPI:
         assert "total_prints" in result
         assert "successful_prints" in result
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_stats_follow_archive_changes(
+        self, async_client: AsyncClient, archive_factory, printer_factory, db_session
+    ):
+        """Verify stats reflect archive updates and deletes, and survive a rebuild."""
+        printer = await printer_factory()
+        kept = await archive_factory(printer.id, status="completed", filament_used_grams=50.0)
+        removed = await archive_factory(printer.id, status="completed", filament_used_grams=100.0)
+        kept.status = "failed"
+        await db_session.commit()
+        await async_client.delete(f"/api/v1/archives/{removed.id}")
+
+        result = (await async_client.get("/api/v1/archives/stats")).json()
+        assert result["total_prints"] == 1
+        assert result["failed_prints"] == 1
+        assert result["total_filament_grams"] == 50.0
+        assert result["prints_by_printer"] == {str(printer.id): 1}
+
+        response = await async_client.post("/api/v1/archives/stats/rebuild")
+        assert response.status_code == 200
+        assert (await async_client.get("/api/v1/archives/stats")).json() == result
+
+        daily = (await async_client.get("/api/v1/archives/stats/daily")).json()
+        assert [day["total_prints"] for day in daily] == [1]
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_stats_total_energy_from_cached_samples(
+        self, async_client: AsyncClient, smart_plug_factory, mock_tasmota_service
+    ):
+        """Verify total-mode energy comes from the sampler cache without querying plugs."""
+        from datetime import datetime
+
+        from backend.app.services.energy_sampler import EnergySample, energy_sampler
+
+        plug = await smart_plug_factory()
+        energy_sampler._latest[plug.id] = EnergySample(plug.id, 150.0, 2.0, 42.0, datetime.utcnow())
+        try:
+            result = (await async_client.get("/api/v1/archives/stats")).json()
+        finally:
+            energy_sampler.clear()
+
+        mock_tasmota_service.get_energy.assert_not_called()
+        assert result["total_energy_kwh"] == 42.0
+        assert result["energy_sampled_at"] is not None
+        assert result["energy_stale"] is False
+
 
 class TestArchiveDataIntegrity:
     """Tests for archive data integrity."""
@@ -3,6 +3,7 @@
 Tests the full request/response cycle for /api/v1/printers/{id}/camera/ endpoints.
 """
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -100,6 +101,72 @@ class TestCameraAPI:
         mock_process1.terminate.assert_called_once()
         mock_process2.terminate.assert_not_called()
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_stop_camera_stream_keeps_shared_stream_with_viewers(
+        self, async_client: AsyncClient, printer_factory
+    ):
+        """Verify stop detaches only the leaving viewer while others still watch the shared upstream."""
+        from backend.app.api.routes.camera import camera_hub_manager
+
+        printer = await printer_factory()
+
+        mock_process = MagicMock()
+        mock_process.returncode = None
+        mock_process.terminate = MagicMock()
+
+        async def source(fps: int):
+            await asyncio.Event().wait()
+            yield b""  # pragma: no cover - makes this an async generator
+
+        hub = await camera_hub_manager.acquire(printer.id, source, 5)
+        leaving = hub.subscribe(5, viewer_id="tab")
+        staying = hub.subscribe(5, viewer_id="other")
+        try:
+            with patch("backend.app.api.routes.camera._active_streams", {f"{printer.id}-abc123": mock_process}):
+                response = await async_client.post(f"/api/v1/printers/{printer.id}/camera/stop?viewer=tab")
+
+            assert response.status_code == 200
+            assert response.json()["stopped"] == 1
+            assert leaving.closed
+            assert not staying.closed
+            assert camera_hub_manager.get_subscriber_count(printer.id) == 1
+            mock_process.terminate.assert_not_called()
+        finally:
+            await hub.stop()
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_replaced_upstream_keeps_new_stream_status(self, async_client: AsyncClient, printer_factory):
+        """Verify an upstream ending after its replacement started doesn't clear the new one's frames."""
+        from backend.app.api.routes.camera import iter_chamber_frames
+
+        printer = await printer_factory()
+        writer = MagicMock()
+        writer.wait_closed = AsyncMock()
+
+        with (
+            patch(
+                "backend.app.api.routes.camera.generate_chamber_image_stream",
+                AsyncMock(return_value=(MagicMock(), writer)),
+            ),
+            patch("backend.app.api.routes.camera.read_next_chamber_frame", AsyncMock(return_value=b"jpeg")),
+        ):
+            old = iter_chamber_frames("10.0.0.1", "code", "P1S", stream_id=f"{printer.id}-old", printer_id=printer.id)
+            await anext(old)
+            new = iter_chamber_frames("10.0.0.1", "code", "P1S", stream_id=f"{printer.id}-new", printer_id=printer.id)
+            await anext(new)
+
+            await old.aclose()
+            status = (await async_client.get(f"/api/v1/printers/{printer.id}/camera/status")).json()
+            assert status["active"] is True
+            assert status["stream_uptime"] is not None
+
+            await new.aclose()
+            status = (await async_client.get(f"/api/v1/printers/{printer.id}/camera/status")).json()
+            assert status["active"] is False
+            assert status["stream_uptime"] is None
+
     # ========================================================================
     # Camera Test Endpoint
     # ========================================================================
@@ -181,6 +181,40 @@ class TestLibraryFilesAPI:
         assert len(result) == 1
         assert result[0]["id"] == file1.id
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_list_files_cursor_pages(self, async_client: AsyncClient, folder_factory, file_factory, db_session):
+        """Verify a folder can be paged in filename order, including repeated filenames."""
+        folder = await folder_factory()
+        files = [
+            await file_factory(folder_id=folder.id, filename=name) for name in ["c.3mf", "a.3mf", "b.3mf", "a.3mf"]
+        ]
+
+        ids, cursor = [], None
+        while True:
+            params = {"folder_id": folder.id, "limit": 3, **({"cursor": cursor} if cursor else {})}
+            response = await async_client.get("/api/v1/library/files", params=params)
+            assert response.status_code == 200
+            assert response.headers["X-Total-Count"] == "4"
+            ids += [f["id"] for f in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert ids == [files[1].id, files[3].id, files[2].id, files[0].id]
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_list_files_sparse_fields(self, async_client: AsyncClient, file_factory, db_session):
+        """Verify fields= returns only the requested fields."""
+        lib_file = await file_factory(filename="benchy.3mf")
+
+        response = await async_client.get("/api/v1/library/files", params={"fields": "id,filename"})
+
+        assert response.status_code == 200
+        assert response.json() == [{"id": lib_file.id, "filename": "benchy.3mf"}]
+        assert (await async_client.get("/api/v1/library/files", params={"fields": "nope"})).status_code == 400
+
     @pytest.mark.asyncio
     @pytest.mark.integration
     async def test_get_file(self, async_client: AsyncClient, file_factory, db_session):
@@ -113,6 +113,27 @@ class TestMetricsAPI:
         assert "bambuddy_printers_total" in content
         assert "bambuddy_printers_connected" in content
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_metrics_smart_plug_energy(self, async_client: AsyncClient, smart_plug_factory):
+        """Verify cached smart plug samples are exported with their age."""
+        from datetime import datetime
+
+        from backend.app.services.energy_sampler import EnergySample, energy_sampler
+
+        await async_client.put("/api/v1/settings/", json={"prometheus_enabled": True, "prometheus_token": ""})
+        plug = await smart_plug_factory(name="Printer Plug")
+        energy_sampler._latest[plug.id] = EnergySample(plug.id, 150.0, 2.0, 42.0, datetime.utcnow())
+        try:
+            content = (await async_client.get("/api/v1/metrics")).text
+        finally:
+            energy_sampler.clear()
+
+        labels = f'{{plug_id="{plug.id}",plug_name="Printer Plug"}}'
+        assert f"bambuddy_smart_plug_power_watts{labels} 150.000" in content
+        assert f"bambuddy_smart_plug_energy_total_kwh{labels} 42.000" in content
+        assert f"bambuddy_smart_plug_sample_age_seconds{labels}" in content
+
     # ========================================================================
     # Settings persistence
     # ========================================================================
@@ -106,6 +106,14 @@ class TestPrintQueueAPI:
         assert response.status_code == 200
         assert isinstance(response.json(), list)
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_get_last_assignment(self, async_client: AsyncClient):
+        """Verify the last model-based assignment is exposed for debugging."""
+        response = await async_client.get("/api/v1/queue/assignment")
+        assert response.status_code == 200
+        assert isinstance(response.json(), dict)
+
     @pytest.mark.asyncio
     @pytest.mark.integration
     async def test_add_to_queue(self, async_client: AsyncClient, printer_factory, archive_factory, db_session):
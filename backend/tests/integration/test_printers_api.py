@@ -222,6 +222,21 @@ class TestPrintersAPI:
         response = await async_client.get(f"/api/v1/printers/{printer_id}")
         assert response.status_code == 404
 
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_delete_printer_forgets_telemetry(self, async_client: AsyncClient, printer_factory):
+        """Verify deleting a printer drops its buffered telemetry."""
+        from backend.app.services.bambu_mqtt import PrinterState
+        from backend.app.services.telemetry import telemetry_store
+
+        printer = await printer_factory()
+        telemetry_store.record(printer.id, PrinterState(connected=True, temperatures={"nozzle": 200.0}))
+
+        response = await async_client.delete(f"/api/v1/printers/{printer.id}")
+
+        assert response.status_code == 200
+        assert printer.id not in telemetry_store._series
+
     @pytest.mark.asyncio
     @pytest.mark.integration
     async def test_delete_nonexistent_printer(self, async_client: AsyncClient):
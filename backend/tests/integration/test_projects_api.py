@@ -492,11 +492,18 @@ class TestProjectExportImport:
 
     @pytest.mark.asyncio
     @pytest.mark.integration
-    async def test_import_project_from_zip_file(self, async_client: AsyncClient):
+    async def test_import_project_from_zip_file(self, async_client: AsyncClient, tmp_path):
         """Verify project can be imported from ZIP file with files."""
+        import hashlib
         import io
         import json
+        import os
         import zipfile
+        from unittest.mock import patch
+
+        from backend.app.api.routes.library import get_library_dir
+        from backend.app.core.config import settings
+        from backend.app.services import blob_store
 
         project_data = {
             "name": "ZIP Imported Project",
@@ -513,11 +520,61 @@ class TestProjectExportImport:
         zip_buffer.seek(0)
         files = {"file": ("project.zip", zip_buffer, "application/zip")}
 
-        response = await async_client.post("/api/v1/projects/import/file", files=files)
-        assert response.status_code == 200
-        data = response.json()
-        assert data["name"] == "ZIP Imported Project"
-        assert data["description"] == "Imported from ZIP"
+        with (
+            patch.object(settings, "archive_dir", tmp_path / "archive"),
+            patch.object(settings, "blob_dir", tmp_path / "blobs"),
+        ):
+            response = await async_client.post("/api/v1/projects/import/file", files=files)
+            assert response.status_code == 200
+            data = response.json()
+            assert data["name"] == "ZIP Imported Project"
+            assert data["description"] == "Imported from ZIP"
+
+            # Imported files are stored by content like uploaded ones
+            content_hash = hashlib.sha256(b"Hello World").hexdigest()
+            assert os.path.samefile(get_library_dir() / "TestFolder" / "test.txt", blob_store.blob_path(content_hash))
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_reimport_leaves_linked_files_intact(self, async_client: AsyncClient, tmp_path):
+        """Verify re-importing over a stored library file doesn't change the files sharing its blob."""
+        import hashlib
+        import io
+        import json
+        import os
+        import zipfile
+        from unittest.mock import patch
+
+        from backend.app.api.routes.library import get_library_dir
+        from backend.app.core.config import settings
+        from backend.app.services import blob_store
+
+        def project_zip(content: str) -> dict:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, "w") as zf:
+                zf.writestr("project.json", json.dumps({"name": "Reimported", "linked_folders": [{"name": "Shared"}]}))
+                zf.writestr("files/Shared/part.txt", content)
+            buffer.seek(0)
+            return {"file": ("project.zip", buffer, "application/zip")}
+
+        with (
+            patch.object(settings, "archive_dir", tmp_path / "archive"),
+            patch.object(settings, "blob_dir", tmp_path / "blobs"),
+        ):
+            response = await async_client.post("/api/v1/projects/import/file", files=project_zip("first"))
+            assert response.status_code == 200
+            first_hash = hashlib.sha256(b"first").hexdigest()
+            # Another file sharing the imported content, e.g. an archive of it
+            other = tmp_path / "other.txt"
+            os.link(blob_store.blob_path(first_hash), other)
+
+            response = await async_client.post("/api/v1/projects/import/file", files=project_zip("second"))
+            assert response.status_code == 200
+
+            assert (get_library_dir() / "Shared" / "part.txt").read_text() == "second"
+            assert other.read_text() == "first"
+            assert blob_store.hash_file(blob_store.blob_path(first_hash)) == first_hash
+            assert not [p.name for p in (get_library_dir() / "Shared").iterdir() if p.name != "part.txt"]
 
     @pytest.mark.asyncio
     @pytest.mark.integration
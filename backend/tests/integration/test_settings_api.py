@@ -645,9 +645,9 @@ class TestSettingsAPI:
 class TestSimplifiedBackupRestore:
     """Integration tests for the simplified backup/restore endpoints (ZIP-based).
 
-    Note: Tests that require actual file operations (backup creation) are skipped
-    because the test suite uses an in-memory database. These tests focus on
-    validation and error handling which don't require file I/O.
+    Note: The test suite uses an in-memory database, so backup creation is tested
+    against a temporary data directory and restore tests focus on validation and
+    error handling.
     """
 
     @pytest.mark.asyncio
@@ -688,3 +688,32 @@ class TestSimplifiedBackupRestore:
 
         assert response.status_code == 400
         assert "not a valid zip" in response.json()["detail"].lower()
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_backup_streams_zip(self, async_client: AsyncClient, tmp_path):
+        """Verify the backup endpoint streams a ZIP with the database and manifest."""
+        import io
+        import sqlite3
+        import zipfile
+        from unittest.mock import patch
+
+        from backend.app.core.config import settings as app_settings
+
+        db_path = tmp_path / "bambuddy.db"
+        sqlite3.connect(db_path).close()
+        (tmp_path / "archive").mkdir()
+        (tmp_path / "archive" / "print.3mf").write_bytes(b"3mf")
+
+        with (
+            patch.object(app_settings, "base_dir", tmp_path),
+            patch.object(app_settings, "plate_calibration_dir", tmp_path / "plate_calibration"),
+            patch.object(app_settings, "database_url", f"sqlite+aiosqlite:///{db_path}"),
+        ):
+            response = await async_client.get("/api/v1/settings/backup?incremental=true")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert "-incremental.zip" in response.headers["content-disposition"]
+        names = zipfile.ZipFile(io.BytesIO(response.content)).namelist()
+        assert names == ["bambuddy.db", "archive/print.3mf", "backup-manifest.json"]
@@ -0,0 +1,55 @@
+"""Integration tests for Telemetry API endpoints."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+
+from backend.app.api.routes import telemetry as telemetry_routes
+from backend.app.services.bambu_mqtt import PrinterState
+from backend.app.services.telemetry import TelemetryStore
+
+
+class TestTelemetryAPI:
+    """Integration tests for /api/v1/telemetry endpoints."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = TelemetryStore(directory=tmp_path)
+        with patch.object(telemetry_routes, "telemetry_store", store):
+            yield store
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    async def test_get_recent_telemetry(self, async_client: AsyncClient, store):
+        """Verify recorded samples are returned for the last hour by default."""
+        now = time.time()
+        for seconds_ago in (30, 20, 10):
+            state = PrinterState(connected=True, temperatures={"nozzle": 200.0 + seconds_ago})
+            store.record(1, state, now=now - seconds_ago)
+
+        response = await async_client.get("/api/v1/telemetry/1", params={"fields": "nozzle_temp,bed_temp"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["printer_id"] == 1
+        assert data["tier"] == "1s"
+        assert len(data["timestamps"]) == 3
+        assert set(data["series"]) == {"nozzle_temp", "bed_temp"}
+        assert data["series"]["nozzle_temp"]["avg"] == [230.0, 220.0, 210.0]
+        assert data["series"]["bed_temp"]["avg"] == [None, None, None]
+
+    @pytest.mark.asyncio
+    @pytest.mark.integration
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"fields": "nozzle_temp,secret"},
+            {"start": "2024-01-02T00:00:00", "end": "2024-01-01T00:00:00"},
+        ],
+    )
+    async def test_rejects_bad_params(self, async_client: AsyncClient, store, params):
+        """Verify unknown fields and empty ranges are rejected."""
+        response = await async_client.get("/api/v1/telemetry/1", params=params)
+        assert response.status_code == 400
@@ -1205,3 +1205,78 @@ class TestRequestTopicAmsMapping:
         assert complete_data["status"] == "completed"
         # Mapping cleared after completion
         assert mqtt_client._captured_ams_mapping is None
+
+
+class TestStateChangeTracking:
+    """Tests for PrinterState section-level change tracking."""
+
+    @pytest.fixture
+    def mqtt_client(self):
+        """Create a BambuMQTTClient instance for testing."""
+        from backend.app.services.bambu_mqtt import BambuMQTTClient
+
+        client = BambuMQTTClient(
+            ip_address="192.168.1.100",
+            serial_number="TEST123",
+            access_code="12345678",
+        )
+        return client
+
+    def test_first_check_reports_all_sections(self, mqtt_client):
+        """Verify a consumer that has seen nothing gets every section."""
+        from backend.app.services.bambu_mqtt import STATE_SECTIONS
+
+        version, changed = mqtt_client.state.changes_since(0)
+
+        assert version > 0
+        assert changed == set(STATE_SECTIONS)
+
+    def test_temperature_tick_only_marks_temperatures(self, mqtt_client):
+        """Verify a temperature-only update doesn't dirty other sections."""
+        mqtt_client._process_message({"print": {"nozzle_temper": 200.0, "mc_percent": 10}})
+        version, _ = mqtt_client.state.changes_since(0)
+
+        mqtt_client._process_message({"print": {"nozzle_temper": 201.0, "mc_percent": 10}})
+        new_version, changed = mqtt_client.state.changes_since(version)
+
+        assert changed == {"temperatures"}
+        assert new_version > version
+
+    def test_unchanged_update_keeps_version(self, mqtt_client):
+        """Verify repeating the same values produces no new version."""
+        mqtt_client._process_message({"print": {"nozzle_temper": 200.0}})
+        version, _ = mqtt_client.state.changes_since(0)
+
+        mqtt_client._process_message({"print": {"nozzle_temper": 200.0}})
+
+        assert mqtt_client.state.changes_since(version) == (version, set())
+
+    def test_ams_and_progress_sections(self, mqtt_client):
+        """Verify AMS merges and progress updates mark their own sections."""
+        version, _ = mqtt_client.state.changes_since(0)
+
+        mqtt_client._handle_ams_data({"ams": [{"id": 0, "tray": [{"id": 0, "tray_type": "PLA"}]}]})
+        mqtt_client.state.progress = 42
+        version2, changed = mqtt_client.state.changes_since(version)
+
+        assert changed == {"ams", "progress"}
+        assert mqtt_client.state.changes_since(version2)[1] == set()
+
+    def test_in_place_mutations_detected(self, mqtt_client):
+        """Verify containers mutated in place are picked up on commit."""
+        version, _ = mqtt_client.state.changes_since(0)
+
+        mqtt_client.state.print_options.spaghetti_detector = True
+        mqtt_client.state.nozzles[0].nozzle_diameter = "0.6"
+
+        assert mqtt_client.state.changes_since(version)[1] == {"print_options", "nozzles"}
+
+    def test_versions_monotonic_across_state_objects(self):
+        """Verify a replacement state object continues the version sequence."""
+        from backend.app.services.bambu_mqtt import PrinterState
+
+        old_version, _ = PrinterState().changes_since(0)
+        new_state = PrinterState()
+        new_state.progress = 1
+
+        assert new_state.commit() > old_version
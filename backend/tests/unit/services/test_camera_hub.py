@@ -0,0 +1,365 @@
+"""Unit tests for the shared camera stream hub.
+
+Tests frame fan-out, drop-oldest backpressure, resolution tiers, idle shutdown
+and error propagation.
+"""
+
+import asyncio
+import io
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.services.camera_hub import (
+    TIER_FULL,
+    TIER_HALF,
+    TIER_THUMBNAIL,
+    CameraHubManager,
+    CameraStreamError,
+    CameraStreamHub,
+    FrameSubscriber,
+    downscale_jpeg,
+    get_jpeg_width,
+    select_tier,
+)
+
+
+def make_source(frames: list[bytes], started: list[int] | None = None, delay: float = 0.01, hold: bool = True):
+    """Build a frame source yielding the given frames, then optionally idling until cancelled."""
+
+    async def source(fps: int):
+        if started is not None:
+            started.append(fps)
+        for frame in frames:
+            await asyncio.sleep(delay)
+            yield frame
+        if hold:
+            await asyncio.Event().wait()
+
+    return source
+
+
+async def collect(subscriber: FrameSubscriber, count: int, timeout: float = 1.0) -> list[bytes]:
+    received = []
+
+    async def _read():
+        async for frame in subscriber.frames():
+            received.append(frame)
+            if len(received) == count:
+                return
+
+    await asyncio.wait_for(_read(), timeout)
+    return received
+
+
+class TestFrameSubscriber:
+    """Tests for FrameSubscriber queueing."""
+
+    def test_drops_oldest_when_full(self):
+        """Verify a slow viewer keeps only the newest frames."""
+        sub = FrameSubscriber(fps=0, queue_size=2)
+        for frame in (b"1", b"2", b"3", b"4"):
+            sub.offer(frame)
+
+        assert sub.frames_dropped == 2
+        assert sub._queue.get_nowait() == b"3"
+        assert sub._queue.get_nowait() == b"4"
+
+    def test_fps_limit_skips_frames(self):
+        """Verify frames arriving faster than the viewer's fps are skipped."""
+        sub = FrameSubscriber(fps=1, queue_size=5)
+        assert sub.offer(b"1") is True
+        assert sub.offer(b"2") is False
+        assert sub._queue.qsize() == 1
+
+    @pytest.mark.asyncio
+    async def test_close_ends_iteration(self):
+        """Verify closing a subscriber ends its frame iterator."""
+        sub = FrameSubscriber(fps=0)
+        sub.offer(b"a")
+        sub.close()
+
+        frames = [frame async for frame in sub.frames()]
+        assert frames == [b"a"]
+        assert sub.offer(b"b") is False
+
+
+class TestCameraStreamHub:
+    """Tests for CameraStreamHub fan-out and lifecycle."""
+
+    @pytest.mark.asyncio
+    async def test_single_upstream_for_multiple_subscribers(self):
+        """Verify all viewers share one upstream and receive the same frames."""
+        started = []
+        hub = CameraStreamHub(1, make_source([b"f1", b"f2"], started), fps=10, queue_size=4)
+
+        sub_a = hub.subscribe(0)
+        sub_b = hub.subscribe(0)
+
+        assert await collect(sub_a, 2) == [b"f1", b"f2"]
+        assert await collect(sub_b, 2) == [b"f1", b"f2"]
+        assert started == [10]
+        await hub.stop()
+
+    @pytest.mark.asyncio
+    async def test_on_frame_callback_feeds_buffer(self):
+        """Verify the on_frame callback sees every upstream frame."""
+        seen = {}
+        hub = CameraStreamHub(7, make_source([b"x"]), fps=5, on_frame=lambda pid, frame: seen.__setitem__(pid, frame))
+        sub = hub.subscribe(0)
+        await collect(sub, 1)
+
+        assert seen == {7: b"x"}
+        assert hub.last_frame == b"x"
+        await hub.stop()
+
+    @pytest.mark.asyncio
+    async def test_idle_shutdown_after_last_subscriber(self):
+        """Verify the upstream stops once the last viewer has left for idle_timeout."""
+        closed = []
+        hub = CameraStreamHub(1, make_source([b"a"]), fps=5, idle_timeout=0.05, on_close=closed.append)
+        sub = hub.subscribe(0)
+        await collect(sub, 1)
+
+        hub.unsubscribe(sub)
+        assert hub.running
+        await asyncio.sleep(0.15)
+
+        assert not hub.running
+        assert hub.closed
+        assert closed == [hub]
+
+    @pytest.mark.asyncio
+    async def test_resubscribe_cancels_idle_shutdown(self):
+        """Verify a viewer joining during the idle grace period keeps the upstream."""
+        hub = CameraStreamHub(1, make_source([b"a"]), fps=5, idle_timeout=0.05)
+        hub.unsubscribe(hub.subscribe(0))
+        sub = hub.subscribe(0)
+        await asyncio.sleep(0.15)
+
+        assert hub.running
+        assert sub.closed is False
+        await hub.stop()
+        assert sub.closed
+
+    @pytest.mark.asyncio
+    async def test_source_error_ends_subscribers(self):
+        """Verify upstream errors are recorded and end every viewer's stream."""
+
+        async def failing_source(fps: int):
+            raise CameraStreamError("Camera connection failed")
+            yield b""  # pragma: no cover - makes this an async generator
+
+        hub = CameraStreamHub(1, failing_source, fps=5)
+        sub = hub.subscribe(0)
+        frames = await asyncio.wait_for(collect(sub, 1), 1.0)
+
+        assert frames == []
+        assert hub.error == "Camera connection failed"
+        assert hub.closed
+
+    @pytest.mark.asyncio
+    async def test_higher_fps_restarts_upstream(self):
+        """Verify a viewer asking for more fps restarts the upstream at the higher rate."""
+        started = []
+        hub = CameraStreamHub(1, make_source([b"a"], started), fps=5)
+        hub.subscribe(5)
+        await asyncio.sleep(0.05)
+        hub.subscribe(10)
+        await asyncio.sleep(0.05)
+
+        assert started == [5, 10]
+        assert hub.fps == 10
+        await hub.stop()
+
+    @pytest.mark.asyncio
+    async def test_higher_fps_waits_for_previous_upstream(self):
+        """Verify the restarted upstream only opens once the replaced one has finished its cleanup."""
+        events = []
+
+        async def source(fps: int):
+            events.append(f"start {fps}")
+            try:
+                yield b"a"
+                await asyncio.Event().wait()
+            finally:
+                await asyncio.sleep(0.02)
+                events.append(f"stop {fps}")
+
+        hub = CameraStreamHub(1, source, fps=5)
+        await collect(hub.subscribe(5), 1)
+        await collect(hub.subscribe(10), 1)
+
+        assert events == ["start 5", "stop 5", "start 10"]
+        await hub.stop()
+
+    @pytest.mark.asyncio
+    async def test_leaving_viewer_lowers_upstream_fps(self):
+        """Verify the upstream drops back to the fastest remaining viewer's rate."""
+        started = []
+        hub = CameraStreamHub(1, make_source([b"a"], started), fps=5)
+        hub.subscribe(5)
+        await asyncio.sleep(0.05)
+        fast = hub.subscribe(15)
+        await asyncio.sleep(0.05)
+        hub.unsubscribe(fast)
+        await asyncio.sleep(0.05)
+
+        assert started == [5, 15, 5]
+        assert hub.fps == 5
+        assert hub.running
+        await hub.stop()
+
+    @pytest.mark.asyncio
+    async def test_detach_viewer(self):
+        """Verify detaching a viewer ends only that viewer's streams."""
+        hub = CameraStreamHub(1, make_source([]), fps=5)
+        tab = hub.subscribe(5, viewer_id="tab")
+        other = hub.subscribe(5, viewer_id="other")
+
+        assert hub.detach("tab") == 1
+        assert hub.detach("missing") == 0
+        assert tab.closed
+        assert not other.closed
+        assert hub.subscriber_count == 1
+        await hub.stop()
+
+
+class TestCameraHubManager:
+    """Tests for CameraHubManager registry."""
+
+    @pytest.mark.asyncio
+    async def test_acquire_reuses_hub(self):
+        """Verify the same hub is returned for the same printer and settings."""
+        manager = CameraHubManager()
+        source = make_source([])
+        hub1 = await manager.acquire(1, source, 5, source_key="a")
+        hub2 = await manager.acquire(1, source, 5, source_key="a")
+
+        assert hub1 is hub2
+        await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_acquire_replaces_hub_when_settings_change(self):
+        """Verify changed camera settings stop the old hub and create a new one."""
+        manager = CameraHubManager()
+        source = make_source([])
+        hub1 = await manager.acquire(1, source, 5, source_key="a")
+        hub1.subscribe(0)
+        hub2 = await manager.acquire(1, source, 5, source_key="b")
+
+        assert hub1 is not hub2
+        assert hub1.closed
+        await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_detach_unknown_printer(self):
+        """Verify detaching a viewer from a printer without a hub detaches nothing."""
+        assert CameraHubManager().detach(1, "tab") == 0
+
+    @pytest.mark.asyncio
+    async def test_stop_removes_hub(self):
+        """Verify stopping a hub removes it from the registry."""
+        manager = CameraHubManager()
+        hub = await manager.acquire(1, make_source([]), 5)
+        hub.subscribe(0)
+
+        assert manager.get_subscriber_count(1) == 1
+        assert await manager.stop(1) is True
+        assert manager.get_hub(1) is None
+        assert await manager.stop(1) is False
+
+
+def make_jpeg(width: int = 1280, height: int = 720) -> bytes:
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 100, 50)).save(out, "JPEG")
+    return out.getvalue()
+
+
+def jpeg_width(frame: bytes) -> int:
+    from PIL import Image
+
+    with Image.open(io.BytesIO(frame)) as img:
+        return img.width
+
+
+class TestResolutionTiers:
+    """Tests for per-viewer resolution tiers."""
+
+    @pytest.mark.parametrize(
+        ("max_width", "expected"),
+        [
+            (None, TIER_FULL),
+            (1920, TIER_FULL),
+            (960, TIER_HALF),
+            (1200, TIER_HALF),
+            (640, TIER_THUMBNAIL),
+            (320, TIER_THUMBNAIL),
+        ],
+    )
+    def test_select_tier(self, max_width, expected):
+        """Verify viewers get the largest tier that fits their max_width."""
+        assert select_tier(max_width, 1920) == expected
+
+    def test_select_tier_unknown_source_width(self):
+        """Verify full resolution is used until the source width is known."""
+        assert select_tier(320, None) == TIER_FULL
+
+    @pytest.mark.parametrize("progressive", [False, True])
+    def test_get_jpeg_width(self, progressive):
+        """Verify the width is read from the frame header of baseline and progressive JPEGs."""
+        from PIL import Image
+
+        out = io.BytesIO()
+        Image.new("RGB", (1280, 720)).save(out, "JPEG", progressive=progressive)
+        assert get_jpeg_width(out.getvalue()) == 1280
+
+    @pytest.mark.parametrize("frame", [b"", b"not a jpeg", b"\xff\xd8\xff\xe0\x00\x10JFIF", b"\xff\xd8\xff\xd9"])
+    def test_get_jpeg_width_invalid(self, frame):
+        """Verify truncated or non-JPEG data has no width."""
+        assert get_jpeg_width(frame) is None
+
+    def test_downscale_jpeg(self):
+        """Verify frames are downscaled to the requested width with aspect ratio kept."""
+        from PIL import Image
+
+        scaled = downscale_jpeg(make_jpeg(1280, 720), 320)
+        with Image.open(io.BytesIO(scaled)) as img:
+            assert img.size == (320, 180)
+
+    def test_downscale_jpeg_smaller_frame_unchanged(self):
+        """Verify frames already within the width are returned as-is."""
+        frame = make_jpeg(200, 100)
+        assert downscale_jpeg(frame, 320) is frame
+
+    @pytest.mark.asyncio
+    async def test_scales_once_per_tier(self):
+        """Verify each tier is encoded once per frame regardless of viewer count."""
+        frame = make_jpeg(1280, 720)
+        hub = CameraStreamHub(1, make_source([frame]), fps=5, queue_size=2)
+        full = hub.subscribe(0)
+        halves = [hub.subscribe(0, max_width=700) for _ in range(3)]
+        thumb = hub.subscribe(0, max_width=300)
+
+        with patch("backend.app.services.camera_hub.downscale_jpeg", wraps=downscale_jpeg) as mock_scale:
+            frames_full = await collect(full, 1)
+            frames_half = [await collect(sub, 1) for sub in halves]
+            frames_thumb = await collect(thumb, 1)
+
+        assert mock_scale.call_count == 2
+        assert jpeg_width(frames_full[0]) == 1280
+        assert all(jpeg_width(f[0]) == 640 for f in frames_half)
+        assert frames_half[0][0] is frames_half[1][0]
+        assert jpeg_width(frames_thumb[0]) == 320
+        await hub.stop()
+
+    def test_thumbnail_tier_limited_to_one_fps(self):
+        """Verify thumbnail viewers get at most one frame per second."""
+        sub = FrameSubscriber(fps=10, max_width=200)
+        sub.tier = TIER_THUMBNAIL
+
+        assert sub.wants_frame(100.0) is True
+        assert sub.wants_frame(100.5) is False
+        assert sub.wants_frame(101.0) is True
@@ -0,0 +1,121 @@
+"""Unit tests for the smart plug energy sampler.
+
+Tests concurrent polling, caching of the latest sample per plug, stored
+readings and staleness reporting.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import select
+
+from backend.app.models.energy_reading import SmartPlugEnergyReading
+from backend.app.services import energy_sampler as energy_sampler_module
+from backend.app.services.energy_sampler import ENERGY_STALE_SECONDS, EnergySample, EnergySampler
+
+
+def energy(total: float) -> dict:
+    return {"power": 100.0, "today": 1.0, "total": total}
+
+
+class TestEnergySampler:
+    """Tests for EnergySampler."""
+
+    @pytest.fixture
+    def sampler(self):
+        return EnergySampler()
+
+    @pytest.mark.asyncio
+    async def test_plugs_polled_concurrently(self, sampler, smart_plug_factory, db_session):
+        """Verify a slow plug doesn't delay the others and times out on its own."""
+        slow = await smart_plug_factory(name="slow", ip_address="192.168.1.1")
+        fast = await smart_plug_factory(name="fast", ip_address="192.168.1.2")
+
+        async def get_energy(plug):
+            await asyncio.sleep(0.3)
+            if plug.id == slow.id:
+                await asyncio.sleep(10)
+            return energy(5.0)
+
+        with (
+            patch.object(energy_sampler_module, "ENERGY_SAMPLE_TIMEOUT", 0.5),
+            patch.object(energy_sampler_module.tasmota_service, "get_energy", side_effect=get_energy),
+        ):
+            start = time.monotonic()
+            samples = await sampler.sample_all(db_session)
+            elapsed = time.monotonic() - start
+
+        assert elapsed < 1.5
+        assert [s.plug_id for s in samples] == [fast.id]
+        assert sampler.get_latest(slow.id) is None
+
+        readings = (await db_session.execute(select(SmartPlugEnergyReading))).scalars().all()
+        assert [(r.plug_id, r.total) for r in readings] == [(fast.id, 5.0)]
+
+    @pytest.mark.asyncio
+    async def test_failed_poll_keeps_last_sample(self, sampler, smart_plug_factory, db_session):
+        """Verify an unreachable plug keeps its previous value, which becomes stale."""
+        plug = await smart_plug_factory()
+        with patch.object(energy_sampler_module.tasmota_service, "get_energy", AsyncMock(return_value=energy(12.5))):
+            await sampler.sample_all(db_session)
+        with patch.object(energy_sampler_module.tasmota_service, "get_energy", AsyncMock(return_value=None)):
+            await sampler.sample_all(db_session)
+
+        total = sampler.get_total_energy([plug.id])
+        assert total.total_kwh == 12.5
+        assert not total.stale
+
+        sampler.get_latest(plug.id).sampled_at -= timedelta(seconds=ENERGY_STALE_SECONDS + 1)
+        assert sampler.get_total_energy([plug.id]).stale
+
+    def test_unsampled_plug_makes_total_stale(self, sampler):
+        """Verify a plug without a sample yet marks the total as incomplete."""
+        sampler._latest[1] = EnergySample(1, None, None, 50.0, datetime.utcnow())
+
+        assert not sampler.get_total_energy([1]).stale
+        total = sampler.get_total_energy([1, 2])
+        assert total.total_kwh == 50.0
+        assert total.stale
+
+    @pytest.mark.asyncio
+    async def test_load_latest_after_restart(self, sampler, smart_plug_factory, db_session):
+        """Verify the cache is seeded from the newest stored reading of each plug."""
+        plug = await smart_plug_factory()
+        now = datetime.utcnow()
+        db_session.add_all(
+            [
+                SmartPlugEnergyReading(plug_id=plug.id, total=1.0, recorded_at=now - timedelta(minutes=2)),
+                SmartPlugEnergyReading(plug_id=plug.id, total=2.0, recorded_at=now - timedelta(minutes=1)),
+            ]
+        )
+        await db_session.commit()
+
+        await sampler.load_latest(db_session)
+
+        assert sampler.get_latest(plug.id).total == 2.0
+
+    @pytest.mark.asyncio
+    async def test_deleted_plugs_dropped(self, sampler, smart_plug_factory, db_session):
+        """Verify samples of deleted plugs are removed from the cache."""
+        sampler._latest[999] = EnergySample(999, None, None, 50.0, datetime.utcnow())
+
+        await sampler.sample_all(db_session)
+
+        assert sampler.get_latest(999) is None
+
+    @pytest.mark.asyncio
+    async def test_prune_readings(self, sampler, smart_plug_factory, db_session):
+        """Verify readings older than the retention period are deleted."""
+        plug = await smart_plug_factory()
+        db_session.add_all(
+            [
+                SmartPlugEnergyReading(plug_id=plug.id, total=1.0, recorded_at=datetime.utcnow() - timedelta(days=40)),
+                SmartPlugEnergyReading(plug_id=plug.id, total=2.0, recorded_at=datetime.utcnow()),
+            ]
+        )
+        await db_session.commit()
+
+        assert await sampler.prune_readings(db_session) == 1
@@ -0,0 +1,97 @@
+"""Unit tests for the streaming archive export."""
+
+import csv
+import gzip
+import io
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from openpyxl import load_workbook
+
+from backend.app.models.archive import PrintArchive
+from backend.app.models.project import Project
+from backend.app.services import export as export_module
+from backend.app.services.export import ExportService
+
+
+async def collect(chunks) -> tuple[bytes, int]:
+    data = b""
+    count = 0
+    async for chunk in chunks:
+        data += chunk
+        count += 1
+    return data, count
+
+
+class TestExportArchives:
+    """Tests for ExportService.export_archives()."""
+
+    @pytest.fixture
+    async def archives(self, db_session):
+        project = Project(name="Big Project")
+        db_session.add(project)
+        await db_session.commit()
+        db_session.add_all(
+            [
+                PrintArchive(
+                    filename=f"part{i}.3mf",
+                    file_path=f"archive/part{i}.3mf",
+                    file_size=100,
+                    print_name=f"Part {i}",
+                    status="failed" if i == 4 else "completed",
+                    project_id=project.id if i % 2 else None,
+                    created_at=datetime(2026, 1, 1 + i, 12, 0),
+                )
+                for i in range(5)
+            ]
+        )
+        await db_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_csv_streamed_in_batches(self, db_session, archives):
+        """Verify CSV rows are produced per batch, newest first, with project names."""
+        service = ExportService(db_session)
+        with patch.object(export_module, "EXPORT_BATCH_SIZE", 2):
+            chunks, filename, content_type = await service.export_archives(
+                fields=["print_name", "project_name", "created_at", "unknown"]
+            )
+            data, count = await collect(chunks)
+
+        assert filename.endswith(".csv")
+        assert content_type == "text/csv"
+        assert count == 3
+        rows = list(csv.reader(io.StringIO(data.decode())))
+        assert rows[0] == ["Print Name", "Project", "Created At", "unknown"]
+        assert rows[1] == ["Part 4", "", "2026-01-05T12:00:00", ""]
+        assert rows[2] == ["Part 3", "Big Project", "2026-01-04T12:00:00", ""]
+        assert len(rows) == 6
+
+    @pytest.mark.asyncio
+    async def test_csv_filters_and_gzip(self, db_session, archives):
+        """Verify filters apply and gzip output decompresses to the CSV."""
+        service = ExportService(db_session)
+        chunks, filename, content_type = await service.export_archives(
+            fields=["print_name"], status="failed", compress=True
+        )
+        data, _ = await collect(chunks)
+
+        assert filename.endswith(".csv.gz")
+        assert content_type == "application/gzip"
+        assert gzip.decompress(data).decode().splitlines() == ["Print Name", "Part 4"]
+
+    @pytest.mark.asyncio
+    async def test_xlsx(self, db_session, archives):
+        """Verify the Excel file has a styled header and all rows."""
+        service = ExportService(db_session)
+        with patch.object(export_module, "EXPORT_BATCH_SIZE", 2):
+            chunks, filename, _ = await service.export_archives(format="xlsx", fields=["id", "print_name"])
+            data, _ = await collect(chunks)
+
+        assert filename.endswith(".xlsx")
+        ws = load_workbook(io.BytesIO(data))["Archives"]
+        rows = [[cell.value for cell in row] for row in ws.iter_rows()]
+        assert rows[0] == ["ID", "Print Name"]
+        assert [row[1] for row in rows[1:]] == ["Part 4", "Part 3", "Part 2", "Part 1", "Part 0"]
+        assert ws["A1"].font.b
+        assert ws.freeze_panes == "A2"
@@ -0,0 +1,162 @@
+"""Unit tests for the MQTT ingestion pipeline.
+
+Tests per-printer ordering, superseded-report coalescing, bounded queues and
+metrics.
+"""
+
+import json
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.app.services.mqtt_ingest import MQTTIngestPipeline, is_superseded
+
+
+def report(**fields) -> dict:
+    return {"print": {"command": "push_status", **fields}}
+
+
+def encode(payload: dict) -> bytes:
+    return json.dumps(payload).encode()
+
+
+def wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out waiting for condition")
+        time.sleep(0.005)
+
+
+class TestIsSuperseded:
+    """Tests for is_superseded."""
+
+    def test_newer_report_with_same_fields(self):
+        """Verify a report is superseded when the newer one sets all its fields."""
+        assert is_superseded(report(nozzle_temper=200), report(nozzle_temper=210, bed_temper=60))
+
+    def test_missing_field_not_superseded(self):
+        """Verify a report with fields the newer one lacks is kept."""
+        assert not is_superseded(report(nozzle_temper=200, bed_temper=60), report(nozzle_temper=210))
+
+    def test_transition_field_change_not_superseded(self):
+        """Verify state transitions are never skipped."""
+        assert not is_superseded(report(gcode_state="RUNNING"), report(gcode_state="FINISH"))
+        assert is_superseded(report(gcode_state="RUNNING"), report(gcode_state="RUNNING"))
+
+    def test_nested_lists_must_match_shape(self):
+        """Verify partial AMS updates aren't skipped for a differently shaped update."""
+        full = report(ams={"ams": [{"id": "0", "tray": [{"id": "0"}, {"id": "1"}]}]})
+        partial = report(ams={"ams": [{"id": "0", "tray": [{"id": "1"}]}]})
+        assert not is_superseded(partial, full)
+        assert is_superseded(full, full)
+
+    def test_non_status_messages_not_superseded(self):
+        """Verify command responses and top-level sections are always processed."""
+        assert not is_superseded({"print": {"command": "extrusion_cali_get"}}, report())
+        assert not is_superseded({"print": {"command": "push_status"}, "xcam": {}}, report(xcam={}))
+
+
+class TestMQTTIngestPipeline:
+    """Tests for MQTTIngestPipeline queueing and workers."""
+
+    @pytest.fixture
+    def pipeline(self):
+        pipeline = MQTTIngestPipeline(workers=2, queue_size=5)
+        yield pipeline
+        pipeline.shutdown()
+
+    def test_messages_processed_in_order_off_thread(self, pipeline):
+        """Verify messages are handled in order on a worker thread."""
+        seen = []
+        pipeline.register("p1", lambda topic, payload: seen.append((threading.current_thread().name, payload)))
+
+        for i in range(3):
+            pipeline.submit("p1", "report", encode({"print": {"command": "gcode_line", "seq": i}}))
+        wait_for(lambda: len(seen) == 3)
+
+        assert [payload["print"]["seq"] for _, payload in seen] == [0, 1, 2]
+        assert all(name.startswith("mqtt-ingest-") for name, _ in seen)
+
+    def test_invalid_json_ignored(self, pipeline):
+        """Verify non-JSON payloads are skipped without reaching the handler."""
+        handler = MagicMock()
+        pipeline.register("p1", handler)
+
+        pipeline.submit("p1", "report", b"\xff\x00")
+        pipeline.submit("p1", "report", encode(report(bed_temper=1)))
+        wait_for(lambda: handler.call_count == 1)
+
+    def test_superseded_reports_coalesced_under_backlog(self, pipeline):
+        """Verify a backlog of repeated status reports collapses to the latest."""
+        gate = threading.Event()
+        seen = []
+
+        def handler(topic, payload):
+            gate.wait(1.0)
+            seen.append(payload["print"].get("nozzle_temper"))
+
+        pipeline.register("p1", handler)
+        pipeline.submit("p1", "report", encode(report(nozzle_temper=0)))
+        wait_for(lambda: pipeline.get_stats("p1")["queue_depth"] == 0)
+
+        for temp in (1, 2, 3):
+            pipeline.submit("p1", "report", encode(report(nozzle_temper=temp)))
+        gate.set()
+        wait_for(lambda: len(seen) == 2)
+
+        assert seen == [0, 3]
+        assert pipeline.get_stats("p1")["coalesced"] == 2
+
+    def test_full_queue_drops_oldest_and_requests_resync(self, pipeline):
+        """Verify overflow drops the oldest message and asks for a full status."""
+        gate = threading.Event()
+        seen = []
+        resync = MagicMock()
+
+        def handler(topic, payload):
+            gate.wait(1.0)
+            seen.append(payload["print"]["seq"])
+
+        pipeline.register("p1", handler, on_overflow=resync)
+        pipeline.submit("p1", "report", encode({"print": {"seq": -1}}))
+        wait_for(lambda: pipeline.get_stats("p1")["queue_depth"] == 0)
+
+        for i in range(7):
+            pipeline.submit("p1", "report", encode({"print": {"seq": i}}))
+        assert pipeline.get_stats("p1")["queue_depth"] == 5
+        gate.set()
+        wait_for(lambda: len(seen) == 6)
+
+        assert seen == [-1, 2, 3, 4, 5, 6]
+        assert pipeline.get_stats("p1")["dropped"] == 2
+        wait_for(lambda: resync.call_count == 1)
+
+    def test_handler_errors_counted(self, pipeline):
+        """Verify a failing handler doesn't stop the printer's queue."""
+        calls = []
+
+        def handler(topic, payload):
+            calls.append(payload)
+            if len(calls) == 1:
+                raise ValueError("boom")
+
+        pipeline.register("p1", handler)
+        pipeline.submit("p1", "report", encode({"a": 1}))
+        pipeline.submit("p1", "report", encode({"a": 2}))
+        wait_for(lambda: len(calls) == 2)
+
+        stats = pipeline.get_stats("p1")
+        assert stats["errors"] == 1
+        assert stats["processed"] == 2
+        assert stats["max_parse_ms"] >= 0
+
+    def test_unregistered_printer_ignored(self, pipeline):
+        """Verify messages for unknown or removed printers are discarded."""
+        pipeline.submit("missing", "report", encode({}))
+        pipeline.register("p1", MagicMock())
+        pipeline.unregister("p1")
+
+        assert pipeline.get_stats() == {}
@@ -3,13 +3,16 @@
 Tests printer connection management, status tracking, and print control.
 """
 
+import json
 import logging
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from backend.app.services.bambu_mqtt import SECTION_AMS
 from backend.app.services.printer_manager import (
     PrinterManager,
+    PrinterStatusCache,
     get_derived_status_name,
     has_stg_cur_idle_bug,
     init_printer_connections,
@@ -1128,3 +1131,63 @@ class TestAmsChangeCallback:
         # This tests the callback signature
         assert manager._on_ams_change is not None
         assert callable(manager._on_ams_change)
+
+
+class TestPrinterStatusCache:
+    """Tests for memoized printer status snapshots."""
+
+    @pytest.fixture
+    def state(self):
+        from backend.app.services.bambu_mqtt import PrinterState
+
+        state = PrinterState(state="IDLE", temperatures={"nozzle": 25.0, "chamber": 30.0})
+        state.raw_data = {"ams": [{"id": 0, "tray": [{"id": 0, "tray_type": "PLA"}]}]}
+        return state
+
+    @pytest.fixture
+    def cache(self):
+        return PrinterStatusCache()
+
+    def test_same_version_returns_cached_snapshot(self, cache, state):
+        """Verify an unchanged state returns the same snapshot and encoding."""
+        first = cache.to_dict(state, 1, "X1C")
+
+        assert cache.to_dict(state, 1, "X1C") is first
+        assert cache.to_json(state, 1, "X1C") is cache.to_json(state, 1, "X1C")
+        assert json.loads(cache.to_json(state, 1, "X1C")) == first
+
+    def test_temperature_tick_reuses_ams_section(self, cache, state):
+        """Verify a temperature change rebuilds temperatures but not AMS trays."""
+        first = cache.to_dict(state, 1, "X1C")
+
+        with patch("backend.app.services.printer_manager._build_ams_section") as build_ams:
+            state.temperatures["nozzle"] = 30.0
+            second = cache.to_dict(state, 1, "X1C")
+
+        build_ams.assert_not_called()
+        assert second is not first
+        assert second["ams"] is first["ams"]
+        assert second["temperatures"]["nozzle"] == 30.0
+        assert first["temperatures"]["nozzle"] == 25.0
+
+    def test_ams_change_rebuilds_ams_section(self, cache, state):
+        """Verify marking the AMS section dirty re-derives the trays."""
+        cache.to_dict(state, 1, "X1C")
+
+        state.raw_data["ams"][0]["tray"][0]["tray_type"] = "PETG"
+        state.mark_dirty(SECTION_AMS)
+
+        assert cache.to_dict(state, 1, "X1C")["ams"][0]["tray"][0]["tray_type"] == "PETG"
+
+    def test_model_filters_chamber_temperature(self, cache, state):
+        """Verify the cache is keyed by model for chamber temperature filtering."""
+        assert "chamber" in cache.to_dict(state, 1, "X1C")["temperatures"]
+        assert "chamber" not in cache.to_dict(state, 1, "P1S")["temperatures"]
+
+    def test_get_section_shares_cached_value(self, cache, state):
+        """Verify REST section lookups share the snapshot's derived sections."""
+        snapshot = cache.to_dict(state, 1, "X1C")
+        ams = cache.get_section(state, 1, "X1C", "ams")
+
+        assert ams["ams"] is snapshot["ams"]
+        assert ams["ams_exists"] is True
@@ -0,0 +1,162 @@
+"""Unit tests for the printer telemetry store.
+
+Tests 1 s sampling into the ring buffer, flushing to the raw tier with 1 min and
+15 min rollups, tier selection, downsampled queries and retention.
+"""
+
+import pytest
+
+from backend.app.services.bambu_mqtt import PrinterState
+from backend.app.services.telemetry import (
+    MINUTE_TIER,
+    QUARTER_TIER,
+    RAW_TIER,
+    TelemetryStore,
+    choose_tier,
+)
+
+# A quarter-hour boundary
+T0 = 1_700_000_100
+
+
+def state(nozzle: float, connected: bool = True) -> PrinterState:
+    return PrinterState(connected=connected, temperatures={"nozzle": nozzle, "bed": 60.0}, cooling_fan_speed=50)
+
+
+class TestTelemetryStore:
+    """Tests for TelemetryStore."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return TelemetryStore(directory=tmp_path)
+
+    def record_seconds(self, store, seconds: int):
+        """Record nozzle temperature = seconds since T0 at 1 Hz, flushing every 10 s like the background loop."""
+        for i in range(seconds):
+            store.record(1, state(float(i)), now=T0 + i + 0.5)
+            if i % 10 == 9:
+                store.flush(now=T0 + i + 1)
+
+    def test_same_second_keeps_latest(self, store):
+        """Verify several reports in one second leave one sample with the latest values."""
+        store.record(1, state(200.0), now=T0 + 0.1)
+        store.record(1, state(210.0), now=T0 + 0.9)
+        store.record(1, state(220.0), now=T0 + 1.2)
+
+        result = store.query(1, T0, T0 + 10, fields=["nozzle_temp"], now=T0 + 2)
+
+        assert result.tier == RAW_TIER.name
+        assert result.timestamps == [T0, T0 + 1]
+        assert result.series["nozzle_temp"]["avg"] == [210.0, 220.0]
+
+    def test_disconnected_printer_not_recorded(self, store):
+        """Verify the stale state of a disconnected printer isn't sampled."""
+        store.record(1, state(200.0, connected=False), now=T0)
+
+        assert store.query(1, T0, T0 + 10, now=T0 + 1).timestamps == []
+
+    def test_rollups(self, store, tmp_path):
+        """Verify completed minutes and quarter hours are rolled up with count, average, minimum and maximum."""
+        self.record_seconds(store, 16 * 60)
+        store.flush(now=T0 + 16 * 60 + 5)
+
+        assert len(list((tmp_path / "1" / RAW_TIER.name).glob("*.bin"))) == 1
+        minutes = store.query(1, T0, T0 + 16 * 60, fields=["nozzle_temp"], max_points=16, now=T0 + 1000)
+        assert minutes.tier == MINUTE_TIER.name
+        assert len(minutes.timestamps) == 16
+        assert minutes.series["nozzle_temp"]["avg"][1] == 89.5
+        assert minutes.series["nozzle_temp"]["min"][1] == 60.0
+        assert minutes.series["nozzle_temp"]["max"][1] == 119.0
+
+        quarter = store.query(1, T0, T0 + 15 * 60 - 1, max_points=1, now=T0 + 1000)
+        assert quarter.resolution == QUARTER_TIER.seconds
+        assert quarter.timestamps == [T0]
+        assert quarter.series["nozzle_temp"]["avg"] == [449.5]
+        assert quarter.series["bed_temp"]["max"] == [60.0]
+        assert quarter.series["chamber_temp"]["avg"] == [None]
+
+    def test_quarter_spans_restart(self, store, tmp_path):
+        """Verify minutes rolled up before a restart are still part of their quarter hour's bucket."""
+        self.record_seconds(store, 8 * 60)
+        store.flush(now=T0 + 8 * 60 + 5)
+
+        restarted = TelemetryStore(directory=tmp_path)
+        for i in range(8 * 60, 16 * 60):
+            restarted.record(1, state(float(i)), now=T0 + i + 0.5)
+            if i % 10 == 9:
+                restarted.flush(now=T0 + i + 1)
+        restarted.flush(now=T0 + 16 * 60 + 5)
+
+        quarter = restarted.query(1, T0, T0 + 15 * 60 - 1, max_points=1, now=T0 + 1000)
+        assert quarter.timestamps == [T0]
+        assert quarter.series["nozzle_temp"]["avg"] == [449.5]
+        assert quarter.series["nozzle_temp"]["min"] == [0.0]
+
+    def test_removed_printer_forgotten(self, store):
+        """Verify a deleted printer's buffered samples are dropped."""
+        store.record(1, state(200.0), now=T0)
+        store.remove(1)
+
+        assert store.query(1, T0, T0 + 10, now=T0 + 1).timestamps == []
+
+    def test_raw_query_downsampled(self, store):
+        """Verify a raw range is merged into evenly spaced points."""
+        self.record_seconds(store, 5 * 60)
+
+        result = store.query(1, T0, T0 + 5 * 60 - 1, fields=["nozzle_temp", "part_fan"], max_points=30, now=T0 + 400)
+
+        assert result.tier == RAW_TIER.name
+        assert result.resolution == 10
+        assert len(result.timestamps) == 30
+        assert result.series["nozzle_temp"]["avg"][0] == 4.5
+        assert result.series["part_fan"]["max"][0] == 50.0
+        assert set(result.series) == {"nozzle_temp", "part_fan"}
+
+    def test_unflushed_and_flushed_samples_counted_once(self, store):
+        """Verify a query sees buffered samples, and the same data after they're written to disk."""
+        self.record_seconds(store, 25)
+        before = store.query(1, T0, T0 + 30, now=T0 + 30)
+        store.flush(now=T0 + 30)
+        after = store.query(1, T0, T0 + 30, now=T0 + 30)
+
+        assert len(before.timestamps) == 25
+        assert after == before
+
+    def test_partial_record_ignored(self, store, tmp_path):
+        """Verify a record cut short by a crash doesn't corrupt the segment."""
+        self.record_seconds(store, 10)
+        [segment] = (tmp_path / "1" / RAW_TIER.name).glob("*.bin")
+        with segment.open("ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        assert len(store.query(1, T0, T0 + 10, now=T0 + 20).timestamps) == 10
+
+    def test_prune(self, store, tmp_path):
+        """Verify segments are removed once they are older than their tier's retention."""
+        for tier, day in [(RAW_TIER, "2023-11-01"), (RAW_TIER, "2023-11-14"), (MINUTE_TIER, "2023-11-01")]:
+            path = tmp_path / "1" / tier.name / f"{day}.bin"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"")
+
+        assert store.prune(now=T0) == 1
+        assert not (tmp_path / "1" / RAW_TIER.name / "2023-11-01.bin").exists()
+        assert (tmp_path / "1" / MINUTE_TIER.name / "2023-11-01.bin").exists()
+
+
+class TestChooseTier:
+    """Tests for choose_tier()."""
+
+    @pytest.mark.parametrize(
+        ("step", "age_days", "tier"),
+        [
+            (1, 0, RAW_TIER),
+            (59, 0, RAW_TIER),
+            (60, 0, MINUTE_TIER),
+            (3600, 0, QUARTER_TIER),
+            (1, 3, MINUTE_TIER),
+            (1, 60, QUARTER_TIER),
+        ],
+    )
+    def test_choose_tier(self, step, age_days, tier):
+        """Verify the coarsest fine-enough tier is used unless it no longer covers the range start."""
+        assert choose_tier(step, T0 - age_days * 86400, T0) is tier
@@ -0,0 +1,131 @@
+"""Unit tests for API key validation.
+
+Tests prefix lookup, the verification cache and batched last_used updates.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.core import auth
+from backend.app.core.auth import (
+    _validate_api_key,
+    flush_api_key_usage,
+    generate_api_key,
+    get_api_key,
+    invalidate_api_key_cache,
+)
+from backend.app.models.api_key import APIKey
+
+
+@pytest.fixture(autouse=True)
+def reset_api_key_state():
+    auth._api_key_cache.clear()
+    auth._api_key_usage.clear()
+    yield
+    auth._api_key_cache.clear()
+    auth._api_key_usage.clear()
+
+
+async def create_key(db: AsyncSession, **kwargs) -> tuple[APIKey, str]:
+    full_key, key_hash, key_prefix = generate_api_key()
+    api_key = APIKey(name="test", key_hash=key_hash, key_prefix=key_prefix, **kwargs)
+    db.add(api_key)
+    await db.commit()
+    return api_key, full_key
+
+
+class TestAPIKeyLookup:
+    """Tests for prefix lookup and the verification cache."""
+
+    @pytest.mark.asyncio
+    async def test_only_matching_prefix_is_hashed(self, db_session):
+        """Verify only keys sharing the presented key's prefix are verified."""
+        keys = [await create_key(db_session) for _ in range(3)]
+        api_key, full_key = keys[1]
+
+        with patch("backend.app.core.auth.verify_password", wraps=auth.verify_password) as mock_verify:
+            assert await _validate_api_key(db_session, full_key) is api_key
+
+        assert mock_verify.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_key_rejected_without_hashing(self, db_session):
+        """Verify an unknown key costs no pbkdf2 verifications."""
+        await create_key(db_session)
+
+        with patch("backend.app.core.auth.verify_password", wraps=auth.verify_password) as mock_verify:
+            assert await _validate_api_key(db_session, "bb_unknown-key-value") is None
+
+        assert mock_verify.call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_verified_key_is_cached(self, db_session):
+        """Verify repeat requests with the same key skip re-hashing."""
+        api_key, full_key = await create_key(db_session)
+        await _validate_api_key(db_session, full_key)
+
+        with patch("backend.app.core.auth.verify_password") as mock_verify:
+            assert await _validate_api_key(db_session, full_key) is api_key
+
+        mock_verify.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_disabled_key_rejected_despite_cache(self, db_session):
+        """Verify a cached key stops working once disabled."""
+        api_key, full_key = await create_key(db_session)
+        await _validate_api_key(db_session, full_key)
+
+        api_key.enabled = False
+        await db_session.commit()
+        invalidate_api_key_cache(api_key.id)
+
+        assert auth._api_key_cache == {}
+        assert await _validate_api_key(db_session, full_key) is None
+
+    @pytest.mark.asyncio
+    async def test_cache_entry_for_replaced_key_ignored(self, db_session):
+        """Verify a stale cache entry can't authenticate as a different key with the same id."""
+        api_key, full_key = await create_key(db_session)
+        await _validate_api_key(db_session, full_key)
+
+        _, other_hash, _ = generate_api_key()
+        api_key.key_hash = other_hash
+        await db_session.commit()
+
+        assert await _validate_api_key(db_session, full_key) is None
+
+    @pytest.mark.asyncio
+    async def test_get_api_key_expired(self, db_session):
+        """Verify get_api_key rejects expired keys."""
+        _, full_key = await create_key(db_session, expires_at=datetime.now() - timedelta(days=1))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_api_key(x_api_key=full_key, db=db_session)
+
+        assert exc_info.value.detail == "API key has expired"
+
+
+class TestAPIKeyUsage:
+    """Tests for batched last_used updates."""
+
+    @pytest.mark.asyncio
+    async def test_last_used_written_on_flush(self, test_engine, db_session):
+        """Verify validation queues last_used and a flush writes it."""
+        api_key, full_key = await create_key(db_session)
+        await _validate_api_key(db_session, full_key)
+
+        await db_session.refresh(api_key)
+        assert api_key.last_used is None
+        assert api_key.id in auth._api_key_usage
+
+        session_maker = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+        with patch("backend.app.core.auth.async_session", session_maker):
+            await flush_api_key_usage()
+
+        await db_session.refresh(api_key)
+        assert api_key.last_used is not None
+        assert auth._api_key_usage == {}
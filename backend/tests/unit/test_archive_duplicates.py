@@ -0,0 +1,145 @@
+"""Unit tests for trigger-maintained archive duplicate counts.
+
+Tests that inserts, renames, re-hashes and deletes (ORM and bulk) keep
+archive_duplicates equal to a full rebuild, and the duplicate flags derived
+from it.
+"""
+
+import pytest
+from sqlalchemy import delete, text, update
+
+from backend.app.models.archive import PrintArchive
+from backend.app.services.archive_duplicates import (
+    get_archives_with_duplicates,
+    install_archive_duplicates,
+    rebuild_archive_duplicates,
+    reinstall_archive_duplicates,
+)
+
+
+async def snapshot(db) -> dict:
+    result = await db.execute(text("SELECT scope, key, archives FROM archive_duplicates ORDER BY scope, key"))
+    return {(row.scope, row.key): row.archives for row in result.all()}
+
+
+def make_archive(**kwargs) -> PrintArchive:
+    defaults = {"filename": "part.3mf", "file_path": "archive/part.3mf", "file_size": 100, "status": "completed"}
+    defaults.update(kwargs)
+    return PrintArchive(**defaults)
+
+
+class TestArchiveDuplicates:
+    """Tests for the archive_duplicates triggers and duplicate flags."""
+
+    @pytest.fixture
+    async def archives(self, db_session):
+        archives = [
+            make_archive(print_name="Benchy", content_hash="aaa"),
+            make_archive(print_name="benchy", content_hash="bbb"),
+            make_archive(print_name="Cube", content_hash="ccc"),
+            make_archive(print_name="Gear", content_hash="ccc"),
+            make_archive(print_name=None, content_hash=None),
+        ]
+        db_session.add_all(archives)
+        await db_session.commit()
+        return archives
+
+    @pytest.mark.asyncio
+    async def test_insert_counts_hash_and_name(self, db_session, archives):
+        """Verify hashes and case-insensitive names are counted on insert."""
+        assert await snapshot(db_session) == {
+            ("hash", "aaa"): 1,
+            ("hash", "bbb"): 1,
+            ("hash", "ccc"): 2,
+            ("name", "benchy"): 2,
+            ("name", "cube"): 1,
+            ("name", "gear"): 1,
+        }
+        benchy, benchy_lower, cube, gear, unnamed = archives
+        assert await get_archives_with_duplicates(db_session, [a.id for a in archives]) == {
+            benchy.id,
+            benchy_lower.id,
+            cube.id,
+            gear.id,
+        }
+
+    @pytest.mark.asyncio
+    async def test_rename_and_rehash(self, db_session, archives):
+        """Verify renaming or re-hashing an archive moves its counts."""
+        benchy, benchy_lower, cube, gear, unnamed = archives
+        benchy_lower.print_name = "Boat"
+        gear.content_hash = "ddd"
+        await db_session.commit()
+
+        assert await get_archives_with_duplicates(db_session, [a.id for a in archives]) == set()
+        assert ("name", "benchy") in await snapshot(db_session)
+        assert await snapshot(db_session) == await self._rebuilt(db_session)
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_and_delete(self, db_session, archives):
+        """Verify bulk statements keep the counts equal to a rebuild and drop empty keys."""
+        await db_session.execute(
+            update(PrintArchive).where(PrintArchive.content_hash == "aaa").values(content_hash="ccc")
+        )
+        await db_session.execute(delete(PrintArchive).where(PrintArchive.print_name == "Cube"))
+        await db_session.commit()
+
+        counts = await snapshot(db_session)
+        assert counts[("hash", "ccc")] == 2
+        assert ("name", "cube") not in counts
+        assert counts == await self._rebuilt(db_session)
+
+    @pytest.mark.asyncio
+    async def test_install_counts_existing_archives(self, db_session, archives):
+        """Verify installing fills the counts for archives that predate the triggers."""
+        expected = await snapshot(db_session)
+        await db_session.execute(text("DELETE FROM archive_duplicates"))
+        await db_session.commit()
+
+        await install_archive_duplicates(await db_session.connection())
+
+        assert await snapshot(db_session) == expected
+
+    @pytest.mark.asyncio
+    async def test_empty_names_not_duplicates(self, db_session, archives):
+        """Verify archives with an empty print name or hash aren't counted as duplicates of each other."""
+        empty = [make_archive(print_name="", content_hash=""), make_archive(print_name="", content_hash="")]
+        db_session.add_all(empty)
+        await db_session.commit()
+
+        counts = await snapshot(db_session)
+        assert ("name", "") not in counts
+        assert ("hash", "") not in counts
+        assert counts == await self._rebuilt(db_session)
+        assert await get_archives_with_duplicates(db_session, [a.id for a in empty]) == set()
+
+    @pytest.mark.asyncio
+    async def test_reinstall_replaces_triggers(self, db_session, archives):
+        """Verify reinstalling drops triggers created by an earlier version and recounts."""
+        conn = await db_session.connection()
+        await conn.execute(text("DROP TRIGGER archive_duplicates_insert"))
+        await conn.execute(
+            text(
+                "CREATE TRIGGER archive_duplicates_insert AFTER INSERT ON print_archives BEGIN "
+                "INSERT INTO archive_duplicates (scope, key, archives) SELECT 'name', lower(new.print_name), 1 "
+                "WHERE new.print_name IS NOT NULL "
+                "ON CONFLICT(scope, key) DO UPDATE SET archives = archives + 1; END"
+            )
+        )
+        await conn.execute(text("INSERT INTO archive_duplicates (scope, key, archives) VALUES ('name', '', 2)"))
+
+        await reinstall_archive_duplicates(conn)
+        db_session.add(make_archive(print_name=""))
+        await db_session.commit()
+
+        assert ("name", "") not in await snapshot(db_session)
+
+    @pytest.mark.asyncio
+    async def test_no_archives(self, db_session):
+        """Verify an empty page has no duplicates without querying."""
+        assert await get_archives_with_duplicates(db_session, []) == set()
+
+    @staticmethod
+    async def _rebuilt(db) -> dict:
+        await rebuild_archive_duplicates(db)
+        return await snapshot(db)
@@ -0,0 +1,143 @@
+"""Unit tests for archive ingest.
+
+Tests the single-pass copy and hash, bounded 3MF model reads and that
+archive_print does its file work off the event loop.
+"""
+
+import io
+import threading
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+
+from backend.app.models.filament_requirements import FilamentRequirements
+from backend.app.services import archive as archive_module, blob_store
+from backend.app.services.archive import ArchiveService, ThreeMFParser, ingest_3mf
+from backend.app.services.blob_store import copy_and_hash
+
+SLICE_INFO = """<?xml version="1.0" encoding="UTF-8"?>
+<config>
+    <plate>
+        <metadata key="index" value="1"/>
+        <filament id="1" used_g="12.5" type="PLA" color="#FF0000"/>
+    </plate>
+</config>
+"""
+
+MODEL = """<?xml version="1.0" encoding="UTF-8"?>
+<model unit="millimeter">
+    <metadata name="Designer">maker</metadata>
+    <metadata name="Title">Benchy</metadata>
+    <resources>
+        <object id="1"><mesh>{mesh}</mesh></object>
+    </resources>
+</model>
+"""
+
+
+def make_3mf(path, mesh: str = ""):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("Metadata/slice_info.config", SLICE_INFO)
+        zf.writestr("3D/3dmodel.model", MODEL.format(mesh=mesh))
+        zf.writestr("Metadata/plate_1.png", b"\x89PNG thumbnail")
+    path.write_bytes(buffer.getvalue())
+    return path
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    with (
+        patch.object(archive_module.settings, "base_dir", tmp_path),
+        patch.object(archive_module.settings, "archive_dir", tmp_path / "archive"),
+        patch.object(archive_module.settings, "blob_dir", tmp_path / "blobs"),
+    ):
+        yield tmp_path
+
+
+class TestCopyAndHash:
+    """Tests for copy_and_hash()."""
+
+    def test_copy_matches_hash(self, tmp_path):
+        """Verify the copy is identical and the hash matches a separate hash pass."""
+        source = tmp_path / "source.bin"
+        source.write_bytes(bytes(range(256)) * 9000)
+        dest = tmp_path / "dest.bin"
+
+        with patch.object(blob_store, "COPY_BUFFER_SIZE", 4096):
+            content_hash = copy_and_hash(source, dest)
+
+        assert dest.read_bytes() == source.read_bytes()
+        assert content_hash == ArchiveService.compute_file_hash(source)
+        assert dest.stat().st_mtime == source.stat().st_mtime
+
+
+class TestModelHeader:
+    """Tests for reading 3MF model metadata."""
+
+    def test_stops_at_resources(self, tmp_path):
+        """Verify metadata is found without reading the mesh data."""
+        file_path = make_3mf(tmp_path / "test.3mf", mesh="DSM00000001234" + "<vertex/>" * 50000)
+
+        with patch.object(archive_module, "MODEL_HEADER_CHUNK_SIZE", 16):
+            metadata = ThreeMFParser(file_path).parse()
+
+        assert metadata["designer"] == "maker"
+        assert metadata["print_name"] == "Benchy"
+        assert "makerworld_model_id" not in metadata
+
+
+class TestIngest:
+    """Tests for the ingest pipeline."""
+
+    def test_ingest_3mf(self, tmp_path, data_dir):
+        """Verify ingest copies, hashes, parses and writes the thumbnail."""
+        source = make_3mf(tmp_path / "test.3mf")
+        archive_dir = data_dir / "archive" / "1" / "job"
+
+        result = ingest_3mf(source, archive_dir, plate_number=1)
+
+        assert result.dest_file == archive_dir / "test.3mf"
+        assert result.content_hash == ArchiveService.compute_file_hash(source)
+        assert result.dest_file.samefile(blob_store.blob_path(result.content_hash))
+        assert result.file_size == source.stat().st_size
+        assert result.thumbnail_path == "archive/1/job/thumbnail.png"
+        assert (archive_dir / "thumbnail.png").read_bytes() == b"\x89PNG thumbnail"
+        assert "_thumbnail_data" not in result.metadata
+        assert [f["type"] for f in result.filament_requirements["all"]] == ["PLA"]
+
+    def test_ingest_non_zip(self, tmp_path, data_dir):
+        """Verify a file that isn't a zip is still archived without metadata."""
+        source = tmp_path / "broken.3mf"
+        source.write_bytes(b"not a zip")
+
+        result = ingest_3mf(source, data_dir / "archive" / "job")
+
+        assert result.metadata == {}
+        assert result.thumbnail_path is None
+        assert result.filament_requirements == {"all": [], "plates": {}}
+
+    @pytest.mark.asyncio
+    async def test_archive_print_parses_off_loop(self, tmp_path, data_dir, db_session):
+        """Verify archive_print parses in the ingest pool and stores the results."""
+        source = make_3mf(tmp_path / "test.3mf")
+        threads = []
+        original = ThreeMFParser.parse_zip
+
+        def record_thread(self, zf):
+            threads.append(threading.current_thread())
+            return original(self, zf)
+
+        with patch.object(ThreeMFParser, "parse_zip", record_thread):
+            archive = await ArchiveService(db_session).archive_print(None, source)
+
+        assert threads and threads[0] is not threading.main_thread()
+        assert archive.print_name == "Benchy"
+        assert archive.content_hash == ArchiveService.compute_file_hash(source)
+        assert (data_dir / archive.file_path).read_bytes() == source.read_bytes()
+        stored = await db_session.scalar(
+            select(FilamentRequirements).where(FilamentRequirements.content_hash == archive.content_hash)
+        )
+        assert stored is not None
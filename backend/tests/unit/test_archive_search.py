@@ -0,0 +1,131 @@
+"""Unit tests for archive full-text search.
+
+Tests query translation, index maintenance by triggers, filtered ranking and
+cursor pagination.
+"""
+
+import pytest
+from sqlalchemy import text, update
+
+from backend.app.models.archive import PrintArchive
+from backend.app.services.archive_search import (
+    build_match_query,
+    format_snippet,
+    install_archive_search,
+    search_archives,
+)
+from backend.app.services.pagination import InvalidCursorError
+
+
+def make_archive(**kwargs) -> PrintArchive:
+    defaults = {
+        "filename": "part.3mf",
+        "file_path": "archive/part.3mf",
+        "file_size": 100,
+        "status": "completed",
+    }
+    defaults.update(kwargs)
+    return PrintArchive(**defaults)
+
+
+class TestBuildMatchQuery:
+    """Tests for translating user queries into FTS5 expressions."""
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("voron", '"voron" *'),
+            ("vor* cube", '"vor" * "cube" *'),
+            ('"benchy v2"', '"benchy v2"'),
+            ('"benchy v"*', '"benchy v" *'),
+            ("tags:gift", 'tags : "gift" *'),
+            ('designer:"Jane Doe"', 'designer : "Jane Doe"'),
+            ("name:cube", 'print_name : "cube" *'),
+            ("a OR b", '"a" * OR "b" *'),
+            ("OR a OR", '"a" *'),
+            ("PLA-CF", '"PLA-CF" *'),
+            ("http://x", '"http://x" *'),
+            ('say "hi', '"say" * "hi"'),
+            ("- * ()", None),
+        ],
+    )
+    def test_translation(self, query, expected):
+        """Verify user queries become safe FTS5 expressions."""
+        assert build_match_query(query) == expected
+
+    def test_snippet_escaped(self):
+        """Verify snippets are HTML-escaped with matches marked."""
+        assert format_snippet("<b>\x01voron\x02</b>") == "&lt;b&gt;<mark>voron</mark>&lt;/b&gt;"
+
+
+class TestSearchArchives:
+    """Tests for search_archives()."""
+
+    @pytest.mark.asyncio
+    async def test_triggers_keep_index_in_sync(self, db_session):
+        """Verify inserts, updates and deletes are searchable without a rebuild."""
+        archive = make_archive(print_name="Voron Cube")
+        db_session.add(archive)
+        await db_session.commit()
+        assert [h.archive_id for h in (await search_archives(db_session, '"voron" *'))[0]] == [archive.id]
+
+        archive.print_name = "Benchy"
+        await db_session.commit()
+        assert (await search_archives(db_session, '"voron" *'))[0] == []
+        assert len((await search_archives(db_session, '"benchy" *'))[0]) == 1
+
+        await db_session.execute(update(PrintArchive).values(notes="stringing test"))
+        await db_session.delete(archive)
+        await db_session.commit()
+        assert (await search_archives(db_session, '"benchy" *'))[0] == []
+
+    @pytest.mark.asyncio
+    async def test_filters_and_cursor_pages(self, db_session):
+        """Verify filtered results page through every match exactly once."""
+        db_session.add_all(
+            [make_archive(print_name=f"cube {i}", status="failed" if i % 3 else "completed") for i in range(20)]
+        )
+        await db_session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            hits, cursor = await search_archives(db_session, '"cube" *', status="completed", limit=3, cursor=cursor)
+            seen.extend(h.archive_id for h in hits)
+            if cursor is None:
+                break
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+        assert all("<mark>cube</mark>" in h.snippet for h in hits)
+
+    @pytest.mark.asyncio
+    async def test_ranked_by_field_weight(self, db_session):
+        """Verify a name match ranks above a notes match."""
+        in_notes = make_archive(print_name="Bracket", notes="printed next to the gear")
+        in_name = make_archive(print_name="Gear")
+        db_session.add_all([in_notes, in_name])
+        await db_session.commit()
+
+        hits, _ = await search_archives(db_session, '"gear" *')
+
+        assert [h.archive_id for h in hits] == [in_name.id, in_notes.id]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, db_session):
+        """Verify a malformed cursor is rejected."""
+        with pytest.raises(InvalidCursorError):
+            await search_archives(db_session, '"x" *', cursor="not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_install_indexes_existing_archives(self, db_session):
+        """Verify archives missing from the index are indexed on install."""
+        db_session.add(make_archive(print_name="Old Print"))
+        await db_session.commit()
+        await db_session.execute(text("INSERT INTO archive_fts(archive_fts) VALUES ('delete-all')"))
+        await db_session.commit()
+        assert (await search_archives(db_session, '"old" *'))[0] == []
+
+        await install_archive_search(await db_session.connection())
+
+        assert len((await search_archives(db_session, '"old" *'))[0]) == 1
@@ -0,0 +1,129 @@
+"""Unit tests for trigger-maintained archive statistics.
+
+Tests that inserts, updates and deletes (ORM and bulk) keep archive_stats
+equal to a full rebuild, and the values the stats endpoint derives from it.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, text, update
+
+from backend.app.models.archive import PrintArchive
+from backend.app.models.printer import Printer
+from backend.app.services.archive_stats import (
+    get_stats_buckets,
+    get_stats_totals,
+    install_archive_stats,
+    rebuild_archive_stats,
+)
+
+
+async def snapshot(db) -> dict:
+    result = await db.execute(text("SELECT * FROM archive_stats WHERE prints != 0 ORDER BY scope, key"))
+    return {
+        (row.scope, row.key): tuple(round(v, 6) if isinstance(v, float) else v for v in row[3:]) for row in result.all()
+    }
+
+
+async def create_printer(db, name: str) -> Printer:
+    printer = Printer(name=name, serial_number=f"SN-{name}", ip_address="192.168.1.10", access_code="12345678")
+    db.add(printer)
+    await db.commit()
+    return printer
+
+
+def make_archive(printer_id: int | None, **kwargs) -> PrintArchive:
+    started = datetime(2026, 3, 1, 10, 0, 0)
+    defaults = {
+        "printer_id": printer_id,
+        "filename": "part.3mf",
+        "file_path": "archive/part.3mf",
+        "file_size": 100,
+        "status": "completed",
+        "filament_type": "PLA",
+        "filament_used_grams": 20.0,
+        "cost": 0.5,
+        "print_time_seconds": 3600,
+        "started_at": started,
+        "completed_at": started + timedelta(seconds=4000),
+        "created_at": started,
+    }
+    defaults.update(kwargs)
+    return PrintArchive(**defaults)
+
+
+class TestArchiveStats:
+    """Tests for the archive_stats triggers and rebuild."""
+
+    @pytest.mark.asyncio
+    async def test_insert_counts_every_bucket(self, db_session):
+        """Verify one archive is counted globally, per printer, per filament type and per day."""
+        printer = await create_printer(db_session, "p1")
+        db_session.add(make_archive(printer.id, filament_type="PLA, PETG"))
+        await db_session.commit()
+
+        totals = await get_stats_totals(db_session)
+        assert totals.prints == 1
+        assert totals.completed == 1
+        assert totals.print_seconds == pytest.approx(4000)
+        assert totals.accuracy_count == 1
+        assert totals.accuracy_sum == pytest.approx(90.0)
+
+        assert {b.key: b.prints for b in await get_stats_buckets(db_session, "filament")} == {"PLA": 1, "PETG": 1}
+        assert [b.key for b in await get_stats_buckets(db_session, "printer")] == [str(printer.id)]
+        assert [b.key for b in await get_stats_buckets(db_session, "day")] == ["2026-03-01"]
+
+    @pytest.mark.asyncio
+    async def test_changes_match_rebuild(self, db_session):
+        """Verify updates and deletes, including bulk statements, keep the totals exact."""
+        p1 = await create_printer(db_session, "p1")
+        p2 = await create_printer(db_session, "p2")
+        archives = [
+            make_archive(p1.id),
+            make_archive(p1.id, status="failed", filament_type="PETG,PLA,PLA"),
+            make_archive(p2.id, started_at=None, completed_at=None, print_time_seconds=1800),
+            make_archive(None, filament_type='PLA "Silk"', cost=None, created_at=datetime(2026, 3, 2)),
+            make_archive(p2.id, filament_type=None, print_time_seconds=10),  # Accuracy out of range
+        ]
+        db_session.add_all(archives)
+        await db_session.commit()
+
+        archives[0].status = "failed"
+        archives[2].filament_used_grams = 55.5
+        archives[3].printer_id = p2.id
+        archives[4].notes = "not a tracked column"
+        await db_session.commit()
+        await db_session.execute(update(PrintArchive).where(PrintArchive.printer_id == p1.id).values(printer_id=None))
+        await db_session.delete(archives[2])
+        await db_session.commit()
+        await db_session.execute(delete(PrintArchive).where(PrintArchive.status == "failed"))
+        await db_session.commit()
+
+        incremental = await snapshot(db_session)
+        await rebuild_archive_stats(db_session)
+        await db_session.commit()
+        assert incremental == await snapshot(db_session)
+
+        totals = await get_stats_totals(db_session)
+        assert totals.prints == 2
+        assert {b.key: b.prints for b in await get_stats_buckets(db_session, "filament")} == {'PLA "Silk"': 1}
+
+    @pytest.mark.asyncio
+    async def test_install_fills_existing_archives(self, db_session):
+        """Verify archives that predate the table are counted on first install."""
+        db_session.add(make_archive(None))
+        await db_session.commit()
+        await db_session.execute(text("DELETE FROM archive_stats"))
+        await db_session.commit()
+
+        await install_archive_stats(await db_session.connection())
+
+        assert (await get_stats_totals(db_session)).prints == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_totals(self, db_session):
+        """Verify totals are zero without archives."""
+        totals = await get_stats_totals(db_session)
+        assert totals.prints == 0
+        assert totals.cost == 0
@@ -0,0 +1,60 @@
+"""Unit tests for the minimum-cost assignment solver."""
+
+import itertools
+
+from backend.app.utils.assignment import min_cost_assignment
+
+
+def total(cost, pairs):
+    return sum(cost[r][c] for r, c in pairs)
+
+
+class TestMinCostAssignment:
+    """Tests for min_cost_assignment()."""
+
+    def test_empty(self):
+        assert min_cost_assignment([]) == []
+        assert min_cost_assignment([[]]) == []
+
+    def test_square(self):
+        cost = [[4, 1, 3], [2, 0, 5], [3, 2, 2]]
+        assert min_cost_assignment(cost) == [(0, 1), (1, 0), (2, 2)]
+
+    def test_beats_greedy(self):
+        """Row 0 greedily taking column 0 would strand row 1."""
+        cost = [[1, 2], [1, None]]
+        assert min_cost_assignment(cost) == [(0, 1), (1, 0)]
+
+    def test_more_rows_than_columns(self):
+        cost = [[5], [1], [3]]
+        assert min_cost_assignment(cost) == [(1, 0)]
+
+    def test_more_columns_than_rows(self):
+        cost = [[5, 1, 3]]
+        assert min_cost_assignment(cost) == [(0, 1)]
+
+    def test_forbidden_pairs_left_unmatched(self):
+        cost = [[None, None], [2, None]]
+        assert min_cost_assignment(cost) == [(1, 0)]
+
+    def test_maximizes_matches_before_cost(self):
+        """Two expensive matches are preferred over one cheap one."""
+        cost = [[0, 100], [None, 100]]
+        assert min_cost_assignment(cost) == [(0, 0), (1, 1)]
+
+    def test_matches_brute_force(self):
+        cost = [
+            [7, 3, None, 8, 2],
+            [2, None, 4, 6, 9],
+            [5, 8, 1, None, 3],
+            [None, 4, 6, 2, 7],
+        ]
+        best = None
+        for cols in itertools.permutations(range(5), 4):
+            pairs = [(r, c) for r, c in enumerate(cols) if cost[r][c] is not None]
+            key = (-len(pairs), total(cost, pairs))
+            if best is None or key < best:
+                best = key
+
+        pairs = min_cost_assignment(cost)
+        assert (-len(pairs), total(cost, pairs)) == best
@@ -0,0 +1,127 @@
+"""Unit tests for the cached auth context.
+
+Tests the auth_enabled and user caches and per-request token resolution.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from starlette.requests import Request
+
+from backend.app.core import auth
+from backend.app.core.auth import (
+    create_access_token,
+    get_cached_user,
+    get_token_user,
+    invalidate_auth_cache,
+    is_auth_enabled,
+)
+from backend.app.models.settings import Settings
+from backend.app.models.user import User
+
+
+@pytest.fixture(autouse=True)
+def reset_auth_cache():
+    invalidate_auth_cache()
+    yield
+    invalidate_auth_cache()
+
+
+def make_request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/api/v1/printers", "headers": []})
+
+
+async def create_user(db, username: str = "alice") -> User:
+    user = User(username=username, password_hash="x", role="user", is_active=True)
+    db.add(user)
+    await db.commit()
+    return user
+
+
+class TestAuthEnabledCache:
+    """Tests for the cached auth_enabled setting."""
+
+    @pytest.mark.asyncio
+    async def test_setting_cached_until_invalidated(self, db_session):
+        """Verify auth_enabled is read once and re-read after invalidation."""
+        setting = Settings(key="auth_enabled", value="true")
+        db_session.add(setting)
+        await db_session.commit()
+
+        assert await is_auth_enabled(db_session) is True
+
+        setting.value = "false"
+        await db_session.commit()
+        assert await is_auth_enabled(db_session) is True
+
+        invalidate_auth_cache()
+        assert await is_auth_enabled(db_session) is False
+
+    @pytest.mark.asyncio
+    async def test_setting_expires(self, db_session):
+        """Verify a cached auth_enabled value is re-read after the TTL."""
+        assert await is_auth_enabled(db_session) is False
+        db_session.add(Settings(key="auth_enabled", value="true"))
+        await db_session.commit()
+
+        with patch("backend.app.core.auth.time.monotonic", return_value=auth.time.monotonic() + auth.AUTH_CACHE_TTL):
+            assert await is_auth_enabled(db_session) is True
+
+
+class TestUserCache:
+    """Tests for the cached user lookup."""
+
+    @pytest.mark.asyncio
+    async def test_user_cached_case_insensitive(self, db_session):
+        """Verify repeated lookups of a username hit the cache."""
+        await create_user(db_session)
+
+        with patch("backend.app.core.auth.get_user_by_username", wraps=auth.get_user_by_username) as mock_get:
+            first = await get_cached_user(db_session, "alice")
+            second = await get_cached_user(db_session, "ALICE")
+
+        assert first is second
+        assert mock_get.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_user_not_cached(self, db_session):
+        """Verify a user created after a failed lookup is found."""
+        assert await get_cached_user(db_session, "bob") is None
+        await create_user(db_session, "bob")
+        assert await get_cached_user(db_session, "bob") is not None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_reloads_user(self, db_session):
+        """Verify changes to a user are seen after invalidation."""
+        user = await create_user(db_session)
+        assert (await get_cached_user(db_session, "alice")).is_active
+
+        user.is_active = False
+        await db_session.commit()
+        invalidate_auth_cache()
+
+        assert not (await get_cached_user(db_session, "alice")).is_active
+
+
+class TestTokenUser:
+    """Tests for resolving a JWT to a user once per request."""
+
+    @pytest.mark.asyncio
+    async def test_token_resolved_once_per_request(self, db_session):
+        """Verify the auth context on request.state is reused."""
+        await create_user(db_session)
+        token = create_access_token({"sub": "alice"})
+        request = make_request()
+
+        user = await get_token_user(db_session, token, request)
+        assert user.username == "alice"
+        assert request.state.auth.token == token
+
+        with patch("backend.app.core.auth.jwt.decode") as mock_decode:
+            assert await get_token_user(db_session, token, request) is user
+        mock_decode.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_invalid_token(self, db_session):
+        """Verify an invalid token resolves to no user."""
+        assert await get_token_user(db_session, "not-a-jwt", make_request()) is None
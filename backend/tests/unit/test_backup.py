@@ -0,0 +1,165 @@
+"""Unit tests for streaming full and incremental backups."""
+
+import io
+import json
+import os
+import shutil
+import sqlite3
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.services import backup as backup_module
+from backend.app.services.backup import (
+    DATABASE_NAME,
+    MANIFEST_NAME,
+    iter_backup,
+    load_last_manifest,
+    read_backup_manifest,
+    reset_blob_store_migration,
+    restore_file,
+)
+from backend.app.services.blob_store import MIGRATED_SETTING
+
+
+def run_backup(incremental: bool = False) -> zipfile.ZipFile:
+    data = b"".join(iter_backup(incremental))
+    return zipfile.ZipFile(io.BytesIO(data))
+
+
+class TestIterBackup:
+    """Tests for iter_backup()."""
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        db_path = tmp_path / "bambuddy.db"
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (42)")
+        conn.commit()
+        conn.close()
+
+        archive_dir = tmp_path / "archive" / "1"
+        archive_dir.mkdir(parents=True)
+        (archive_dir / "print.3mf").write_bytes(b"3mf" * 1000)
+        (archive_dir / "meta.json").write_text('{"a": 1}' * 100)
+        (tmp_path / "icons").mkdir()
+        (tmp_path / "icons" / "old.png").write_bytes(b"png")
+
+        with (
+            patch.object(backup_module.settings, "base_dir", tmp_path),
+            patch.object(backup_module.settings, "plate_calibration_dir", tmp_path / "plate_calibration"),
+            patch.object(backup_module.settings, "database_url", f"sqlite+aiosqlite:///{db_path}"),
+        ):
+            yield tmp_path
+
+    def test_full_backup(self, data_dir, tmp_path_factory):
+        """Verify a full backup holds the database, all files and the manifest."""
+        zf = run_backup()
+
+        assert sorted(zf.namelist()) == sorted(
+            [DATABASE_NAME, "archive/1/meta.json", "archive/1/print.3mf", "icons/old.png", MANIFEST_NAME]
+        )
+        assert zf.getinfo("archive/1/print.3mf").compress_type == zipfile.ZIP_STORED
+        assert zf.getinfo("archive/1/meta.json").compress_type == zipfile.ZIP_DEFLATED
+        assert zf.testzip() is None
+
+        restored = tmp_path_factory.mktemp("restored") / DATABASE_NAME
+        restored.write_bytes(zf.read(DATABASE_NAME))
+        assert sqlite3.connect(restored).execute("SELECT x FROM t").fetchone() == (42,)
+
+        manifest = read_backup_manifest(zf)
+        assert manifest["incremental"] is False
+        assert set(manifest["files"]) == {"archive/1/meta.json", "archive/1/print.3mf", "icons/old.png"}
+        assert load_last_manifest()["id"] == manifest["id"]
+
+    def test_incremental_backup(self, data_dir):
+        """Verify an incremental backup only holds changed files and lists deleted ones."""
+        base = read_backup_manifest(run_backup())
+
+        (data_dir / "archive" / "1" / "meta.json").write_text('{"a": 2}')
+        (data_dir / "archive" / "2").mkdir()
+        (data_dir / "archive" / "2" / "new.3mf").write_bytes(b"new")
+        (data_dir / "icons" / "old.png").unlink()
+        # Touched without changing the content
+        os.utime(data_dir / "archive" / "1" / "print.3mf", ns=(1, 1))
+
+        zf = run_backup(incremental=True)
+
+        assert sorted(zf.namelist()) == sorted(
+            [DATABASE_NAME, "archive/1/meta.json", "archive/2/new.3mf", MANIFEST_NAME]
+        )
+        manifest = read_backup_manifest(zf)
+        assert manifest["incremental"] is True
+        assert manifest["base"] == base["id"]
+        assert manifest["deleted"] == ["icons/old.png"]
+        assert "archive/1/print.3mf" in manifest["files"]
+
+    def test_incremental_without_previous_is_full(self, data_dir):
+        """Verify an incremental backup without a previous one contains everything."""
+        manifest = read_backup_manifest(run_backup(incremental=True))
+
+        assert manifest["incremental"] is False
+        assert len(manifest["files"]) == 3
+
+    def test_manifest_saved_only_when_complete(self, data_dir):
+        """Verify an interrupted backup doesn't become the base of the next incremental one."""
+        chunks = iter_backup()
+        next(chunks)
+        chunks.close()
+
+        assert load_last_manifest() is None
+        assert not (data_dir / MANIFEST_NAME).exists()
+
+    def test_read_manifest_of_old_backup(self):
+        """Verify backups made before manifests existed have no manifest."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr(DATABASE_NAME, b"")
+        assert read_backup_manifest(zipfile.ZipFile(buffer)) is None
+
+    def test_manifest_is_json(self, data_dir):
+        """Verify the stored last manifest matches the one in the ZIP."""
+        zf = run_backup()
+
+        assert json.loads(zf.read(MANIFEST_NAME)) == load_last_manifest()
+
+
+class TestRestore:
+    """Tests for restore_file() and reset_blob_store_migration()."""
+
+    def test_restore_over_linked_file(self, tmp_path):
+        """Verify restoring over a file doesn't change the other files linked to it."""
+        (tmp_path / "backup").mkdir()
+        (tmp_path / "backup" / "a.3mf").write_bytes(b"restored")
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "a.3mf").write_bytes(b"current")
+        os.link(tmp_path / "data" / "a.3mf", tmp_path / "blob")
+
+        shutil.copytree(tmp_path / "backup", tmp_path / "data", copy_function=restore_file, dirs_exist_ok=True)
+
+        assert (tmp_path / "data" / "a.3mf").read_bytes() == b"restored"
+        assert (tmp_path / "blob").read_bytes() == b"current"
+        assert os.listdir(tmp_path / "data") == ["a.3mf"]
+
+    def test_reset_blob_store_migration(self, tmp_path):
+        """Verify the restored database no longer records the blob store migration."""
+        db_file = tmp_path / DATABASE_NAME
+        conn = sqlite3.connect(db_file)
+        conn.execute("CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO settings VALUES (?, ?)", [(MIGRATED_SETTING, "true"), ("theme", "dark")])
+        conn.commit()
+        conn.close()
+
+        reset_blob_store_migration(db_file)
+
+        rows = sqlite3.connect(db_file).execute("SELECT key FROM settings").fetchall()
+        assert rows == [("theme",)]
+
+    def test_reset_blob_store_migration_without_settings(self, tmp_path):
+        """Verify a database without a settings table is left alone."""
+        db_file = tmp_path / DATABASE_NAME
+        sqlite3.connect(db_file).close()
+
+        reset_blob_store_migration(db_file)
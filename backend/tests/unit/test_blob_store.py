@@ -0,0 +1,180 @@
+"""Unit tests for the content-addressed blob store.
+
+Tests storing and linking files, collapsing existing duplicates, reference
+counting through link counts and garbage collection.
+"""
+
+import errno
+import os
+import time
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+from backend.app.services import blob_store
+from backend.app.services.archive import ProjectPageParser
+from backend.app.services.blob_store import (
+    blob_path,
+    collect_garbage,
+    intern_file,
+    release_blob,
+    store_file,
+)
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path):
+    with patch.object(blob_store.settings, "blob_dir", tmp_path / "blobs"):
+        yield tmp_path / "blobs"
+
+
+def write(path, content: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+class TestStoreFile:
+    """Tests for store_file()."""
+
+    def test_identical_content_stored_once(self, tmp_path):
+        """Verify two copies of the same content share one blob."""
+        source = write(tmp_path / "upload.3mf", b"model data")
+
+        first = store_file(source, tmp_path / "archive" / "a" / "upload.3mf")
+        second = store_file(source, tmp_path / "archive" / "b" / "upload.3mf")
+
+        assert first == second
+        blob = blob_path(first)
+        assert blob.read_bytes() == b"model data"
+        assert blob.samefile(tmp_path / "archive" / "a" / "upload.3mf")
+        assert blob.samefile(tmp_path / "archive" / "b" / "upload.3mf")
+        assert blob.stat().st_nlink == 3
+        assert not any((blob_store.settings.blob_dir / "tmp").iterdir())
+
+    def test_linked_source_not_copied(self, tmp_path):
+        """Verify storing a file that is already a blob link only creates a link."""
+        library_file = write(tmp_path / "library" / "file.3mf", b"library model")
+        intern_file(library_file)
+
+        with patch.object(blob_store, "copy_and_hash", wraps=blob_store.copy_and_hash) as mock_copy:
+            content_hash = store_file(library_file, tmp_path / "archive" / "file.3mf")
+
+        mock_copy.assert_not_called()
+        assert blob_path(content_hash).stat().st_nlink == 3
+
+    def test_falls_back_to_copy_without_links(self, tmp_path):
+        """Verify files are copied when the filesystem can't hard link."""
+        source = write(tmp_path / "upload.3mf", b"model data")
+        dest = tmp_path / "archive" / "upload.3mf"
+
+        with patch.object(blob_store.os, "link", side_effect=OSError("not supported")):
+            store_file(source, dest)
+
+        assert dest.read_bytes() == b"model data"
+        assert dest.stat().st_nlink == 1
+
+    def test_replacing_a_link_leaves_others_untouched(self, tmp_path):
+        """Verify moving a new file over one link doesn't change the other copies."""
+        source = write(tmp_path / "upload.3mf", b"original")
+        a = tmp_path / "a.3mf"
+        b = tmp_path / "b.3mf"
+        store_file(source, a)
+        store_file(source, b)
+
+        edited = write(tmp_path / "edited.tmp", b"edited")
+        os.replace(edited, a)
+
+        assert a.read_bytes() == b"edited"
+        assert b.read_bytes() == b"original"
+
+    def test_project_page_edit_across_devices(self, tmp_path):
+        """Verify editing a linked 3MF's metadata with no cross-device rename leaves the other links and the blob intact."""
+        model = b'<model><metadata name="Title">Benchy</metadata></model>'
+        source = tmp_path / "upload.3mf"
+        with zipfile.ZipFile(source, "w") as zf:
+            zf.writestr("3D/3dmodel.model", model)
+        content_hash = store_file(source, tmp_path / "archive" / "a" / "model.3mf")
+        store_file(source, tmp_path / "archive" / "b" / "model.3mf")
+        original = source.read_bytes()
+
+        # A temp dir on another filesystem makes shutil.move fall back to copying into the target
+        with patch("os.rename", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+            assert ProjectPageParser(tmp_path / "archive" / "a" / "model.3mf").update_metadata({"title": "Boat"})
+
+        with zipfile.ZipFile(tmp_path / "archive" / "a" / "model.3mf") as zf:
+            assert b"Boat" in zf.read("3D/3dmodel.model")
+        assert (tmp_path / "archive" / "b" / "model.3mf").read_bytes() == original
+        assert blob_store.hash_file(blob_path(content_hash)) == content_hash
+        assert not list((tmp_path / "archive" / "a").glob(".*"))
+
+
+class TestInternFile:
+    """Tests for intern_file()."""
+
+    def test_collapses_duplicates(self, tmp_path):
+        """Verify existing duplicate files become links to one blob."""
+        a = write(tmp_path / "a.3mf", b"same")
+        b = write(tmp_path / "b.3mf", b"same")
+
+        assert intern_file(a) == intern_file(b)
+        assert a.samefile(b)
+        assert a.read_bytes() == b"same"
+
+    def test_stale_hash_not_trusted(self, tmp_path):
+        """Verify a recorded hash is only trusted if the file is linked to that blob."""
+        a = write(tmp_path / "a.3mf", b"content a")
+        b = write(tmp_path / "b.3mf", b"content b")
+        hash_a = intern_file(a)
+
+        assert intern_file(b, hash_a) != hash_a
+        assert b.read_bytes() == b"content b"
+
+
+class TestBlobLifetime:
+    """Tests for releasing blobs and garbage collection."""
+
+    def test_release_after_last_reference(self, tmp_path):
+        """Verify a blob is removed only once its last link is deleted."""
+        source = write(tmp_path / "upload.3mf", b"model data")
+        a = tmp_path / "a.3mf"
+        b = tmp_path / "b.3mf"
+        content_hash = store_file(source, a)
+        store_file(source, b)
+
+        a.unlink()
+        release_blob(content_hash)
+        assert blob_path(content_hash).exists()
+
+        b.unlink()
+        release_blob(content_hash)
+        assert not blob_path(content_hash).exists()
+
+    def test_collect_garbage(self, tmp_path, blob_dir):
+        """Verify unreferenced blobs and stale temp files are removed."""
+        kept = store_file(write(tmp_path / "kept.3mf", b"kept"), tmp_path / "kept-link.3mf")
+        orphan = store_file(write(tmp_path / "orphan.3mf", b"orphan"), tmp_path / "orphan-link.3mf")
+        (tmp_path / "orphan-link.3mf").unlink()
+        stale = write(blob_dir / "tmp" / "stale", b"partial")
+        fresh = write(blob_dir / "tmp" / "fresh", b"in progress")
+        old = time.time() - blob_store.TEMP_MAX_AGE_SECONDS - 1
+        os.utime(stale, (old, old))
+
+        assert collect_garbage() == 2
+        assert blob_path(kept).exists()
+        assert not blob_path(orphan).exists()
+        assert not stale.exists()
+        assert fresh.exists()
+
+    def test_deduplicate_existing(self, tmp_path):
+        """Verify existing files are moved into the store and savings are counted."""
+        a = write(tmp_path / "a.3mf", b"x" * 100)
+        b = write(tmp_path / "b.3mf", b"x" * 100)
+        missing = tmp_path / "missing.3mf"
+
+        files, saved = blob_store._deduplicate([(a, None), (b, None), (missing, None)])
+
+        assert files == 2
+        assert saved == 100
+        assert a.samefile(b)
@@ -0,0 +1,98 @@
+"""Unit tests for stored filament requirements.
+
+Tests storing at ingest, lookup by content hash and lazy backfill.
+"""
+
+import io
+import zipfile
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.app.models.archive import PrintArchive
+from backend.app.models.filament_requirements import FilamentRequirements
+from backend.app.services import filament_requirements as service
+from backend.app.services.filament_requirements import (
+    filament_requirements_for_archive,
+    store_filament_requirements,
+)
+
+SLICE_INFO = """<?xml version="1.0" encoding="UTF-8"?>
+<config>
+    <plate>
+        <metadata key="index" value="1"/>
+        <filament id="1" used_g="12.5" type="PLA" color="#FF0000"/>
+    </plate>
+    <plate>
+        <metadata key="index" value="2"/>
+        <filament id="2" used_g="30.0" type="PETG" color="#00FF00"/>
+    </plate>
+</config>
+"""
+
+
+@pytest.fixture
+def archive_file(tmp_path):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("Metadata/slice_info.config", SLICE_INFO)
+    file_path = tmp_path / "archive" / "test.3mf"
+    file_path.parent.mkdir()
+    file_path.write_bytes(buffer.getvalue())
+    return file_path
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    with patch.object(service.settings, "base_dir", tmp_path):
+        yield tmp_path
+
+
+class TestFilamentRequirements:
+    """Tests for the filament requirements store."""
+
+    @pytest.mark.asyncio
+    async def test_store_is_idempotent(self, db_session, archive_file):
+        """Verify storing the same content twice keeps one entry."""
+        await store_filament_requirements(db_session, archive_file, "a" * 64)
+        await store_filament_requirements(db_session, archive_file, "a" * 64)
+        await db_session.commit()
+
+        count = await db_session.scalar(select(func.count(FilamentRequirements.id)))
+        assert count == 1
+
+    @pytest.mark.asyncio
+    async def test_archive_reads_stored_requirements(self, db_session, archive_file, base_dir):
+        """Verify archives with a stored entry don't reparse the file."""
+        archive = PrintArchive(filename="test.3mf", file_path="archive/test.3mf", content_hash="b" * 64, file_size=1)
+        await store_filament_requirements(db_session, archive_file, archive.content_hash)
+
+        with patch.object(service, "_parse_requirements") as mock_parse:
+            plate2 = await filament_requirements_for_archive(db_session, archive, plate_id=2)
+            everything = await filament_requirements_for_archive(db_session, archive)
+
+        mock_parse.assert_not_called()
+        assert [f["type"] for f in plate2] == ["PETG"]
+        assert [f["slot_id"] for f in everything] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_lazy_backfill(self, db_session, archive_file, base_dir):
+        """Verify an archive without a hash or stored entry is hashed, parsed and stored once."""
+        archive = PrintArchive(filename="test.3mf", file_path="archive/test.3mf", file_size=1)
+        db_session.add(archive)
+        await db_session.commit()
+
+        plate1 = await filament_requirements_for_archive(db_session, archive, plate_id=1)
+
+        assert [f["type"] for f in plate1] == ["PLA"]
+        assert archive.content_hash == service._hash_file(archive_file)
+        stored = await db_session.scalar(
+            select(FilamentRequirements).where(FilamentRequirements.content_hash == archive.content_hash)
+        )
+        assert stored is not None
+
+    @pytest.mark.asyncio
+    async def test_unknown_plate_is_empty(self, db_session, archive_file, base_dir):
+        archive = PrintArchive(filename="test.3mf", file_path="archive/test.3mf", content_hash="c" * 64, file_size=1)
+        assert await filament_requirements_for_archive(db_session, archive, plate_id=9) == []
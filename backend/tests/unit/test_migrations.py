@@ -0,0 +1,97 @@
+"""Unit tests for versioned schema migrations."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import text
+
+from backend.app.core import migrations as migrations_module
+from backend.app.core.config import APP_VERSION
+from backend.app.core.migrations import (
+    MIGRATIONS,
+    Migration,
+    get_schema_state,
+    mark_seeded,
+    run_migrations,
+)
+
+
+def fake_migrations(count: int) -> list[Migration]:
+    return [Migration(version, f"step {version}", AsyncMock()) for version in range(1, count + 1)]
+
+
+class TestRunMigrations:
+    """Tests for run_migrations()."""
+
+    @pytest.fixture
+    async def conn(self, test_engine):
+        async with test_engine.begin() as conn:
+            yield conn
+
+    @pytest.mark.asyncio
+    async def test_applies_pending_in_order_once(self, conn):
+        """Verify pending migrations run once, in order, and the version is recorded."""
+        steps = fake_migrations(3)
+        with patch.object(migrations_module, "MIGRATIONS", steps):
+            assert await run_migrations(conn) == steps
+            assert (await get_schema_state(conn)).version == 3
+
+            assert await run_migrations(conn) == []
+
+        for step in steps:
+            step.upgrade.assert_awaited_once_with(conn)
+
+    @pytest.mark.asyncio
+    async def test_only_newer_migrations_run(self, conn):
+        """Verify an upgrade only runs the migrations added since the recorded version."""
+        with patch.object(migrations_module, "MIGRATIONS", fake_migrations(2)):
+            await run_migrations(conn)
+
+        steps = fake_migrations(4)
+        with patch.object(migrations_module, "MIGRATIONS", steps):
+            applied = await run_migrations(conn)
+
+        assert [m.version for m in applied] == [3, 4]
+        steps[0].upgrade.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_dry_run_changes_nothing(self, conn):
+        """Verify a dry run lists pending migrations without applying them."""
+        steps = fake_migrations(2)
+        with patch.object(migrations_module, "MIGRATIONS", steps):
+            assert await run_migrations(conn, dry_run=True) == steps
+
+        steps[0].upgrade.assert_not_awaited()
+        assert (await get_schema_state(conn)).version == 0
+        assert not (await conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'schema_version'"))).first()
+
+    @pytest.mark.asyncio
+    async def test_newer_database_left_alone(self, conn):
+        """Verify a database from a newer release isn't migrated."""
+        with patch.object(migrations_module, "MIGRATIONS", fake_migrations(5)):
+            await run_migrations(conn)
+
+        steps = fake_migrations(3)
+        with patch.object(migrations_module, "MIGRATIONS", steps):
+            assert await run_migrations(conn) == []
+        assert (await get_schema_state(conn)).version == 5
+
+    @pytest.mark.asyncio
+    async def test_migration_resets_seeded_version(self, conn):
+        """Verify defaults are seeded again after a schema change."""
+        with patch.object(migrations_module, "MIGRATIONS", fake_migrations(1)):
+            await run_migrations(conn)
+        await mark_seeded(conn)
+        assert (await get_schema_state(conn)).seeded_app_version == APP_VERSION
+
+        with patch.object(migrations_module, "MIGRATIONS", fake_migrations(2)):
+            await run_migrations(conn)
+        assert (await get_schema_state(conn)).seeded_app_version is None
+
+    @pytest.mark.asyncio
+    async def test_real_migrations_idempotent(self, conn):
+        """Verify the real migrations apply cleanly to a schema created by create_all."""
+        applied = await run_migrations(conn)
+
+        assert [m.version for m in applied] == [m.version for m in MIGRATIONS]
+        assert (await get_schema_state(conn)).version == MIGRATIONS[-1].version
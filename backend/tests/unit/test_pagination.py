@@ -0,0 +1,47 @@
+"""Unit tests for pagination cursors and sparse field selection."""
+
+import pytest
+
+from backend.app.services.pagination import (
+    InvalidCursorError,
+    UnknownFieldError,
+    decode_cursor,
+    encode_cursor,
+    parse_fields,
+)
+
+
+class TestCursors:
+    """Tests for encode_cursor() and decode_cursor()."""
+
+    def test_round_trip(self):
+        """Verify a cursor decodes to the key it was made from."""
+        cursor = encode_cursor("2024-01-01 12:00:00", 42)
+        assert decode_cursor(cursor, str, int) == ("2024-01-01 12:00:00", 42)
+
+    @pytest.mark.parametrize(
+        "cursor",
+        ["not-a-cursor", encode_cursor(1), encode_cursor("x", "not-an-id"), encode_cursor(None, None, None)],
+    )
+    def test_invalid(self, cursor):
+        """Verify garbage, wrong-length and wrongly typed cursors are rejected."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor, str, int)
+
+
+class TestParseFields:
+    """Tests for parse_fields()."""
+
+    def test_all_fields_by_default(self):
+        """Verify no selection means all fields."""
+        assert parse_fields(None, ["id"]) is None
+        assert parse_fields("", ["id"]) is None
+
+    def test_keeps_order_and_drops_repeats(self):
+        """Verify the requested order is kept and repeated or empty names are ignored."""
+        assert parse_fields("name, id,,name", ["id", "name"]) == ["name", "id"]
+
+    def test_unknown_field(self):
+        """Verify fields the response doesn't have are rejected."""
+        with pytest.raises(UnknownFieldError):
+            parse_fields("id,secret", ["id"])
@@ -0,0 +1,211 @@
+"""Query plan regression tests.
+
+Runs the hot queries through EXPLAIN QUERY PLAN and checks that SQLite uses
+the intended indexes, so a query rewrite or a dropped index that falls back to
+a full table scan or a temporary sort fails here instead of on a large
+installation.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, select
+
+from backend.app.models.library import LibraryFile
+from backend.app.models.print_log import PrintLogEntry  # noqa: F401  (registers the table)
+from backend.app.models.print_queue import PrintQueueItem
+from backend.app.models.spool_usage_history import SpoolUsageHistory
+from backend.app.services.archive import ArchiveService
+from backend.app.services.archive_duplicates import get_archives_with_duplicates
+from backend.app.services.export import ExportService
+from backend.app.services.pagination import encode_cursor
+
+
+@contextmanager
+def captured_queries(engine):
+    """Collect the SQL statements (with parameters) executed on an engine."""
+    queries: list[tuple[str, tuple]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def query_plans(db, queries, table: str, containing: str = "") -> list[str]:
+    """EXPLAIN QUERY PLAN of each captured SELECT reading the given table."""
+    conn = await db.connection()
+    plans = []
+    for statement, parameters in queries:
+        if not statement.lstrip().upper().startswith("SELECT") or f"FROM {table}" not in statement:
+            continue
+        if containing not in statement:
+            continue
+        rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+        plans.append("\n".join(row[3] for row in rows))
+    assert plans, f"no query on {table} was executed"
+    return plans
+
+
+async def plan_of(db, stmt) -> str:
+    compiled = stmt.compile(dialect=db.bind.dialect)
+    parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    conn = await db.connection()
+    rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", parameters)).all()
+    return "\n".join(row[3] for row in rows)
+
+
+def assert_uses(plan: str, index: str, *, sorted_by_index: bool = True) -> None:
+    assert f"INDEX {index}" in plan, plan
+    if sorted_by_index:
+        assert "TEMP B-TREE" not in plan, plan
+
+
+class TestArchiveQueryPlans:
+    """Query plans of archive listing and duplicate detection."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("filters", "index"),
+        [
+            ({}, "ix_print_archives_created_at"),
+            ({"printer_id": 1}, "ix_print_archives_printer_created"),
+            ({"project_id": 1}, "ix_print_archives_project_created"),
+        ],
+    )
+    async def test_list_archives(self, test_engine, db_session, filters, index):
+        """Verify listing reads the newest archives from an index without sorting."""
+        with captured_queries(test_engine) as queries:
+            await ArchiveService(db_session).list_archives(**filters)
+
+        plan = (await query_plans(db_session, queries, "print_archives"))[0]
+        assert_uses(plan, index)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("filters", "index"),
+        [
+            ({}, "ix_print_archives_created_at (created_at<?)"),
+            ({"printer_id": 1}, "ix_print_archives_printer_created (printer_id=? AND created_at<?)"),
+            ({"project_id": 1}, "ix_print_archives_project_created (project_id=? AND created_at<?)"),
+        ],
+    )
+    async def test_list_archives_cursor(self, test_engine, db_session, filters, index):
+        """Verify a cursor page starts reading the index at the cursor instead of skipping rows."""
+        cursor = encode_cursor("2024-01-01 12:00:00", 42)
+        with captured_queries(test_engine) as queries:
+            await ArchiveService(db_session).list_archives(cursor=cursor, **filters)
+
+        plan = (await query_plans(db_session, queries, "print_archives"))[0]
+        assert_uses(plan, index)
+
+    @pytest.mark.asyncio
+    async def test_export_status_filter(self, test_engine, db_session):
+        """Verify a status-filtered export walks the status index in date order."""
+        with captured_queries(test_engine) as queries:
+            chunks, _, _ = await ExportService(db_session).export_archives(status="failed")
+            async for _chunk in chunks:
+                pass
+
+        plan = (await query_plans(db_session, queries, "print_archives"))[0]
+        assert_uses(plan, "ix_print_archives_status_created")
+
+    @pytest.mark.asyncio
+    async def test_duplicate_flags(self, test_engine, db_session):
+        """Verify marking a page's duplicates only looks up its archives and their keys."""
+        with captured_queries(test_engine) as queries:
+            await get_archives_with_duplicates(db_session, [1, 2, 3])
+
+        plan = (await query_plans(db_session, queries, "print_archives"))[0]
+        assert "SCAN" not in plan, plan
+        assert plan.count("INDEX sqlite_autoindex_archive_duplicates_1 (scope=? AND key=?)") == 2, plan
+
+    @pytest.mark.asyncio
+    async def test_find_duplicates(self, test_engine, db_session):
+        """Verify duplicate lookups use the hash, name and MakerWorld ID indexes."""
+        with captured_queries(test_engine) as queries:
+            await ArchiveService(db_session).find_duplicates(
+                1, content_hash="abc", print_name="Benchy", makerworld_model_id="12345"
+            )
+
+        exact_plan, similar_plan = await query_plans(db_session, queries, "print_archives")
+        assert_uses(exact_plan, "ix_print_archives_content_hash", sorted_by_index=False)
+        assert "MULTI-INDEX OR" in similar_plan, similar_plan
+        assert_uses(similar_plan, "ix_print_archives_name_key", sorted_by_index=False)
+        assert_uses(similar_plan, "ix_print_archives_makerworld_id", sorted_by_index=False)
+
+
+class TestRelatedQueryPlans:
+    """Query plans of the queue, library, print log and spool usage queries."""
+
+    @pytest.mark.asyncio
+    async def test_scheduler_pending_items(self, db_session):
+        """Verify the scheduler's pending items come from the queue index in order."""
+        plan = await plan_of(
+            db_session,
+            select(PrintQueueItem)
+            .where(PrintQueueItem.status == "pending")
+            .order_by(PrintQueueItem.printer_id, PrintQueueItem.position),
+        )
+        assert_uses(plan, "ix_print_queue_status_printer_position")
+
+    @pytest.mark.asyncio
+    async def test_printing_item_of_printer(self, db_session):
+        """Verify looking up a printer's running item uses the queue index."""
+        plan = await plan_of(
+            db_session,
+            select(PrintQueueItem).where(PrintQueueItem.printer_id == 1).where(PrintQueueItem.status == "printing"),
+        )
+        assert_uses(plan, "ix_print_queue_status_printer_position")
+
+    @pytest.mark.asyncio
+    async def test_library_folder_listing(self, db_session):
+        """Verify a folder's files are read in filename order from the index."""
+        plan = await plan_of(
+            db_session, select(LibraryFile).where(LibraryFile.folder_id == 1).order_by(LibraryFile.filename)
+        )
+        assert_uses(plan, "ix_library_files_folder_filename")
+
+    @pytest.mark.asyncio
+    async def test_library_folder_page(self, test_engine, db_session, async_client):
+        """Verify a cursor page of a folder starts reading the index at the cursor."""
+        params = {"folder_id": 1, "limit": 50, "cursor": encode_cursor("part.3mf", 42)}
+        with captured_queries(test_engine) as queries:
+            response = await async_client.get("/api/v1/library/files", params=params)
+        assert response.status_code == 200
+
+        plan = (await query_plans(db_session, queries, "library_files", containing="ORDER BY"))[0]
+        assert_uses(plan, "ix_library_files_folder_filename (folder_id=? AND filename>?)")
+
+    @pytest.mark.asyncio
+    async def test_spool_usage_history(self, db_session):
+        """Verify a spool's usage history is read newest first from the index."""
+        plan = await plan_of(
+            db_session,
+            select(SpoolUsageHistory)
+            .where(SpoolUsageHistory.spool_id == 1)
+            .order_by(SpoolUsageHistory.created_at.desc())
+            .limit(50),
+        )
+        assert_uses(plan, "ix_spool_usage_history_spool_created")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("params", "index"),
+        [
+            ({}, "ix_print_log_entries_created_at"),
+            ({"printer_id": 1}, "ix_print_log_entries_printer_created"),
+        ],
+    )
+    async def test_print_log(self, test_engine, db_session, async_client, params, index):
+        """Verify the print log page is read newest first from an index."""
+        with captured_queries(test_engine) as queries:
+            response = await async_client.get("/api/v1/print-log/", params=params)
+        assert response.status_code == 200
+
+        plan = (await query_plans(db_session, queries, "print_log_entries", containing="ORDER BY"))[0]
+        assert_uses(plan, index)
@@ -0,0 +1,290 @@
+"""Tests for event-driven wakeups in the print scheduler."""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from backend.app.services.print_scheduler import PrintScheduler
+
+
+def make_item(item_id: int, printer_id: int | None, scheduled_time: datetime | None = None):
+    item = MagicMock()
+    item.id = item_id
+    item.printer_id = printer_id
+    item.archive_id = 100
+    item.library_file_id = None
+    item.scheduled_time = scheduled_time
+    item.manual_start = False
+    item.target_model = None
+    item.require_previous_success = False
+    return item
+
+
+def patch_session(items):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = items
+    mock_db = AsyncMock()
+    mock_db.execute = AsyncMock(return_value=mock_result)
+    ctx = patch("backend.app.services.print_scheduler.async_session")
+    mock_session = ctx.start()
+    mock_session.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+    mock_session.return_value.__aexit__ = AsyncMock(return_value=False)
+    return ctx
+
+
+class TestSchedulerWake:
+    """Test wakeup bookkeeping."""
+
+    @pytest.fixture
+    def scheduler(self):
+        return PrintScheduler()
+
+    def test_first_pass_checks_all_printers(self, scheduler):
+        """The first pass after startup should re-evaluate every printer."""
+        assert scheduler._take_wakeups() is None
+        assert scheduler._take_wakeups() == set()
+
+    def test_wake_collects_printers(self, scheduler):
+        """Waking specific printers should only re-evaluate those printers."""
+        scheduler._take_wakeups()
+        scheduler.wake(1)
+        scheduler.wake(2)
+        assert scheduler._take_wakeups() == {1, 2}
+
+    def test_wake_all_wins(self, scheduler):
+        """Waking without a printer should re-evaluate every printer."""
+        scheduler._take_wakeups()
+        scheduler.wake(1)
+        scheduler.wake()
+        assert scheduler._take_wakeups() is None
+
+    def test_status_wakes_on_transition_only(self, scheduler):
+        """Only changes to connection or print state should wake the scheduler."""
+        scheduler._take_wakeups()
+        state = MagicMock(connected=True, state="RUNNING")
+
+        scheduler.on_printer_status(1, state, {"status"})
+        assert scheduler._take_wakeups() == {1}
+
+        scheduler.on_printer_status(1, state, {"status"})
+        assert scheduler._take_wakeups() == set()
+
+        state.state = "IDLE"
+        scheduler.on_printer_status(1, state, {"status"})
+        assert scheduler._take_wakeups() == {1}
+
+    @patch("backend.app.services.print_scheduler.printer_manager")
+    def test_ams_change_wakes_idle_printer(self, mock_pm, scheduler):
+        """Filament changes on an idle printer may satisfy a waiting job."""
+        mock_pm.is_connected.return_value = True
+        mock_pm.get_status.return_value = MagicMock(state="IDLE")
+        state = MagicMock(connected=True, state="IDLE")
+        scheduler.on_printer_status(1, state, {"status"})
+        scheduler._take_wakeups()
+
+        scheduler.on_printer_status(1, state, {"ams"})
+        assert scheduler._take_wakeups() == {1}
+
+    def test_due_timers_wake_printers(self, scheduler):
+        """Scheduled items that are due should wake their printer."""
+        scheduler._take_wakeups()
+        past = datetime.utcnow() - timedelta(seconds=1)
+        future = datetime.utcnow() + timedelta(hours=1)
+        scheduler._timers = [(past, 1, 3), (future, 2, 4)]
+
+        scheduler._pop_due_timers()
+
+        assert scheduler._take_wakeups() == {3}
+        assert len(scheduler._timers) == 1
+
+    @pytest.mark.asyncio
+    async def test_wait_returns_on_wake(self, scheduler):
+        """A wake should end the wait well before the safety-net interval."""
+        scheduler._running = True
+        scheduler._wake_event = asyncio.Event()
+        scheduler._debounce_delay = 0
+        scheduler._take_wakeups()
+
+        asyncio.get_running_loop().call_later(0.05, scheduler.wake, 5)
+        await asyncio.wait_for(scheduler._wait_for_work(), timeout=2)
+
+        assert scheduler._take_wakeups() == {5}
+
+
+class TestSchedulerPartialPass:
+    """Test that woken passes only re-evaluate affected printers."""
+
+    @pytest.fixture
+    def scheduler(self):
+        return PrintScheduler()
+
+    @pytest.mark.asyncio
+    @patch("backend.app.services.print_scheduler.printer_manager")
+    async def test_only_affected_printers_started(self, mock_pm, scheduler):
+        """Items for printers outside the woken set should not be evaluated."""
+        mock_pm.is_connected.return_value = True
+        mock_pm.get_status.return_value = MagicMock(state="IDLE")
+        ctx = patch_session([make_item(1, 1), make_item(2, 2)])
+        try:
+            with patch.object(scheduler, "_dispatch_print", AsyncMock()) as mock_dispatch:
+                await scheduler.check_queue({2})
+                await scheduler.wait_for_dispatches()
+        finally:
+            ctx.stop()
+
+        mock_dispatch.assert_called_once_with(2)
+
+    @pytest.mark.asyncio
+    @patch("backend.app.services.print_scheduler.printer_manager")
+    async def test_future_items_become_timers(self, mock_pm, scheduler):
+        """Pending items scheduled in the future should be tracked as timers."""
+        mock_pm.is_connected.return_value = True
+        mock_pm.get_status.return_value = MagicMock(state="RUNNING")
+        future = datetime.utcnow() + timedelta(hours=1)
+        ctx = patch_session([make_item(1, 1, future), make_item(2, 2)])
+        try:
+            await scheduler.check_queue()
+        finally:
+            ctx.stop()
+
+        assert scheduler._timers == [(future, 1, 1)]
+
+
+class TestSchedulerConcurrentDispatch:
+    """Test that printers are dispatched independently of each other."""
+
+    @pytest.fixture
+    def scheduler(self):
+        return PrintScheduler()
+
+    @pytest.mark.asyncio
+    @patch("backend.app.services.print_scheduler.printer_manager")
+    async def test_slow_printer_does_not_block_others(self, mock_pm, scheduler):
+        """A slow upload to one printer should not delay starting another."""
+        mock_pm.is_connected.return_value = True
+        mock_pm.get_status.return_value = MagicMock(state="IDLE")
+        release = asyncio.Event()
+        started: list[int] = []
+
+        async def fake_dispatch(item_id):
+            started.append(item_id)
+            if item_id == 1:
+                await release.wait()
+
+        ctx = patch_session([make_item(1, 1), make_item(2, 2)])
+        try:
+            with patch.object(scheduler, "_dispatch_print", side_effect=fake_dispatch):
+                await asyncio.wait_for(scheduler.check_queue(), timeout=1)
+                await asyncio.sleep(0)
+                assert started == [1, 2]
+                assert 2 not in scheduler._dispatch_tasks
+                assert scheduler._is_dispatching(1)
+
+                # The printer still uploading stays busy for the next pass
+                await scheduler.check_queue()
+                await asyncio.sleep(0)
+                assert started.count(1) == 1
+
+                release.set()
+                await scheduler.wait_for_dispatches()
+        finally:
+            ctx.stop()
+
+        assert not scheduler._dispatch_tasks
+        assert not scheduler._dispatch_items
+
+    @pytest.mark.asyncio
+    async def test_started_printer_busy_until_it_reports(self, scheduler):
+        """A just-started printer should not get another job while it still reports IDLE."""
+        scheduler._recently_started[1] = asyncio.get_running_loop().time() + 60
+        assert scheduler._is_dispatching(1)
+
+        scheduler.on_printer_status(1, MagicMock(connected=True, state="IDLE"), {"status"})
+        assert scheduler._is_dispatching(1)
+
+        scheduler.on_printer_status(1, MagicMock(connected=True, state="PREPARE"), {"status"})
+        assert not scheduler._is_dispatching(1)
+
+    @pytest.mark.asyncio
+    async def test_start_grace_period_expires(self, scheduler):
+        """A printer that never reports should become available after the grace period."""
+        scheduler._recently_started[1] = asyncio.get_running_loop().time() - 1
+        assert not scheduler._is_dispatching(1)
+        assert 1 not in scheduler._recently_started
+
+
+class TestModelAssignment:
+    """Test joint assignment of model-based items to idle printers."""
+
+    @pytest.fixture
+    def scheduler(self):
+        return PrintScheduler()
+
+    @staticmethod
+    def make_printer(printer_id: int, trays: list[tuple[str, str]]):
+        printer = MagicMock()
+        printer.id = printer_id
+        printer.model = "X1C"
+        printer.location = None
+        status = MagicMock(state="IDLE")
+        status.raw_data = {
+            "ams": [
+                {
+                    "id": 0,
+                    "tray": [
+                        {"id": i, "tray_type": tray_type, "tray_color": color}
+                        for i, (tray_type, color) in enumerate(trays)
+                    ],
+                }
+            ]
+        }
+        return printer, status
+
+    @staticmethod
+    def make_model_item(item_id: int, filament: tuple[str, str]):
+        item = make_item(item_id, None)
+        item.target_model = "X1C"
+        item.target_location = None
+        item.required_filament_types = None
+        item.filament = [{"slot_id": 1, "type": filament[0], "color": filament[1]}]
+        return item
+
+    @pytest.mark.asyncio
+    @patch("backend.app.services.print_scheduler.printer_manager")
+    async def test_does_not_strand_job_needing_specific_printer(self, mock_pm, scheduler):
+        """The first item should leave the only PETG printer to the item that needs it."""
+        printer_a, status_a = self.make_printer(1, [("PLA", "FF0000FF"), ("PETG", "000000FF")])
+        printer_b, status_b = self.make_printer(2, [("PLA", "FF0000FF")])
+        statuses = {1: status_a, 2: status_b}
+        mock_pm.is_connected.return_value = True
+        mock_pm.get_status.side_effect = statuses.get
+
+        pla_item = self.make_model_item(10, ("PLA", "#FF0000"))
+        petg_item = self.make_model_item(11, ("PETG", "#000000"))
+
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = [printer_a, printer_b]
+        mock_db = AsyncMock()
+        mock_db.execute = AsyncMock(return_value=mock_result)
+
+        async def requirements(db, item):
+            return item.filament
+
+        with patch.object(scheduler, "_get_filament_requirements", side_effect=requirements):
+            planned = await scheduler._plan_model_assignments(mock_db, [pla_item, petg_item], set())
+
+        assert planned == {10: 2, 11: 1}
+        details = {d["item_id"]: d for d in scheduler.last_assignment["items"]}
+        assert details[11]["costs"][2]["spool_swaps"] == 1
+        assert details[11]["costs"][1]["spool_swaps"] == 0
+
+    def test_filament_match_cost(self, scheduler):
+        """Exact colors are free, similar colors cheap and missing types most expensive."""
+        loaded = [{"type": "PLA", "color": "#FF0000"}, {"type": "PETG", "color": "#000000"}]
+
+        assert scheduler._filament_match_cost([{"type": "PLA", "color": "#FF0000"}], loaded) == (0, 0)
+        assert scheduler._filament_match_cost([{"type": "PLA", "color": "#F01010"}], loaded) == (1, 0)
+        assert scheduler._filament_match_cost([{"type": "PLA", "color": "#0000FF"}], loaded) == (4, 1)
+        assert scheduler._filament_match_cost([{"type": "ABS", "color": "#FF0000"}], loaded) == (10, 1)
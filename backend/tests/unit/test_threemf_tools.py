@@ -9,6 +9,7 @@ import math
 import zipfile
 
 from backend.app.utils.threemf_tools import (
+    extract_filament_requirements_from_3mf,
     extract_filament_usage_from_3mf,
     get_cumulative_usage_at_layer,
     mm_to_grams,
@@ -408,3 +409,62 @@ class TestExtractFilamentUsageFrom3mf:
         assert len(result) == 1
         assert result[0]["type"] == ""
         assert result[0]["color"] == ""
+
+
+MULTI_PLATE_SLICE_INFO = """<?xml version="1.0" encoding="UTF-8"?>
+<config>
+    <plate>
+        <metadata key="index" value="1"/>
+        <filament id="2" used_g="25.04" used_m="8.1" type="PLA" color="#FF0000" tray_info_idx="GFA00"/>
+        <filament id="1" used_g="10.0" used_m="3.2" type="PETG" color="#00FF00"/>
+        <filament id="3" used_g="0" type="ABS" color="#0000FF"/>
+    </plate>
+    <plate>
+        <metadata key="index" value="2"/>
+        <filament id="1" used_g="75.0" type="PETG" color="#00FF00"/>
+    </plate>
+</config>
+"""
+
+
+class TestExtractFilamentRequirementsFrom3mf:
+    """Tests for extract_filament_requirements_from_3mf()."""
+
+    def test_whole_file_and_per_plate(self):
+        with zipfile.ZipFile(create_mock_3mf(MULTI_PLATE_SLICE_INFO)) as zf:
+            result = extract_filament_requirements_from_3mf(zf)
+
+        assert [f["slot_id"] for f in result["all"]] == [1, 1, 2]
+        assert set(result["plates"]) == {"1", "2"}
+        plate1 = result["plates"]["1"]
+        assert [f["slot_id"] for f in plate1] == [1, 2]
+        assert plate1[1] == {
+            "slot_id": 2,
+            "type": "PLA",
+            "color": "#FF0000",
+            "used_grams": 25.0,
+            "used_meters": 8.1,
+            "tray_info_idx": "GFA00",
+        }
+        assert result["plates"]["2"][0]["used_grams"] == 75.0
+
+    def test_nozzle_mapping_added_for_dual_nozzle_files(self):
+        buffer = create_mock_3mf(MULTI_PLATE_SLICE_INFO)
+        with zipfile.ZipFile(buffer, "a") as zf:
+            zf.writestr(
+                "Metadata/project_settings.config",
+                '{"filament_nozzle_map": ["0", "1"], "physical_extruder_map": ["1", "0"]}',
+            )
+        buffer.seek(0)
+        with zipfile.ZipFile(buffer) as zf:
+            result = extract_filament_requirements_from_3mf(zf)
+
+        assert {f["slot_id"]: f["nozzle_id"] for f in result["plates"]["1"]} == {1: 1, 2: 0}
+
+    def test_missing_slice_info_returns_empty(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zf:
+            zf.writestr("3D/3dmodel.model", "<model/>")
+        buffer.seek(0)
+        with zipfile.ZipFile(buffer) as zf:
+            assert extract_filament_requirements_from_3mf(zf) == {"all": [], "plates": {}}
@@ -0,0 +1,334 @@
+"""Unit tests for the WebSocket ConnectionManager broadcast pipeline."""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.app.core.websocket import ConnectionManager, compute_status_delta
+
+
+class FakeWebSocket:
+    """Minimal WebSocket stand-in recording sent messages."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.sent: list[dict] = []
+        self.delay = delay
+        self.fail = fail
+        self.accepted = False
+        self.closed = False
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, data: str):
+        if self.fail:
+            raise RuntimeError("socket closed")
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(data))
+
+    async def close(self):
+        self.closed = True
+
+
+async def settle():
+    """Let writer tasks run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestComputeStatusDelta:
+    """Tests for compute_status_delta."""
+
+    def test_only_changed_keys(self):
+        """Verify only changed top-level keys are included."""
+        base = {"state": "RUNNING", "progress": 10, "ams": [{"id": 0}]}
+        current = {"state": "RUNNING", "progress": 11, "ams": [{"id": 0}]}
+        assert compute_status_delta(base, current) == {"progress": 11}
+
+    def test_new_keys_included(self):
+        """Verify keys added since the base are included."""
+        assert compute_status_delta({"a": 1}, {"a": 1, "b": None}) == {"b": None}
+
+    def test_removed_key_requires_snapshot(self):
+        """Verify a removed key forces a full snapshot."""
+        assert compute_status_delta({"a": 1, "b": 2}, {"a": 1}) is None
+
+
+class TestConnectionManager:
+    """Tests for ConnectionManager queues, coalescing and deltas."""
+
+    @pytest.fixture
+    def manager(self):
+        return ConnectionManager(coalesce_window=0.05)
+
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_all_clients(self, manager):
+        """Verify broadcasts are delivered to every connection."""
+        ws1, ws2 = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(ws1)
+        await manager.connect(ws2)
+
+        await manager.send_archive_created({"id": 1})
+        await settle()
+
+        assert ws1.sent == [{"type": "archive_created", "data": {"id": 1}}]
+        assert ws2.sent == ws1.sent
+        assert len(manager.active_connections) == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_block_others(self, manager):
+        """Verify a slow socket doesn't delay delivery to other clients."""
+        slow, fast = FakeWebSocket(delay=1.0), FakeWebSocket()
+        await manager.connect(slow)
+        await manager.connect(fast)
+
+        await asyncio.wait_for(manager.broadcast({"type": "x"}), 0.1)
+        await settle()
+
+        assert fast.sent == [{"type": "x"}]
+        assert slow.sent == []
+        await manager.disconnect(slow)
+
+    @pytest.mark.asyncio
+    async def test_failed_client_is_removed(self, manager):
+        """Verify clients whose send fails are dropped."""
+        broken = FakeWebSocket(fail=True)
+        await manager.connect(broken)
+
+        await manager.broadcast({"type": "x"})
+        await settle()
+
+        assert manager.active_connections == []
+
+    @pytest.mark.asyncio
+    async def test_first_status_sent_as_full_snapshot(self, manager):
+        """Verify a client with no prior state receives a full snapshot."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+
+        await manager.send_printer_status(1, {"state": "IDLE", "progress": 0})
+        await settle()
+
+        assert ws.sent == [{"type": "printer_status", "printer_id": 1, "data": {"state": "IDLE", "progress": 0}}]
+
+    @pytest.mark.asyncio
+    async def test_subsequent_status_sent_as_delta(self, manager):
+        """Verify later updates only carry the changed sections."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.send_printer_status(1, {"state": "RUNNING", "progress": 0})
+        await settle()
+
+        await asyncio.sleep(0.06)
+        await manager.send_printer_status(1, {"state": "RUNNING", "progress": 5})
+        await settle()
+
+        assert ws.sent[-1] == {"type": "printer_status", "printer_id": 1, "data": {"progress": 5}, "delta": True}
+
+    @pytest.mark.asyncio
+    async def test_updates_within_window_are_coalesced(self, manager):
+        """Verify only the latest state within the coalescing window is sent."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.send_printer_status(1, {"progress": 0})
+        await settle()
+
+        for progress in (1, 2, 3):
+            await manager.send_printer_status(1, {"progress": progress})
+        await settle()
+        assert len(ws.sent) == 1
+
+        await asyncio.sleep(0.08)
+        assert ws.sent[-1]["data"] == {"progress": 3}
+        assert len(ws.sent) == 2
+
+    @pytest.mark.asyncio
+    async def test_unchanged_status_not_resent(self, manager):
+        """Verify an identical state produces no message."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.send_printer_status(1, {"progress": 1})
+        await asyncio.sleep(0.06)
+        await manager.send_printer_status(1, {"progress": 1})
+        await settle()
+
+        assert len(ws.sent) == 1
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_delta(self, manager):
+        """Verify deltas are computed against the snapshot sent on connect."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.send_status_snapshot(ws, 1, {"state": "IDLE", "bed": 20})
+        await settle()
+
+        await manager.send_printer_status(1, {"state": "IDLE", "bed": 25})
+        await settle()
+
+        assert ws.sent[0] == {"type": "printer_status", "printer_id": 1, "data": {"state": "IDLE", "bed": 20}}
+        assert ws.sent[1]["data"] == {"bed": 25}
+        assert ws.sent[1]["delta"] is True
+
+    @pytest.mark.asyncio
+    async def test_snapshot_uses_pre_encoded_json(self, manager):
+        """Verify a snapshot with a cached encoding is sent without re-serializing."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        snapshot = {"state": "IDLE"}
+        await manager.send_status_snapshot(ws, 1, snapshot, encoded=b'{"state": "IDLE", "cached": true}')
+        await settle()
+
+        assert ws.sent == [{"type": "printer_status", "printer_id": 1, "data": {"state": "IDLE", "cached": True}}]
+        assert manager._clients[ws].sent_status[1] == (-1, snapshot)
+
+    @pytest.mark.asyncio
+    async def test_in_sync_clients_share_serialization(self, manager):
+        """Verify clients at the same base state reuse one serialized payload."""
+        ws1, ws2 = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(ws1)
+        await manager.connect(ws2)
+        await manager.send_printer_status(1, {"progress": 1})
+        await settle()
+
+        assert len(manager._payload_cache[1]) == 1
+
+    @pytest.mark.asyncio
+    async def test_removed_printer_state_forgotten(self, manager):
+        """Verify a printer re-added under a deleted printer's ID starts from a full snapshot."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await manager.send_printer_status(1, {"state": "RUNNING", "progress": 50})
+        await settle()
+
+        manager.remove_printer(1)
+
+        assert 1 not in manager._status
+        assert 1 not in manager._payload_cache
+        assert 1 not in manager._clients[ws].sent_status
+
+        await manager.send_printer_status(1, {"state": "IDLE", "progress": 0})
+        await settle()
+
+        assert ws.sent[-1] == {"type": "printer_status", "printer_id": 1, "data": {"state": "IDLE", "progress": 0}}
+
+    @pytest.mark.asyncio
+    async def test_disconnect_stops_writer(self, manager):
+        """Verify disconnect removes the client and cancels its writer task."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        client = manager._clients[ws]
+
+        await manager.disconnect(ws)
+
+        assert manager.active_connections == []
+        assert client.task.done()
+
+
+class TestSubscriptions:
+    """Tests for topic subscriptions and routing."""
+
+    @pytest.fixture
+    def manager(self):
+        return ConnectionManager(coalesce_window=0.0)
+
+    @pytest.mark.asyncio
+    async def test_printer_subscription_filters_status(self, manager):
+        """Verify clients subscribed to printers only get those printers' updates."""
+        kiosk, dashboard = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(kiosk)
+        await manager.connect(dashboard)
+        manager.update_subscriptions(kiosk, "subscribe", printers=[2])
+
+        await manager.send_printer_status(1, {"progress": 1})
+        await manager.send_printer_status(2, {"progress": 2})
+        await settle()
+
+        assert [m["printer_id"] for m in kiosk.sent] == [2]
+        assert sorted(m["printer_id"] for m in dashboard.sent) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_event_subscription_filters_types(self, manager):
+        """Verify event-type subscriptions drop other event types."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        manager.update_subscriptions(ws, "subscribe", events=["printer_status"])
+
+        await manager.send_archive_created({"id": 1})
+        await manager.send_printer_status(1, {"progress": 1})
+        await settle()
+
+        assert [m["type"] for m in ws.sent] == ["printer_status"]
+
+    @pytest.mark.asyncio
+    async def test_messages_without_printer_ignore_printer_filter(self, manager):
+        """Verify farm-wide events still reach printer-filtered clients."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        manager.update_subscriptions(ws, "subscribe", printers=[5])
+
+        await manager.send_archive_created({"id": 1})
+        await manager.send_print_complete(6, {})
+        await settle()
+
+        assert [m["type"] for m in ws.sent] == ["archive_created"]
+
+    @pytest.mark.asyncio
+    async def test_scope_subscription(self, manager):
+        """Verify permission scope subscriptions expand to their event types."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        manager.update_subscriptions(ws, "subscribe", scopes=["archives:read", "bogus:scope"])
+
+        await manager.send_archive_updated({"id": 1})
+        await manager.send_printer_status(1, {"progress": 1})
+        await settle()
+
+        assert [m["type"] for m in ws.sent] == ["archive_updated"]
+        assert manager.get_subscriptions(ws)["scopes"] == ["archives:read"]
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_and_wildcard(self, manager):
+        """Verify unsubscribing removes a printer and "*" restores everything."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        added = manager.update_subscriptions(ws, "subscribe", printers=[1, 2])
+        assert added == []
+        assert manager.update_subscriptions(ws, "subscribe", printers=[3]) == [3]
+
+        manager.update_subscriptions(ws, "unsubscribe", printers=[1])
+        assert manager.get_subscriptions(ws)["printers"] == [2, 3]
+
+        manager.update_subscriptions(ws, "subscribe", printers="*")
+        assert manager.get_subscriptions(ws)["printers"] == "*"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "subscription",
+        [{"printers": "12"}, {"printers": 1}, {"events": "printer_status"}, {"scopes": "archives:read"}],
+    )
+    async def test_non_list_subscription_rejected(self, manager, subscription):
+        """Verify a bare string or number is rejected instead of being read as a list of its characters."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        manager.update_subscriptions(ws, "subscribe", printers=[3], events=["printer_status"])
+
+        with pytest.raises(ValueError):
+            manager.update_subscriptions(ws, "subscribe", **subscription)
+
+        subscriptions = manager.get_subscriptions(ws)
+        assert subscriptions["printers"] == [3]
+        assert subscriptions["events"] == ["printer_status"]
+        assert subscriptions["scopes"] == []
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cleans_topic_index(self, manager):
+        """Verify disconnected clients are removed from every topic."""
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        manager.update_subscriptions(ws, "subscribe", printers=[1], events=["printer_status"])
+
+        await manager.disconnect(ws)
+
+        assert manager._topics == {}
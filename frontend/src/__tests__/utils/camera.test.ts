@@ -0,0 +1,24 @@
+/**
+ * Tests for camera stream sizing.
+ */
+
+import { describe, it, expect, afterEach, vi } from 'vitest';
+import { getCameraStreamMaxWidth } from '../../utils/camera';
+
+describe('getCameraStreamMaxWidth', () => {
+  afterEach(() => {
+    vi.unstubAllGlobals();
+  });
+
+  it('rounds the displayed width up to a step', () => {
+    vi.stubGlobal('devicePixelRatio', 1);
+    expect(getCameraStreamMaxWidth(400)).toBe(640);
+    expect(getCameraStreamMaxWidth(640)).toBe(640);
+    expect(getCameraStreamMaxWidth(0)).toBe(320);
+  });
+
+  it('accounts for the device pixel ratio', () => {
+    vi.stubGlobal('devicePixelRatio', 2);
+    expect(getCameraStreamMaxWidth(400)).toBe(960);
+  });
+});
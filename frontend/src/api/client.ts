@@ -369,6 +369,8 @@ export interface Archive {
   // User tracking (Issue #206)
   created_by_id: number | null;
   created_by_username: string | null;
+  // Search results only: matched text with the terms wrapped in <mark>
+  search_snippet?: string | null;
 }
 
 export interface PrintLogEntry {
@@ -406,6 +408,8 @@ export interface ArchiveStats {
   time_accuracy_by_printer: Record<string, number> | null;
   total_energy_kwh: number;
   total_energy_cost: number;
+  energy_sampled_at: string | null;
+  energy_stale: boolean;
 }
 
 export interface TagInfo {
@@ -3569,8 +3573,8 @@ export const api = {
     }),
 
   // Camera
-  getCameraStreamUrl: (printerId: number, fps = 10) =>
-    `${API_BASE}/printers/${printerId}/camera/stream?fps=${fps}`,
+  getCameraStreamUrl: (printerId: number, fps = 10, maxWidth?: number, viewerId?: string) =>
+    `${API_BASE}/printers/${printerId}/camera/stream?fps=${fps}${maxWidth ? `&max_width=${maxWidth}` : ''}${viewerId ? `&viewer=${viewerId}` : ''}`,
   getCameraSnapshotUrl: (printerId: number) =>
     `${API_BASE}/printers/${printerId}/camera/snapshot`,
   testCameraConnection: (printerId: number) =>
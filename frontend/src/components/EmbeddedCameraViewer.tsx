@@ -5,6 +5,7 @@ import { X, RefreshCw, AlertTriangle, Maximize2, Minimize2, GripVertical, WifiOf
 import { api, getAuthToken } from '../api/client';
 import { useToast } from '../contexts/ToastContext';
 import { useAuth } from '../contexts/AuthContext';
+import { getCameraStreamMaxWidth } from '../utils/camera';
 import { ChamberLight } from './icons/ChamberLight';
 import { SkipObjectsModal, SkipObjectsIcon } from './SkipObjectsModal';
 
@@ -87,9 +88,13 @@ export function EmbeddedCameraViewer({ printerId, printerName, viewerIndex = 0,
   const [streamError, setStreamError] = useState(false);
   const [streamLoading, setStreamLoading] = useState(true);
   const [imageKey, setImageKey] = useState(Date.now());
+  // Identifies this viewer's stream so stopping it doesn't affect other viewers of the printer
+  const [viewerId] = useState(() => Math.random().toString(36).slice(2, 10));
   const [reconnectAttempts, setReconnectAttempts] = useState(0);
   const [isReconnecting, setIsReconnecting] = useState(false);
   const [reconnectCountdown, setReconnectCountdown] = useState(0);
+  // Width requested from the server, only updated once a resize ends
+  const [streamWidth, setStreamWidth] = useState(() => getCameraStreamMaxWidth(state.width));
 
   const containerRef = useRef<HTMLDivElement>(null);
   const imgRef = useRef<HTMLImageElement>(null);
@@ -151,7 +156,7 @@ export function EmbeddedCameraViewer({ printerId, printerName, viewerIndex = 0,
   const stopSentRef = useRef(false);
   useEffect(() => {
     stopSentRef.current = false;
-    const stopUrl = `/api/v1/printers/${printerId}/camera/stop`;
+    const stopUrl = `/api/v1/printers/${printerId}/camera/stop?viewer=${viewerId}`;
 
     const sendStopOnce = () => {
       if (printerId > 0 && !stopSentRef.current) {
@@ -174,7 +179,7 @@ export function EmbeddedCameraViewer({ printerId, printerName, viewerIndex = 0,
       if (countdownIntervalRef.current) clearInterval(countdownIntervalRef.current);
       if (stallCheckIntervalRef.current) clearInterval(stallCheckIntervalRef.current);
     };
-  }, [printerId]);
+  }, [printerId, viewerId]);
 
   // Auto-hide loading after timeout
   useEffect(() => {
@@ -454,7 +459,7 @@ export function EmbeddedCameraViewer({ printerId, printerName, viewerIndex = 0,
     const stopHeaders: Record<string, string> = {};
     const stopToken = getAuthToken();
     if (stopToken) stopHeaders['Authorization'] = `Bearer ${stopToken}`;
-    fetch(`/api/v1/printers/${printerId}/camera/stop`, { method: 'POST', headers: stopHeaders }).catch(() => {});
+    fetch(`/api/v1/printers/${printerId}/camera/stop?viewer=${viewerId}`, { method: 'POST', headers: stopHeaders }).catch(() => {});
 
     if (imgRef.current) imgRef.current.src = '';
     setTimeout(() => setImageKey(Date.now()), 100);
@@ -509,7 +514,15 @@ export function EmbeddedCameraViewer({ printerId, printerName, viewerIndex = 0,
     }
   }, [isDragging, isResizing, dragOffset]);
 
-  const streamUrl = `/api/v1/printers/${printerId}/camera/stream?fps=15&t=${imageKey}`;
+  useEffect(() => {
+    if (!isResizing) {
+      setStreamWidth(getCameraStreamMaxWidth(state.width));
+    }
+  }, [isResizing, state.width]);
+
+  // Fullscreen and zoomed-in views need every pixel; the floating window only its own width
+  const streamMaxWidth = isFullscreen || zoomLevel > 1 ? undefined : streamWidth;
+  const streamUrl = `${api.getCameraStreamUrl(printerId, 15, streamMaxWidth, viewerId)}&t=${imageKey}`;
 
   return (
     <div
@@ -5,6 +5,8 @@ interface WebSocketMessage {
   type: string;
   printer_id?: number;
   data?: Record<string, unknown>;
+  // printer_status only: data holds just the changed top-level fields
+  delta?: boolean;
 }
 
 export function useWebSocket() {
@@ -6,6 +6,7 @@ import { RefreshCw, AlertTriangle, Camera, Maximize, Minimize, WifiOff, ZoomIn,
 import { api, getAuthToken } from '../api/client';
 import { useToast } from '../contexts/ToastContext';
 import { useAuth } from '../contexts/AuthContext';
+import { getCameraStreamMaxWidth } from '../utils/camera';
 import { ChamberLight } from '../components/icons/ChamberLight';
 import { SkipObjectsModal, SkipObjectsIcon } from '../components/SkipObjectsModal';
 
@@ -27,6 +28,8 @@ export function CameraPage() {
   const [streamError, setStreamError] = useState(false);
   const [streamLoading, setStreamLoading] = useState(true);
   const [imageKey, setImageKey] = useState(Date.now());
+  // Identifies this page's stream so stopping it doesn't affect other viewers of the printer
+  const [viewerId] = useState(() => Math.random().toString(36).slice(2, 10));
   const [transitioning, setTransitioning] = useState(false);
   const [isFullscreen, setIsFullscreen] = useState(false);
   const [reconnectAttempts, setReconnectAttempts] = useState(0);
@@ -38,6 +41,7 @@ export function CameraPage() {
   const [panStart, setPanStart] = useState({ x: 0, y: 0 });
   const [lastTouchDistance, setLastTouchDistance] = useState<number | null>(null);
   const [lastTouchCenter, setLastTouchCenter] = useState<{ x: number; y: number } | null>(null);
+  const [streamWidth, setStreamWidth] = useState(() => getCameraStreamMaxWidth(window.innerWidth));
   const imgRef = useRef<HTMLImageElement>(null);
   const containerRef = useRef<HTMLDivElement>(null);
   const reconnectTimerRef = useRef<NodeJS.Timeout | null>(null);
@@ -99,7 +103,7 @@ export function CameraPage() {
   const stopSentRef = useRef(false);
 
   useEffect(() => {
-    const stopUrl = `/api/v1/printers/${id}/camera/stop`;
+    const stopUrl = `/api/v1/printers/${id}/camera/stop?viewer=${viewerId}`;
     stopSentRef.current = false;
 
     const sendStopOnce = () => {
@@ -132,7 +136,7 @@ export function CameraPage() {
       // Send stop signal only once
       sendStopOnce();
     };
-  }, [id]);
+  }, [id, viewerId]);
 
   // Auto-hide loading after timeout
   useEffect(() => {
@@ -195,6 +199,22 @@ export function CameraPage() {
     };
   }, []);
 
+  // Request frames no wider than the window (debounced so resizing doesn't reopen the stream repeatedly)
+  useEffect(() => {
+    let resizeTimeout: NodeJS.Timeout;
+    const updateStreamWidth = () => {
+      clearTimeout(resizeTimeout);
+      resizeTimeout = setTimeout(() => setStreamWidth(getCameraStreamMaxWidth(window.innerWidth)), 500);
+    };
+
+    window.addEventListener('resize', updateStreamWidth);
+
+    return () => {
+      clearTimeout(resizeTimeout);
+      window.removeEventListener('resize', updateStreamWidth);
+    };
+  }, []);
+
   // Clean up reconnect timers on unmount
   useEffect(() => {
     return () => {
@@ -350,7 +370,7 @@ export function CameraPage() {
       const headers: Record<string, string> = {};
       const token = getAuthToken();
       if (token) headers['Authorization'] = `Bearer ${token}`;
-      fetch(`/api/v1/printers/${id}/camera/stop`, { method: 'POST', headers }).catch(() => {});
+      fetch(`/api/v1/printers/${id}/camera/stop?viewer=${viewerId}`, { method: 'POST', headers }).catch(() => {});
     }
   };
 
@@ -577,7 +597,7 @@ export function CameraPage() {
   const currentUrl = transitioning
     ? ''
     : streamMode === 'stream'
-      ? `/api/v1/printers/${id}/camera/stream?fps=15&t=${imageKey}`
+      ? `${api.getCameraStreamUrl(id, 15, zoomLevel > 1 ? undefined : streamWidth, viewerId)}&t=${imageKey}`
       : `/api/v1/printers/${id}/camera/snapshot?t=${imageKey}`;
 
   const isDisabled = streamLoading || transitioning || isReconnecting;
@@ -138,11 +138,20 @@ export function StreamOverlayPage() {
     const wsUrl = `${protocol}//${window.location.host}/api/v1/ws`;
     const ws = new WebSocket(wsUrl);
 
+    ws.onopen = () => {
+      // Only receive status updates for the printer shown in the overlay
+      ws.send(JSON.stringify({ type: 'subscribe', printers: [id], events: ['printer_status'] }));
+    };
+
     ws.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
-        if (data.type === 'printer_status' && data.printer_id === id) {
-          queryClient.setQueryData(['printerStatus', id], data.status);
+        if (data.type === 'printer_status' && data.printer_id === id && data.data) {
+          // Status updates may be deltas containing only changed fields - merge them
+          queryClient.setQueryData(['printerStatus', id], (old: Record<string, unknown> | undefined) => ({
+            ...old,
+            ...data.data,
+          }));
         }
       } catch {
         // Ignore parse errors
@@ -0,0 +1,18 @@
+/**
+ * Camera stream sizing
+ *
+ * Viewers pass the width they display the stream at, so the server can send
+ * them a downscaled tier instead of full-resolution frames.
+ */
+
+// Requested widths are rounded up to this step, so resizing a viewer only
+// reopens the stream when it crosses a step instead of on every pixel
+const STREAM_WIDTH_STEP = 320;
+
+/**
+ * Largest frame width a viewer displayed at the given CSS width can use
+ */
+export function getCameraStreamMaxWidth(displayWidth: number): number {
+  const pixels = displayWidth * (window.devicePixelRatio || 1);
+  return Math.max(1, Math.ceil(pixels / STREAM_WIDTH_STEP)) * STREAM_WIDTH_STEP;
+}
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Inspect and apply database schema migrations.
+
+Usage:
+    python scripts/migrate_db.py status             # current version and pending migrations
+    python scripts/migrate_db.py upgrade --dry-run  # list what an upgrade would apply
+    python scripts/migrate_db.py upgrade            # apply pending migrations (as on startup)
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.core.config import settings
+from backend.app.core.database import engine, init_db
+from backend.app.core.migrations import MIGRATIONS, get_schema_state, latest_version, run_migrations
+
+
+async def show_status() -> None:
+    async with engine.connect() as conn:
+        state = await get_schema_state(conn)
+
+    print(f"Database: {settings.database_url}")
+    print(f"Schema version: {state.version} (latest: {latest_version()})")
+    print(f"Defaults seeded for: {state.seeded_app_version or '-'}")
+    for migration in MIGRATIONS:
+        mark = "✓" if migration.version <= state.version else " "
+        print(f"  [{mark}] {migration.version:3d}  {migration.description}")
+
+
+async def upgrade(dry_run: bool) -> None:
+    if dry_run:
+        async with engine.connect() as conn:
+            pending = await run_migrations(conn, dry_run=True)
+        if not pending:
+            print("Schema is up to date.")
+        for migration in pending:
+            print(f"Would apply {migration.version}: {migration.description}")
+        return
+
+    async with engine.connect() as conn:
+        before = (await get_schema_state(conn)).version
+    await init_db()
+    async with engine.connect() as conn:
+        after = (await get_schema_state(conn)).version
+    print(f"✓ Schema version {before} -> {after}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    try:
+        if args.command == "upgrade":
+            await upgrade(args.dry_run)
+        else:
+            await show_status()
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and apply database schema migrations")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("status", help="Show the schema version and pending migrations")
+    upgrade_parser = subparsers.add_parser("upgrade", help="Apply pending migrations")
+    upgrade_parser.add_argument("--dry-run", action="store_true", help="Only list pending migrations")
+
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()